@@ -0,0 +1,127 @@
+# Copyright 2020 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmarks for TFX artifact deserialization and serialization."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import time
+
+from absl import flags
+from tfx.benchmarks import benchmark_base
+from tfx.orchestration import data_types_utils
+from tfx.types import artifact_utils
+from tfx.types import standard_artifacts
+
+from ml_metadata.proto import metadata_store_pb2
+from tensorflow.python.platform import test  # pylint: disable=g-direct-tensorflow-import
+
+FLAGS = flags.FLAGS
+flags.DEFINE_integer("num_artifacts", 100000,
+                     "Number of artifacts to deserialize.")
+
+
+class ArtifactBenchmark(benchmark_base.BenchmarkBase):
+  """Benchmarks for (de)serializing artifacts."""
+
+  def __init__(self, **kwargs):
+    # Benchmark runners may pass extraneous arguments we don't care about.
+    del kwargs
+    super(ArtifactBenchmark, self).__init__()
+
+  def _num_artifacts(self):
+    return (FLAGS.num_artifacts
+            if FLAGS.is_parsed() else FLAGS["num_artifacts"].default)
+
+  def _make_artifacts(self, artifact_type):
+    artifacts = []
+    for i in range(self._num_artifacts()):
+      artifact = metadata_store_pb2.Artifact()
+      artifact.id = i
+      artifact.type_id = artifact_type.id
+      artifact.uri = "/tmp/artifacts/%d" % i
+      artifact.properties["split_names"].string_value = '["train", "eval"]'
+      artifact.custom_properties["span"].int_value = i
+      artifacts.append(artifact)
+    return artifacts
+
+  def _run(self, artifact_type):
+    artifacts = self._make_artifacts(artifact_type)
+    start = time.time()
+    for artifact in artifacts:
+      artifact_utils.deserialize_artifact(artifact_type, artifact)
+    end = time.time()
+    delta = end - start
+    self.report_benchmark(
+        iters=1,
+        wall_time=delta,
+        extras={"num_artifacts": len(artifacts)})
+
+  def benchmarkDeserializeArtifacts(self):
+    """Benchmark deserializing artifacts of a standard artifact type."""
+    artifact_type = standard_artifacts.Examples._get_artifact_type()  # pylint: disable=protected-access
+    artifact_type.id = 1
+    self._run(artifact_type)
+
+  def benchmarkDeserializeArtifactsOfUnknownType(self):
+    """Benchmark deserializing artifacts of a type without artifact class."""
+    artifact_type = standard_artifacts.Examples._get_artifact_type()  # pylint: disable=protected-access
+    artifact_type.id = 1
+    artifact_type.name = "ArtifactBenchmarkUnknownType"
+    self._run(artifact_type)
+
+  def _run_serialization(self, serialize, deserialize):
+    artifact_type = standard_artifacts.Examples._get_artifact_type()  # pylint: disable=protected-access
+    artifact_type.id = 1
+    artifact_dict = {
+        "examples": [
+            artifact_utils.deserialize_artifact(artifact_type, artifact)
+            for artifact in self._make_artifacts(artifact_type)
+        ]
+    }
+    num_artifacts = len(artifact_dict["examples"])
+    start = time.time()
+    serialized = serialize(artifact_dict)
+    end = time.time()
+    serialize_delta = end - start
+    start = time.time()
+    deserialize(serialized)
+    end = time.time()
+    deserialize_delta = end - start
+    self.report_benchmark(
+        iters=1,
+        wall_time=serialize_delta + deserialize_delta,
+        extras={
+            "num_artifacts": num_artifacts,
+            "serialized_bytes_per_artifact": len(serialized) / num_artifacts,
+            "serialize_seconds_per_artifact": serialize_delta / num_artifacts,
+            "deserialize_seconds_per_artifact":
+                deserialize_delta / num_artifacts,
+        })
+
+  def benchmarkArtifactDictJsonSerialization(self):
+    """Benchmark the JSON format of artifact dicts passed to executors."""
+    self._run_serialization(artifact_utils.jsonify_artifact_dict,
+                            artifact_utils.parse_artifact_dict)
+
+  def benchmarkArtifactDictBinarySerialization(self):
+    """Benchmark the binary format of artifact dicts passed to executors."""
+    self._run_serialization(
+        lambda d: data_types_utils.serialize_executor_args(d, {}, {}),
+        data_types_utils.deserialize_executor_args)
+
+
+if __name__ == "__main__":
+  test.main()
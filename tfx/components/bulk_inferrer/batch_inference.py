@@ -0,0 +1,334 @@
+# Copyright 2020 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Batched inference on serialized examples for BulkInferrer.
+
+The public `RunInference` transform of tfx_bsl takes parsed examples one by
+one and batches them again with an adaptive batch size. BulkInferrer already
+reads its input in batches of serialized records, so this module runs the
+inference DoFns of tfx_bsl on those batches directly:
+
+  * Batches are sent to the model as they were read, so the batch size of
+    inference requests is the one configured in the DataSpec.
+  * In-process Predict only needs the serialized examples, so they are not
+    parsed at all. Other operations (and remote Predict) embed or inspect the
+    examples, which are parsed into the proto of the payload format.
+  * The number of batches concurrently in inference in a worker process can be
+    bounded, which bounds its memory usage and the load on remote endpoints.
+    The bound is shared by all transforms of the same inflight group.
+  * Batches can be keyed (e.g. by split) to run the batches of several inputs
+    through a single inference stage, which loads the model once per worker
+    process instead of once per input.
+
+The inference DoFns of tfx_bsl are not part of its public API. All uses of
+them are in `_get_inference_dofns`, and if the installed tfx_bsl lacks any of
+them, the examples are parsed and run through the public `RunInference`
+transform instead, without the batching and the bound of this module.
+"""
+
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Text, Tuple
+import uuid
+
+from absl import logging
+import apache_beam as beam
+import tensorflow as tf
+from tfx.proto import example_gen_pb2
+from tfx_bsl.beam import run_inference as run_inference_impl
+from tfx_bsl.beam import shared
+from tfx_bsl.public.beam import run_inference
+from tfx_bsl.public.proto import model_spec_pb2
+
+from tensorflow_serving.apis import prediction_log_pb2
+
+# Protos of the payload formats which can be parsed for inference.
+_EXAMPLE_CLASSES = {
+    example_gen_pb2.PayloadFormat.FORMAT_TF_EXAMPLE:
+        tf.train.Example,
+    example_gen_pb2.PayloadFormat.FORMAT_TF_SEQUENCE_EXAMPLE:
+        tf.train.SequenceExample,
+}
+
+# Private names of tfx_bsl's run_inference module used by this module.
+_PRIVATE_RUN_INFERENCE_NAMES = (
+    'OperationType',
+    '_get_operation_type',
+    '_using_in_process_inference',
+    '_BatchPredictDoFn',
+    '_RemotePredictDoFn',
+    '_BatchClassifyDoFn',
+    '_BatchRegressDoFn',
+    '_BatchMultiInferenceDoFn',
+    '_BuildPredictionLogForPredictionsDoFn',
+    '_BuildPredictionLogForClassificationsDoFn',
+    '_BuildPredictionLogForRegressionsDoFn',
+    '_BuildMultiInferenceLogDoFn',
+)
+
+# Semaphores bounding the batches in inference, shared by all DoFn instances
+# of the transforms of an inflight group in a worker process.
+_inflight_semaphores = {}  # type: Dict[Text, threading.BoundedSemaphore]
+_inflight_semaphores_lock = threading.Lock()
+
+
+def _has_private_run_inference_api() -> bool:
+  return all(
+      hasattr(run_inference_impl, name)
+      for name in _PRIVATE_RUN_INFERENCE_NAMES)
+
+
+class _SerializedExample(object):
+  """A serialized example standing in for its parsed proto.
+
+  In-process Predict (`_BatchPredictDoFn` of tfx_bsl) only calls
+  `SerializeToString` and `ByteSize` on its inputs. batch_inference_test runs
+  it on a Predict model to catch changes of that contract.
+  """
+
+  __slots__ = ['_serialized']
+
+  def __init__(self, serialized: bytes):
+    self._serialized = serialized
+
+  def SerializeToString(self) -> bytes:  # pylint: disable=invalid-name
+    return self._serialized
+
+  def ByteSize(self) -> int:  # pylint: disable=invalid-name
+    return len(self._serialized)
+
+
+def _get_inference_dofns(
+    inference_spec_type: model_spec_pb2.InferenceSpecType,
+    pipeline_options: Any) -> Tuple[beam.DoFn, beam.DoFn, bool]:
+  """Returns the inference and log building DoFns of `inference_spec_type`.
+
+  Args:
+    inference_spec_type: Model inference endpoint.
+    pipeline_options: Options of the pipeline, used by remote inference.
+
+  Returns:
+    A tuple of the DoFn running inference on lists of examples, the DoFn
+    building a PredictionLog from each of its outputs, and whether the
+    examples need to be parsed.
+
+  Raises:
+    NotImplementedError: If the operation is not supported by tfx_bsl.
+  """
+  # pylint: disable=protected-access
+  operation_type = run_inference_impl._get_operation_type(inference_spec_type)
+  in_process = run_inference_impl._using_in_process_inference(
+      inference_spec_type)
+  operation_types = run_inference_impl.OperationType
+  if operation_type == operation_types.PREDICTION:
+    if in_process:
+      return (run_inference_impl._BatchPredictDoFn(inference_spec_type,
+                                                   shared.Shared()),
+              run_inference_impl._BuildPredictionLogForPredictionsDoFn(),
+              False)
+    return (run_inference_impl._RemotePredictDoFn(inference_spec_type,
+                                                  pipeline_options),
+            run_inference_impl._BuildPredictionLogForPredictionsDoFn(), True)
+  if not in_process:
+    raise NotImplementedError(
+        'Remote inference only supports Predict, got %s.' % operation_type)
+  if operation_type == operation_types.CLASSIFICATION:
+    return (run_inference_impl._BatchClassifyDoFn(inference_spec_type,
+                                                  shared.Shared()),
+            run_inference_impl._BuildPredictionLogForClassificationsDoFn(),
+            True)
+  if operation_type == operation_types.REGRESSION:
+    return (run_inference_impl._BatchRegressDoFn(inference_spec_type,
+                                                 shared.Shared()),
+            run_inference_impl._BuildPredictionLogForRegressionsDoFn(), True)
+  if operation_type == operation_types.MULTIHEAD:
+    return (run_inference_impl._BatchMultiInferenceDoFn(inference_spec_type,
+                                                        shared.Shared()),
+            run_inference_impl._BuildMultiInferenceLogDoFn(), True)
+  # pylint: enable=protected-access
+  raise NotImplementedError('Unsupported operation_type %s' % operation_type)
+
+
+class _BatchInferenceDoFn(beam.DoFn):
+  """Runs inference on keyed lists of serialized examples."""
+
+  def __init__(self, inference_dofn: beam.DoFn, build_log_dofn: beam.DoFn,
+               example_classes: Dict[Any, Optional[Any]],
+               max_inflight_batches: int, inflight_group: Text):
+    self._inference_dofn = inference_dofn
+    self._build_log_dofn = build_log_dofn
+    self._example_classes = example_classes
+    self._max_inflight_batches = max_inflight_batches
+    # Identifies the semaphore shared by the DoFns of the inflight group.
+    self._inflight_group = inflight_group
+    self._inflight = None
+
+  def setup(self):
+    self._inference_dofn.setup()
+    if self._max_inflight_batches > 0:
+      with _inflight_semaphores_lock:
+        self._inflight = _inflight_semaphores.setdefault(
+            self._inflight_group,
+            threading.BoundedSemaphore(self._max_inflight_batches))
+
+  def process(
+      self, element: Tuple[Any, List[bytes]]
+  ) -> Iterable[Tuple[Any, prediction_log_pb2.PredictionLog]]:
+    key, serialized_examples = element
+    example_class = self._example_classes[key]
+    if example_class is None:
+      elements = [_SerializedExample(s) for s in serialized_examples]
+    else:
+      elements = [example_class.FromString(s) for s in serialized_examples]
+    if self._inflight is None:
+      results = list(self._inference_dofn.process(elements))
+    else:
+      with self._inflight:
+        results = list(self._inference_dofn.process(elements))
+    for result in results:
+      for prediction_log in self._build_log_dofn.process(result):
+        yield key, prediction_log
+
+  def finish_bundle(self):
+    self._inference_dofn.finish_bundle()
+
+  def teardown(self):
+    self._inference_dofn.teardown()
+
+
+@beam.ptransform_fn
+@beam.typehints.with_input_types(Tuple[Any, List[bytes]])
+@beam.typehints.with_output_types(Tuple[Any, prediction_log_pb2.PredictionLog])
+def RunInferenceOnKeyedBatches(  # pylint: disable=invalid-name
+    keyed_batches: beam.pvalue.PCollection,
+    inference_spec_type: model_spec_pb2.InferenceSpecType,
+    payload_formats: Dict[Any, int],
+    max_inflight_batches: int = 0,
+    inflight_group: Optional[Text] = None) -> beam.pvalue.PCollection:
+  """Runs inference on keyed batches of serialized examples.
+
+  All keys share a single inference stage, and thus a single model instance
+  per worker process for in-process inference.
+
+  Args:
+    keyed_batches: A PCollection of (key, list of serialized examples) pairs.
+      Each list is sent to the model as a single request.
+    inference_spec_type: Model inference endpoint.
+    payload_formats: The payload format of the serialized examples of each
+      key, one of the enums in example_gen_pb2.PayloadFormat.
+    max_inflight_batches: If positive, the maximum number of batches
+      concurrently in inference in a worker process, over all transforms of
+      the same `inflight_group`.
+    inflight_group: Identifies the transforms sharing the bound of
+      `max_inflight_batches`. Defaults to a group of this transform only.
+
+  Returns:
+    A PCollection of (key, PredictionLog) pairs.
+
+  Raises:
+    ValueError: If the examples need to be parsed but their payload format is
+      not supported.
+  """
+  if not _has_private_run_inference_api():
+    logging.warning('tfx_bsl lacks the inference DoFns of batched inference, '
+                    'using the public RunInference transform instead.')
+    return (keyed_batches
+            | 'RunPublicInference' >> _RunPublicInference(  # pylint: disable=no-value-for-parameter
+                inference_spec_type, payload_formats))
+
+  inference_dofn, build_log_dofn, needs_parsing = _get_inference_dofns(
+      inference_spec_type, keyed_batches.pipeline.options)
+  example_classes = {}
+  for key, payload_format in payload_formats.items():
+    example_classes[key] = None
+    if needs_parsing:
+      if payload_format not in _EXAMPLE_CLASSES:
+        raise ValueError(
+            'Payload format %s is only supported by in-process Predict.' %
+            example_gen_pb2.PayloadFormat.Name(payload_format))
+      example_classes[key] = _EXAMPLE_CLASSES[payload_format]
+  return (keyed_batches
+          | 'RunInference' >> beam.ParDo(
+              _BatchInferenceDoFn(inference_dofn, build_log_dofn,
+                                  example_classes, max_inflight_batches,
+                                  inflight_group or uuid.uuid4().hex)))
+
+
+def _parse_batch(element: Tuple[Any, List[bytes]],
+                 example_class: Any) -> List[Any]:
+  return [example_class.FromString(s) for s in element[1]]
+
+
+@beam.ptransform_fn
+@beam.typehints.with_input_types(Tuple[Any, List[bytes]])
+@beam.typehints.with_output_types(Tuple[Any, prediction_log_pb2.PredictionLog])
+def _RunPublicInference(  # pylint: disable=invalid-name
+    keyed_batches: beam.pvalue.PCollection,
+    inference_spec_type: model_spec_pb2.InferenceSpecType,
+    payload_formats: Dict[Any, int]) -> beam.pvalue.PCollection:
+  """Runs the public RunInference transform of tfx_bsl on each key."""
+  results = []
+  for index, (key, payload_format) in enumerate(payload_formats.items()):
+    if payload_format not in _EXAMPLE_CLASSES:
+      raise ValueError(
+          'Payload format %s is not supported by RunInference.' %
+          example_gen_pb2.PayloadFormat.Name(payload_format))
+    results.append(
+        keyed_batches
+        | 'Select[%d]' % index >> beam.Filter(
+            lambda kv, key=key: kv[0] == key)
+        | 'Parse[%d]' % index >> beam.FlatMap(
+            _parse_batch, example_class=_EXAMPLE_CLASSES[payload_format])
+        | 'RunInference[%d]' % index >> run_inference.RunInference(
+            inference_spec_type)
+        | 'Key[%d]' % index >> beam.Map(
+            lambda prediction_log, key=key: (key, prediction_log)))
+  return results | 'FlattenKeys' >> beam.Flatten(
+      pipeline=keyed_batches.pipeline)
+
+
+@beam.ptransform_fn
+@beam.typehints.with_input_types(List[bytes])
+@beam.typehints.with_output_types(prediction_log_pb2.PredictionLog)
+def RunInferenceOnBatches(  # pylint: disable=invalid-name
+    batches: beam.pvalue.PCollection,
+    inference_spec_type: model_spec_pb2.InferenceSpecType,
+    payload_format: int,
+    max_inflight_batches: int = 0,
+    inflight_group: Optional[Text] = None) -> beam.pvalue.PCollection:
+  """Runs inference on batches of serialized examples.
+
+  Args:
+    batches: A PCollection of lists of serialized examples, each of which is
+      sent to the model as a single request.
+    inference_spec_type: Model inference endpoint.
+    payload_format: The payload format of the serialized examples, one of the
+      enums in example_gen_pb2.PayloadFormat.
+    max_inflight_batches: If positive, the maximum number of batches
+      concurrently in inference in a worker process, over all transforms of
+      the same `inflight_group`.
+    inflight_group: Identifies the transforms sharing the bound of
+      `max_inflight_batches`. Defaults to a group of this transform only.
+
+  Returns:
+    A PCollection of PredictionLogs.
+
+  Raises:
+    ValueError: If the examples need to be parsed but their payload format is
+      not supported.
+  """
+  return (batches
+          | 'KeyWithVoid' >> beam.Map(lambda batch: (None, batch))
+          | 'RunInferenceOnKeyedBatches' >> RunInferenceOnKeyedBatches(  # pylint: disable=no-value-for-parameter
+              inference_spec_type, {None: payload_format},
+              max_inflight_batches, inflight_group)
+          | 'DropKeys' >> beam.Values())
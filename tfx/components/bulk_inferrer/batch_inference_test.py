@@ -0,0 +1,218 @@
+# Copyright 2020 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for tfx.components.bulk_inferrer.batch_inference."""
+
+import os
+
+import apache_beam as beam
+from apache_beam.testing import util as beam_test_util
+import mock
+import tensorflow as tf
+from tfx.components.bulk_inferrer import batch_inference
+from tfx.proto import example_gen_pb2
+from tfx.utils import path_utils
+from tfx_bsl.public.proto import model_spec_pb2
+
+
+class _PredictModule(tf.Module):
+  """Predicts twice the `x` feature of tf.Examples or tf.SequenceExamples."""
+
+  def __init__(self, sequence_example):
+    super(_PredictModule, self).__init__()
+    self._sequence_example = sequence_example
+
+  @tf.function(
+      input_signature=[tf.TensorSpec([None], tf.string, name='examples')])
+  def predict(self, examples):
+    feature_spec = {'x': tf.io.FixedLenFeature([1], tf.float32)}
+    if self._sequence_example:
+      features, _, _ = tf.io.parse_sequence_example(
+          examples, context_features=feature_spec)
+    else:
+      features = tf.io.parse_example(examples, feature_spec)
+    return {'output': features['x'] * 2}
+
+
+class _NoOpDoFn(beam.DoFn):
+
+  def setup(self):
+    pass
+
+
+class BatchInferenceTest(tf.test.TestCase):
+
+  def setUp(self):
+    super(BatchInferenceTest, self).setUp()
+    source_data_dir = os.path.join(
+        os.path.dirname(os.path.dirname(__file__)), 'testdata')
+    examples_file = os.path.join(source_data_dir, 'csv_example_gen',
+                                 'unlabelled',
+                                 'data_tfrecord-00000-of-00012.gz')
+    self._examples = list(
+        tf.compat.v1.python_io.tf_record_iterator(
+            path=examples_file,
+            options=tf.compat.v1.python_io.TFRecordOptions(
+                tf.compat.v1.python_io.TFRecordCompressionType.GZIP)))[:8]
+    model_uri = os.path.join(source_data_dir, 'trainer/current')
+    self._inference_spec = model_spec_pb2.InferenceSpecType()
+    self._inference_spec.saved_model_spec.model_path = (
+        path_utils.serving_model_path(model_uri))
+
+  def testSerializedExample(self):
+    serialized = self._examples[0]
+    example = batch_inference._SerializedExample(serialized)
+    self.assertEqual(serialized, example.SerializeToString())
+    self.assertEqual(len(serialized), example.ByteSize())
+
+  def testRunInferenceOnBatches(self):
+    batches = [self._examples[:5], self._examples[5:]]
+
+    def _Check(prediction_logs):
+      self.assertLen(prediction_logs, len(self._examples))
+      for prediction_log in prediction_logs:
+        self.assertLen(
+            prediction_log.classify_log.response.result.classifications, 1)
+
+    with beam.Pipeline() as p:
+      result = (
+          p
+          | beam.Create(batches, reshuffle=False)
+          | batch_inference.RunInferenceOnBatches(
+              self._inference_spec,
+              payload_format=example_gen_pb2.PayloadFormat.FORMAT_TF_EXAMPLE,
+              max_inflight_batches=1))
+      beam_test_util.assert_that(result, _Check)
+
+  def testRunInferenceOnKeyedBatches(self):
+    keyed_batches = [('a', self._examples[:3]), ('b', self._examples[3:]),
+                     ('a', self._examples[3:4])]
+
+    def _Check(keyed_prediction_logs):
+      counts = {}
+      for key, prediction_log in keyed_prediction_logs:
+        counts[key] = counts.get(key, 0) + 1
+        self.assertTrue(prediction_log.HasField('classify_log'))
+      self.assertEqual({'a': 4, 'b': len(self._examples) - 3}, counts)
+
+    with beam.Pipeline() as p:
+      result = (
+          p
+          | beam.Create(keyed_batches, reshuffle=False)
+          | batch_inference.RunInferenceOnKeyedBatches(
+              self._inference_spec,
+              payload_formats={
+                  'a': example_gen_pb2.PayloadFormat.FORMAT_TF_EXAMPLE,
+                  'b': example_gen_pb2.PayloadFormat.FORMAT_TF_EXAMPLE,
+              }))
+      beam_test_util.assert_that(result, _Check)
+
+  def _SavePredictModel(self, sequence_example):
+    model_path = os.path.join(self.get_temp_dir(), self._testMethodName,
+                              str(sequence_example))
+    module = _PredictModule(sequence_example)
+    tf.saved_model.save(
+        module, model_path, signatures={'serving_default': module.predict})
+    inference_spec = model_spec_pb2.InferenceSpecType()
+    inference_spec.saved_model_spec.model_path = model_path
+    return inference_spec
+
+  def _RunPredict(self, sequence_example):
+    examples = []
+    for i in range(5):
+      if sequence_example:
+        example = tf.train.SequenceExample()
+        example.context.feature['x'].float_list.value.append(i)
+      else:
+        example = tf.train.Example()
+        example.features.feature['x'].float_list.value.append(i)
+      examples.append(example.SerializeToString())
+    if sequence_example:
+      payload_format = example_gen_pb2.PayloadFormat.FORMAT_TF_SEQUENCE_EXAMPLE
+    else:
+      payload_format = example_gen_pb2.PayloadFormat.FORMAT_TF_EXAMPLE
+
+    def _Check(prediction_logs):
+      outputs = {}
+      for prediction_log in prediction_logs:
+        predict_log = prediction_log.predict_log
+        outputs[predict_log.request.inputs['examples'].string_val[0]] = (
+            tf.make_ndarray(predict_log.response.outputs['output']).tolist())
+      self.assertEqual(
+          {serialized: [[i * 2.0]] for i, serialized in enumerate(examples)},
+          outputs)
+
+    with mock.patch.object(
+        batch_inference._SerializedExample,
+        'SerializeToString',
+        autospec=True,
+        side_effect=lambda e: e._serialized) as mock_serialize:
+      with beam.Pipeline() as p:
+        result = (
+            p
+            | beam.Create([examples[:2], examples[2:]], reshuffle=False)
+            | batch_inference.RunInferenceOnBatches(
+                self._SavePredictModel(sequence_example),
+                payload_format=payload_format))
+        beam_test_util.assert_that(result, _Check)
+    # In-process Predict sends the serialized examples without parsing them.
+    self.assertTrue(mock_serialize.called)
+
+  def testRunInferenceOnBatchesWithPredictModel(self):
+    self._RunPredict(sequence_example=False)
+
+  def testRunInferenceOnBatchesWithPredictModelAndSequenceExamples(self):
+    self._RunPredict(sequence_example=True)
+
+  def testRunInferenceOnBatchesWithPublicRunInference(self):
+
+    def _Check(prediction_logs):
+      self.assertLen(prediction_logs, len(self._examples))
+      for prediction_log in prediction_logs:
+        self.assertTrue(prediction_log.HasField('classify_log'))
+
+    with mock.patch.object(batch_inference, '_has_private_run_inference_api',
+                           return_value=False):
+      with beam.Pipeline() as p:
+        result = (
+            p
+            | beam.Create([self._examples[:5], self._examples[5:]])
+            | batch_inference.RunInferenceOnBatches(
+                self._inference_spec,
+                payload_format=example_gen_pb2.PayloadFormat.FORMAT_TF_EXAMPLE))
+        beam_test_util.assert_that(result, _Check)
+
+  def testInflightGroupsShareSemaphores(self):
+
+    def _MakeDoFn(inflight_group):
+      dofn = batch_inference._BatchInferenceDoFn(
+          _NoOpDoFn(), _NoOpDoFn(), {}, 2, inflight_group)
+      dofn.setup()
+      return dofn
+
+    self.assertIs(_MakeDoFn('a')._inflight, _MakeDoFn('a')._inflight)
+    self.assertIsNot(_MakeDoFn('a')._inflight, _MakeDoFn('b')._inflight)
+
+  def testRunInferenceOnBatchesUnsupportedPayloadFormat(self):
+    with self.assertRaisesRegex(ValueError, 'FORMAT_PROTO'):
+      with beam.Pipeline() as p:
+        _ = (
+            p
+            | beam.Create([self._examples[:1]])
+            | batch_inference.RunInferenceOnBatches(
+                self._inference_spec,
+                payload_format=example_gen_pb2.PayloadFormat.FORMAT_PROTO))
+
+
+if __name__ == '__main__':
+  tf.test.main()
@@ -14,47 +14,110 @@
 """TFX bulk_inferrer executor."""
 
 import os
-from typing import Any, Dict, List, Optional, Text
+from typing import Any, Dict, List, Optional, Text, Tuple
+import uuid
 
 from absl import logging
 import apache_beam as beam
-import tensorflow as tf
 
 from tfx import types
+from tfx.components.bulk_inferrer import batch_inference
 from tfx.components.bulk_inferrer import prediction_to_example_utils
+from tfx.components.util import examples_utils
 from tfx.components.util import model_utils
+from tfx.components.util import parquet_io
+from tfx.components.util import tfxio_utils
 from tfx.dsl.components.base import base_executor
 from tfx.proto import bulk_inferrer_pb2
+from tfx.proto import example_gen_pb2
 from tfx.types import artifact_utils
 from tfx.utils import io_utils
 from tfx.utils import path_utils
 from tfx.utils import proto_utils
-from tfx_bsl.public.beam import run_inference
 from tfx_bsl.public.proto import model_spec_pb2
 from tensorflow_serving.apis import prediction_log_pb2
 
 
 _PREDICTION_LOGS_FILE_NAME = 'prediction_logs'
 _EXAMPLES_FILE_NAME = 'examples'
+_TELEMETRY_DESCRIPTORS = ['BulkInferrer']
+_RAW_RECORDS_COLUMN = '__raw_records__'
+
+
+@beam.ptransform_fn
+@beam.typehints.with_input_types(beam.Pipeline)
+@beam.typehints.with_output_types(List[bytes])
+def _ReadExamples(pipeline: beam.Pipeline, examples: types.Artifact,
+                  example_uri: Text,
+                  data_spec: bulk_inferrer_pb2.DataSpec
+                 ) -> beam.pvalue.PCollection:
+  """Reads batches of serialized examples."""
+  tfxio_factory = tfxio_utils.get_tfxio_factory_from_artifact(
+      examples=[examples],
+      telemetry_descriptors=_TELEMETRY_DESCRIPTORS,
+      read_as_raw_records=True,
+      raw_record_column_name=_RAW_RECORDS_COLUMN)
+  tfxio = tfxio_factory(io_utils.all_files_pattern(example_uri))
+  return (
+      pipeline
+      | 'ReadData' >> tfxio.BeamSource(batch_size=data_spec.batch_size or None)
+      | 'ExtractSerializedExamples' >> beam.Map(
+          lambda record_batch: record_batch.column(  # pylint: disable=g-long-lambda
+              record_batch.schema.get_field_index(_RAW_RECORDS_COLUMN)
+          ).flatten().to_pylist()))
 
 
 @beam.ptransform_fn
 @beam.typehints.with_input_types(beam.Pipeline)
 @beam.typehints.with_output_types(prediction_log_pb2.PredictionLog)
 def _RunInference(
-    pipeline: beam.Pipeline, example_uri: Text,
-    inference_endpoint: model_spec_pb2.InferenceSpecType
-) -> beam.pvalue.PCollection:
+    pipeline: beam.Pipeline, examples: types.Artifact, example_uri: Text,
+    data_spec: bulk_inferrer_pb2.DataSpec,
+    inference_endpoint: model_spec_pb2.InferenceSpecType,
+    inflight_group: Text) -> beam.pvalue.PCollection:
   """Runs model inference on given examples data."""
-  # TODO(b/174703893): adopt standardized input.
+  # pylint: disable=no-value-for-parameter
   return (
       pipeline
-      | 'ReadData' >> beam.io.ReadFromTFRecord(
-          file_pattern=io_utils.all_files_pattern(example_uri))
-      # TODO(b/131873699): Use the correct Example type here, which
-      # is either Example or SequenceExample.
-      | 'ParseExamples' >> beam.Map(tf.train.Example.FromString)
-      | 'RunInference' >> run_inference.RunInference(inference_endpoint))
+      | 'ReadExamples' >> _ReadExamples(examples, example_uri, data_spec)
+      | 'RunInference' >> batch_inference.RunInferenceOnBatches(
+          inference_endpoint,
+          payload_format=examples_utils.get_payload_format(examples),
+          max_inflight_batches=data_spec.max_inflight_batches,
+          inflight_group=inflight_group))
+
+
+@beam.ptransform_fn
+@beam.typehints.with_input_types(beam.Pipeline)
+@beam.typehints.with_output_types(Tuple[Text,
+                                        prediction_log_pb2.PredictionLog])
+def _RunSharedInference(
+    pipeline: beam.Pipeline, example_artifacts: Dict[Text, types.Artifact],
+    example_uris: Dict[Text, Text], data_spec: bulk_inferrer_pb2.DataSpec,
+    inference_endpoint: model_spec_pb2.InferenceSpecType,
+    inflight_group: Text) -> beam.pvalue.PCollection:
+  """Runs model inference on all splits in a single inference stage."""
+  keyed_batches = []
+  for split, example_uri in example_uris.items():
+    # pylint: disable=no-value-for-parameter
+    keyed_batches.append(
+        pipeline
+        | 'ReadExamples[{}]'.format(split) >> _ReadExamples(
+            example_artifacts[split], example_uri, data_spec)
+        | 'KeyWithSplit[{}]'.format(split) >> beam.Map(
+            lambda batch, split=split: (split, batch)))
+  payload_formats = {
+      split: examples_utils.get_payload_format(artifact)
+      for split, artifact in example_artifacts.items()
+  }
+  return (
+      keyed_batches
+      | 'FlattenSplits' >> beam.Flatten(pipeline=pipeline)
+      | 'RunInference' >> batch_inference.RunInferenceOnKeyedBatches(
+          inference_endpoint,
+          payload_formats=payload_formats,
+          max_inflight_batches=data_spec.max_inflight_batches,
+          inflight_group=inflight_group))
 
 
 @beam.ptransform_fn
@@ -64,14 +127,21 @@ def _WriteExamples(prediction_log: beam.pvalue.PCollection,
                    output_example_spec: bulk_inferrer_pb2.OutputExampleSpec,
                    output_path: Text) -> beam.pvalue.PDone:
   """Converts `prediction_log` to `tf.train.Example` and materializes."""
-  return (prediction_log
-          | 'ConvertToExamples' >> beam.Map(
-              prediction_to_example_utils.convert,
-              output_example_spec=output_example_spec)
+  examples = (
+      prediction_log
+      | 'BatchPredictionLogs' >> beam.BatchElements()
+      | 'ConvertToExamples' >> beam.FlatMap(
+          prediction_to_example_utils.convert_batch,
+          output_example_spec=output_example_spec,
+          join_key_feature=output_example_spec.join_key_feature or None))
+  if output_example_spec.join_key_feature:
+    return (examples
+            | 'WriteExamples' >> parquet_io.WriteExamplesToParquet(
+                os.path.join(output_path, _EXAMPLES_FILE_NAME)))
+  return (examples
           | 'WriteExamples' >> beam.io.WriteToTFRecord(
               os.path.join(output_path, _EXAMPLES_FILE_NAME),
-              file_name_suffix='.gz',
-              coder=beam.coders.ProtoCoder(tf.train.Example)))
+              file_name_suffix='.gz'))
 
 
 class Executor(base_executor.BaseExecutor):
@@ -176,6 +246,7 @@ class Executor(base_executor.BaseExecutor):
     """
 
     example_uris = {}
+    example_artifacts = {}
     for example_artifact in examples:
       for split in artifact_utils.decode_split_names(
           example_artifact.split_names):
@@ -183,23 +254,48 @@ class Executor(base_executor.BaseExecutor):
           if split in data_spec.example_splits:
             example_uris[split] = artifact_utils.get_split_uri(
                 [example_artifact], split)
+            example_artifacts[split] = example_artifact
         else:
           example_uris[split] = artifact_utils.get_split_uri([example_artifact],
                                                              split)
+          example_artifacts[split] = example_artifact
 
     if output_examples:
       output_examples.split_names = artifact_utils.encode_split_names(
           sorted(example_uris.keys()))
+      if output_example_spec.join_key_feature:
+        examples_utils.set_payload_format(
+            output_examples, example_gen_pb2.PayloadFormat.FORMAT_PARQUET)
 
+    # The inference of all splits shares the bound of max_inflight_batches.
+    inflight_group = uuid.uuid4().hex
     with self._make_beam_pipeline() as pipeline:
-      data_list = []
-      for split, example_uri in example_uris.items():
-        # pylint: disable=no-value-for-parameter
-        data = (
+      # pylint: disable=no-value-for-parameter
+      split_data = {}
+      if data_spec.share_model_across_splits and example_uris:
+        splits = sorted(example_uris.keys())
+        partitions = (
             pipeline
-            | 'RunInference[{}]'.format(split) >> _RunInference(
-                example_uri, inference_endpoint))
+            | 'RunSharedInference' >> _RunSharedInference(
+                example_artifacts, example_uris, data_spec, inference_endpoint,
+                inflight_group)
+            | 'PartitionBySplit' >> beam.Partition(
+                lambda kv, _, indices: indices[kv[0]],
+                len(splits),
+                indices={split: i for i, split in enumerate(splits)}))
+        for i, split in enumerate(splits):
+          split_data[split] = (
+              partitions[i] | 'DropSplit[{}]'.format(split) >> beam.Values())
+      else:
+        for split, example_uri in example_uris.items():
+          split_data[split] = (
+              pipeline
+              | 'RunInference[{}]'.format(split) >> _RunInference(
+                  example_artifacts[split], example_uri, data_spec,
+                  inference_endpoint, inflight_group))
 
+      data_list = []
+      for split, data in split_data.items():
         if output_examples:
           output_examples_split_uri = artifact_utils.get_split_uri(
               [output_examples], split)
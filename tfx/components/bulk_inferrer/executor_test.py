@@ -15,8 +15,12 @@
 
 import os
 
+import mock
 import tensorflow as tf
+from tfx.components.bulk_inferrer import batch_inference
 from tfx.components.bulk_inferrer import executor
+from tfx.components.util import examples_utils
+from tfx.components.util import parquet_io
 from tfx.dsl.io import fileio
 from tfx.proto import bulk_inferrer_pb2
 from tfx.types import artifact_utils
@@ -136,6 +140,50 @@ class ExecutorTest(tf.test.TestCase):
         len(results[0].classify_log.response.result.classifications[0].classes),
         2)
 
+  def testDoWithBatchSize(self):
+    self._exec_properties['data_spec'] = proto_utils.proto_to_json(
+        text_format.Parse(
+            """
+                example_splits: 'unlabelled'
+                batch_size: 7
+                max_inflight_batches: 1
+            """, bulk_inferrer_pb2.DataSpec()))
+
+    batch_sizes = []
+    process = batch_inference._BatchInferenceDoFn.process
+
+    def _Process(dofn, element):
+      batch_sizes.append(len(element[1]))
+      return process(dofn, element)
+
+    # Run executor.
+    with mock.patch.object(
+        batch_inference._BatchInferenceDoFn,
+        'process',
+        autospec=True,
+        side_effect=_Process):
+      bulk_inferrer = executor.Executor(self._context)
+      bulk_inferrer.Do(self._input_dict, self._output_dict_ir,
+                       self._exec_properties)
+
+    # Check outputs.
+    num_examples = 0
+    for f in fileio.glob(
+        os.path.join(self._examples.uri, 'unlabelled', '*.gz')):
+      num_examples += sum(1 for _ in tf.compat.v1.python_io.tf_record_iterator(
+          path=f,
+          options=tf.compat.v1.python_io.TFRecordOptions(
+              tf.compat.v1.python_io.TFRecordCompressionType.GZIP)))
+    results = self._get_results(self._prediction_log_dir,
+                                executor._PREDICTION_LOGS_FILE_NAME,
+                                prediction_log_pb2.PredictionLog)
+    self.assertLen(results, num_examples)
+    self.assertTrue(all(r.HasField('classify_log') for r in results))
+    # Inference requests have the batch size of the DataSpec, except for the
+    # last batch of a bundle.
+    self.assertEqual(num_examples, sum(batch_sizes))
+    self.assertEqual(7, max(batch_sizes))
+
   def testDoWithOutputExamplesAllSplits(self):
     self._exec_properties['output_example_spec'] = proto_utils.proto_to_json(
         text_format.Parse(
@@ -158,6 +206,45 @@ class ExecutorTest(tf.test.TestCase):
     self._verify_example_split('unlabelled')
     self._verify_example_split('unlabelled2')
 
+  def testDoWithOutputExamplesSharedModelAcrossSplits(self):
+    self._exec_properties['data_spec'] = proto_utils.proto_to_json(
+        text_format.Parse(
+            """
+                share_model_across_splits: true
+            """, bulk_inferrer_pb2.DataSpec()))
+    self._exec_properties['output_example_spec'] = proto_utils.proto_to_json(
+        text_format.Parse(
+            """
+                output_columns_spec {
+                  classify_output {
+                    label_column: 'classify_label'
+                    score_column: 'classify_score'
+                  }
+                }
+            """, bulk_inferrer_pb2.OutputExampleSpec()))
+    output_dict = dict(self._output_dict_ir, **self._output_dict_oe)
+
+    # Run executor.
+    bulk_inferrer = executor.Executor(self._context)
+    bulk_inferrer.Do(self._input_dict, output_dict, self._exec_properties)
+
+    # Check outputs.
+    self._verify_example_split('unlabelled')
+    self._verify_example_split('unlabelled2')
+    self.assertEqual(
+        len(
+            self._get_results(
+                os.path.join(self._output_examples_dir, 'unlabelled'),
+                executor._EXAMPLES_FILE_NAME, tf.train.Example)),
+        len(
+            self._get_results(
+                os.path.join(self._output_examples_dir, 'unlabelled2'),
+                executor._EXAMPLES_FILE_NAME, tf.train.Example)))
+    self.assertTrue(
+        self._get_results(self._prediction_log_dir,
+                          executor._PREDICTION_LOGS_FILE_NAME,
+                          prediction_log_pb2.PredictionLog))
+
   def testDoWithOutputExamplesSpecifiedSplits(self):
     self._exec_properties['data_spec'] = proto_utils.proto_to_json(
         text_format.Parse(
@@ -186,6 +273,34 @@ class ExecutorTest(tf.test.TestCase):
     self.assertFalse(
         fileio.exists(os.path.join(self._output_examples_dir, 'unlabelled2')))
 
+  def testDoWithOutputExamplesJoinKey(self):
+    self._exec_properties['output_example_spec'] = proto_utils.proto_to_json(
+        text_format.Parse(
+            """
+                output_columns_spec {
+                  classify_output {
+                    label_column: 'classify_label'
+                    score_column: 'classify_score'
+                  }
+                }
+                join_key_feature: 'trip_start_timestamp'
+            """, bulk_inferrer_pb2.OutputExampleSpec()))
+
+    # Run executor.
+    bulk_inferrer = executor.Executor(self._context)
+    bulk_inferrer.Do(self._input_dict, self._output_dict_oe,
+                     self._exec_properties)
+
+    # Check outputs.
+    self.assertEqual(
+        'FORMAT_PARQUET',
+        examples_utils.get_payload_format_string(self._output_examples))
+    tfxio = parquet_io.ParquetTFXIO(
+        os.path.join(self._output_examples_dir, 'unlabelled', '*'))
+    self.assertCountEqual(
+        ['trip_start_timestamp', 'classify_label', 'classify_score'],
+        tfxio.ArrowSchema().names)
+
 
 if __name__ == '__main__':
   tf.test.main()
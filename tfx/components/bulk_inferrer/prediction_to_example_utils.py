@@ -13,7 +13,7 @@
 # limitations under the License.
 """Utils for converting prediction_log to example."""
 
-from typing import Any, List, Tuple, Text, Union
+from typing import Any, List, Optional, Sequence, Tuple, Text, Union
 
 import numpy as np
 import six
@@ -22,6 +22,7 @@ import tensorflow as tf
 from tfx.proto import bulk_inferrer_pb2
 from tensorflow_serving.apis import classification_pb2
 from tensorflow_serving.apis import prediction_log_pb2
+from tensorflow.core.framework import tensor_pb2
 
 INPUT_KEY = 'examples'
 FEATURE_LIST_TYPE = List[Tuple[Text, List[Union[Text, bytes, float]]]]
@@ -45,46 +46,173 @@ def convert(prediction_log: prediction_log_pb2.PredictionLog,
     A `tf.train.Example` converted from the given prediction_log.
   Raises:
     ValueError: If the inference type or signature name in spec does not match
-    that in prediction_log.
+    that in prediction_log, if an output column already exists in the example
+    or if an output key is missing from the outputs of a PredictLog.
   """
-  specs = output_example_spec.output_columns_spec
-  if prediction_log.HasField('multi_inference_log'):
-    example, output_features = _parse_multi_inference_log(
-        prediction_log.multi_inference_log, output_example_spec)
+  example, output_features = _parse_prediction_log(prediction_log,
+                                                   output_example_spec)
+  if isinstance(example, bytes):
+    example = tf.train.Example.FromString(example)
   else:
-    if len(specs) != 1:
-      raise ValueError('Got single inference result, so expect single spec in'
-                       'output_example_spec: %s' % output_example_spec)
-    if prediction_log.HasField('regress_log'):
-      example = tf.train.Example()
-      example.CopyFrom(
-          prediction_log.regress_log.request.input.example_list.examples[0])
-      output_features = [
-          (specs[0].regress_output.value_column,
-           [prediction_log.regress_log.response.result.regressions[0].value])
-      ]
-    elif prediction_log.HasField('classify_log'):
-      example, output_features = _parse_classify_log(
-          prediction_log.classify_log, specs[0].classify_output)
-    elif prediction_log.HasField('predict_log'):
-      example, output_features = _parse_predict_log(prediction_log.predict_log,
-                                                    specs[0].predict_output)
-    else:
-      raise ValueError('Unsupported prediction type in prediction_log: %s' %
-                       prediction_log)
+    example_copy = tf.train.Example()
+    example_copy.CopyFrom(example)
+    example = example_copy
   return _add_columns(example, output_features)
 
 
+def convert_batch(prediction_logs: Sequence[prediction_log_pb2.PredictionLog],
+                  output_example_spec: _OutputExampleSpecType,
+                  join_key_feature: Optional[Text] = None) -> List[bytes]:
+  """Converts given `prediction_logs` to serialized `tf.train.Example`s.
+
+  This is the batched equivalent of `convert`. The input examples are not
+  copied into new messages; instead the serialized input example is
+  concatenated with serialized examples holding the output columns, which
+  parses as the merged example. Output tensors of PredictLogs are decoded for
+  the whole batch at once.
+
+  Args:
+    prediction_logs: The input prediction logs.
+    output_example_spec: The spec for how to map prediction results to columns
+      in example.
+    join_key_feature: If set, the converted examples only contain this feature
+      of the input examples, which can be used to join the predictions with
+      the input examples, instead of all of their features.
+
+  Returns:
+    A list of serialized `tf.train.Example`s, one per prediction log.
+  Raises:
+    ValueError: If the inference type or signature name in spec does not match
+    that in prediction_logs, if an input example does not have the
+    `join_key_feature`, if an output column already exists in an input example
+    or if an output key is missing from the outputs of a PredictLog.
+  """
+  if not prediction_logs:
+    return []
+  specs = output_example_spec.output_columns_spec
+  inputs = []
+  output_features = []
+  predict_indices = []
+  for i, prediction_log in enumerate(prediction_logs):
+    if prediction_log.HasField('predict_log'):
+      if len(specs) != 1:
+        raise ValueError('Got single inference result, so expect single spec '
+                         'in output_example_spec: %s' % output_example_spec)
+      inputs.append(
+          prediction_log.predict_log.request.inputs[INPUT_KEY].string_val[0])
+      output_features.append([])
+      predict_indices.append(i)
+    else:
+      example, features = _parse_prediction_log(prediction_log,
+                                                output_example_spec)
+      inputs.append(example)
+      output_features.append(features)
+
+  if predict_indices:
+    predict_logs = [prediction_logs[i].predict_log for i in predict_indices]
+    for col in specs[0].predict_output.output_columns:
+      values = _decode_output_tensors(
+          [_get_output_tensor(log, col.output_key) for log in predict_logs],
+          col.output_key)
+      for i, value in zip(predict_indices, values):
+        output_features[i].append((col.output_column, value))
+
+  result = []
+  for example, features in zip(inputs, output_features):
+    _check_output_columns(example, features, join_key_feature)
+    if join_key_feature:
+      prefix = _serialize_join_key(example, join_key_feature)
+    elif isinstance(example, bytes):
+      prefix = example
+    else:
+      prefix = example.SerializeToString()
+    result.append(prefix + b''.join(
+        _serialize_column(col, value) for col, value in features))
+  return result
+
+
+def _check_output_columns(example: Union[tf.train.Example, bytes],
+                          features: FEATURE_LIST_TYPE,
+                          join_key_feature: Optional[Text]) -> None:
+  """Raises a ValueError if an output column is a feature of the example."""
+  if join_key_feature:
+    # Only the join key feature of the input example is kept.
+    existing_columns = (join_key_feature,)
+  else:
+    if isinstance(example, bytes):
+      # The name of every feature of a serialized example is in its bytes, so
+      # examples which can't have an output column are not parsed.
+      if not any(six.ensure_binary(col) in example for col, _ in features):
+        return
+      example = tf.train.Example.FromString(example)
+    existing_columns = example.features.feature
+  for col, _ in features:
+    if col in existing_columns:
+      raise ValueError('column name %s already exists in example: %s' %
+                       (col, example))
+
+
+def _get_output_tensor(predict_log: prediction_log_pb2.PredictLog,
+                       output_key: Text) -> tensor_pb2.TensorProto:
+  """Returns the output tensor of `output_key` of a PredictLog."""
+  outputs = predict_log.response.outputs
+  if output_key not in outputs:
+    raise ValueError(
+        'Output key %s is not an output of the model, whose outputs are %s.' %
+        (output_key, sorted(outputs.keys())))
+  return outputs[output_key]
+
+
+def _parse_prediction_log(
+    prediction_log: prediction_log_pb2.PredictionLog,
+    output_example_spec: _OutputExampleSpecType
+) -> Tuple[Union[tf.train.Example, bytes], FEATURE_LIST_TYPE]:
+  """Returns the input example and the output features of `prediction_log`.
+
+  Args:
+    prediction_log: The input prediction log.
+    output_example_spec: The spec for how to map prediction results to columns
+      in example.
+
+  Returns:
+    A tuple of the input example and the output features. The input example
+    is either a message owned by `prediction_log`, which must not be mutated,
+    or the serialized example of a PredictLog.
+  """
+  specs = output_example_spec.output_columns_spec
+  if prediction_log.HasField('multi_inference_log'):
+    return _parse_multi_inference_log(prediction_log.multi_inference_log,
+                                      output_example_spec)
+  if len(specs) != 1:
+    raise ValueError('Got single inference result, so expect single spec in'
+                     'output_example_spec: %s' % output_example_spec)
+  if prediction_log.HasField('regress_log'):
+    example = prediction_log.regress_log.request.input.example_list.examples[0]
+    output_features = [
+        (specs[0].regress_output.value_column,
+         [prediction_log.regress_log.response.result.regressions[0].value])
+    ]
+    return example, output_features
+  elif prediction_log.HasField('classify_log'):
+    return _parse_classify_log(prediction_log.classify_log,
+                               specs[0].classify_output)
+  elif prediction_log.HasField('predict_log'):
+    return _parse_predict_log(prediction_log.predict_log,
+                              specs[0].predict_output)
+  raise ValueError('Unsupported prediction type in prediction_log: %s' %
+                   prediction_log)
+
+
 def _parse_multi_inference_log(
     multi_inference_log: prediction_log_pb2.MultiInferenceLog,
-    output_example_spec: _OutputExampleSpecType) -> tf.train.Example:
+    output_example_spec: _OutputExampleSpecType
+) -> Tuple[tf.train.Example, FEATURE_LIST_TYPE]:
   """Parses MultiInferenceLog."""
   spec_map = {
       spec.signature_name or tf.saved_model.DEFAULT_SERVING_SIGNATURE_DEF_KEY:
       spec for spec in output_example_spec.output_columns_spec
   }
-  example = tf.train.Example()
-  example.CopyFrom(multi_inference_log.request.input.example_list.examples[0])
+  example = multi_inference_log.request.input.example_list.examples[0]
   output_features = []
   for result in multi_inference_log.response.results:
     spec = spec_map[result.model_spec.signature_name]
@@ -106,8 +234,7 @@ def _parse_classify_log(
     classify_output_spec: _ClassifyOutputType
 ) -> Tuple[tf.train.Example, FEATURE_LIST_TYPE]:
   """Parses ClassiyLog."""
-  example = tf.train.Example()
-  example.CopyFrom(classify_log.request.input.example_list.examples[0])
+  example = classify_log.request.input.example_list.examples[0]
   return example, _parse_classification_result(classify_log.response.result,
                                                classify_output_spec)
 
@@ -130,14 +257,13 @@ def _parse_classification_result(
 def _parse_predict_log(
     predict_log: prediction_log_pb2.PredictLog,
     predict_output_spec: _PredictOutputType
-) -> Tuple[tf.train.Example, FEATURE_LIST_TYPE]:
+) -> Tuple[bytes, FEATURE_LIST_TYPE]:
   """Parses PredictLog."""
   input_tensor_proto = predict_log.request.inputs[INPUT_KEY]
-  example = tf.train.Example.FromString(input_tensor_proto.string_val[0])
-  outputs = predict_log.response.outputs
+  example = input_tensor_proto.string_val[0]
   output_features = []
   for col in predict_output_spec.output_columns:
-    output_tensor_proto = outputs.get(col.output_key)
+    output_tensor_proto = _get_output_tensor(predict_log, col.output_key)
     output_values = np.squeeze(tf.make_ndarray(output_tensor_proto))
     if output_values.ndim > 1:
       raise ValueError(
@@ -158,8 +284,9 @@ def _add_columns(example: tf.train.Example,
   """Add given features to `example`."""
   feature_map = example.features.feature
   for col, value in features:
-    assert col not in feature_map, ('column name %s already exists in example: '
-                                    '%s') % (col, example)
+    if col in feature_map:
+      raise ValueError('column name %s already exists in example: %s' %
+                       (col, example))
     # Note: we only consider two types, bytes and float for now.
     if isinstance(value[0], (six.text_type, six.binary_type)):
       if isinstance(value[0], six.text_type):
@@ -170,3 +297,99 @@ def _add_columns(example: tf.train.Example,
     else:
       feature_map[col].float_list.value[:] = value
   return example
+
+
+def _decode_output_tensors(tensor_protos: Sequence[tensor_pb2.TensorProto],
+                           output_key: Text) -> List[Any]:
+  """Decodes the output tensors of a batch into 1D values per tensor."""
+  dtype = tensor_protos[0].dtype
+  if all(t.tensor_content and t.dtype == dtype for t in tensor_protos):
+    shapes = [[d.size for d in t.tensor_shape.dim] for t in tensor_protos]
+    for shape in shapes:
+      if sum(1 for size in shape if size != 1) > 1:
+        raise ValueError(
+            'All output values must be convertible to 1D arrays, but %s was '
+            'not. shape was %s.' % (output_key, shape))
+    flat_values = np.frombuffer(
+        b''.join(t.tensor_content for t in tensor_protos),
+        dtype=tf.as_dtype(dtype).as_numpy_dtype)
+    sizes = [int(np.prod(shape)) for shape in shapes]
+    return np.split(flat_values, np.cumsum(sizes)[:-1])
+
+  result = []
+  for tensor_proto in tensor_protos:
+    output_values = np.squeeze(tf.make_ndarray(tensor_proto))
+    if output_values.ndim > 1:
+      raise ValueError(
+          'All output values must be convertible to 1D arrays, but %s was '
+          'not. value was %s.' % (output_key, output_values))
+    result.append(np.atleast_1d(output_values))
+  return result
+
+
+def _encode_varint(value: int) -> bytes:
+  result = bytearray()
+  while True:
+    bits = value & 0x7f
+    value >>= 7
+    if value:
+      result.append(bits | 0x80)
+    else:
+      result.append(bits)
+      return bytes(result)
+
+
+def _length_delimited(tag: bytes, payload: bytes) -> bytes:
+  return tag + _encode_varint(len(payload)) + payload
+
+
+# Wire format tags of the fields used to serialize output columns, i.e.
+# Example.features, Features.feature (map entries with key and value),
+# Feature.bytes_list and Feature.float_list, and BytesList.value and
+# FloatList.value. All of them are length delimited.
+_TAG_FIELD_1 = b'\x0a'
+_TAG_FIELD_2 = b'\x12'
+
+
+def _serialize_feature(name: Text, feature: bytes) -> bytes:
+  """Serializes an Example holding the given serialized Feature."""
+  entry = (
+      _length_delimited(_TAG_FIELD_1, name.encode('utf-8')) +
+      _length_delimited(_TAG_FIELD_2, feature))
+  return _length_delimited(_TAG_FIELD_1,
+                           _length_delimited(_TAG_FIELD_1, entry))
+
+
+def _serialize_column(col: Text, value: Any) -> bytes:
+  """Serializes an Example holding a single output column."""
+  if isinstance(value, np.ndarray) and value.dtype != np.object_:
+    is_bytes = value.dtype.kind in ('S', 'U')
+  else:
+    is_bytes = isinstance(value[0], (six.text_type, six.binary_type))
+  # Note: we only consider two types, bytes and float for now.
+  if is_bytes:
+    bytes_list = b''.join(
+        _length_delimited(
+            _TAG_FIELD_1,
+            v.encode('utf-8') if isinstance(v, six.text_type) else v)
+        for v in value)
+    feature = _length_delimited(_TAG_FIELD_1, bytes_list)
+  else:
+    float_list = _length_delimited(
+        _TAG_FIELD_1,
+        np.asarray(value, dtype=np.float32).astype('<f4').tobytes())
+    feature = _length_delimited(_TAG_FIELD_2, float_list)
+  return _serialize_feature(col, feature)
+
+
+def _serialize_join_key(example: Union[tf.train.Example, bytes],
+                        join_key_feature: Text) -> bytes:
+  """Serializes an Example holding the join key feature of `example`."""
+  if isinstance(example, bytes):
+    example = tf.train.Example.FromString(example)
+  feature_map = example.features.feature
+  if join_key_feature not in feature_map:
+    raise ValueError('Join key feature %s is missing in example: %s' %
+                     (join_key_feature, example))
+  return _serialize_feature(join_key_feature,
+                            feature_map[join_key_feature].SerializeToString())
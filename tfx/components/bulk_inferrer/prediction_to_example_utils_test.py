@@ -307,6 +307,146 @@ class PredictionToExampleUtilsTest(tf.test.TestCase):
     self.assertProtoEquals(expected_example,
                            utils.convert(prediction_log, output_example_spec))
 
+  def _make_predict_log(self, index):
+    example = tf.train.Example()
+    example.features.feature['id'].int64_list.value.append(index)
+    example.features.feature['input'].bytes_list.value.append(b'feature')
+    prediction_log = prediction_log_pb2.PredictionLog()
+    request_input = prediction_log.predict_log.request.inputs[utils.INPUT_KEY]
+    request_input.dtype = tf.string.as_datatype_enum
+    request_input.string_val.append(example.SerializeToString())
+    outputs = prediction_log.predict_log.response.outputs
+    outputs['output_float'].CopyFrom(
+        tf.make_tensor_proto([[index / 10.0, index / 5.0]], dtype=tf.float32))
+    outputs['output_int'].CopyFrom(
+        tf.make_tensor_proto([index], dtype=tf.int64))
+    outputs['output_bytes'].CopyFrom(
+        tf.make_tensor_proto([b'prediction%d' % index]))
+    return prediction_log
+
+  def _predict_output_example_spec(self, join_key_feature=''):
+    return text_format.Parse(
+        """
+        output_columns_spec {
+          predict_output {
+            output_columns {
+              output_key: 'output_float'
+              output_column: 'predict_float'
+            }
+            output_columns {
+              output_key: 'output_int'
+              output_column: 'predict_int'
+            }
+            output_columns {
+              output_key: 'output_bytes'
+              output_column: 'predict_bytes'
+            }
+          }
+        }
+        join_key_feature: '%s'
+    """ % join_key_feature, bulk_inferrer_pb2.OutputExampleSpec())
+
+  def test_convert_batch_for_predict(self):
+    prediction_logs = [self._make_predict_log(i) for i in range(5)]
+    output_example_spec = self._predict_output_example_spec()
+    serialized_examples = utils.convert_batch(prediction_logs,
+                                              output_example_spec)
+    self.assertLen(serialized_examples, 5)
+    for prediction_log, serialized in zip(prediction_logs,
+                                          serialized_examples):
+      self.assertProtoEquals(
+          utils.convert(prediction_log, output_example_spec),
+          tf.train.Example.FromString(serialized))
+
+  def test_convert_batch_for_classify(self):
+    prediction_log = text_format.Parse(
+        """
+      classify_log {
+        request {
+          input {
+            example_list {
+              examples {
+                features {
+                  feature: {
+                    key: "classify_input"
+                    value: { bytes_list: { value: "feature" } }
+                  }
+                }
+              }
+            }
+          }
+        }
+        response {
+          result {
+            classifications {
+              classes {
+                label: '1'
+                score: 0.6
+              }
+              classes {
+                label: '0'
+                score: 0.4
+              }
+            }
+          }
+        }
+      }
+    """, prediction_log_pb2.PredictionLog())
+    output_example_spec = text_format.Parse(
+        """
+        output_columns_spec {
+          classify_output {
+            label_column: 'classify_label'
+            score_column: 'classify_score'
+          }
+        }
+    """, bulk_inferrer_pb2.OutputExampleSpec())
+    serialized_examples = utils.convert_batch([prediction_log] * 2,
+                                              output_example_spec)
+    for serialized in serialized_examples:
+      self.assertProtoEquals(
+          utils.convert(prediction_log, output_example_spec),
+          tf.train.Example.FromString(serialized))
+
+  def test_convert_batch_with_join_key(self):
+    prediction_logs = [self._make_predict_log(i) for i in range(3)]
+    serialized_examples = utils.convert_batch(
+        prediction_logs,
+        self._predict_output_example_spec('id'),
+        join_key_feature='id')
+    for i, serialized in enumerate(serialized_examples):
+      example = tf.train.Example.FromString(serialized)
+      self.assertCountEqual(
+          ['id', 'predict_float', 'predict_int', 'predict_bytes'],
+          example.features.feature.keys())
+      self.assertEqual([i], example.features.feature['id'].int64_list.value)
+    with self.assertRaises(ValueError):
+      utils.convert_batch(prediction_logs,
+                          self._predict_output_example_spec('missing'),
+                          join_key_feature='missing')
+
+  def test_convert_batch_with_existing_column(self):
+    prediction_logs = [self._make_predict_log(i) for i in range(3)]
+    # Only the last input example has a feature named like an output column.
+    example = tf.train.Example.FromString(prediction_logs[-1].predict_log
+                                          .request.inputs[utils.INPUT_KEY]
+                                          .string_val[0])
+    example.features.feature['predict_int'].int64_list.value.append(1)
+    prediction_logs[-1].predict_log.request.inputs[
+        utils.INPUT_KEY].string_val[0] = example.SerializeToString()
+    with self.assertRaisesRegex(ValueError, 'predict_int already exists'):
+      utils.convert_batch(prediction_logs, self._predict_output_example_spec())
+    with self.assertRaisesRegex(ValueError, 'predict_int already exists'):
+      utils.convert(prediction_logs[-1], self._predict_output_example_spec())
+
+  def test_convert_batch_with_missing_output_key(self):
+    prediction_logs = [self._make_predict_log(i) for i in range(2)]
+    del prediction_logs[1].predict_log.response.outputs['output_int']
+    with self.assertRaisesRegex(ValueError, 'Output key output_int'):
+      utils.convert_batch(prediction_logs, self._predict_output_example_spec())
+    with self.assertRaisesRegex(ValueError, 'Output key output_int'):
+      utils.convert(prediction_logs[1], self._predict_output_example_spec())
+
 
 if __name__ == '__main__':
   tf.test.main()
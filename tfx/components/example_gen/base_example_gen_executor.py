@@ -21,8 +21,10 @@ from __future__ import print_function
 import abc
 import bisect
 import hashlib
+import math
 import os
-from typing import Any, Dict, List, Text, Union
+from typing import Any, Dict, List, Optional, Text, Union
+import uuid
 
 from absl import logging
 import apache_beam as beam
@@ -31,7 +33,9 @@ import tensorflow as tf
 from tfx import types
 from tfx.components.example_gen import utils
 from tfx.components.util import examples_utils
+from tfx.components.util import parquet_io
 from tfx.dsl.components.base import base_executor
+from tfx.dsl.io import fileio
 from tfx.proto import example_gen_pb2
 from tfx.types import artifact_utils
 from tfx.utils import proto_utils
@@ -39,6 +43,9 @@ from tfx.utils import proto_utils
 # Default file name for TFRecord output file prefix.
 DEFAULT_FILE_NAME = 'data_tfrecord'
 
+# Default file name for Parquet output file prefix.
+DEFAULT_PARQUET_FILE_NAME = 'data_parquet'
+
 
 def _GeneratePartitionKey(record: Union[tf.train.Example,
                                         tf.train.SequenceExample, bytes],
@@ -83,7 +90,8 @@ def _PartitionFn(
   assert num_partitions == len(
       buckets), 'Partitions do not match bucket number.'
   partition_str = _GeneratePartitionKey(record, split_config)
-  bucket = int(hashlib.sha256(partition_str).hexdigest(), 16) % buckets[-1]
+  bucket = int.from_bytes(
+      hashlib.sha256(partition_str).digest(), 'big') % buckets[-1]
   # For example, if buckets is [10,50,80], there will be 3 splits:
   #   bucket >=0 && < 10, returns 0
   #   bucket >=10 && < 50, returns 1
@@ -91,27 +99,278 @@ def _PartitionFn(
   return bisect.bisect(buckets, bucket)
 
 
+class _AssignSplitByFingerprintFn(beam.DoFn):
+  """Assigns batches of records to splits by FarmHash fingerprints.
+
+  Outputs (split index, record) pairs. Records without a partition feature are
+  emitted in serialized form, so that they are serialized only once.
+  """
+
+  def __init__(self, buckets: List[int],
+               split_config: example_gen_pb2.SplitConfig):
+    self._buckets = buckets
+    self._split_config = split_config
+    self._session = None
+
+  def setup(self):
+    if not tf.executing_eagerly():
+      graph = tf.Graph()
+      with graph.as_default():
+        self._keys = tf.compat.v1.placeholder(tf.string, shape=[None])
+        self._hash_buckets = tf.strings.to_hash_bucket_fast(
+            self._keys, self._buckets[-1])
+      self._session = tf.compat.v1.Session(graph=graph)
+
+  def teardown(self):
+    if self._session is not None:
+      self._session.close()
+
+  def _HashBuckets(self, keys: List[bytes]) -> List[int]:
+    if self._session is None:
+      return tf.strings.to_hash_bucket_fast(keys, self._buckets[-1]).numpy()
+    return self._session.run(self._hash_buckets, feed_dict={self._keys: keys})
+
+  def process(self, records):
+    keys = [_GeneratePartitionKey(r, self._split_config) for r in records]
+    if not self._split_config.HasField('partition_feature_name'):
+      # The partition key is the serialized record itself.
+      records = keys
+    for record, bucket in zip(records, self._HashBuckets(keys)):
+      yield bisect.bisect(self._buckets, bucket), record
+
+
+@beam.ptransform_fn
+@beam.typehints.with_input_types(Union[tf.train.Example,
+                                       tf.train.SequenceExample, bytes])
+def _PartitionByFingerprint(
+    records: beam.pvalue.PCollection,
+    buckets: List[int],
+    split_config: example_gen_pb2.SplitConfig,
+) -> List[beam.pvalue.PCollection]:
+  """Partitions records into splits using batched FarmHash fingerprints."""
+  partitions = (
+      records
+      | 'Batch' >> beam.BatchElements()
+      | 'AssignSplit' >> beam.ParDo(
+          _AssignSplitByFingerprintFn(buckets, split_config))
+      | 'Partition' >> beam.Partition(lambda kv, _: kv[0], len(buckets)))
+  return [
+      partition | 'DropSplitIndex[{}]'.format(index) >> beam.Values()
+      for index, partition in enumerate(partitions)
+  ]
+
+
+# Beam compression type and file name suffix of each output compression.
+_COMPRESSION_TYPES = {
+    example_gen_pb2.WriteConfig.GZIP:
+        (beam.io.filesystem.CompressionTypes.GZIP, '.gz'),
+    example_gen_pb2.WriteConfig.NONE:
+        (beam.io.filesystem.CompressionTypes.UNCOMPRESSED, ''),
+    example_gen_pb2.WriteConfig.ZLIB:
+        (beam.io.filesystem.CompressionTypes.DEFLATE, '.deflate'),
+}
+
+# Parquet compression codec of each output compression.
+_PARQUET_COMPRESSIONS = {
+    example_gen_pb2.WriteConfig.GZIP: parquet_io.COMPRESSION_GZIP,
+    example_gen_pb2.WriteConfig.NONE: parquet_io.COMPRESSION_NONE,
+    example_gen_pb2.WriteConfig.SNAPPY: parquet_io.COMPRESSION_SNAPPY,
+}
+
+# TFRecordWriter compression type of each output compression.
+_TF_RECORD_COMPRESSION_TYPES = {
+    example_gen_pb2.WriteConfig.GZIP: 'GZIP',
+    example_gen_pb2.WriteConfig.NONE: '',
+    example_gen_pb2.WriteConfig.ZLIB: 'ZLIB',
+}
+
+
+def _IsParquet(payload_format: Optional[int]) -> bool:
+  return payload_format == example_gen_pb2.PayloadFormat.FORMAT_PARQUET
+
+
+def _GetCompression(write_config: example_gen_pb2.WriteConfig,
+                    payload_format: Optional[int] = None) -> int:
+  """Returns the output compression, defaulting to GZIP (SNAPPY for Parquet).
+
+  Args:
+    write_config: The example_gen_pb2.WriteConfig of the output.
+    payload_format: The output payload format, one of
+      example_gen_pb2.PayloadFormat enum.
+
+  Raises:
+    ValueError: if the compression is not supported by the payload format.
+  """
+  if _IsParquet(payload_format):
+    compression = (
+        write_config.compression or example_gen_pb2.WriteConfig.SNAPPY)
+    if compression not in _PARQUET_COMPRESSIONS:
+      raise ValueError('Compression {} is not supported by FORMAT_PARQUET.'
+                       .format(example_gen_pb2.WriteConfig.Compression.Name(
+                           compression)))
+    return compression
+  compression = write_config.compression or example_gen_pb2.WriteConfig.GZIP
+  if compression not in _COMPRESSION_TYPES:
+    raise ValueError('Compression {} is only supported by FORMAT_PARQUET.'
+                     .format(example_gen_pb2.WriteConfig.Compression.Name(
+                         compression)))
+  return compression
+
+
+def _GetFileNamePrefix(payload_format: Optional[int]) -> Text:
+  return (DEFAULT_PARQUET_FILE_NAME
+          if _IsParquet(payload_format) else DEFAULT_FILE_NAME)
+
+
+def _IsShuffled(write_config: example_gen_pb2.WriteConfig,
+                payload_format: Optional[int] = None) -> bool:
+  """Returns whether records are redistributed randomly before the write."""
+  return (not write_config.disable_shuffle or _IsParquet(payload_format) or
+          write_config.WhichOneof('sharding') == 'target_shard_size_bytes')
+
+
+def _ShardIndex(record: bytes, num_shards: int) -> int:
+  """Assigns a record to a shard deterministically by its fingerprint."""
+  return int.from_bytes(hashlib.sha256(record).digest()[:8],
+                        'big') % num_shards
+
+
+def _GetTmpDir(output_split_path: Text) -> Text:
+  """Returns the directory of partially written shards of a split.
+
+  It is a sibling of the split directory, so that readers of the split never
+  match partially written shards.
+  """
+  output_split_path = output_split_path.rstrip('/')
+  return os.path.join(
+      os.path.dirname(output_split_path),
+      '.tmp-' + os.path.basename(output_split_path))
+
+
+def _RemoveDir(unused_num_shards: int, path: Text) -> None:
+  if fileio.exists(path):
+    fileio.rmtree(path)
+
+
+class _WriteShardFn(beam.DoFn):
+  """Writes a group of serialized records as a single TFRecord shard."""
+
+  def __init__(self, file_path_prefix: Text, file_name_suffix: Text,
+               compression: int, tmp_dir: Text):
+    self._file_path_prefix = file_path_prefix
+    self._file_name_suffix = file_name_suffix
+    self._compression = compression
+    self._tmp_dir = tmp_dir
+
+  def process(self, element, shard_indices):
+    shard_index, records = element
+    # Shards to which no record was assigned are not written, so the written
+    # shards are numbered densely.
+    shard_indices = sorted(shard_indices)
+    path = '{}-{:05d}-of-{:05d}{}'.format(self._file_path_prefix,
+                                          shard_indices.index(shard_index),
+                                          len(shard_indices),
+                                          self._file_name_suffix)
+    # Write to a temporary file first so that a retried bundle never leaves a
+    # partially written shard behind.
+    fileio.makedirs(self._tmp_dir)
+    tmp_path = os.path.join(
+        self._tmp_dir, '{}.tmp-{}'.format(os.path.basename(path),
+                                          uuid.uuid4().hex))
+    options = tf.io.TFRecordOptions(
+        compression_type=_TF_RECORD_COMPRESSION_TYPES[self._compression])
+    with tf.io.TFRecordWriter(tmp_path, options) as writer:
+      for record in records:
+        writer.write(record)
+    fileio.rename(tmp_path, path, overwrite=True)
+    yield path
+
+
 @beam.ptransform_fn
 @beam.typehints.with_input_types(Union[tf.train.Example,
                                        tf.train.SequenceExample, bytes])
 @beam.typehints.with_output_types(beam.pvalue.PDone)
-def _WriteSplit(example_split: beam.pvalue.PCollection,
-                output_split_path: Text) -> beam.pvalue.PDone:
-  """Shuffles and writes output split as serialized records in TFRecord."""
+def _WriteSplit(
+    example_split: beam.pvalue.PCollection,
+    output_split_path: Text,
+    write_config: Optional[example_gen_pb2.WriteConfig] = None,
+    payload_format: Optional[int] = None
+) -> beam.pvalue.PDone:
+  """Shuffles and writes output split as serialized records in TFRecord.
+
+  Splits of the FORMAT_PARQUET payload format, whose records are tf.Examples,
+  are written as Parquet files instead. Their records are always grouped into
+  shards randomly.
+
+  Args:
+    example_split: PCollection of records (tf.Example, tf.SequenceExample, or
+      bytes).
+    output_split_path: Directory to write the split to.
+    write_config: Controls shuffling, sharding and compression of the files.
+    payload_format: The output payload format, one of
+      example_gen_pb2.PayloadFormat enum.
+
+  Returns:
+    beam.pvalue.PDone.
+  """
+  write_config = write_config or example_gen_pb2.WriteConfig()
+  compression = _GetCompression(write_config, payload_format)
+  file_path_prefix = os.path.join(output_split_path,
+                                  _GetFileNamePrefix(payload_format))
 
   def _MaybeSerialize(x):
     if isinstance(x, (tf.train.Example, tf.train.SequenceExample)):
       return x.SerializeToString()
     return x
 
-  return (example_split
-          # TODO(jyzhao): make shuffle optional.
-          | 'MaybeSerialize' >> beam.Map(_MaybeSerialize)
-          | 'Shuffle' >> beam.transforms.Reshuffle()
-          # TODO(jyzhao): multiple output format.
+  records = example_split | 'MaybeSerialize' >> beam.Map(_MaybeSerialize)
+
+  if _IsParquet(payload_format):
+    return (records
+            # pylint: disable=no-value-for-parameter
+            | 'WriteParquet' >> parquet_io.WriteExamplesToParquet(
+                file_path_prefix,
+                num_shards=write_config.num_shards,
+                target_shard_size_bytes=write_config.target_shard_size_bytes,
+                compression=_PARQUET_COMPRESSIONS[compression]))
+
+  compression_type, file_name_suffix = _COMPRESSION_TYPES[compression]
+
+  if write_config.WhichOneof('sharding') == 'target_shard_size_bytes':
+    # The number of shards depends on the total size of the split, so records
+    # are grouped by a shard index derived from their fingerprint instead of
+    # being written by WriteToTFRecord. The grouping also shuffles the records.
+    target_shard_size = write_config.target_shard_size_bytes
+    num_shards = beam.pvalue.AsSingleton(
+        records
+        | 'RecordSize' >> beam.Map(len)
+        | 'TotalSize' >> beam.CombineGlobally(sum)
+        | 'NumShards' >> beam.Map(
+            lambda size: max(1, int(math.ceil(size / target_shard_size)))))
+    shards = (
+        records
+        | 'AssignShard' >> beam.Map(
+            lambda record, n: (_ShardIndex(record, n), record), n=num_shards)
+        | 'GroupByShard' >> beam.GroupByKey())
+    tmp_dir = _GetTmpDir(output_split_path)
+    return (shards
+            | 'Write' >> beam.ParDo(
+                _WriteShardFn(file_path_prefix, file_name_suffix, compression,
+                              tmp_dir),
+                shard_indices=beam.pvalue.AsList(
+                    shards | 'ShardIndex' >> beam.Keys()))
+            | 'CountShards' >> beam.combiners.Count.Globally()
+            | 'RemoveTmpDir' >> beam.Map(_RemoveDir, path=tmp_dir))
+
+  if not write_config.disable_shuffle:
+    records |= 'Shuffle' >> beam.transforms.Reshuffle()
+  # TODO(jyzhao): multiple output format.
+  return (records
           | 'Write' >> beam.io.WriteToTFRecord(
-              os.path.join(output_split_path, DEFAULT_FILE_NAME),
-              file_name_suffix='.gz'))
+              file_path_prefix,
+              file_name_suffix=file_name_suffix,
+              num_shards=write_config.num_shards,
+              compression_type=compression_type))
 
 
 class BaseExampleGenExecutor(
@@ -222,13 +481,24 @@ class BaseExampleGenExecutor(
       for split in output_config.split_config.splits:
         total_buckets += split.hash_buckets
         buckets.append(total_buckets)
-      example_splits = (
+      records = (
           pipeline
           | 'InputToRecord' >>
           # pylint: disable=no-value-for-parameter
-          input_to_record(exec_properties, input_config.splits[0].pattern)
-          | 'SplitData' >> beam.Partition(_PartitionFn, len(buckets), buckets,
-                                          output_config.split_config))
+          input_to_record(exec_properties, input_config.splits[0].pattern))
+      if (output_config.split_config.partition_hash ==
+          example_gen_pb2.SplitConfig.FARMHASH_FINGERPRINT64):
+        example_splits = (
+            records
+            # pylint: disable=no-value-for-parameter
+            | 'SplitData' >> _PartitionByFingerprint(
+                buckets, output_config.split_config))
+      else:
+        example_splits = (
+            records
+            | 'SplitData' >> beam.Partition(_PartitionFn, len(buckets),
+                                            buckets,
+                                            output_config.split_config))
     else:
       # Use input splits.
       for split in input_config.splits:
@@ -257,7 +527,10 @@ class BaseExampleGenExecutor(
     but subclasses can choose to override to write to any serialized records
     payload into gzipped TFRecord as specified, so long as downstream
     component can consume it. The format of payload is added to
-    `payload_format` custom property of the output Example artifact.
+    `payload_format` custom property of the output Example artifact. Shuffling,
+    sharding and compression of the output files are controlled by
+    `output_config.write_config`, and the resulting layout is recorded in the
+    `compression`, `shuffled` and `num_shards` custom properties.
 
     Args:
       input_dict: Input dict from input key to a list of Artifacts. Depends on
@@ -291,6 +564,8 @@ class BaseExampleGenExecutor(
     examples_artifact.split_names = artifact_utils.encode_split_names(
         utils.generate_output_split_names(input_config, output_config))
 
+    output_payload_format = exec_properties.get(utils.OUTPUT_DATA_FORMAT_KEY)
+
     logging.info('Generating examples.')
     with self._make_beam_pipeline() as pipeline:
       example_splits = self.GenerateExamplesByBeam(pipeline, exec_properties)
@@ -300,12 +575,26 @@ class BaseExampleGenExecutor(
         (example_split
          | 'WriteSplit[{}]'.format(split_name) >> _WriteSplit(
              artifact_utils.get_split_uri(output_dict[utils.EXAMPLES_KEY],
-                                          split_name)))
+                                          split_name),
+             output_config.write_config,
+             output_payload_format))
       # pylint: enable=expression-not-assigned, no-value-for-parameter
 
-    output_payload_format = exec_properties.get(utils.OUTPUT_DATA_FORMAT_KEY)
-    if output_payload_format:
-      for output_examples_artifact in output_dict[utils.EXAMPLES_KEY]:
+    num_shards = {}
+    for split_name in example_splits:
+      num_shards[split_name] = len(fileio.glob(os.path.join(
+          artifact_utils.get_split_uri(output_dict[utils.EXAMPLES_KEY],
+                                       split_name),
+          _GetFileNamePrefix(output_payload_format) + '*')))
+    for output_examples_artifact in output_dict[utils.EXAMPLES_KEY]:
+      if output_payload_format:
         examples_utils.set_payload_format(
             output_examples_artifact, output_payload_format)
+      examples_utils.set_write_layout(
+          output_examples_artifact,
+          compression=_GetCompression(output_config.write_config,
+                                      output_payload_format),
+          shuffled=_IsShuffled(output_config.write_config,
+                               output_payload_format),
+          num_shards=num_shards)
     logging.info('Examples generated.')
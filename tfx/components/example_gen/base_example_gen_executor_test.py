@@ -24,11 +24,13 @@ import tensorflow as tf
 
 from tfx.components.example_gen import base_example_gen_executor
 from tfx.components.example_gen import utils
+from tfx.components.util import parquet_io
 from tfx.dsl.io import fileio
 from tfx.proto import example_gen_pb2
 from tfx.types import artifact_utils
 from tfx.types import standard_artifacts
 from tfx.utils import proto_utils
+from tfx_bsl.tfxio import dataset_options
 
 
 @beam.ptransform_fn
@@ -167,6 +169,168 @@ class BaseExampleGenExecutorTest(tf.test.TestCase):
 
     self._testDo()
 
+  def _setPartitionHash(self, partition_hash):
+    output_config = example_gen_pb2.Output()
+    proto_utils.json_to_proto(self._exec_properties[utils.OUTPUT_CONFIG_KEY],
+                              output_config)
+    output_config.split_config.partition_hash = partition_hash
+    self._exec_properties[utils.OUTPUT_CONFIG_KEY] = proto_utils.proto_to_json(
+        output_config)
+
+  def testDoOutputSplitWithFingerprint(self):
+    # Update exec proterties.
+    self._setPartitionHash(example_gen_pb2.SplitConfig.FARMHASH_FINGERPRINT64)
+
+    self._testDo()
+
+  def testDoOutputSplitWithFingerprintAndProto(self):
+    # Update exec proterties.
+    self._exec_properties['format_proto'] = True
+    self._setPartitionHash(example_gen_pb2.SplitConfig.FARMHASH_FINGERPRINT64)
+
+    self._testDo()
+
+  def testFeatureBasedPartitionWithFingerprint(self):
+    # Update exec proterties.
+    self._testFeatureBasedPartition('i')
+    self._exec_properties['has_empty'] = False
+    self._setPartitionHash(example_gen_pb2.SplitConfig.FARMHASH_FINGERPRINT64)
+
+    self._testDo()
+
+  def testDoWithWriteConfig(self):
+    # Update exec proterties.
+    output_config = example_gen_pb2.Output()
+    proto_utils.json_to_proto(self._exec_properties[utils.OUTPUT_CONFIG_KEY],
+                              output_config)
+    output_config.write_config.disable_shuffle = True
+    output_config.write_config.num_shards = 2
+    output_config.write_config.compression = example_gen_pb2.WriteConfig.NONE
+    self._exec_properties[utils.OUTPUT_CONFIG_KEY] = proto_utils.proto_to_json(
+        output_config)
+
+    # Run executor.
+    example_gen = TestExampleGenExecutor()
+    example_gen.Do({}, self._output_dict, self._exec_properties)
+
+    # Check example gen outputs.
+    for split in ['train', 'eval']:
+      for shard in range(2):
+        self.assertTrue(
+            fileio.exists(
+                os.path.join(self._examples.uri, split,
+                             'data_tfrecord-0000{}-of-00002'.format(shard))))
+    self.assertEqual('NONE', self._examples.get_string_custom_property(
+        utils.COMPRESSION_PROPERTY_NAME))
+    self.assertEqual(0, self._examples.get_int_custom_property(
+        utils.SHUFFLED_PROPERTY_NAME))
+    self.assertEqual('{"eval": 2, "train": 2}',
+                     self._examples.get_string_custom_property(
+                         utils.NUM_SHARDS_PROPERTY_NAME))
+
+  def testDoWithTargetShardSize(self):
+    # Update exec proterties.
+    output_config = example_gen_pb2.Output()
+    proto_utils.json_to_proto(self._exec_properties[utils.OUTPUT_CONFIG_KEY],
+                              output_config)
+    output_config.write_config.target_shard_size_bytes = 1 << 30
+    output_config.write_config.compression = example_gen_pb2.WriteConfig.ZLIB
+    self._exec_properties[utils.OUTPUT_CONFIG_KEY] = proto_utils.proto_to_json(
+        output_config)
+
+    # Run executor.
+    example_gen = TestExampleGenExecutor()
+    example_gen.Do({}, self._output_dict, self._exec_properties)
+
+    # All records of a split fit into a single shard.
+    train_output_file = os.path.join(self._examples.uri, 'train',
+                                     'data_tfrecord-00000-of-00001.deflate')
+    self.assertTrue(fileio.exists(train_output_file))
+    self.assertLen(
+        list(tf.data.TFRecordDataset(train_output_file,
+                                     compression_type='ZLIB')), 4000)
+    self.assertEqual('ZLIB', self._examples.get_string_custom_property(
+        utils.COMPRESSION_PROPERTY_NAME))
+    self.assertEqual(1, self._examples.get_int_custom_property(
+        utils.SHUFFLED_PROPERTY_NAME))
+    # Shards are written through a temporary directory outside of the split,
+    # which is removed afterwards.
+    self.assertEqual(['data_tfrecord-00000-of-00001.deflate'],
+                     fileio.listdir(os.path.join(self._examples.uri, 'train')))
+    self.assertCountEqual(['train', 'eval'],
+                          fileio.listdir(self._examples.uri))
+
+  def testDoWithTargetShardSize_DenseDeterministicShards(self):
+    output_config = example_gen_pb2.Output()
+    proto_utils.json_to_proto(self._exec_properties[utils.OUTPUT_CONFIG_KEY],
+                              output_config)
+    output_config.write_config.target_shard_size_bytes = 1 << 10
+    self._exec_properties[utils.OUTPUT_CONFIG_KEY] = proto_utils.proto_to_json(
+        output_config)
+
+    def run():
+      example_gen = TestExampleGenExecutor()
+      example_gen.Do({}, self._output_dict, self._exec_properties)
+      split_dir = os.path.join(self._examples.uri, 'train')
+      files = sorted(fileio.listdir(split_dir))
+      contents = []
+      for f in files:
+        dataset = tf.data.TFRecordDataset(
+            os.path.join(split_dir, f), compression_type='GZIP')
+        contents.append(sorted(dataset.as_numpy_iterator()))
+      fileio.rmtree(self._examples.uri)
+      return files, contents
+
+    files, contents = run()
+    self.assertGreater(len(files), 1)
+    # Shards are numbered without gaps.
+    self.assertEqual([
+        'data_tfrecord-{:05d}-of-{:05d}.gz'.format(i, len(files))
+        for i in range(len(files))
+    ], files)
+    self.assertEqual((files, contents), run())
+
+  def testDoWithParquet(self):
+    # Update exec proterties.
+    self._exec_properties[utils.OUTPUT_DATA_FORMAT_KEY] = (
+        example_gen_pb2.PayloadFormat.FORMAT_PARQUET)
+
+    # Run executor.
+    example_gen = TestExampleGenExecutor()
+    example_gen.Do({}, self._output_dict, self._exec_properties)
+
+    num_rows = 0
+    for split in ['train', 'eval']:
+      output_file = os.path.join(self._examples.uri, split,
+                                 'data_parquet-00000-of-00001.parquet')
+      self.assertTrue(fileio.exists(output_file))
+      record_batches = parquet_io.ParquetTFXIO(output_file).Project(
+          ['i']).RecordBatches(
+              dataset_options.RecordBatchesOptions(
+                  batch_size=1000, num_epochs=1))
+      num_rows += sum(rb.num_rows for rb in record_batches)
+    self.assertEqual(6000, num_rows)
+    self.assertEqual(
+        'FORMAT_PARQUET',
+        self._examples.get_string_custom_property(
+            utils.PAYLOAD_FORMAT_PROPERTY_NAME))
+    self.assertEqual('SNAPPY', self._examples.get_string_custom_property(
+        utils.COMPRESSION_PROPERTY_NAME))
+
+  def testParquetDoesNotSupportZlib(self):
+    output_config = example_gen_pb2.Output()
+    proto_utils.json_to_proto(self._exec_properties[utils.OUTPUT_CONFIG_KEY],
+                              output_config)
+    output_config.write_config.compression = example_gen_pb2.WriteConfig.ZLIB
+    self._exec_properties[utils.OUTPUT_CONFIG_KEY] = proto_utils.proto_to_json(
+        output_config)
+    self._exec_properties[utils.OUTPUT_DATA_FORMAT_KEY] = (
+        example_gen_pb2.PayloadFormat.FORMAT_PARQUET)
+
+    example_gen = TestExampleGenExecutor()
+    with self.assertRaisesRegex(ValueError, 'not supported by FORMAT_PARQUET'):
+      example_gen.Do({}, self._output_dict, self._exec_properties)
+
   def _testFeatureBasedPartition(self, partition_feature_name):
     self._exec_properties[utils.OUTPUT_CONFIG_KEY] = proto_utils.proto_to_json(
         example_gen_pb2.Output(
@@ -19,18 +19,29 @@ from __future__ import division
 from __future__ import print_function
 
 import os
-from typing import Any, Dict, Iterable, List, Text
+from typing import Any, Callable, Dict, Iterable, List, Text, Tuple, Union
 
 from absl import logging
 import apache_beam as beam
+import numpy as np
 import tensorflow as tf
 
 from tfx.components.example_gen import utils
 from tfx.components.example_gen.base_example_gen_executor import BaseExampleGenExecutor
 from tfx.dsl.io import fileio
+from tfx.proto import example_gen_pb2
 from tfx.utils import io_utils
+from tfx.utils import proto_utils
 from tfx_bsl.coders import csv_decoder
 
+# Proto message type and tf.train.Feature field of the value list of each
+# column type.
+_VALUE_LIST_TYPES = {
+    csv_decoder.ColumnType.INT: ('tensorflow.Int64List', 'int64_list'),
+    csv_decoder.ColumnType.FLOAT: ('tensorflow.FloatList', 'float_list'),
+    csv_decoder.ColumnType.STRING: ('tensorflow.BytesList', 'bytes_list'),
+}
+
 
 def _int_handler(cell: csv_decoder.CSVCell) -> tf.train.Feature:
   value_list = []
@@ -99,15 +110,152 @@ class _ParsedCsvToTfExample(beam.DoFn):
     yield tf.train.Example(features=tf.train.Features(feature=feature))
 
 
-@beam.ptransform_fn
-@beam.typehints.with_input_types(beam.Pipeline)
-@beam.typehints.with_output_types(tf.train.Example)
-def _CsvToExample(  # pylint: disable=invalid-name
-    pipeline: beam.Pipeline, exec_properties: Dict[Text, Any],
-    split_pattern: Text) -> beam.pvalue.PCollection:
-  """Read CSV files and transform to TF examples.
+def _EncodeFeatures(cells: tf.Tensor,
+                    column_type: csv_decoder.ColumnType) -> tf.Tensor:
+  """Encodes a 1-D tensor of CSV cells of one type to serialized Features."""
+  if column_type not in _VALUE_LIST_TYPES:
+    # Same as tf.train.Feature() for columns whose type cannot be inferred.
+    return tf.fill(tf.shape(cells), '')
+  message_type, kind = _VALUE_LIST_TYPES[column_type]
+  present = tf.strings.length(cells) > 0
+  if column_type == csv_decoder.ColumnType.STRING:
+    values = cells
+  else:
+    numeric_cells = tf.where(present, cells, tf.fill(tf.shape(cells), '0'))
+    if column_type == csv_decoder.ColumnType.INT:
+      values = tf.strings.to_number(numeric_cells, tf.int64)
+    else:
+      # Parse as double first so that rounding matches float(cell).
+      values = tf.cast(tf.strings.to_number(numeric_cells, tf.float64),
+                       tf.float32)
+  value_lists = tf.io.encode_proto(
+      sizes=tf.expand_dims(tf.cast(present, tf.int32), 1),
+      values=[tf.expand_dims(values, 1)],
+      field_names=['value'],
+      message_type=message_type)
+  # An empty value list serializes to nothing.
+  value_lists = tf.where(present, value_lists, tf.fill(tf.shape(cells), ''))
+  return tf.io.encode_proto(
+      sizes=tf.ones([tf.size(cells), 1], tf.int32),
+      values=[tf.expand_dims(value_lists, 1)],
+      field_names=[kind],
+      message_type='tensorflow.Feature')
+
+
+def _MakeExamplesEncoder(
+    column_infos: List[csv_decoder.ColumnInfo]
+) -> Callable[[tf.Tensor], tf.Tensor]:
+  """Returns a function encoding CSV cells to serialized tf.Examples.
+
+  The returned function takes a [num_rows, num_columns] string tensor and
+  encodes all columns of the same type with a constant number of ops. The
+  features are written in the same order as deterministic proto serialization
+  of the per row conversion does (sorted by name), so hash based partitioning
+  of the records is not affected by the choice of conversion.
 
-  Note that each input split will be transformed by this function separately.
+  Args:
+    column_infos: Column names and types, in the order of the CSV columns.
+  """
+  order = sorted(range(len(column_infos)),
+                 key=lambda i: column_infos[i].name.encode('utf-8'))
+  names = [column_infos[i].name for i in order]
+  num_columns = len(names)
+  column_indices_by_type = {}
+  for sorted_index, column_index in enumerate(order):
+    column_indices_by_type.setdefault(column_infos[column_index].type,
+                                      []).append(sorted_index)
+  permutation = []
+  for indices in column_indices_by_type.values():
+    permutation.extend(indices)
+  inverse_permutation = np.argsort(permutation)
+
+  def encode(cells: tf.Tensor) -> tf.Tensor:
+    cells = tf.gather(cells, order, axis=1)
+    num_rows = tf.shape(cells)[0]
+    encoded_groups = []
+    for column_type, indices in column_indices_by_type.items():
+      encoded = _EncodeFeatures(
+          tf.reshape(tf.gather(cells, indices, axis=1), [-1]), column_type)
+      encoded_groups.append(tf.reshape(encoded, [num_rows, len(indices)]))
+    features = tf.gather(
+        tf.concat(encoded_groups, axis=1), inverse_permutation, axis=1)
+    keys = tf.tile(tf.constant([names]), [num_rows, 1])
+    entries = tf.io.encode_proto(
+        sizes=tf.ones([num_rows * num_columns, 2], tf.int32),
+        values=[tf.reshape(keys, [-1, 1]),
+                tf.reshape(features, [-1, 1])],
+        field_names=['key', 'value'],
+        message_type='tensorflow.Features.FeatureEntry')
+    feature_maps = tf.io.encode_proto(
+        sizes=tf.fill([num_rows, 1], num_columns),
+        values=[tf.reshape(entries, [num_rows, num_columns])],
+        field_names=['feature'],
+        message_type='tensorflow.Features')
+    return tf.io.encode_proto(
+        sizes=tf.ones([num_rows, 1], tf.int32),
+        values=[tf.expand_dims(feature_maps, 1)],
+        field_names=['features'],
+        message_type='tensorflow.Example')
+
+  return encode
+
+
+@beam.typehints.with_input_types(List[List[csv_decoder.CSVCell]],
+                                 List[csv_decoder.ColumnInfo])
+@beam.typehints.with_output_types(bytes)
+class _ParsedCsvBatchToSerializedExample(beam.DoFn):
+  """A beam.DoFn to convert batches of parsed CSV lines to tf.Examples.
+
+  Unlike `_ParsedCsvToTfExample`, no proto object is created per cell. The
+  cells of a batch are converted column by column with TensorFlow ops and the
+  serialized tf.Examples are output directly.
+  """
+
+  def __init__(self):
+    self._encode_fn = None
+    self._session = None
+
+  def _make_encode_fn(self, column_infos: List[csv_decoder.ColumnInfo]):
+    encoder = _MakeExamplesEncoder(column_infos)
+    cells_spec = tf.TensorSpec([None, len(column_infos)], tf.string)
+    if tf.executing_eagerly():
+      encode = tf.function(encoder, input_signature=[cells_spec])
+      return lambda rows: encode(rows).numpy()
+    graph = tf.Graph()
+    with graph.as_default():
+      cells = tf.compat.v1.placeholder(cells_spec.dtype, cells_spec.shape)
+      examples = encoder(cells)
+    self._session = tf.compat.v1.Session(graph=graph)
+    return lambda rows: self._session.run(examples, feed_dict={cells: rows})
+
+  def teardown(self):
+    if self._session is not None:
+      self._session.close()
+
+  def process(self, batch: List[List[csv_decoder.CSVCell]],
+              column_infos: List[csv_decoder.ColumnInfo]) -> Iterable[bytes]:
+    if not self._encode_fn:
+      self._encode_fn = self._make_encode_fn(column_infos)
+
+    rows = []
+    for csv_cells in batch:
+      # skip blank lines.
+      if not csv_cells:
+        continue
+      if len(csv_cells) != len(column_infos):
+        raise ValueError('Invalid CSV line: {}'.format(csv_cells))
+      rows.append(csv_cells)
+
+    if rows:
+      for serialized_example in self._encode_fn(rows):
+        yield serialized_example
+
+
+def _ReadParsedCsvLines(
+    pipeline: beam.Pipeline, exec_properties: Dict[Text, Any],
+    split_pattern: Text
+) -> Tuple[beam.pvalue.PCollection, beam.pvalue.AsSingleton]:
+  """Reads CSV files of a split and infers the column types.
 
   Args:
     pipeline: beam pipeline.
@@ -117,7 +265,8 @@ def _CsvToExample(  # pylint: disable=invalid-name
       that maps to input files with root directory given by input_base.
 
   Returns:
-    PCollection of TF examples.
+    A pair of the PCollection of parsed CSV lines and the column infos as a
+    singleton side input.
 
   Raises:
     RuntimeError: if split is empty or csv headers are not equal.
@@ -147,14 +296,109 @@ def _CsvToExample(  # pylint: disable=invalid-name
       parsed_csv_lines
       | 'InferColumnTypes' >> beam.CombineGlobally(
           csv_decoder.ColumnTypeInferrer(column_names, skip_blank_lines=True)))
+  return parsed_csv_lines, column_infos
+
+
+@beam.ptransform_fn
+@beam.typehints.with_input_types(beam.Pipeline)
+@beam.typehints.with_output_types(tf.train.Example)
+def _CsvToExample(  # pylint: disable=invalid-name
+    pipeline: beam.Pipeline, exec_properties: Dict[Text, Any],
+    split_pattern: Text) -> beam.pvalue.PCollection:
+  """Read CSV files and transform to TF examples.
+
+  Note that each input split will be transformed by this function separately.
+
+  Args:
+    pipeline: beam pipeline.
+    exec_properties: A dict of execution properties.
+      - input_base: input dir that contains CSV data. CSV must have header line.
+    split_pattern: Split.pattern in Input config, glob relative file pattern
+      that maps to input files with root directory given by input_base.
+
+  Returns:
+    PCollection of TF examples.
+
+  Raises:
+    RuntimeError: if split is empty or csv headers are not equal.
+  """
+  parsed_csv_lines, column_infos = _ReadParsedCsvLines(
+      pipeline, exec_properties, split_pattern)
 
   return (parsed_csv_lines
           | 'ToTFExample' >> beam.ParDo(_ParsedCsvToTfExample(), column_infos))
 
 
+@beam.ptransform_fn
+@beam.typehints.with_input_types(beam.Pipeline)
+@beam.typehints.with_output_types(bytes)
+def _CsvToSerializedExample(  # pylint: disable=invalid-name
+    pipeline: beam.Pipeline, exec_properties: Dict[Text, Any],
+    split_pattern: Text) -> beam.pvalue.PCollection:
+  """Read CSV files and transform to serialized TF examples in batches.
+
+  Note that each input split will be transformed by this function separately.
+
+  Args:
+    pipeline: beam pipeline.
+    exec_properties: A dict of execution properties.
+      - input_base: input dir that contains CSV data. CSV must have header line.
+    split_pattern: Split.pattern in Input config, glob relative file pattern
+      that maps to input files with root directory given by input_base.
+
+  Returns:
+    PCollection of serialized TF examples.
+
+  Raises:
+    RuntimeError: if split is empty or csv headers are not equal.
+  """
+  parsed_csv_lines, column_infos = _ReadParsedCsvLines(
+      pipeline, exec_properties, split_pattern)
+
+  return (parsed_csv_lines
+          | 'BatchCSVLines' >> beam.BatchElements()
+          | 'ToSerializedTFExample' >> beam.ParDo(
+              _ParsedCsvBatchToSerializedExample(), column_infos))
+
+
+@beam.ptransform_fn
+@beam.typehints.with_input_types(beam.Pipeline)
+@beam.typehints.with_output_types(Union[tf.train.Example, bytes])
+def _CsvToRecord(  # pylint: disable=invalid-name
+    pipeline: beam.Pipeline, exec_properties: Dict[Text, Any],
+    split_pattern: Text) -> beam.pvalue.PCollection:
+  """Read CSV files and transform to (serialized) TF examples.
+
+  The batched conversion is used unless the output is partitioned by a
+  feature, which requires parsed tf.Example records.
+
+  Args:
+    pipeline: beam pipeline.
+    exec_properties: A dict of execution properties.
+      - input_base: input dir that contains CSV data. CSV must have header line.
+      - output_config: JSON string of example_gen_pb2.Output instance.
+    split_pattern: Split.pattern in Input config, glob relative file pattern
+      that maps to input files with root directory given by input_base.
+
+  Returns:
+    PCollection of TF examples or serialized TF examples.
+  """
+  output_config = example_gen_pb2.Output()
+  if exec_properties.get(utils.OUTPUT_CONFIG_KEY):
+    proto_utils.json_to_proto(exec_properties[utils.OUTPUT_CONFIG_KEY],
+                              output_config)
+  if output_config.split_config.HasField('partition_feature_name'):
+    # pylint: disable=no-value-for-parameter
+    return pipeline | 'CsvToExample' >> _CsvToExample(exec_properties,
+                                                      split_pattern)
+  # pylint: disable=no-value-for-parameter
+  return pipeline | 'CsvToSerializedExample' >> _CsvToSerializedExample(
+      exec_properties, split_pattern)
+
+
 class Executor(BaseExampleGenExecutor):
   """Generic TFX CSV example gen executor."""
 
   def GetInputSourceToExamplePTransform(self) -> beam.PTransform:
     """Returns PTransform for CSV to TF examples."""
-    return _CsvToExample
+    return _CsvToRecord
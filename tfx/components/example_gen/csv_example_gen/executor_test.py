@@ -80,6 +80,55 @@ class ExecutorTest(tf.test.TestCase):
 
       util.assert_that(examples, check_results)
 
+  def testCsvToSerializedExample(self):
+    with beam.Pipeline() as pipeline:
+      examples = (
+          pipeline
+          | 'ToSerializedTFExample' >> executor._CsvToSerializedExample(
+              exec_properties={utils.INPUT_BASE_KEY: self._input_data_dir},
+              split_pattern='csv/*')
+          | 'Parse' >> beam.Map(tf.train.Example.FromString))
+
+      def check_results(results):
+        # We use Python assertion here to avoid Beam serialization error in
+        # pickling tf.test.TestCase.
+        assert (15000 == len(results)), 'Unexpected example count.'
+        assert (18 == len(results[0].features.feature)), 'Example not match.'
+
+      util.assert_that(examples, check_results)
+
+  def testCsvToSerializedExampleWithEmptyColumn(self):
+    expected_examples = []
+    for a, c, d in [(1, b'x', 0.1), (2, b'y', 0.2), (3, None, 0.3)]:
+      expected_examples.append(
+          tf.train.Example(
+              features=tf.train.Features(
+                  feature={
+                      'A':
+                          tf.train.Feature(
+                              int64_list=tf.train.Int64List(value=[a])),
+                      'B':
+                          tf.train.Feature(),
+                      'C':
+                          tf.train.Feature(
+                              bytes_list=tf.train.BytesList(
+                                  value=[c] if c else [])),
+                      'D':
+                          tf.train.Feature(
+                              float_list=tf.train.FloatList(value=[d])),
+                  })).SerializeToString(deterministic=True))
+
+    with beam.Pipeline() as pipeline:
+      examples = (
+          pipeline
+          | 'ToSerializedTFExample' >> executor._CsvToSerializedExample(
+              exec_properties={utils.INPUT_BASE_KEY: self._input_data_dir},
+              split_pattern='csv_empty/*'))
+
+      # The batched conversion matches the deterministic serialization of the
+      # per row conversion, so that hash based partitioning is unchanged.
+      util.assert_that(examples, util.equal_to(expected_examples))
+
   def testDo(self):
     output_data_dir = os.path.join(
         os.environ.get('TEST_UNDECLARED_OUTPUTS_DIR', self.get_temp_dir()),
@@ -19,15 +19,48 @@ from __future__ import division
 from __future__ import print_function
 
 import os
-from typing import Any, Dict, Text, Union
+from typing import Any, Dict, List, Optional, Text, Tuple, Union
 
 from absl import logging
 import apache_beam as beam
 import tensorflow as tf
 
+from tfx import types
 from tfx.components.example_gen import base_example_gen_executor
 from tfx.components.example_gen import utils
+from tfx.components.util import examples_utils
+from tfx.dsl.io import fileio
 from tfx.proto import example_gen_pb2
+from tfx.types import artifact_utils
+from tfx.utils import proto_utils
+
+# Output compression of each input file compression detected by Beam.
+_FILE_COMPRESSIONS = {
+    beam.io.filesystem.CompressionTypes.GZIP:
+        example_gen_pb2.WriteConfig.GZIP,
+    beam.io.filesystem.CompressionTypes.DEFLATE:
+        example_gen_pb2.WriteConfig.ZLIB,
+    beam.io.filesystem.CompressionTypes.UNCOMPRESSED:
+        example_gen_pb2.WriteConfig.NONE,
+}
+
+
+def _NeedsParsedRecords(output_config: example_gen_pb2.Output) -> bool:
+  """Returns whether the records must be parsed before being written.
+
+  Parsed records are only needed to partition by a feature, and to keep the
+  split assignment of SHA-256 partitioning, which hashes the deterministically
+  serialized records. Otherwise the records are passed through as bytes.
+
+  Args:
+    output_config: The example_gen_pb2.Output of the component.
+  """
+  split_config = output_config.split_config
+  if not split_config.splits:
+    return False
+  return (split_config.HasField('partition_feature_name') or
+          split_config.partition_hash !=
+          example_gen_pb2.SplitConfig.FARMHASH_FINGERPRINT64)
 
 
 @beam.ptransform_fn
@@ -89,6 +122,10 @@ class Executor(base_example_gen_executor.BaseExampleGenExecutor):
         PCollection of records (tf.Example, tf.SequenceExample, or bytes).
       """
       output_payload_format = exec_properties.get(utils.OUTPUT_DATA_FORMAT_KEY)
+      output_config = example_gen_pb2.Output()
+      if exec_properties.get(utils.OUTPUT_CONFIG_KEY):
+        proto_utils.json_to_proto(exec_properties[utils.OUTPUT_CONFIG_KEY],
+                                  output_config)
 
       serialized_records = (
           pipeline
@@ -96,8 +133,17 @@ class Executor(base_example_gen_executor.BaseExampleGenExecutor):
           | _ImportSerializedRecord(exec_properties, split_pattern))
       if output_payload_format == example_gen_pb2.PayloadFormat.FORMAT_PROTO:
         return serialized_records
-      elif (output_payload_format ==
-            example_gen_pb2.PayloadFormat.FORMAT_TF_EXAMPLE):
+      elif (output_payload_format in (
+          example_gen_pb2.PayloadFormat.FORMAT_TF_EXAMPLE,
+          example_gen_pb2.PayloadFormat.FORMAT_TF_SEQUENCE_EXAMPLE,
+          example_gen_pb2.PayloadFormat.FORMAT_PARQUET) and
+            not _NeedsParsedRecords(output_config)):
+        # Pass the serialized records through without a decode and encode
+        # cycle per record.
+        return serialized_records
+      elif output_payload_format in (
+          example_gen_pb2.PayloadFormat.FORMAT_TF_EXAMPLE,
+          example_gen_pb2.PayloadFormat.FORMAT_PARQUET):
         return (serialized_records
                 | 'ToTFExample' >> beam.Map(tf.train.Example.FromString))
       elif (output_payload_format ==
@@ -107,6 +153,137 @@ class Executor(base_example_gen_executor.BaseExampleGenExecutor):
                     tf.train.SequenceExample.FromString))
 
       raise ValueError('output_payload_format must be one of FORMAT_TF_EXAMPLE,'
-                       ' FORMAT_TF_SEQUENCE_EXAMPLE or FORMAT_PROTO')
+                       ' FORMAT_TF_SEQUENCE_EXAMPLE, FORMAT_PROTO or '
+                       'FORMAT_PARQUET')
 
     return ImportRecord
+
+  def _GetFilesToCopy(
+      self, input_config: example_gen_pb2.Input,
+      output_config: example_gen_pb2.Output, exec_properties: Dict[Text, Any]
+  ) -> Optional[Tuple[int, Dict[Text, List[Text]]]]:
+    """Returns the input files to copy as is, if no record needs rewriting.
+
+    Copying is possible if the output is not Parquet, the input splits are the
+    output splits, shuffle is disabled, no sharding is requested and all input
+    files of a split have the requested compression. An unspecified
+    compression adopts the compression of the input files.
+
+    Args:
+      input_config: The example_gen_pb2.Input of the component.
+      output_config: The example_gen_pb2.Output of the component.
+      exec_properties: A dict of execution properties.
+
+    Returns:
+      A pair of the output compression and a dict from split name to the
+      input files of the split, or None if the files cannot be copied.
+    """
+    write_config = output_config.write_config
+    if (exec_properties.get(utils.OUTPUT_DATA_FORMAT_KEY) ==
+        example_gen_pb2.PayloadFormat.FORMAT_PARQUET or
+        output_config.split_config.splits or
+        not write_config.disable_shuffle or
+        write_config.WhichOneof('sharding')):
+      return None
+
+    compression = write_config.compression
+    files_by_split = {}
+    for split in input_config.splits:
+      files = sorted(fileio.glob(
+          os.path.join(exec_properties[utils.INPUT_BASE_KEY], split.pattern)))
+      if not files:
+        return None
+      for input_file in files:
+        file_compression = _FILE_COMPRESSIONS.get(
+            beam.io.filesystem.CompressionTypes.detect_compression_type(
+                input_file))
+        if file_compression is None:
+          return None
+        if not compression:
+          compression = file_compression
+        elif file_compression != compression:
+          return None
+      files_by_split[split.name] = files
+    return compression, files_by_split
+
+  def Do(
+      self,
+      input_dict: Dict[Text, List[types.Artifact]],
+      output_dict: Dict[Text, List[types.Artifact]],
+      exec_properties: Dict[Text, Any],
+  ) -> None:
+    """Imports input records, copying input files as is when possible.
+
+    When each input split becomes an output split unchanged (see
+    `_GetFilesToCopy`), the input files are copied into the output artifact
+    without running a Beam pipeline. Otherwise the records are imported by
+    the Beam pipeline of `BaseExampleGenExecutor`.
+
+    Args:
+      input_dict: Input dict from input key to a list of Artifacts.
+      output_dict: Output dict from output key to a list of Artifacts.
+        - examples: splits of serialized records.
+      exec_properties: A dict of execution properties.
+        - input_base: an external directory containing the data files.
+        - input_config: JSON string of example_gen_pb2.Input instance,
+          providing input configuration.
+        - output_config: JSON string of example_gen_pb2.Output instance,
+          providing output configuration.
+        - output_data_format: Payload format of generated data in output
+          artifact, one of example_gen_pb2.PayloadFormat enum.
+
+    Returns:
+      None
+    """
+    input_config = example_gen_pb2.Input()
+    proto_utils.json_to_proto(exec_properties[utils.INPUT_CONFIG_KEY],
+                              input_config)
+    output_config = example_gen_pb2.Output()
+    proto_utils.json_to_proto(exec_properties[utils.OUTPUT_CONFIG_KEY],
+                              output_config)
+
+    files_to_copy = self._GetFilesToCopy(input_config, output_config,
+                                         exec_properties)
+    if files_to_copy is None:
+      super(Executor, self).Do(input_dict, output_dict, exec_properties)
+      return
+
+    self._log_startup(input_dict, output_dict, exec_properties)
+    compression, files_by_split = files_to_copy
+    # pylint: disable=protected-access
+    _, file_name_suffix = base_example_gen_executor._COMPRESSION_TYPES[
+        compression]
+    # pylint: enable=protected-access
+
+    examples_artifact = artifact_utils.get_single_instance(
+        output_dict[utils.EXAMPLES_KEY])
+    examples_artifact.split_names = artifact_utils.encode_split_names(
+        utils.generate_output_split_names(input_config, output_config))
+
+    logging.info('Copying input files as examples.')
+    num_shards = {}
+    for split_name, input_files in files_by_split.items():
+      output_split_path = artifact_utils.get_split_uri(
+          output_dict[utils.EXAMPLES_KEY], split_name)
+      fileio.makedirs(output_split_path)
+      for index, input_file in enumerate(input_files):
+        fileio.copy(
+            input_file,
+            os.path.join(
+                output_split_path, '{}-{:05d}-of-{:05d}{}'.format(
+                    base_example_gen_executor.DEFAULT_FILE_NAME, index,
+                    len(input_files), file_name_suffix)),
+            overwrite=True)
+      num_shards[split_name] = len(input_files)
+
+    output_payload_format = exec_properties.get(utils.OUTPUT_DATA_FORMAT_KEY)
+    for output_examples_artifact in output_dict[utils.EXAMPLES_KEY]:
+      if output_payload_format:
+        examples_utils.set_payload_format(
+            output_examples_artifact, output_payload_format)
+      examples_utils.set_write_layout(
+          output_examples_artifact,
+          compression=compression,
+          shuffled=False,
+          num_shards=num_shards)
+    logging.info('Examples generated.')
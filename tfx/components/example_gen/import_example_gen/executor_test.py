@@ -141,6 +141,78 @@ class ExecutorTest(tf.test.TestCase):
         self.examples.get_string_custom_property(
             utils.PAYLOAD_FORMAT_PROPERTY_NAME))
 
+  def _runDoWithInputSplits(self, write_config):
+    exec_properties = {
+        utils.INPUT_BASE_KEY:
+            self._input_data_dir,
+        utils.INPUT_CONFIG_KEY:
+            self._input_config,
+        utils.OUTPUT_CONFIG_KEY:
+            proto_utils.proto_to_json(
+                example_gen_pb2.Output(write_config=write_config)),
+        utils.OUTPUT_DATA_FORMAT_KEY:
+            example_gen_pb2.PayloadFormat.FORMAT_TF_EXAMPLE,
+    }
+    self.examples = standard_artifacts.Examples()
+    self.examples.uri = os.path.join(
+        os.environ.get('TEST_UNDECLARED_OUTPUTS_DIR', self.get_temp_dir()),
+        self._testMethodName)
+    executor.Executor().Do({}, {utils.EXAMPLES_KEY: [self.examples]},
+                           exec_properties)
+    self.assertEqual(
+        artifact_utils.encode_split_names(['tfrecord']),
+        self.examples.split_names)
+
+  def testDoWithPassthrough(self):
+    self._runDoWithInputSplits(
+        example_gen_pb2.WriteConfig(num_shards=1, disable_shuffle=True))
+
+    output_file = os.path.join(self.examples.uri, 'tfrecord',
+                               'data_tfrecord-00000-of-00001.gz')
+    self.assertTrue(fileio.exists(output_file))
+    self.assertLen(
+        list(tf.data.TFRecordDataset(output_file, compression_type='GZIP')),
+        15000)
+
+  def testDoWithFileCopy(self):
+    self._runDoWithInputSplits(
+        example_gen_pb2.WriteConfig(disable_shuffle=True))
+
+    for input_file in fileio.glob(
+        os.path.join(self._input_data_dir, 'tfrecord', '*')):
+      output_file = os.path.join(self.examples.uri, 'tfrecord',
+                                 os.path.basename(input_file))
+      self.assertTrue(fileio.exists(output_file))
+      self.assertEqual(
+          fileio.open(input_file, 'rb').read(),
+          fileio.open(output_file, 'rb').read())
+    self.assertEqual(
+        'GZIP',
+        self.examples.get_string_custom_property(
+            utils.COMPRESSION_PROPERTY_NAME))
+    self.assertEqual(
+        '{"tfrecord": 2}',
+        self.examples.get_string_custom_property(
+            utils.NUM_SHARDS_PROPERTY_NAME))
+    self.assertEqual(
+        example_gen_pb2.PayloadFormat.Name(
+            example_gen_pb2.PayloadFormat.FORMAT_TF_EXAMPLE),
+        self.examples.get_string_custom_property(
+            utils.PAYLOAD_FORMAT_PROPERTY_NAME))
+
+  def testDoWithFileCopyCompressionMismatch(self):
+    # Files are rewritten by Beam if they don't have the output compression.
+    self._runDoWithInputSplits(
+        example_gen_pb2.WriteConfig(
+            disable_shuffle=True,
+            compression=example_gen_pb2.WriteConfig.NONE))
+
+    output_files = fileio.glob(
+        os.path.join(self.examples.uri, 'tfrecord', '*'))
+    self.assertTrue(output_files)
+    for output_file in output_files:
+      self.assertFalse(output_file.endswith('.gz'))
+
 
 if __name__ == '__main__':
   tf.test.main()
@@ -51,6 +51,12 @@ EXAMPLES_KEY = 'examples'
 PAYLOAD_FORMAT_PROPERTY_NAME = 'payload_format'
 # Key for the `input_fingerprint` custom property of output examples artifact.
 FINGERPRINT_PROPERTY_NAME = 'input_fingerprint'
+# Key for the `compression` custom property of output examples artifact.
+COMPRESSION_PROPERTY_NAME = 'compression'
+# Key for the `shuffled` custom property of output examples artifact.
+SHUFFLED_PROPERTY_NAME = 'shuffled'
+# Key for the `num_shards` custom property of output examples artifact.
+NUM_SHARDS_PROPERTY_NAME = 'num_shards'
 # Key for the `span` custom property of output examples artifact.
 SPAN_PROPERTY_NAME = 'span'
 # Span spec used in split pattern.
@@ -32,6 +32,7 @@ from tfx.types.standard_component_specs import ANOMALIES_KEY
 from tfx.types.standard_component_specs import EXCLUDE_SPLITS_KEY
 from tfx.types.standard_component_specs import SCHEMA_KEY
 from tfx.types.standard_component_specs import STATISTICS_KEY
+from tfx.utils import decoded_artifact_cache
 from tfx.utils import io_utils
 from tfx.utils import json_utils
 
@@ -102,7 +103,7 @@ class Executor(base_executor.BaseExecutor):
           'split %s.', split)
       label_inputs = {
           STATISTICS_KEY:
-              tfdv.load_statistics(
+              decoded_artifact_cache.load_statistics(
                   io_utils.get_only_uri_in_dir(
                       os.path.join(stats_artifact.uri, split))),
           SCHEMA_KEY:
@@ -115,6 +116,8 @@ class Executor(base_executor.BaseExecutor):
       logging.info(
           'Validation complete for split %s. Anomalies written to '
           '%s.', split, output_uri)
+    logging.info('Decoded artifact cache stats: %s',
+                 decoded_artifact_cache.get_stats())
 
   def _Validate(self, inputs: Dict[Text, Any], outputs: Dict[Text,
                                                              Any]) -> None:
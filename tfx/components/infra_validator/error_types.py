@@ -39,6 +39,15 @@ class ValidationFailed(InfraValidationError):  # pylint: disable=g-bad-exception
   pass
 
 
+class ThresholdsNotMet(ValidationFailed):  # pylint: disable=g-bad-exception-name
+  """Load test metrics are not within their thresholds.
+
+  Unlike other validation failures, this is a property of the model and the
+  serving binary, thus it is not retried.
+  """
+  pass
+
+
 class GracefulShutdown(InfraValidationError):  # pylint: disable=g-bad-exception-name
   """Graceful shutdown was requested and validation would be aborted."""
   pass
@@ -19,6 +19,8 @@ from __future__ import print_function
 
 import contextlib
 import functools
+from concurrent import futures
+import json
 import os
 import signal
 import threading
@@ -28,6 +30,7 @@ from typing import Any, Dict, List, Optional, Text
 from absl import logging
 from tfx import types
 from tfx.components.infra_validator import error_types
+from tfx.components.infra_validator import load_tester
 from tfx.components.infra_validator import request_builder
 from tfx.components.infra_validator import serving_bins
 from tfx.components.infra_validator import types as iv_types
@@ -44,6 +47,7 @@ from tfx.utils.model_paths import tf_serving_flavor
 
 _DEFAULT_NUM_TRIES = 5
 _DEFAULT_POLLING_INTERVAL_SEC = 1
+_DEFAULT_INITIAL_POLLING_INTERVAL_SEC = 0.1
 _DEFAULT_MAX_LOADING_TIME_SEC = 300
 _DEFAULT_MODEL_NAME = 'infra-validation-model'
 
@@ -66,6 +70,8 @@ _BLESSED_KEY = 'blessed'
 _BLESSED_FILENAME = 'INFRA_BLESSED'
 # Filename of infra blessing artifact on fail.
 _NOT_BLESSED_FILENAME = 'INFRA_NOT_BLESSED'
+# Filename of the load test metrics in the infra blessing artifact.
+_LOAD_TEST_METRICS_FILENAME = 'load_test_metrics.json'
 
 
 def _create_model_server_runner(
@@ -100,6 +106,30 @@ def _create_model_server_runner(
     raise NotImplementedError('Invalid serving_platform {}'.format(platform))
 
 
+class _WarmServer(object):
+  """Holds a model server left running by a failed validation attempt.
+
+  When an attempt fails while sending requests but the model is still loaded,
+  the failure is not caused by the model server, and the next attempt of the
+  same serving binary can reuse the server instead of starting a new one.
+  """
+
+  def __init__(self):
+    self.runner = None
+    self.client = None
+
+  def Put(self, runner, client):
+    self.runner = runner
+    self.client = client
+
+  def Take(self):
+    """Returns and clears the held (runner, client), which may be Nones."""
+    result = (self.runner, self.client)
+    self.runner = None
+    self.client = None
+    return result
+
+
 def _mark_blessed(blessing: types.Artifact) -> None:
   logging.info('Model passed infra validation.')
   io_utils.write_string_file(
@@ -121,10 +151,24 @@ class Executor(base_executor.BaseExecutor):
                context: Optional[base_executor.BaseExecutor.Context] = None):
     super(Executor, self).__init__(context)
     self._cleanups = []
+    self._lock = threading.Lock()
+    # Model server runners started and not yet stopped.
+    self._active_runners = set()
+    # Load test metrics of the last attempt, by serving binary image.
+    self._load_test_metrics = {}
+    # Set when ongoing validations should not start new attempts.
+    self._shutdown_event = threading.Event()
 
   def _AddCleanup(self, function, *args, **kwargs):
     self._cleanups.append(functools.partial(function, *args, **kwargs))
 
+  def _StopActiveRunners(self):
+    with self._lock:
+      runners = list(self._active_runners)
+    for runner in runners:
+      logging.info('Stopping %r.', runner)
+      runner.Stop()
+
   def _Cleanup(self):
     for cleanup in self._cleanups:
       try:
@@ -144,7 +188,8 @@ class Executor(base_executor.BaseExecutor):
       output_dict:
         - `blessing`: Single `InfraBlessing` artifact containing the validated
           result. It is an empty file with the name either of INFRA_BLESSED or
-          INFRA_NOT_BLESSED.
+          INFRA_NOT_BLESSED. If a load test has run, it also contains its
+          metrics for each serving binary in load_test_metrics.json.
       exec_properties:
         - `serving_spec`: Serialized `ServingSpec` configuration.
         - `validation_spec`: Serialized `ValidationSpec` configuration.
@@ -173,6 +218,10 @@ class Executor(base_executor.BaseExecutor):
       validation_spec.num_tries = _DEFAULT_NUM_TRIES
     if not validation_spec.max_loading_time_seconds:
       validation_spec.max_loading_time_seconds = _DEFAULT_MAX_LOADING_TIME_SEC
+    if validation_spec.HasField('load_test') and not (
+        examples and exec_properties.get(_REQUEST_SPEC_KEY)):
+      raise ValueError(
+          'ValidationSpec.load_test requires examples and request_spec.')
 
     if exec_properties.get(_REQUEST_SPEC_KEY):
       request_spec = infra_validator_pb2.RequestSpec()
@@ -181,6 +230,8 @@ class Executor(base_executor.BaseExecutor):
     else:
       request_spec = None
 
+    self._shutdown_event.clear()
+    self._AddCleanup(self._StopActiveRunners)
     with self._InstallGracefulShutdownHandler():
       self._Do(
           model=model,
@@ -261,15 +312,37 @@ class Executor(base_executor.BaseExecutor):
       requests = []
 
     model_path = self._PrepareModelPath(model.uri, serving_spec)
-    # TODO(jjong): Make logic parallel.
-    all_passed = True
-    for serving_binary in serving_bins.parse_serving_binaries(serving_spec):
-      all_passed &= self._ValidateWithRetry(
-          model_path=model_path,
-          serving_binary=serving_binary,
-          serving_spec=serving_spec,
-          validation_spec=validation_spec,
-          requests=requests)
+    serving_binaries = serving_bins.parse_serving_binaries(serving_spec)
+    validate = functools.partial(
+        self._ValidateWithRetry,
+        model_path=model_path,
+        serving_spec=serving_spec,
+        validation_spec=validation_spec,
+        requests=requests)
+    parallelism = min(validation_spec.parallelism, len(serving_binaries))
+    if parallelism > 1:
+      logging.info('Validating %d serving binaries with parallelism %d.',
+                   len(serving_binaries), parallelism)
+      pool = futures.ThreadPoolExecutor(max_workers=parallelism)
+      try:
+        results = list(
+            pool.map(lambda b: validate(serving_binary=b), serving_binaries))
+      except:  # pylint: disable=bare-except
+        # Do not wait for the other validations (e.g. on graceful shutdown).
+        # They stop before their next attempt, and their model servers are
+        # stopped on cleanup.
+        self._shutdown_event.set()
+        pool.shutdown(wait=False)
+        raise
+      pool.shutdown()
+    else:
+      results = [validate(serving_binary=b) for b in serving_binaries]
+    all_passed = all(results)
+
+    if self._load_test_metrics:
+      io_utils.write_string_file(
+          os.path.join(blessing.uri, _LOAD_TEST_METRICS_FILENAME),
+          json.dumps(self._load_test_metrics, indent=2, sort_keys=True))
 
     if all_passed:
       _mark_blessed(blessing)
@@ -311,31 +384,46 @@ class Executor(base_executor.BaseExecutor):
       validation_spec: infra_validator_pb2.ValidationSpec,
       requests: List[iv_types.Request]):
 
-    for i in range(validation_spec.num_tries):
-      logging.info('Starting infra validation (attempt %d/%d).', i + 1,
-                   validation_spec.num_tries)
-      try:
-        self._ValidateOnce(
-            model_path=model_path,
-            serving_binary=serving_binary,
-            serving_spec=serving_spec,
-            validation_spec=validation_spec,
-            requests=requests)
-      except error_types.GracefulShutdown:
-        # GracefulShutdown means infra validation aborted. No more retry and
-        # escalate the error.
-        raise
-      except Exception as e:  # pylint: disable=broad-except
-        # Other exceptions indicates validation failure. Log the error and
-        # retry.
-        logging.exception('Infra validation (attempt %d/%d) failed.', i + 1,
-                          validation_spec.num_tries)
-        if isinstance(e, error_types.DeadlineExceeded):
-          logging.info('Consider increasing the value of '
-                       'ValidationSpec.max_loading_time_seconds.')
-      else:
-        # If validation has passed without any exception, succeeded.
-        return True
+    warm_server = _WarmServer()
+    try:
+      for i in range(validation_spec.num_tries):
+        if self._shutdown_event.is_set():
+          raise error_types.GracefulShutdown('Validation has been aborted.')
+        logging.info('Starting infra validation (attempt %d/%d).', i + 1,
+                     validation_spec.num_tries)
+        try:
+          self._ValidateOnce(
+              model_path=model_path,
+              serving_binary=serving_binary,
+              serving_spec=serving_spec,
+              validation_spec=validation_spec,
+              requests=requests,
+              warm_server=warm_server)
+        except error_types.GracefulShutdown:
+          # GracefulShutdown means infra validation aborted. No more retry and
+          # escalate the error.
+          raise
+        except error_types.ThresholdsNotMet:
+          # Another attempt would measure the same model on the same serving
+          # binary, so the model is not blessed without retrying.
+          logging.exception('Infra validation (attempt %d/%d) failed.', i + 1,
+                            validation_spec.num_tries)
+          return False
+        except Exception as e:  # pylint: disable=broad-except
+          # Other exceptions indicates validation failure. Log the error and
+          # retry.
+          logging.exception('Infra validation (attempt %d/%d) failed.', i + 1,
+                            validation_spec.num_tries)
+          if isinstance(e, error_types.DeadlineExceeded):
+            logging.info('Consider increasing the value of '
+                         'ValidationSpec.max_loading_time_seconds.')
+        else:
+          # If validation has passed without any exception, succeeded.
+          return True
+    finally:
+      runner, _ = warm_server.Take()
+      if runner is not None:
+        self._StopRunner(runner)
 
     # Every trial has failed. Marking model as not blessed.
     return False
@@ -345,27 +433,72 @@ class Executor(base_executor.BaseExecutor):
       serving_binary: serving_bins.ServingBinary,
       serving_spec: infra_validator_pb2.ServingSpec,
       validation_spec: infra_validator_pb2.ValidationSpec,
-      requests: List[iv_types.Request]):
-
-    deadline = time.time() + validation_spec.max_loading_time_seconds
-    runner = _create_model_server_runner(
-        model_path=model_path,
-        serving_binary=serving_binary,
-        serving_spec=serving_spec)
+      requests: List[iv_types.Request],
+      warm_server: Optional[_WarmServer] = None):
+
+    runner, client = None, None
+    if warm_server is not None:
+      runner, client = warm_server.Take()
+    if runner is not None and not client.IsModelAvailable():
+      logging.info('Model is no longer available; stopping %r.', runner)
+      self._StopRunner(runner)
+      runner, client = None, None
+    keep_running = False
 
     try:
-      logging.info('Starting %r.', runner)
-      runner.Start()
-
-      # Check model is successfully loaded.
-      runner.WaitUntilRunning(deadline)
-      client = serving_binary.MakeClient(runner.GetEndpoint())
-      client.WaitUntilModelLoaded(
-          deadline, polling_interval_sec=_DEFAULT_POLLING_INTERVAL_SEC)
+      if runner is None:
+        deadline = time.time() + validation_spec.max_loading_time_seconds
+        runner = _create_model_server_runner(
+            model_path=model_path,
+            serving_binary=serving_binary,
+            serving_spec=serving_spec)
+        with self._lock:
+          self._active_runners.add(runner)
+        logging.info('Starting %r.', runner)
+        runner.Start()
+
+        # Check model is successfully loaded.
+        runner.WaitUntilRunning(deadline)
+        client = serving_binary.MakeClient(runner.GetEndpoint())
+        client.WaitUntilModelLoaded(
+            deadline,
+            polling_interval_sec=_DEFAULT_POLLING_INTERVAL_SEC,
+            initial_polling_interval_sec=_DEFAULT_INITIAL_POLLING_INTERVAL_SEC)
+      else:
+        logging.info('Reusing %r.', runner)
 
       # Check model can be successfully queried.
       if requests:
-        client.SendRequests(requests)
+        try:
+          client.SendRequests(requests)
+          if validation_spec.HasField('load_test'):
+            self._RunLoadTest(runner, client, serving_binary, requests,
+                              validation_spec.load_test)
+        except error_types.GracefulShutdown:
+          raise
+        except Exception:  # pylint: disable=broad-except
+          # The model is still loaded, so the server can be reused by the next
+          # attempt.
+          keep_running = warm_server is not None and client.IsModelAvailable()
+          raise
     finally:
-      logging.info('Stopping %r.', runner)
+      if keep_running:
+        warm_server.Put(runner, client)
+      elif runner is not None:
+        self._StopRunner(runner)
+
+  def _RunLoadTest(self, runner, client, serving_binary, requests,
+                   load_test_spec):
+    metrics = load_tester.run_load_test(client, requests, load_test_spec)
+    metrics[load_tester.MEMORY_BYTES] = runner.GetMemoryUsageBytes()
+    with self._lock:
+      self._load_test_metrics[serving_binary.image] = metrics
+    load_tester.check_thresholds(metrics, load_test_spec)
+
+  def _StopRunner(self, runner):
+    logging.info('Stopping %r.', runner)
+    try:
       runner.Stop()
+    finally:
+      with self._lock:
+        self._active_runners.discard(runner)
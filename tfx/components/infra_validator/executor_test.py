@@ -17,6 +17,7 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import json
 import os
 import signal
 import threading
@@ -248,6 +249,128 @@ class ExecutorTest(tf.test.TestCase):
         mock_runner_factory.return_value.WaitUntilRunning.assert_called()
         mock_client.WaitUntilModelLoaded.assert_called()
 
+  def testDo_ValidatesServingBinariesInParallel(self):
+    serving_spec = _make_serving_spec({
+        'tensorflow_serving': {
+            'tags': ['1.15.0', '2.3.0']
+        },
+        'local_docker': {},
+        'model_name': 'chicago-taxi',
+    })
+    validation_spec = _make_validation_spec({
+        'max_loading_time_seconds': 10,
+        'num_tries': 3,
+        'parallelism': 2,
+    })
+    self._exec_properties['serving_spec'] = proto_utils.proto_to_json(
+        serving_spec)
+    self._exec_properties['validation_spec'] = proto_utils.proto_to_json(
+        validation_spec)
+    started = threading.Barrier(2, timeout=10)
+    started_images = set()
+    lock = threading.Lock()
+
+    def validate_side_effect(serving_binary, **kwargs):
+      del kwargs  # Unused.
+      with lock:
+        is_first_try = serving_binary.image not in started_images
+        started_images.add(serving_binary.image)
+      if is_first_try:
+        # Both serving binaries are validated at the same time.
+        started.wait()
+      if serving_binary.image.endswith('2.3.0'):
+        raise ValueError
+
+    infra_validator = executor.Executor(self._context)
+    with mock.patch.object(infra_validator, '_ValidateOnce') as validate_mock:
+      validate_mock.side_effect = validate_side_effect
+      infra_validator.Do(self._input_dict, self._output_dict,
+                         self._exec_properties)
+
+    # 1.15.0 passes on the first try and 2.3.0 fails all 3 tries.
+    self.assertEqual(4, validate_mock.call_count)
+    self.assertNotBlessed()
+
+  def testValidateWithRetry_ReusesServerIfModelAvailable(self):
+    infra_validator = executor.Executor(self._context)
+    with mock.patch.object(self._serving_binary,
+                           'MakeClient') as mock_client_factory:
+      mock_client = mock_client_factory.return_value
+      mock_client.SendRequests.side_effect = [ValueError, None]
+      mock_client.IsModelAvailable.return_value = True
+      with mock.patch.object(
+          executor, '_create_model_server_runner') as mock_runner_factory:
+        self.assertTrue(infra_validator._ValidateWithRetry(
+            model_path=self._model_path,
+            serving_binary=self._serving_binary,
+            serving_spec=self._serving_spec,
+            validation_spec=self._validation_spec,
+            requests=['my_request']))
+        mock_runner_factory.assert_called_once()
+        mock_runner_factory.return_value.Stop.assert_called_once()
+        self.assertEqual(2, mock_client.SendRequests.call_count)
+
+  def testValidateWithRetry_RestartsServerIfModelUnavailable(self):
+    infra_validator = executor.Executor(self._context)
+    with mock.patch.object(self._serving_binary,
+                           'MakeClient') as mock_client_factory:
+      mock_client = mock_client_factory.return_value
+      mock_client.SendRequests.side_effect = [ValueError, None]
+      mock_client.IsModelAvailable.return_value = False
+      with mock.patch.object(
+          executor, '_create_model_server_runner') as mock_runner_factory:
+        self.assertTrue(infra_validator._ValidateWithRetry(
+            model_path=self._model_path,
+            serving_binary=self._serving_binary,
+            serving_spec=self._serving_spec,
+            validation_spec=self._validation_spec,
+            requests=['my_request']))
+        self.assertEqual(2, mock_runner_factory.call_count)
+
+  def testValidateWithRetry_DoesNotRetryUnmetThresholds(self):
+    infra_validator = executor.Executor(self._context)
+    with mock.patch.object(infra_validator, '_ValidateOnce') as validate_mock:
+      validate_mock.side_effect = error_types.ThresholdsNotMet
+      self.assertFalse(infra_validator._ValidateWithRetry(
+          model_path=self._model_path,
+          serving_binary=self._serving_binary,
+          serving_spec=self._serving_spec,
+          validation_spec=self._validation_spec,
+          requests=['my_request']))
+    validate_mock.assert_called_once()
+
+  def testDo_WritesLoadTestMetrics(self):
+    validation_spec = _make_validation_spec({
+        'max_loading_time_seconds': 10,
+        'num_tries': 1,
+        'load_test': {
+            'num_requests': 5,
+            'max_p99_latency_ms': 60000,
+        },
+    })
+    self._exec_properties['validation_spec'] = proto_utils.proto_to_json(
+        validation_spec)
+    self.build_requests_mock.return_value = ['my_request']
+
+    infra_validator = executor.Executor(self._context)
+    with mock.patch.object(serving_bins.TensorFlowServing,
+                           'MakeClient') as mock_client_factory:
+      with mock.patch.object(
+          executor, '_create_model_server_runner') as mock_runner_factory:
+        mock_runner_factory.return_value.GetMemoryUsageBytes.return_value = 100
+        infra_validator.Do(self._input_dict, self._output_dict,
+                           self._exec_properties)
+
+    self.assertBlessed()
+    mock_client = mock_client_factory.return_value
+    mock_client.SendRequests.assert_called_once_with(['my_request'])
+    self.assertEqual(5, mock_client.SendRequest.call_count)
+    metrics = json.loads(
+        fileio.open(
+            os.path.join(self._blessing.uri, 'load_test_metrics.json')).read())
+    self.assertEqual(5, metrics[self._serving_binary.image]['num_requests'])
+    self.assertEqual(100, metrics[self._serving_binary.image]['memory_bytes'])
+
   def testSignalHandling(self):
     infra_validator = executor.Executor(self._context)
     ready_to_kill_event = threading.Event()
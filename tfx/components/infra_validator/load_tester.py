@@ -0,0 +1,159 @@
+# Copyright 2020 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Load test of a loaded model for InfraValidator."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import math
+import threading
+import time
+from typing import Dict, List, Optional, Text
+
+from absl import logging
+from tfx.components.infra_validator import error_types
+from tfx.components.infra_validator import types
+from tfx.components.infra_validator.model_server_clients import base_client
+from tfx.proto import infra_validator_pb2
+
+# Keys of the load test metrics.
+NUM_REQUESTS = 'num_requests'
+THROUGHPUT_QPS = 'throughput_qps'
+P50_LATENCY_MS = 'p50_latency_ms'
+P90_LATENCY_MS = 'p90_latency_ms'
+P99_LATENCY_MS = 'p99_latency_ms'
+MEMORY_BYTES = 'memory_bytes'
+
+
+def _percentile(sorted_values: List[float], percent: float) -> float:
+  """Nearest-rank percentile of non-empty sorted values."""
+  rank = int(math.ceil(percent / 100.0 * len(sorted_values)))
+  return sorted_values[max(rank, 1) - 1]
+
+
+def run_load_test(
+    client: base_client.BaseModelServerClient,
+    requests: List[types.Request],
+    load_test_spec: infra_validator_pb2.LoadTestSpec) -> Dict[Text, float]:
+  """Replays `requests` cyclically against the model server.
+
+  Args:
+    client: A client of the model server with the model loaded.
+    requests: Requests to replay. Must not be empty.
+    load_test_spec: A `LoadTestSpec` config.
+
+  Returns:
+    A dict of the number of requests sent, the throughput in requests per
+    second and the p50, p90 and p99 latencies in milliseconds.
+
+  Raises:
+    ValueError: If `requests` is empty or `num_requests` is not positive.
+    ValidationFailed: If the model server failed to respond to a request.
+  """
+  if not requests:
+    raise ValueError('Load test requires at least one request.')
+  num_requests = load_test_spec.num_requests
+  if num_requests <= 0:
+    raise ValueError('LoadTestSpec.num_requests should be positive.')
+  concurrency = max(load_test_spec.concurrency, 1)
+  interval = 1.0 / load_test_spec.qps if load_test_spec.qps > 0 else 0.0
+
+  latencies = []
+  errors = []
+  lock = threading.Lock()
+  next_index = [0]
+
+  def _worker():
+    while True:
+      with lock:
+        index = next_index[0]
+        if index >= num_requests or errors:
+          return
+        next_index[0] += 1
+      # Pace requests to the target rate.
+      delay = start + index * interval - time.time()
+      if delay > 0:
+        time.sleep(delay)
+      request_start = time.time()
+      try:
+        client.SendRequest(requests[index % len(requests)])
+      except error_types.ValidationFailed as e:
+        with lock:
+          errors.append(e)
+        return
+      latency = time.time() - request_start
+      with lock:
+        latencies.append(latency)
+
+  logging.info('Running load test of %d requests with concurrency %d.',
+               num_requests, concurrency)
+  start = time.time()
+  workers = [threading.Thread(target=_worker) for _ in range(concurrency)]
+  for worker in workers:
+    worker.start()
+  for worker in workers:
+    worker.join()
+  elapsed = time.time() - start
+  if errors:
+    raise errors[0]
+
+  latencies.sort()
+  result = {
+      NUM_REQUESTS: num_requests,
+      THROUGHPUT_QPS: num_requests / elapsed if elapsed > 0 else float('inf'),
+      P50_LATENCY_MS: _percentile(latencies, 50) * 1000,
+      P90_LATENCY_MS: _percentile(latencies, 90) * 1000,
+      P99_LATENCY_MS: _percentile(latencies, 99) * 1000,
+  }
+  logging.info('Load test result: %s', result)
+  return result
+
+
+def check_thresholds(
+    metrics: Dict[Text, Optional[float]],
+    load_test_spec: infra_validator_pb2.LoadTestSpec) -> None:
+  """Checks the load test metrics against the thresholds of the spec.
+
+  Args:
+    metrics: Load test metrics, as returned by `run_load_test` with an optional
+      `MEMORY_BYTES` entry.
+    load_test_spec: A `LoadTestSpec` config.
+
+  Raises:
+    ThresholdsNotMet: If any metric is not within its threshold, or if the
+      memory usage has a threshold but was not measured.
+  """
+  violations = []
+  for key, threshold in ((P50_LATENCY_MS, load_test_spec.max_p50_latency_ms),
+                         (P90_LATENCY_MS, load_test_spec.max_p90_latency_ms),
+                         (P99_LATENCY_MS, load_test_spec.max_p99_latency_ms)):
+    if threshold and metrics[key] > threshold:
+      violations.append('{}={} > {}'.format(key, metrics[key], threshold))
+  if (load_test_spec.min_throughput_qps and
+      metrics[THROUGHPUT_QPS] < load_test_spec.min_throughput_qps):
+    violations.append('{}={} < {}'.format(THROUGHPUT_QPS,
+                                          metrics[THROUGHPUT_QPS],
+                                          load_test_spec.min_throughput_qps))
+  if load_test_spec.max_memory_bytes:
+    memory_bytes = metrics.get(MEMORY_BYTES)
+    if memory_bytes is None:
+      violations.append('{} is not reported by the serving platform'.format(
+          MEMORY_BYTES))
+    elif memory_bytes > load_test_spec.max_memory_bytes:
+      violations.append('{}={} > {}'.format(MEMORY_BYTES, memory_bytes,
+                                            load_test_spec.max_memory_bytes))
+  if violations:
+    raise error_types.ThresholdsNotMet(
+        'Load test thresholds are not met: {}'.format(', '.join(violations)))
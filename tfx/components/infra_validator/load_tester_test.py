@@ -0,0 +1,90 @@
+# Copyright 2020 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for tfx.components.infra_validator.load_tester."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import threading
+
+import mock
+import tensorflow as tf
+from tfx.components.infra_validator import error_types
+from tfx.components.infra_validator import load_tester
+from tfx.proto import infra_validator_pb2
+
+
+class LoadTesterTest(tf.test.TestCase):
+
+  def testRunLoadTest(self):
+    client = mock.Mock()
+    sent = []
+    lock = threading.Lock()
+
+    def send_request(request):
+      with lock:
+        sent.append(request)
+
+    client.SendRequest.side_effect = send_request
+    result = load_tester.run_load_test(
+        client, ['a', 'b', 'c'],
+        infra_validator_pb2.LoadTestSpec(num_requests=10, concurrency=3))
+
+    self.assertCountEqual(['a', 'b', 'c'] * 3 + ['a'], sent)
+    self.assertEqual(10, result[load_tester.NUM_REQUESTS])
+    self.assertGreater(result[load_tester.THROUGHPUT_QPS], 0)
+    self.assertLessEqual(result[load_tester.P50_LATENCY_MS],
+                         result[load_tester.P90_LATENCY_MS])
+    self.assertLessEqual(result[load_tester.P90_LATENCY_MS],
+                         result[load_tester.P99_LATENCY_MS])
+
+  def testRunLoadTest_RaisesIfRequestFails(self):
+    client = mock.Mock()
+    client.SendRequest.side_effect = error_types.ValidationFailed
+    with self.assertRaises(error_types.ValidationFailed):
+      load_tester.run_load_test(
+          client, ['a'],
+          infra_validator_pb2.LoadTestSpec(num_requests=10, concurrency=2))
+
+  def testCheckThresholds(self):
+    metrics = {
+        load_tester.NUM_REQUESTS: 100,
+        load_tester.THROUGHPUT_QPS: 50.0,
+        load_tester.P50_LATENCY_MS: 10.0,
+        load_tester.P90_LATENCY_MS: 20.0,
+        load_tester.P99_LATENCY_MS: 100.0,
+        load_tester.MEMORY_BYTES: None,
+    }
+    load_tester.check_thresholds(
+        metrics,
+        infra_validator_pb2.LoadTestSpec(
+            num_requests=100, max_p50_latency_ms=10, max_p90_latency_ms=30,
+            min_throughput_qps=50))
+    with self.assertRaisesRegex(error_types.ThresholdsNotMet,
+                                'p99_latency_ms'):
+      load_tester.check_thresholds(
+          metrics,
+          infra_validator_pb2.LoadTestSpec(
+              num_requests=100, max_p99_latency_ms=50))
+    with self.assertRaisesRegex(error_types.ValidationFailed,
+                                'memory_bytes is not reported'):
+      load_tester.check_thresholds(
+          metrics,
+          infra_validator_pb2.LoadTestSpec(
+              num_requests=100, max_memory_bytes=1000))
+
+
+if __name__ == '__main__':
+  tf.test.main()
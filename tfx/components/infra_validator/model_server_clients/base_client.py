@@ -19,7 +19,7 @@ from __future__ import print_function
 
 import abc
 import time
-from typing import List
+from typing import List, Optional
 
 from absl import logging
 import six
@@ -39,18 +39,30 @@ class BaseModelServerClient(six.with_metaclass(abc.ABCMeta, object)):
     """
     pass
 
-  def WaitUntilModelLoaded(self, deadline: float,
-                           polling_interval_sec: int) -> None:
+  def IsModelAvailable(self) -> bool:
+    """Returns whether the model is currently available for query."""
+    return self._GetServingStatus() == types.ModelServingStatus.READY
+
+  def WaitUntilModelLoaded(
+      self,
+      deadline: float,
+      polling_interval_sec: float,
+      initial_polling_interval_sec: Optional[float] = None) -> None:
     """Wait until model is loaded and available.
 
     Args:
       deadline: A deadline time in UTC timestamp (in seconds).
-      polling_interval_sec: GetServingStatus() polling interval.
+      polling_interval_sec: GetServingStatus() polling interval. If
+        `initial_polling_interval_sec` is set, the maximum polling interval.
+      initial_polling_interval_sec: Optional first polling interval, which is
+        doubled after each poll up to `polling_interval_sec`. Models that load
+        quickly are then detected without waiting a full polling interval.
 
     Raises:
       DeadlineExceeded: When deadline exceeded before model is ready.
       ValidationFailed: If validation failed explicitly.
     """
+    interval = initial_polling_interval_sec or polling_interval_sec
     while time.time() < deadline:
       status = self._GetServingStatus()
       if status == types.ModelServingStatus.NOT_READY:
@@ -58,7 +70,8 @@ class BaseModelServerClient(six.with_metaclass(abc.ABCMeta, object)):
             level=logging.INFO,
             n_seconds=10,
             msg='Waiting for model to be loaded...')
-        time.sleep(polling_interval_sec)
+        time.sleep(max(0, min(interval, deadline - time.time())))
+        interval = min(interval * 2, polling_interval_sec)
         continue
       elif status == types.ModelServingStatus.UNAVAILABLE:
         raise error_types.ValidationFailed(
@@ -79,6 +92,24 @@ class BaseModelServerClient(six.with_metaclass(abc.ABCMeta, object)):
     """
     pass
 
+  def SendRequest(self, request: types.Request) -> None:
+    """Send a request to the model server.
+
+    Args:
+      request: A request proto.
+
+    Raises:
+      ValidationFailed: If error occurred while sending the request.
+    """
+    try:
+      self._SendRequest(request)
+    except Exception as original_error:  # pylint: disable=broad-except
+      six.raise_from(
+          error_types.ValidationFailed(
+              'Model server failed to respond to the request {}'.format(
+                  request)),
+          original_error)
+
   def SendRequests(self, requests: List[types.Request]) -> None:
     """Send requests to the model server.
 
@@ -89,10 +120,4 @@ class BaseModelServerClient(six.with_metaclass(abc.ABCMeta, object)):
       ValidationFailed: If error occurred while sending requests.
     """
     for r in requests:
-      try:
-        self._SendRequest(r)
-      except Exception as original_error:  # pylint: disable=broad-except
-        six.raise_from(
-            error_types.ValidationFailed(
-                'Model server failed to respond to the request {}'.format(r)),
-            original_error)
+      self.SendRequest(r)
@@ -135,6 +135,30 @@ class TensorflowServingClientTest(tf.test.TestCase):
     # Check result.
     self.assertEqual(result, types.ModelServingStatus.NOT_READY)
 
+  @mock.patch('time.sleep')
+  def testWaitUntilModelLoaded_BacksOffPolling(self, mock_sleep):
+    # Prepare stub and client.
+    not_ready = _make_response({
+        'model_version_status': [{'state': 'LOADING'}]
+    })
+    ready = _make_response({
+        'model_version_status': [{'state': 'AVAILABLE'}]
+    })
+    self.model_stub.GetModelStatus.side_effect = [
+        not_ready, not_ready, not_ready, not_ready, ready]
+    client = tensorflow_serving_client.TensorFlowServingClient(
+        'localhost:1234', 'a_model_name')
+
+    # Call.
+    with mock.patch('time.time', return_value=0):
+      client.WaitUntilModelLoaded(
+          deadline=100, polling_interval_sec=0.3,
+          initial_polling_interval_sec=0.1)
+
+    # Check polling intervals.
+    self.assertEqual([0.1, 0.2, 0.3, 0.3],
+                     [c[0][0] for c in mock_sleep.call_args_list])
+
   def testIssueRequests_NoErrorIfSucceeded(self):
     # Prepare requests and client.
     r1 = classification_pb2.ClassificationRequest()
@@ -18,7 +18,7 @@ from __future__ import division
 from __future__ import print_function
 
 import abc
-from typing import Text
+from typing import Optional, Text
 
 import six
 
@@ -141,3 +141,14 @@ class BaseModelServerRunner(six.with_metaclass(abc.ABCMeta, object)):
     graceful shutdown period, and it is perfectly fine to add a retry logic
     inside `Stop()` until the deadline is met.
     """
+
+  def GetMemoryUsageBytes(self) -> Optional[int]:
+    """Get the current memory usage of the model server, if available.
+
+    Only called when the model server job is in the Running state.
+
+    Returns:
+      Memory usage in bytes, or None if the serving platform does not report
+      it.
+    """
+    return None
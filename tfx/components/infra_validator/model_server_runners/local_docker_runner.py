@@ -155,6 +155,15 @@ class LocalDockerRunner(base_runner.BaseModelServerRunner):
     raise error_types.DeadlineExceeded(
         'Deadline exceeded while waiting for the container to be running.')
 
+  def GetMemoryUsageBytes(self):
+    assert self._container is not None, 'container has not been started.'
+    try:
+      stats = self._container.stats(stream=False)
+    except docker_errors.APIError:
+      logging.warning('Unable to get container stats.', exc_info=True)
+      return None
+    return stats.get('memory_stats', {}).get('usage')
+
   def Stop(self):
     if self._container:
       logging.info('Stopping container.')
@@ -0,0 +1,183 @@
+# Copyright 2020 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Sampling of serialized records from the files of an Examples split.
+
+Records are read directly from the files in plain Python, without building a
+TFXIO or a TensorFlow graph, so that taking a few records is cheap regardless
+of the size of the split.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import gzip
+import itertools
+import random
+import struct
+import zlib
+from typing import Any, Iterator, List, Optional, Text
+
+import apache_beam as beam
+
+from tfx.components.util import examples_utils
+from tfx.components.util import parquet_io
+from tfx.dsl.io import fileio
+from tfx.proto import example_gen_pb2
+from tfx.proto import infra_validator_pb2
+
+# A TFRecord is a little-endian uint64 length and the masked CRC32C of the
+# length, followed by the data and the masked CRC32C of the data.
+_TFRECORD_HEADER = struct.Struct('<QI')
+_TFRECORD_FOOTER_SIZE = 4
+
+_READ_CHUNK_SIZE = 1 << 20
+
+
+class _ZlibReader(object):
+  """Minimal readable file object over a zlib compressed stream."""
+
+  def __init__(self, fileobj: Any):
+    self._fileobj = fileobj
+    self._decompressor = zlib.decompressobj()
+    self._buffer = bytearray()
+
+  def read(self, size: int) -> bytes:
+    while len(self._buffer) < size and not self._decompressor.eof:
+      chunk = self._fileobj.read(_READ_CHUNK_SIZE)
+      if not chunk:
+        break
+      self._buffer.extend(self._decompressor.decompress(chunk))
+    result = bytes(self._buffer[:size])
+    del self._buffer[:size]
+    return result
+
+
+def read_tfrecords(file_path: Text, compression: int) -> Iterator[bytes]:
+  """Reads the records of a TFRecord file.
+
+  Record checksums are not verified.
+
+  Args:
+    file_path: Path of the TFRecord file.
+    compression: One of the enums in example_gen_pb2.WriteConfig.Compression.
+
+  Yields:
+    The records of the file, in order.
+
+  Raises:
+    ValueError: If the file is truncated.
+  """
+  with fileio.open(file_path, 'rb') as f:
+    if compression == example_gen_pb2.WriteConfig.NONE:
+      reader = f
+    elif compression == example_gen_pb2.WriteConfig.ZLIB:
+      reader = _ZlibReader(f)
+    else:
+      reader = gzip.GzipFile(fileobj=f, mode='rb')
+    while True:
+      header = reader.read(_TFRECORD_HEADER.size)
+      if not header:
+        return
+      if len(header) < _TFRECORD_HEADER.size:
+        raise ValueError('Truncated TFRecord file {}.'.format(file_path))
+      length, _ = _TFRECORD_HEADER.unpack(header)
+      data = reader.read(length + _TFRECORD_FOOTER_SIZE)
+      if len(data) < length + _TFRECORD_FOOTER_SIZE:
+        raise ValueError('Truncated TFRecord file {}.'.format(file_path))
+      yield data[:length]
+
+
+_FILE_COMPRESSIONS = {
+    beam.io.filesystem.CompressionTypes.GZIP:
+        example_gen_pb2.WriteConfig.GZIP,
+    beam.io.filesystem.CompressionTypes.DEFLATE:
+        example_gen_pb2.WriteConfig.ZLIB,
+    beam.io.filesystem.CompressionTypes.UNCOMPRESSED:
+        example_gen_pb2.WriteConfig.NONE,
+}
+
+
+def detect_compression(file_path: Text) -> int:
+  """Returns the compression of a TFRecord file from its file name.
+
+  Args:
+    file_path: Path of the TFRecord file.
+
+  Returns:
+    One of the enums in example_gen_pb2.WriteConfig.Compression.
+
+  Raises:
+    ValueError: If the compression of the file is not supported.
+  """
+  compression_type = (
+      beam.io.filesystem.CompressionTypes.detect_compression_type(file_path))
+  if compression_type not in _FILE_COMPRESSIONS:
+    raise ValueError('Unsupported compression {} of {}.'.format(
+        compression_type, file_path))
+  return _FILE_COMPRESSIONS[compression_type]
+
+
+def _read_records(file_paths: List[Text], payload_format: int,
+                  compression: Optional[int]) -> Iterator[bytes]:
+  if examples_utils.is_columnar_payload_format(payload_format):
+    return parquet_io.ReadSerializedExamples(file_paths)
+  return itertools.chain.from_iterable(
+      read_tfrecords(
+          file_path,
+          detect_compression(file_path) if compression is None else compression)
+      for file_path in file_paths)
+
+
+def sample_records(
+    file_paths: List[Text],
+    payload_format: int,
+    compression: Optional[int],
+    num_records: int,
+    sampling: int = infra_validator_pb2.RequestSpec.HEAD,
+    random_seed: int = 0) -> List[bytes]:
+  """Samples serialized records from the files of an Examples split.
+
+  Records of a columnar payload format are sampled as serialized tf.Examples.
+
+  Args:
+    file_paths: Paths of the files of the split.
+    payload_format: One of the enums in example_gen_pb2.PayloadFormat.
+    compression: One of the enums in example_gen_pb2.WriteConfig.Compression,
+      or None to detect the compression of each file from its file name.
+      Ignored for columnar payload formats.
+    num_records: Maximum number of records to sample.
+    sampling: One of the enums in infra_validator_pb2.RequestSpec.Sampling.
+      HEAD reads the first records of the files in order, and RANDOM takes a
+      uniform sample of the records of all files.
+    random_seed: Seed of the RANDOM sampling.
+
+  Returns:
+    Up to `num_records` serialized records.
+  """
+  records = _read_records(sorted(file_paths), payload_format, compression)
+  if sampling != infra_validator_pb2.RequestSpec.RANDOM:
+    return list(itertools.islice(records, num_records))
+
+  # Reservoir sampling, so that only `num_records` records are kept in memory.
+  rng = random.Random(random_seed)
+  result = []
+  for index, record in enumerate(records):
+    if index < num_records:
+      result.append(record)
+    else:
+      replaced = rng.randint(0, index)
+      if replaced < num_records:
+        result[replaced] = record
+  return result
@@ -0,0 +1,131 @@
+# Copyright 2020 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for tfx.components.infra_validator.record_sampler."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+
+from absl.testing import parameterized
+import tensorflow as tf
+from tfx.components.infra_validator import record_sampler
+from tfx.proto import example_gen_pb2
+from tfx.proto import infra_validator_pb2
+
+_TF_EXAMPLE = example_gen_pb2.PayloadFormat.FORMAT_TF_EXAMPLE
+
+
+class RecordSamplerTest(tf.test.TestCase, parameterized.TestCase):
+
+  def setUp(self):
+    super(RecordSamplerTest, self).setUp()
+    self._output_dir = os.path.join(
+        os.environ.get('TEST_UNDECLARED_OUTPUTS_DIR', self.get_temp_dir()),
+        self._testMethodName)
+    tf.io.gfile.makedirs(self._output_dir)
+
+  def _WriteFiles(self, num_files, records_per_file, compression_type='GZIP',
+                  suffix=''):
+    file_paths = []
+    for i in range(num_files):
+      file_path = os.path.join(self._output_dir, 'data-%d%s' % (i, suffix))
+      with tf.io.TFRecordWriter(file_path, compression_type) as writer:
+        for j in range(records_per_file):
+          writer.write(b'record-%d-%d' % (i, j))
+      file_paths.append(file_path)
+    return file_paths
+
+  @parameterized.named_parameters(
+      ('Gzip', 'GZIP', example_gen_pb2.WriteConfig.GZIP),
+      ('Zlib', 'ZLIB', example_gen_pb2.WriteConfig.ZLIB),
+      ('Uncompressed', '', example_gen_pb2.WriteConfig.NONE))
+  def testReadTFRecords(self, compression_type, compression):
+    [file_path] = self._WriteFiles(1, 3, compression_type)
+
+    self.assertEqual(
+        [b'record-0-0', b'record-0-1', b'record-0-2'],
+        list(record_sampler.read_tfrecords(file_path, compression)))
+
+  def testReadTFRecords_FailIfTruncated(self):
+    [file_path] = self._WriteFiles(1, 1, '')
+    with tf.io.gfile.GFile(file_path, 'rb') as f:
+      contents = f.read()
+    with tf.io.gfile.GFile(file_path, 'wb') as f:
+      f.write(contents[:-1])
+
+    with self.assertRaises(ValueError):
+      list(record_sampler.read_tfrecords(
+          file_path, example_gen_pb2.WriteConfig.NONE))
+
+  def testSampleRecords_Head(self):
+    file_paths = self._WriteFiles(2, 3)
+
+    self.assertEqual(
+        [b'record-0-0', b'record-0-1', b'record-0-2', b'record-1-0'],
+        record_sampler.sample_records(
+            list(reversed(file_paths)),
+            payload_format=_TF_EXAMPLE,
+            compression=example_gen_pb2.WriteConfig.GZIP,
+            num_records=4))
+
+  def testSampleRecords_DetectsCompression(self):
+    file_paths = (
+        self._WriteFiles(1, 1, 'GZIP', suffix='.gz') +
+        self._WriteFiles(1, 1, '', suffix='.tfrecord'))
+
+    self.assertEqual(
+        [b'record-0-0', b'record-0-0'],
+        record_sampler.sample_records(
+            file_paths,
+            payload_format=_TF_EXAMPLE,
+            compression=None,
+            num_records=2))
+
+  def testSampleRecords_Random(self):
+    file_paths = self._WriteFiles(4, 25)
+
+    def sample(random_seed):
+      return record_sampler.sample_records(
+          file_paths,
+          payload_format=_TF_EXAMPLE,
+          compression=example_gen_pb2.WriteConfig.GZIP,
+          num_records=10,
+          sampling=infra_validator_pb2.RequestSpec.RANDOM,
+          random_seed=random_seed)
+
+    result = sample(random_seed=1)
+    self.assertLen(result, 10)
+    self.assertLen(set(result), 10)
+    self.assertEqual(result, sample(random_seed=1))
+    self.assertNotEqual(result, sample(random_seed=2))
+    # Records are sampled across files.
+    self.assertGreater(len({r.split(b'-')[1] for r in result}), 1)
+
+  def testSampleRecords_FewerRecordsThanRequested(self):
+    file_paths = self._WriteFiles(1, 2)
+
+    self.assertCountEqual(
+        [b'record-0-0', b'record-0-1'],
+        record_sampler.sample_records(
+            file_paths,
+            payload_format=_TF_EXAMPLE,
+            compression=example_gen_pb2.WriteConfig.GZIP,
+            num_records=10,
+            sampling=infra_validator_pb2.RequestSpec.RANDOM))
+
+
+if __name__ == '__main__':
+  tf.test.main()
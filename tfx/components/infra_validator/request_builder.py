@@ -25,15 +25,15 @@ from absl import logging
 import six
 import tensorflow as tf
 from tfx import types
+from tfx.components.example_gen import utils as example_gen_utils
+from tfx.components.infra_validator import record_sampler
 from tfx.components.infra_validator import types as iv_types
 from tfx.components.util import examples_utils
-from tfx.components.util import tfxio_utils
 from tfx.dsl.io import fileio
 from tfx.proto import example_gen_pb2
 from tfx.proto import infra_validator_pb2
 from tfx.types import artifact_utils
 from tfx.utils import path_utils
-from tfx_bsl.tfxio import dataset_options
 
 from tensorflow.python.saved_model import loader_impl  # pylint: disable=g-direct-tensorflow-import
 from tensorflow_serving.apis import classification_pb2
@@ -44,8 +44,6 @@ from tensorflow_serving.apis import regression_pb2
 
 _TENSORFLOW_SERVING = 'tensorflow_serving'
 _DEFAULT_NUM_EXAMPLES = 1
-_RAW_RECORDS_COLUMN = 'raw_records'
-_TELEMETRY_DESCRIPTORS = ['InfraValidator']
 
 _DEFAULT_TAG_SET = frozenset([tf.saved_model.SERVING])
 
@@ -95,7 +93,9 @@ def build_requests(  # pylint: disable=invalid-name
   builder.ReadExamplesArtifact(
       examples,
       split_name=split_name,
-      num_examples=num_examples)
+      num_examples=num_examples,
+      sampling=request_spec.sampling,
+      random_seed=request_spec.random_seed)
 
   return builder.BuildRequests()
 
@@ -144,21 +144,24 @@ class _BaseRequestBuilder(six.with_metaclass(abc.ABCMeta, object)):
     self._records = []  # type: List[bytes]
     self._payload_format = example_gen_pb2.PayloadFormat.FORMAT_UNSPECIFIED
 
-  # TODO(jjong): The method strongly assumes that the output of ExampleGen is
-  # a gzipped TFRecords of tf.Example. We need a better abstraction (e.g. TFXIO)
-  # to accept arbitrary file format and convert it to appropriate request types.
-  def ReadExamplesArtifact(self, examples: types.Artifact, num_examples: int,
-                           split_name: Optional[Text] = None):
+  def ReadExamplesArtifact(
+      self, examples: types.Artifact, num_examples: int,
+      split_name: Optional[Text] = None,
+      sampling: int = infra_validator_pb2.RequestSpec.HEAD,
+      random_seed: int = 0):
     """Read records from Examples artifact.
 
-    Currently it assumes Examples artifact contains serialized tf.Example in
-    gzipped TFRecord files.
+    Records are read directly from the files of the split, in the payload
+    format and compression of the Examples artifact. Examples of a columnar
+    payload format are read as serialized tf.Examples.
 
     Args:
       examples: `Examples` artifact.
       num_examples: Number of examples to read. If the specified value is larger
           than the actual number of examples, all examples would be read.
       split_name: Name of the split to read from the Examples artifact.
+      sampling: One of the enums in infra_validator_pb2.RequestSpec.Sampling.
+      random_seed: Seed of the RANDOM sampling.
 
     Raises:
       RuntimeError: If read twice.
@@ -181,12 +184,6 @@ class _BaseRequestBuilder(six.with_metaclass(abc.ABCMeta, object)):
 
     # ExampleGen generates artifacts under each split_name directory.
     glob_pattern = os.path.join(examples.uri, split_name, '*')
-    tfxio_factory = tfxio_utils.get_tfxio_factory_from_artifact(
-        examples=[examples],
-        telemetry_descriptors=_TELEMETRY_DESCRIPTORS,
-        schema=None,
-        read_as_raw_records=True,
-        raw_record_column_name=_RAW_RECORDS_COLUMN)
     try:
       filenames = fileio.glob(glob_pattern)
     except tf.errors.NotFoundError:
@@ -195,28 +192,24 @@ class _BaseRequestBuilder(six.with_metaclass(abc.ABCMeta, object)):
       raise ValueError('Unable to find examples matching {}.'.format(
           glob_pattern))
 
-    self._payload_format = examples_utils.get_payload_format(examples)
-    tfxio = tfxio_factory(filenames)
-
-    self._ReadFromDataset(
-        tfxio.TensorFlowDataset(
-            dataset_options.TensorFlowDatasetOptions(batch_size=num_examples)))
-
-  def _ReadFromDataset(self, dataset: tf.data.Dataset):
-    dataset = dataset.take(1)
-    if tf.executing_eagerly():
-      for d in dataset:
-        self._records.extend(d[_RAW_RECORDS_COLUMN].numpy())
+    payload_format = examples_utils.get_payload_format(examples)
+    # Examples which do not record their compression, e.g. imported ones, are
+    # not necessarily gzipped.
+    compression = None
+    if examples.has_custom_property(
+        example_gen_utils.COMPRESSION_PROPERTY_NAME):
+      compression = examples_utils.get_compression(examples)
+    self._records = record_sampler.sample_records(
+        filenames,
+        payload_format=payload_format,
+        compression=compression,
+        num_records=num_examples,
+        sampling=sampling,
+        random_seed=random_seed)
+    if examples_utils.is_columnar_payload_format(payload_format):
+      self._payload_format = example_gen_pb2.PayloadFormat.FORMAT_TF_EXAMPLE
     else:
-      it = tf.compat.v1.data.make_one_shot_iterator(dataset)
-      next_el = it.get_next()
-      with tf.Session() as sess:
-        while True:
-          try:
-            d = sess.run(next_el)
-            self._records.extend(d[_RAW_RECORDS_COLUMN])
-          except tf.errors.OutOfRangeError:
-            break
+      self._payload_format = payload_format
 
   @abc.abstractmethod
   def BuildRequests(self) -> List[iv_types.Request]:
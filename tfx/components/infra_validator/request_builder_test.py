@@ -232,6 +232,23 @@ class BaseRequestBuilderTest(tf.test.TestCase):
     self.assertEqual(len(builder._records), 1)
     self.assertIsInstance(builder._records[0], bytes)
 
+  def testReadExamplesArtifact_RandomSampling(self):
+    head_builder = _MockBuilder()
+    head_builder.ReadExamplesArtifact(self._examples, num_examples=5,
+                                      split_name='eval')
+    builder1 = _MockBuilder()
+    builder1.ReadExamplesArtifact(
+        self._examples, num_examples=5, split_name='eval',
+        sampling=infra_validator_pb2.RequestSpec.RANDOM, random_seed=1)
+    builder2 = _MockBuilder()
+    builder2.ReadExamplesArtifact(
+        self._examples, num_examples=5, split_name='eval',
+        sampling=infra_validator_pb2.RequestSpec.RANDOM, random_seed=1)
+
+    self.assertLen(builder1._records, 5)
+    self.assertEqual(builder1._records, builder2._records)
+    self.assertNotEqual(head_builder._records, builder1._records)
+
   def testReadExamplesArtifact_FailIfSplitNamesEmpty(self):
     builder = _MockBuilder()
     examples = standard_artifacts.Examples()
@@ -472,7 +489,9 @@ class TestBuildRequests(tf.test.TestCase):
     builder.ReadExamplesArtifact.assert_called_with(
         self._examples,
         split_name='eval',
-        num_examples=1)
+        num_examples=1,
+        sampling=infra_validator_pb2.RequestSpec.HEAD,
+        random_seed=0)
     builder.BuildRequests.assert_called()
 
   def testBuildRequests_NumberOfRequests(self):
@@ -518,7 +537,9 @@ class TestBuildRequests(tf.test.TestCase):
     builder.ReadExamplesArtifact.assert_called_with(
         self._examples,
         split_name=None,  # Without split_name (will choose any split).
-        num_examples=1)   # Default num_examples = 1.
+        num_examples=1,   # Default num_examples = 1.
+        sampling=infra_validator_pb2.RequestSpec.HEAD,
+        random_seed=0)
 
 
 if __name__ == '__main__':
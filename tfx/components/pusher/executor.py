@@ -25,12 +25,12 @@ from typing import Any, Dict, List, Optional, Text
 from absl import logging
 
 from tfx import types
+from tfx.components.pusher import model_fingerprint
 from tfx.components.util import model_utils
 from tfx.dsl.components.base import base_executor
 from tfx.dsl.io import fileio
 from tfx.proto import pusher_pb2
 from tfx.types import artifact_utils
-from tfx.utils import io_utils
 from tfx.utils import path_utils
 from tfx.utils import proto_utils
 
@@ -51,6 +51,11 @@ PUSHED_MODEL_KEY = 'pushed_model'
 _PUSHED_KEY = 'pushed'
 _PUSHED_DESTINATION_KEY = 'pushed_destination'
 _PUSHED_VERSION_KEY = 'pushed_version'
+_PUSHED_FINGERPRINT_KEY = 'pushed_fingerprint'
+
+# Directory under the filesystem push destination keeping the manifest of each
+# pushed version. Model servers ignore it as its name is not a version number.
+_MANIFESTS_DIR = '.tfx_manifests'
 
 
 class Executor(base_executor.BaseExecutor):
@@ -156,40 +161,93 @@ class Executor(base_executor.BaseExecutor):
       fs_config = push_destination.filesystem
       if fs_config.versioning == _Versioning.AUTO:
         fs_config.versioning = _Versioning.UNIX_TIMESTAMP
-      if fs_config.versioning == _Versioning.UNIX_TIMESTAMP:
-        model_version = str(int(time.time()))
-      else:
+      if fs_config.versioning != _Versioning.UNIX_TIMESTAMP:
         raise NotImplementedError(
             'Invalid Versioning {}'.format(fs_config.versioning))
-      logging.info('Model version: %s', model_version)
-      serving_path = os.path.join(fs_config.base_directory, model_version)
 
-      if fileio.exists(serving_path):
+      # Compare the model with the latest pushed version. Digests of unchanged
+      # files are reused if the latest version was pushed from the same model.
+      latest_version = self._GetLatestVersion(fs_config.base_directory)
+      latest_path = None
+      latest_manifest = None
+      if latest_version is not None:
+        latest_path = os.path.join(fs_config.base_directory, latest_version)
+        latest_manifest = model_fingerprint.read_manifest(
+            self._GetManifestPath(fs_config.base_directory, latest_version))
+      manifest = model_fingerprint.compute_manifest(model_path,
+                                                    latest_manifest)
+      fingerprint = manifest[model_fingerprint.FINGERPRINT_KEY]
+
+      if (latest_manifest and fingerprint ==
+          latest_manifest[model_fingerprint.FINGERPRINT_KEY]):
+        model_version = latest_version
+        serving_path = latest_path
         logging.info(
-            'Destination directory %s already exists, skipping current push.',
-            serving_path)
+            'Model is identical to the pushed version %s, skipping current '
+            'push.', serving_path)
       else:
-        # tf.serving won't load partial model, it will retry until fully copied.
-        io_utils.copy_dir(model_path, serving_path)
-        logging.info('Model written to serving path %s.', serving_path)
+        model_version = str(int(time.time()))
+        logging.info('Model version: %s', model_version)
+        serving_path = os.path.join(fs_config.base_directory, model_version)
+        if fileio.exists(serving_path):
+          logging.info(
+              'Destination directory %s already exists, skipping current '
+              'push.', serving_path)
+        else:
+          # tf.serving won't load partial model, it will retry until fully
+          # copied. Files unchanged since the latest version are copied from
+          # it.
+          num_changed_files = model_fingerprint.copy_model(
+              manifest,
+              serving_path,
+              base_manifest=latest_manifest,
+              base_path=latest_path,
+              use_hard_links=fs_config.use_hard_links)
+          model_fingerprint.write_manifest(
+              manifest,
+              self._GetManifestPath(fs_config.base_directory, model_version))
+          logging.info('Model written to serving path %s (%d changed files).',
+                       serving_path, num_changed_files)
     else:
       raise NotImplementedError(
           'Invalid push destination {}'.format(destination_kind))
 
     # Copy the model to pushing uri for archiving.
-    io_utils.copy_dir(model_path, model_push.uri)
+    model_fingerprint.copy_model(
+        manifest, model_push.uri, use_hard_links=fs_config.use_hard_links)
     self._MarkPushed(model_push,
                      pushed_destination=serving_path,
-                     pushed_version=model_version)
+                     pushed_version=model_version,
+                     pushed_fingerprint=fingerprint)
     logging.info('Model pushed to %s.', model_push.uri)
 
+  def _GetLatestVersion(self, base_directory: Text) -> Optional[Text]:
+    """Returns the latest version pushed to a filesystem destination."""
+    if not fileio.isdir(base_directory):
+      return None
+    versions = [
+        os.path.basename(os.path.normpath(name))
+        for name in fileio.listdir(base_directory)
+    ]
+    versions = [version for version in versions if version.isdigit()]
+    if not versions:
+      return None
+    return max(versions, key=int)
+
+  def _GetManifestPath(self, base_directory: Text, version: Text) -> Text:
+    return os.path.join(base_directory, _MANIFESTS_DIR, version + '.json')
+
   def _MarkPushed(self, model_push: types.Artifact, pushed_destination: Text,
-                  pushed_version: Optional[Text] = None) -> None:
+                  pushed_version: Optional[Text] = None,
+                  pushed_fingerprint: Optional[Text] = None) -> None:
     model_push.set_int_custom_property('pushed', 1)
     model_push.set_string_custom_property(
         _PUSHED_DESTINATION_KEY, pushed_destination)
     if pushed_version is not None:
       model_push.set_string_custom_property(_PUSHED_VERSION_KEY, pushed_version)
+    if pushed_fingerprint is not None:
+      model_push.set_string_custom_property(_PUSHED_FINGERPRINT_KEY,
+                                            pushed_fingerprint)
 
   def _MarkNotPushed(self, model_push: types.Artifact):
     model_push.set_int_custom_property('pushed', 0)
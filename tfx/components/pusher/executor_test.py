@@ -20,11 +20,15 @@ from __future__ import print_function
 
 import json
 import os
+
+import mock
 import tensorflow as tf
 
 from tfx.components.pusher import executor
 from tfx.dsl.io import fileio
 from tfx.types import standard_artifacts
+from tfx.utils import io_utils
+from tfx.utils import path_utils
 
 
 class ExecutorTest(tf.test.TestCase):
@@ -198,6 +202,68 @@ class ExecutorTest(tf.test.TestCase):
     # Check model is pushed.
     self.assertPushed()
 
+  def _PushAgain(self):
+    self._model_push = standard_artifacts.PushedModel()
+    self._model_push.uri = os.path.join(self._output_data_dir, 'model_push_2')
+    self._output_dict[executor.PUSHED_MODEL_KEY] = [self._model_push]
+    self._executor.Do(self._input_dict, self._output_dict,
+                      self._exec_properties)
+
+  def _GetVersions(self):
+    return sorted(
+        v for v in fileio.listdir(self._serving_model_dir) if v.isdigit())
+
+  @mock.patch.object(executor, 'time')
+  def testDo_IdenticalModel_SkipsPush(self, mock_time):
+    self._model_blessing.set_int_custom_property('blessed', 1)
+    mock_time.time.return_value = 1000
+    self._executor.Do(self._input_dict, self._output_dict,
+                      self._exec_properties)
+    fingerprint = self._model_push.get_string_custom_property(
+        'pushed_fingerprint')
+    self.assertNotEmpty(fingerprint)
+
+    mock_time.time.return_value = 2000
+    self._PushAgain()
+
+    self.assertPushed()
+    self.assertEqual(['1000'], self._GetVersions())
+    self.assertEqual('1000',
+                     self._model_push.get_string_custom_property(
+                         'pushed_version'))
+    self.assertEqual(
+        fingerprint,
+        self._model_push.get_string_custom_property('pushed_fingerprint'))
+
+  @mock.patch.object(executor, 'time')
+  def testDo_ChangedModel_PushesNewVersion(self, mock_time):
+    self._model_blessing.set_int_custom_property('blessed', 1)
+    model_uri = os.path.join(self._output_data_dir, 'model')
+    io_utils.copy_dir(self._model_export.uri, model_uri)
+    self._model_export.uri = model_uri
+    mock_time.time.return_value = 1000
+    self._executor.Do(self._input_dict, self._output_dict,
+                      self._exec_properties)
+    fingerprint = self._model_push.get_string_custom_property(
+        'pushed_fingerprint')
+
+    model_path = path_utils.serving_model_path(model_uri)
+    with fileio.open(os.path.join(model_path, 'new_file'), 'w') as f:
+      f.write('new')
+    mock_time.time.return_value = 2000
+    self._PushAgain()
+
+    self.assertEqual(['1000', '2000'], self._GetVersions())
+    self.assertNotEqual(
+        fingerprint,
+        self._model_push.get_string_custom_property('pushed_fingerprint'))
+    new_version = os.path.join(self._serving_model_dir, '2000')
+    self.assertTrue(fileio.exists(os.path.join(new_version, 'new_file')))
+    self.assertEqual(
+        set(fileio.listdir(os.path.join(self._serving_model_dir, '1000'))) |
+        {'new_file'},
+        set(fileio.listdir(new_version)))
+
 
 if __name__ == '__main__':
   tf.test.main()
@@ -0,0 +1,221 @@
+# Lint as: python3
+# Copyright 2020 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Content fingerprints of model directories for incremental pushes.
+
+The manifest of a model directory records the size, modification time and
+SHA-256 digest of every file, the subdirectories, and the fingerprint of the
+whole directory. The manifest of the previous push lets Pusher skip pushing an
+identical model, reuse the digests of unchanged files, and copy unchanged files
+from the previous push rather than from the model.
+"""
+
+from concurrent import futures
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional, Text, Tuple
+
+from tfx.dsl.io import fileio
+
+# Keys of a manifest.
+FINGERPRINT_KEY = 'fingerprint'
+MODEL_PATH_KEY = 'model_path'
+FILES_KEY = 'files'
+DIRS_KEY = 'dirs'
+
+_SIZE_KEY = 'size'
+_MTIME_KEY = 'mtime'
+_SHA256_KEY = 'sha256'
+
+_READ_CHUNK_SIZE = 1 << 20
+_NUM_COPY_THREADS = 16
+
+
+def _is_local(path: Text) -> bool:
+  return '://' not in path
+
+
+def _stat(path: Text) -> Tuple[int, int]:
+  """Returns the size and modification time in nanoseconds of a file."""
+  stat = fileio.stat(path)
+  if hasattr(stat, 'st_size'):
+    return stat.st_size, stat.st_mtime_ns
+  return stat.length, stat.mtime_nsec
+
+
+def _sha256(path: Text) -> Text:
+  digest = hashlib.sha256()
+  with fileio.open(path, 'rb') as f:
+    while True:
+      chunk = f.read(_READ_CHUNK_SIZE)
+      if not chunk:
+        break
+      digest.update(chunk)
+  return digest.hexdigest()
+
+
+def _list_files(dir_path: Text) -> Tuple[Dict[Text, Text], List[Text]]:
+  """Lists the files and the subdirectories of a directory.
+
+  Args:
+    dir_path: Path of the directory.
+
+  Returns:
+    A dict from the relative paths of the files to their paths, and the sorted
+    relative paths of the subdirectories.
+  """
+  dir_path = dir_path.rstrip('/')
+
+  def relative(path):
+    return path.rstrip('/').replace(dir_path, '', 1).lstrip('/')
+
+  files = {}
+  dirs = []
+  for dir_name, _, leaf_files in fileio.walk(dir_path):
+    if relative(dir_name):
+      dirs.append(relative(dir_name))
+    for leaf_file in leaf_files:
+      file_path = os.path.join(dir_name, leaf_file)
+      files[relative(file_path)] = file_path
+  return files, sorted(dirs)
+
+
+def compute_manifest(
+    model_path: Text,
+    previous_manifest: Optional[Dict[Text, Any]] = None) -> Dict[Text, Any]:
+  """Computes the manifest of a model directory.
+
+  Args:
+    model_path: Path of the model directory.
+    previous_manifest: Optional earlier manifest. If it is a manifest of the
+      same `model_path`, the digests of files whose size and modification time
+      are unchanged are reused instead of reading the files.
+
+  Returns:
+    The manifest of the model directory.
+  """
+  reusable_files = {}
+  if (previous_manifest and
+      previous_manifest.get(MODEL_PATH_KEY) == model_path):
+    reusable_files = previous_manifest.get(FILES_KEY, {})
+
+  file_paths, dirs = _list_files(model_path)
+  files = {}
+  for relative_path, file_path in file_paths.items():
+    size, mtime = _stat(file_path)
+    previous = reusable_files.get(relative_path)
+    if (previous and previous[_SIZE_KEY] == size and
+        previous[_MTIME_KEY] == mtime):
+      sha256 = previous[_SHA256_KEY]
+    else:
+      sha256 = _sha256(file_path)
+    files[relative_path] = {
+        _SIZE_KEY: size,
+        _MTIME_KEY: mtime,
+        _SHA256_KEY: sha256,
+    }
+
+  fingerprint = hashlib.sha256()
+  for relative_path in sorted(files):
+    fingerprint.update(
+        '{}\0{}\0'.format(relative_path,
+                          files[relative_path][_SHA256_KEY]).encode('utf-8'))
+  for relative_path in dirs:
+    fingerprint.update('{}/\0'.format(relative_path).encode('utf-8'))
+  return {
+      FINGERPRINT_KEY: fingerprint.hexdigest(),
+      MODEL_PATH_KEY: model_path,
+      FILES_KEY: files,
+      DIRS_KEY: dirs,
+  }
+
+
+def read_manifest(path: Text) -> Optional[Dict[Text, Any]]:
+  """Reads a manifest, or returns None if there is none at `path`."""
+  if not fileio.exists(path):
+    return None
+  with fileio.open(path, 'r') as f:
+    return json.loads(f.read())
+
+
+def write_manifest(manifest: Dict[Text, Any], path: Text) -> None:
+  """Writes a manifest to `path`."""
+  fileio.makedirs(os.path.dirname(path))
+  with fileio.open(path, 'w') as f:
+    f.write(json.dumps(manifest, sort_keys=True))
+
+
+def _copy_file(src: Text, dst: Text, use_hard_links: bool = False) -> None:
+  """Copies a file, or hard links it on a local filesystem if requested."""
+  if use_hard_links and _is_local(src) and _is_local(dst):
+    try:
+      os.link(src, dst)
+      return
+    except OSError:
+      pass
+  fileio.copy(src, dst, overwrite=True)
+
+
+def copy_model(manifest: Dict[Text, Any],
+               dst: Text,
+               base_manifest: Optional[Dict[Text, Any]] = None,
+               base_path: Optional[Text] = None,
+               use_hard_links: bool = False) -> int:
+  """Copies the model of a manifest to `dst`.
+
+  Files are copied concurrently, and directories are recreated even if they
+  are empty. Files identical to a file of the same relative path in the base
+  model are copied from the base model, e.g. a previous push at the same
+  destination, which makes them server-side copies on remote filesystems.
+
+  Args:
+    manifest: The manifest of the model to copy.
+    dst: Path of the destination directory.
+    base_manifest: Optional manifest of the base model.
+    base_path: Path of the base model, if `base_manifest` is given.
+    use_hard_links: Whether to hard link rather than copy files on local
+      filesystems. The copy then shares its files with their source, so that
+      modifying a file in place modifies it in both.
+
+  Returns:
+    The number of files copied from the model rather than from the base model.
+  """
+  model_path = manifest[MODEL_PATH_KEY]
+  base_files = (base_manifest or {}).get(FILES_KEY, {})
+  copies = []
+  num_changed_files = 0
+  for relative_path, file_info in manifest[FILES_KEY].items():
+    base_file_info = base_files.get(relative_path)
+    if (base_path and base_file_info and
+        base_file_info[_SHA256_KEY] == file_info[_SHA256_KEY]):
+      src = os.path.join(base_path, relative_path)
+    else:
+      src = os.path.join(model_path, relative_path)
+      num_changed_files += 1
+    copies.append((src, os.path.join(dst, relative_path)))
+
+  dir_paths = {os.path.dirname(d) for _, d in copies}
+  dir_paths.update(
+      os.path.join(dst, relative_path)
+      for relative_path in manifest.get(DIRS_KEY, []))
+  fileio.makedirs(dst)
+  for dir_path in sorted(dir_paths):
+    fileio.makedirs(dir_path)
+  with futures.ThreadPoolExecutor(max_workers=_NUM_COPY_THREADS) as pool:
+    for result in [
+        pool.submit(_copy_file, src, d, use_hard_links) for src, d in copies
+    ]:
+      result.result()
+  return num_changed_files
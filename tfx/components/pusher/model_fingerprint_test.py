@@ -0,0 +1,146 @@
+# Lint as: python3
+# Copyright 2020 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for tfx.components.pusher.model_fingerprint."""
+
+import os
+
+import mock
+import tensorflow as tf
+from tfx.components.pusher import model_fingerprint
+from tfx.dsl.io import fileio
+
+
+class ModelFingerprintTest(tf.test.TestCase):
+
+  def setUp(self):
+    super(ModelFingerprintTest, self).setUp()
+    self._model_path = os.path.join(self.get_temp_dir(), self._testMethodName,
+                                    'model')
+    self._WriteFile('saved_model.pb', 'graph')
+    self._WriteFile('variables/variables.index', 'index')
+
+  def _WriteFile(self, relative_path, contents, model_path=None):
+    path = os.path.join(model_path or self._model_path, relative_path)
+    fileio.makedirs(os.path.dirname(path))
+    # Replaces rather than overwrites files, which may be hard linked.
+    if fileio.exists(path):
+      fileio.remove(path)
+    with fileio.open(path, 'w') as f:
+      f.write(contents)
+
+  def _ReadFile(self, path):
+    with fileio.open(path, 'r') as f:
+      return f.read()
+
+  def testComputeManifest(self):
+    manifest = model_fingerprint.compute_manifest(self._model_path)
+
+    self.assertEqual(self._model_path,
+                     manifest[model_fingerprint.MODEL_PATH_KEY])
+    self.assertCountEqual(['saved_model.pb', 'variables/variables.index'],
+                          manifest[model_fingerprint.FILES_KEY].keys())
+
+    # Identical contents at another path have the same fingerprint.
+    other_path = os.path.join(os.path.dirname(self._model_path), 'other')
+    self._WriteFile('saved_model.pb', 'graph', other_path)
+    self._WriteFile('variables/variables.index', 'index', other_path)
+    self.assertEqual(
+        manifest[model_fingerprint.FINGERPRINT_KEY],
+        model_fingerprint.compute_manifest(other_path)[
+            model_fingerprint.FINGERPRINT_KEY])
+
+    self._WriteFile('saved_model.pb', 'new graph', other_path)
+    self.assertNotEqual(
+        manifest[model_fingerprint.FINGERPRINT_KEY],
+        model_fingerprint.compute_manifest(other_path)[
+            model_fingerprint.FINGERPRINT_KEY])
+
+  def testComputeManifest_ReusesDigestsOfUnchangedFiles(self):
+    manifest = model_fingerprint.compute_manifest(self._model_path)
+
+    with mock.patch.object(model_fingerprint, '_sha256') as mock_sha256:
+      self.assertEqual(
+          manifest,
+          model_fingerprint.compute_manifest(self._model_path, manifest))
+      mock_sha256.assert_not_called()
+
+  def testReadAndWriteManifest(self):
+    path = os.path.join(self.get_temp_dir(), self._testMethodName,
+                        'manifests', '1.json')
+    self.assertIsNone(model_fingerprint.read_manifest(path))
+
+    manifest = model_fingerprint.compute_manifest(self._model_path)
+    model_fingerprint.write_manifest(manifest, path)
+    self.assertEqual(manifest, model_fingerprint.read_manifest(path))
+
+  def testCopyModel_CopiesUnchangedFilesFromBase(self):
+    base_path = os.path.join(self.get_temp_dir(), self._testMethodName, 'base')
+    base_manifest = model_fingerprint.compute_manifest(self._model_path)
+    self.assertEqual(2, model_fingerprint.copy_model(base_manifest, base_path))
+
+    self._WriteFile('saved_model.pb', 'new graph')
+    manifest = model_fingerprint.compute_manifest(self._model_path,
+                                                  base_manifest)
+    dst = os.path.join(self.get_temp_dir(), self._testMethodName, 'dst')
+    with mock.patch.object(
+        model_fingerprint, '_copy_file',
+        wraps=model_fingerprint._copy_file) as mock_copy_file:
+      self.assertEqual(
+          1,
+          model_fingerprint.copy_model(
+              manifest, dst, base_manifest=base_manifest, base_path=base_path))
+    mock_copy_file.assert_any_call(
+        os.path.join(base_path, 'variables/variables.index'),
+        os.path.join(dst, 'variables/variables.index'), False)
+    mock_copy_file.assert_any_call(
+        os.path.join(self._model_path, 'saved_model.pb'),
+        os.path.join(dst, 'saved_model.pb'), False)
+    self.assertEqual('new graph',
+                     self._ReadFile(os.path.join(dst, 'saved_model.pb')))
+    self.assertEqual(
+        'index', self._ReadFile(os.path.join(dst, 'variables/variables.index')))
+
+  def testCopyModel_RecreatesEmptyDirectories(self):
+    fileio.makedirs(os.path.join(self._model_path, 'assets'))
+    manifest = model_fingerprint.compute_manifest(self._model_path)
+    self.assertEqual(['assets', 'variables'],
+                     manifest[model_fingerprint.DIRS_KEY])
+
+    dst = os.path.join(self.get_temp_dir(), self._testMethodName, 'dst')
+    model_fingerprint.copy_model(manifest, dst)
+
+    self.assertTrue(fileio.isdir(os.path.join(dst, 'assets')))
+    self.assertEqual(
+        manifest[model_fingerprint.FINGERPRINT_KEY],
+        model_fingerprint.compute_manifest(dst)[
+            model_fingerprint.FINGERPRINT_KEY])
+
+  def testCopyModel_HardLinksOnlyIfRequested(self):
+    manifest = model_fingerprint.compute_manifest(self._model_path)
+    src = os.path.join(self._model_path, 'saved_model.pb')
+
+    copy_path = os.path.join(self.get_temp_dir(), self._testMethodName, 'copy')
+    model_fingerprint.copy_model(manifest, copy_path)
+    self.assertFalse(
+        os.path.samefile(src, os.path.join(copy_path, 'saved_model.pb')))
+
+    link_path = os.path.join(self.get_temp_dir(), self._testMethodName, 'link')
+    model_fingerprint.copy_model(manifest, link_path, use_hard_links=True)
+    self.assertTrue(
+        os.path.samefile(src, os.path.join(link_path, 'saved_model.pb')))
+
+
+if __name__ == '__main__':
+  tf.test.main()
@@ -27,6 +27,7 @@ import tensorflow_data_validation as tfdv
 from tfx import types
 from tfx.dsl.components.base import base_executor
 from tfx.types import artifact_utils
+from tfx.utils import decoded_artifact_cache
 from tfx.utils import io_utils
 from tfx.utils import json_utils
 
@@ -95,15 +96,17 @@ class Executor(base_executor.BaseExecutor):
       logging.info('Processing schema from statistics for split %s.', split)
       stats_uri = io_utils.get_only_uri_in_dir(
           os.path.join(stats_artifact.uri, split))
+      # The statistics are only read, so they need not be copied.
+      stats = decoded_artifact_cache.load_statistics(stats_uri, copy=False)
       if not schema:
-        schema = tfdv.infer_schema(
-            tfdv.load_statistics(stats_uri), infer_feature_shape)
+        schema = tfdv.infer_schema(stats, infer_feature_shape)
       else:
-        schema = tfdv.update_schema(schema, tfdv.load_statistics(stats_uri),
-                                    infer_feature_shape)
+        schema = tfdv.update_schema(schema, stats, infer_feature_shape)
 
     output_uri = os.path.join(
         artifact_utils.get_single_uri(output_dict[SCHEMA_KEY]),
         _DEFAULT_FILE_NAME)
     io_utils.write_pbtxt_file(output_uri, schema)
     logging.info('Schema written to %s.', output_uri)
+    logging.info('Decoded artifact cache stats: %s',
+                 decoded_artifact_cache.get_stats())
@@ -50,6 +50,11 @@ class StatisticsGen(base_component.BaseComponent):
                schema: Optional[types.Channel] = None,
                stats_options: Optional[tfdv.StatsOptions] = None,
                exclude_splits: Optional[List[Text]] = None,
+               fuse_splits: bool = False,
+               sample_rate: Optional[float] = None,
+               sample_size: Optional[int] = None,
+               statistics_cache: Optional[types.Channel] = None,
+               incremental_statistics: bool = False,
                output: Optional[types.Channel] = None,
                input_data: Optional[types.Channel] = None,
                instance_name: Optional[Text] = None):
@@ -69,6 +74,29 @@ class StatisticsGen(base_component.BaseComponent):
       exclude_splits: Names of splits where statistics and sample should not
         be generated. Default behavior (when exclude_splits is set to None)
         is excluding no splits.
+      fuse_splits: If True, the statistics of all splits are computed in a
+        single fused pass keyed by split name instead of one statistics
+        computation per split.
+      sample_rate: If set, statistics are computed over a sample containing
+        each example with this probability.
+      sample_size: If set, statistics are computed over a uniform random sample
+        of at most this many examples per split. At most one of `sample_rate`
+        and `sample_size` may be set. When sampling, the number of examples
+        each split's statistics were computed over is recorded in the
+        `effective_sample_sizes` custom property of the output artifact.
+      statistics_cache: Optional input 'ExampleStatisticsCache' channel holding
+        the partial statistics of spans computed by a previous StatisticsGen
+        run. Only used when `incremental_statistics` is True.
+      incremental_statistics: If True, `examples` may contain one artifact per
+        span of a window, and the statistics of each split are computed by
+        merging mergeable per-span partial statistics. Partials found in
+        `statistics_cache` are reused, partials of new spans are computed, and
+        the partials of the window are written to the
+        `updated_statistics_cache` output. The resulting statistics do not
+        depend on which partials were cached. Statistics with lift statistics
+        or custom generators which are not `CombinerStatsGenerator`s are
+        computed over all spans instead, without cache. Cannot be combined
+        with sampling or `fuse_splits`.
       output: `ExampleStatisticsPath` channel for statistics of each split
         provided in the input examples.
       input_data: Backwards compatibility alias for the `examples` argument.
@@ -85,6 +113,19 @@ class StatisticsGen(base_component.BaseComponent):
     if exclude_splits is None:
       exclude_splits = []
       logging.info('Excluding no splits because exclude_splits is not set.')
+    if sample_rate is not None and sample_size is not None:
+      raise ValueError('At most one of sample_rate and sample_size may be set.')
+    if incremental_statistics:
+      if fuse_splits or sample_rate is not None or sample_size is not None:
+        raise ValueError('incremental_statistics cannot be combined with '
+                         'sampling or fuse_splits.')
+      updated_statistics_cache = types.Channel(
+          type=standard_artifacts.ExampleStatisticsCache)
+    else:
+      updated_statistics_cache = None
+      if statistics_cache:
+        raise ValueError('`statistics_cache` is set when '
+                         'incremental_statistics is False.')
     if not output:
       output = types.Channel(type=standard_artifacts.ExampleStatistics)
     # TODO(b/150802589): Move jsonable interface to tfx_bsl and use json_utils.
@@ -92,7 +133,12 @@ class StatisticsGen(base_component.BaseComponent):
     spec = StatisticsGenSpec(
         examples=examples,
         schema=schema,
+        statistics_cache=statistics_cache,
         stats_options_json=stats_options_json,
         exclude_splits=json_utils.dumps(exclude_splits),
-        statistics=output)
+        fuse_splits=int(fuse_splits),
+        sample_rate=sample_rate,
+        sample_size=sample_size,
+        statistics=output,
+        updated_statistics_cache=updated_statistics_cache)
     super(StatisticsGen, self).__init__(spec=spec, instance_name=instance_name)
@@ -53,6 +53,26 @@ class ComponentTest(tf.test.TestCase):
     self.assertEqual(standard_artifacts.ExampleStatistics.TYPE_NAME,
                      statistics_gen.outputs['statistics'].type_name)
 
+  def testConstructIncremental(self):
+    examples = standard_artifacts.Examples()
+    examples.split_names = artifact_utils.encode_split_names(['train', 'eval'])
+    statistics_gen = component.StatisticsGen(
+        examples=channel_utils.as_channel([examples]),
+        statistics_cache=channel_utils.as_channel(
+            [standard_artifacts.ExampleStatisticsCache()]),
+        incremental_statistics=True)
+    self.assertEqual(
+        standard_artifacts.ExampleStatisticsCache.TYPE_NAME,
+        statistics_gen.outputs['updated_statistics_cache'].type_name)
+
+  def testConstructWithCacheButNotIncremental(self):
+    examples = standard_artifacts.Examples()
+    with self.assertRaises(ValueError):
+      component.StatisticsGen(
+          examples=channel_utils.as_channel([examples]),
+          statistics_cache=channel_utils.as_channel(
+              [standard_artifacts.ExampleStatisticsCache()]))
+
 
 if __name__ == '__main__':
   tf.test.main()
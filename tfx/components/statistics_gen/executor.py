@@ -12,19 +12,28 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """TFX statistics_gen executor."""
+import collections
 import os
 from typing import Any, Dict, List, Text
 
 from absl import logging
+import apache_beam as beam
 from tensorflow_data_validation.api import stats_api
+from tensorflow_data_validation.statistics import stats_impl
 from tensorflow_data_validation.statistics import stats_options as options
+from tensorflow_data_validation.utils import stats_util
 from tfx import types
+from tfx.components.statistics_gen import incremental
+from tfx.components.statistics_gen import sampling
 from tfx.components.util import tfxio_utils
 from tfx.dsl.components.base import base_executor
+from tfx.dsl.io import fileio
 from tfx.types import artifact_utils
 from tfx.utils import io_utils
 from tfx.utils import json_utils
 
+from tensorflow_metadata.proto.v0 import statistics_pb2
+
 # Key for examples in executor input_dict.
 EXAMPLES_KEY = 'examples'
 # Key for statistics in executor input_dict.
@@ -34,9 +43,25 @@ SCHEMA_KEY = 'schema'
 STATS_OPTIONS_JSON_KEY = 'stats_options_json'
 # Key for exclude splits in executor exec_properties dict.
 EXCLUDE_SPLITS_KEY = 'exclude_splits'
+# Key for computing all splits in one fused pass in exec_properties dict.
+FUSE_SPLITS_KEY = 'fuse_splits'
+# Key for the per-example sample rate in exec_properties dict.
+SAMPLE_RATE_KEY = 'sample_rate'
+# Key for the per-split reservoir sample size in exec_properties dict.
+SAMPLE_SIZE_KEY = 'sample_size'
+
+# Key for the input statistics cache in executor input_dict.
+STATISTICS_CACHE_KEY = 'statistics_cache'
 
 # Key for statistics in executor output_dict.
 STATISTICS_KEY = 'statistics'
+# Key for the updated statistics cache in executor output_dict.
+UPDATED_STATISTICS_CACHE_KEY = 'updated_statistics_cache'
+
+# Custom property of the statistics artifact holding a JSON dict from split
+# name to the number of examples statistics were computed over, set when
+# sampling is enabled.
+EFFECTIVE_SAMPLE_SIZES_PROPERTY = 'effective_sample_sizes'
 
 # Default file name for stats generated.
 _DEFAULT_FILE_NAME = 'stats_tfrecord'
@@ -44,6 +69,23 @@ _DEFAULT_FILE_NAME = 'stats_tfrecord'
 _TELEMETRY_DESCRIPTORS = ['StatisticsGen']
 
 
+def _SelectSplitStatistics(
+    statistics: statistics_pb2.DatasetFeatureStatisticsList,
+    split: Text) -> statistics_pb2.DatasetFeatureStatisticsList:
+  """Returns the statistics of `split` out of the statistics of all splits."""
+  result = statistics_pb2.DatasetFeatureStatisticsList()
+  for dataset in statistics.datasets:
+    if dataset.name == split:
+      result.datasets.add().CopyFrom(dataset)
+      # Match the output of computing the statistics of the split on its own.
+      result.datasets[0].ClearField('name')
+      break
+  else:
+    # The split is empty (e.g. after sampling).
+    result.datasets.add()
+  return result
+
+
 class Executor(base_executor.BaseExecutor):
   """Computes statistics over input training data for example validation.
 
@@ -64,22 +106,41 @@ class Executor(base_executor.BaseExecutor):
       input_dict: Input dict from input key to a list of Artifacts.
         - input_data: A list of type `standard_artifacts.Examples`. This should
           contain both 'train' and 'eval' split.
+          When computing statistics incrementally, this may contain one
+          artifact per span of the window.
         - schema: Optionally, a list of type `standard_artifacts.Schema`. When
           the stats_options exec_property also contains a schema, this input
           should not be provided.
+        - statistics_cache: Optionally, a list of type
+          `standard_artifacts.ExampleStatisticsCache` holding the partial
+          statistics of spans computed by a previous run.
       output_dict: Output dict from output key to a list of Artifacts.
         - output: A list of type `standard_artifacts.ExampleStatistics`. This
           should contain both the 'train' and 'eval' splits.
+        - updated_statistics_cache: Optionally, a list of type
+          `standard_artifacts.ExampleStatisticsCache`. When set, statistics
+          are computed incrementally from per-span partial statistics, which
+          are written to this cache, unless the statistics cannot be merged
+          from partials (see `incremental.is_mergeable`).
       exec_properties: A dict of execution properties.
         - stats_options_json: Optionally, a JSON representation of StatsOptions.
           When a schema is provided as an input, the StatsOptions value should
           not also contain a schema.
         - exclude_splits: JSON-serialized list of names of splits where
           statistics and sample should not be generated.
+        - fuse_splits: Optionally, whether to compute the statistics of all
+          splits in a single fused pass keyed by split name instead of one
+          statistics computation per split.
+        - sample_rate: Optionally, the probability with which each example is
+          included in the statistics.
+        - sample_size: Optionally, the maximum number of examples per split
+          included in the statistics, sampled uniformly at random.
 
     Raises:
       ValueError when a schema is provided both as an input and as part of the
-      StatsOptions exec_property.
+      StatsOptions exec_property, when both sample_rate and sample_size are
+      set, or when statistics are computed incrementally together with
+      sampling or fused splits.
 
     Returns:
       None
@@ -92,8 +153,16 @@ class Executor(base_executor.BaseExecutor):
     if not isinstance(exclude_splits, list):
       raise ValueError('exclude_splits in execution properties needs to be a '
                        'list. Got %s instead.' % type(exclude_splits))
+    incremental_enabled = bool(output_dict.get(UPDATED_STATISTICS_CACHE_KEY))
     # Setup output splits.
-    examples = artifact_utils.get_single_instance(input_dict[EXAMPLES_KEY])
+    if incremental_enabled:
+      examples_list = input_dict[EXAMPLES_KEY]
+      if not examples_list:
+        raise ValueError('At least one examples artifact is required.')
+      examples = examples_list[0]
+    else:
+      examples = artifact_utils.get_single_instance(input_dict[EXAMPLES_KEY])
+      examples_list = [examples]
     examples_split_names = artifact_utils.decode_split_names(
         examples.split_names)
     split_names = [
@@ -121,6 +190,28 @@ class Executor(base_executor.BaseExecutor):
                 artifact_utils.get_single_uri(input_dict[SCHEMA_KEY])))
         stats_options.schema = schema
 
+    fuse_splits = bool(exec_properties.get(FUSE_SPLITS_KEY, 0))
+    sample_rate = exec_properties.get(SAMPLE_RATE_KEY)
+    sample_size = exec_properties.get(SAMPLE_SIZE_KEY)
+    if sample_rate is not None and sample_size is not None:
+      raise ValueError('At most one of sample_rate and sample_size may be set.')
+    if stats_options.sample_rate is not None:
+      # The sampling of tfdv.GenerateStatistics is replaced by the sampling of
+      # the executor, so that a single sample rate is applied, and the fused
+      # pass, which bypasses tfdv.GenerateStatistics, samples as well.
+      if sample_rate is None and sample_size is None:
+        sample_rate = stats_options.sample_rate
+      stats_options.sample_rate = None
+    sampling_enabled = sample_rate is not None or sample_size is not None
+
+    if incremental_enabled:
+      if sampling_enabled or fuse_splits:
+        raise ValueError('Incremental statistics do not support sampling or '
+                         'fused splits.')
+      self._DoIncremental(examples_list, split_names, stats_options,
+                          input_dict, output_dict)
+      return
+
     split_and_tfxio = []
     tfxio_factory = tfxio_utils.get_tfxio_factory_from_artifact(
         examples=[examples],
@@ -132,18 +223,162 @@ class Executor(base_executor.BaseExecutor):
       uri = os.path.join(examples.uri, split)
       split_and_tfxio.append(
           (split, tfxio_factory(io_utils.all_files_pattern(uri))))
+    output_paths = {
+        split: os.path.join(
+            artifact_utils.get_split_uri(output_dict[STATISTICS_KEY], split),
+            _DEFAULT_FILE_NAME) for split, _ in split_and_tfxio
+    }
     with self._make_beam_pipeline() as p:
+      keyed_data = []
       for split, tfxio in split_and_tfxio:
         logging.info('Generating statistics for split %s.', split)
+        keyed_data.append(
+            p
+            | 'TFXIORead[%s]' % split >> tfxio.BeamSource()
+            | 'KeyWithSplit[%s]' % split >> beam.Map(
+                lambda record_batch, split=split: (split, record_batch)))
+
+      if fuse_splits:
+        data = keyed_data | 'FlattenSplits' >> beam.Flatten()
+        if stats_options.feature_whitelist:
+          # GenerateStatisticsImpl filters features before slicing, which the
+          # sliced implementation does not do by itself.
+          data |= 'RemoveNonWhitelistedFeatures' >> beam.Map(
+              lambda kv, features: (kv[0], stats_impl._filter_features(  # pylint: disable=protected-access
+                  kv[1], feature_whitelist=features)),
+              features=stats_options.feature_whitelist)
+        if sample_rate is not None or sample_size is not None:
+          data |= 'Sample' >> sampling.SampleRecordBatches(
+              sample_rate=sample_rate, sample_size=sample_size)
+        # Split names are used as slice keys so that the statistics of all
+        # splits are computed by a single keyed combine.
+        statistics = data | 'GenerateStatistics' >> (
+            stats_impl.GenerateSlicedStatisticsImpl(
+                stats_options, is_slicing_enabled=True))
+        for split, _ in split_and_tfxio:
+          _ = (
+              statistics
+              | 'SelectStatistics[%s]' % split >> beam.Map(
+                  _SelectSplitStatistics, split=split)
+              | 'WriteStatsOutput[%s]' % split >>
+              stats_api.WriteStatisticsToTFRecord(output_paths[split]))
+      else:
+        for (split, _), data in zip(split_and_tfxio, keyed_data):
+          if sample_rate is not None or sample_size is not None:
+            data |= 'Sample[%s]' % split >> sampling.SampleRecordBatches(
+                sample_rate=sample_rate, sample_size=sample_size)
+          _ = (
+              data
+              | 'DropSplitKey[%s]' % split >> beam.Values()
+              | 'GenerateStatistics[%s]' % split >>
+              stats_api.GenerateStatistics(stats_options)
+              | 'WriteStatsOutput[%s]' % split >>
+              stats_api.WriteStatisticsToTFRecord(output_paths[split]))
+    for split, output_path in output_paths.items():
+      logging.info('Statistics for split %s written to %s.', split,
+                   os.path.dirname(output_path))
+
+    if sampling_enabled:
+      effective_sample_sizes = {}
+      for split, output_path in output_paths.items():
+        split_statistics = stats_util.load_statistics(output_path)
+        effective_sample_sizes[split] = (
+            split_statistics.datasets[0].num_examples
+            if split_statistics.datasets else 0)
+      logging.info('Effective sample sizes: %s', effective_sample_sizes)
+      statistics_artifact.set_string_custom_property(
+          EFFECTIVE_SAMPLE_SIZES_PROPERTY,
+          json_utils.dumps(effective_sample_sizes))
+
+  def _DoIncremental(self, examples_list: List[types.Artifact],
+                     split_names: List[Text],
+                     stats_options: options.StatsOptions,
+                     input_dict: Dict[Text, List[types.Artifact]],
+                     output_dict: Dict[Text, List[types.Artifact]]) -> None:
+    """Computes statistics by merging cached and new per-span partials."""
+    for examples in examples_list:
+      missing_splits = set(split_names) - set(
+          artifact_utils.decode_split_names(examples.split_names))
+      if missing_splits:
+        raise ValueError('Examples at %s are missing splits %s.' %
+                         (examples.uri, sorted(missing_splits)))
+
+    input_cache_dir = None
+    if input_dict.get(STATISTICS_CACHE_KEY):
+      input_cache_dir = artifact_utils.get_single_uri(
+          input_dict[STATISTICS_CACHE_KEY])
+    output_cache_dir = artifact_utils.get_single_uri(
+        output_dict[UPDATED_STATISTICS_CACHE_KEY])
+    tfxio_factory = tfxio_utils.get_tfxio_factory_from_artifact(
+        examples=examples_list, telemetry_descriptors=_TELEMETRY_DESCRIPTORS)
+
+    if not incremental.is_mergeable(stats_options):
+      logging.warning(
+          'The statistics of the stats options cannot be merged from partial '
+          'statistics, computing the statistics of all spans without cache.')
+      fileio.makedirs(output_cache_dir)
+      with self._make_beam_pipeline() as p:
+        for split in split_names:
+          data = [
+              p | 'TFXIORead[%s][%d]' % (split, index) >> tfxio_factory(
+                  io_utils.all_files_pattern(
+                      os.path.join(examples.uri, split))).BeamSource()
+              for index, examples in enumerate(examples_list)
+          ]
+          output_uri = artifact_utils.get_split_uri(
+              output_dict[STATISTICS_KEY], split)
+          _ = (
+              data
+              | 'FlattenSpans[%s]' % split >> beam.Flatten()
+              | 'GenerateStatistics[%s]' % split >>
+              stats_api.GenerateStatistics(stats_options)
+              | 'WriteStatsOutput[%s]' % split >>
+              stats_api.WriteStatisticsToTFRecord(
+                  os.path.join(output_uri, _DEFAULT_FILE_NAME)))
+      return
+
+    cache_keys = collections.OrderedDict()
+    for split in split_names:
+      for examples in examples_list:
+        cache_keys[(split, examples.uri)] = incremental.get_cache_key(
+            examples, split, stats_options)
+    cached_keys = set(
+        incremental.copy_partials(input_cache_dir, output_cache_dir,
+                                  cache_keys.values()))
+    logging.info('Reusing %d out of %d partial statistics from the cache.',
+                 len(cached_keys), len(cache_keys))
+
+    with self._make_beam_pipeline() as p:
+      for split in split_names:
+        partials = []
+        for examples in examples_list:
+          key = cache_keys[(split, examples.uri)]
+          if key in cached_keys:
+            partial = (
+                p | 'ReadPartial[%s]' % key >>
+                incremental.ReadPartialStatistics(output_cache_dir, key))
+          else:
+            tfxio = tfxio_factory(
+                io_utils.all_files_pattern(os.path.join(examples.uri, split)))
+            partial = (
+                p
+                | 'TFXIORead[%s]' % key >> tfxio.BeamSource()
+                | 'ComputePartial[%s]' % key >>
+                incremental.ComputePartialStatistics(stats_options))
+            _ = (
+                partial
+                | 'WritePartial[%s]' % key >>
+                incremental.WritePartialStatistics(output_cache_dir, key))
+          partials.append(partial)
         output_uri = artifact_utils.get_split_uri(output_dict[STATISTICS_KEY],
                                                   split)
-        output_path = os.path.join(output_uri, _DEFAULT_FILE_NAME)
-        data = p | 'TFXIORead[%s]' % split >> tfxio.BeamSource()
         _ = (
-            data
-            | 'GenerateStatistics[%s]' % split >>
-            stats_api.GenerateStatistics(stats_options)
+            partials
+            | 'FlattenPartials[%s]' % split >> beam.Flatten()
+            | 'MergePartials[%s]' % split >>
+            incremental.MergePartialStatistics(stats_options)
             | 'WriteStatsOutput[%s]' % split >>
-            stats_api.WriteStatisticsToTFRecord(output_path))
+            stats_api.WriteStatisticsToTFRecord(
+                os.path.join(output_uri, _DEFAULT_FILE_NAME)))
         logging.info('Statistics for split %s written to %s.', split,
                      output_uri)
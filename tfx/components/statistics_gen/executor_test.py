@@ -137,6 +137,197 @@ class ExecutorTest(absltest.TestCase):
     self._validate_stats_output(
         os.path.join(stats.uri, 'eval', 'stats_tfrecord'))
 
+  def testDoWithFusedSplitsAndSampling(self):
+    source_data_dir = os.path.join(
+        os.path.dirname(os.path.dirname(__file__)), 'testdata')
+    output_data_dir = os.path.join(
+        os.environ.get('TEST_UNDECLARED_OUTPUTS_DIR', self.get_temp_dir()),
+        self._testMethodName)
+    fileio.makedirs(output_data_dir)
+
+    # Create input dict.
+    examples = standard_artifacts.Examples()
+    examples.uri = os.path.join(source_data_dir, 'csv_example_gen')
+    examples.split_names = artifact_utils.encode_split_names(['train', 'eval'])
+
+    input_dict = {
+        executor.EXAMPLES_KEY: [examples],
+    }
+
+    exec_properties = {
+        executor.EXCLUDE_SPLITS_KEY: json_utils.dumps([]),
+        executor.FUSE_SPLITS_KEY: 1,
+        executor.SAMPLE_SIZE_KEY: 100,
+    }
+
+    # Create output dict.
+    stats = standard_artifacts.ExampleStatistics()
+    stats.uri = output_data_dir
+    output_dict = {
+        executor.STATISTICS_KEY: [stats],
+    }
+
+    # Run executor.
+    stats_gen_executor = executor.Executor()
+    stats_gen_executor.Do(input_dict, output_dict, exec_properties)
+
+    # Check statistics_gen outputs.
+    for split in ('train', 'eval'):
+      stats_path = os.path.join(stats.uri, split, 'stats_tfrecord')
+      self._validate_stats_output(stats_path)
+      data_set = tfdv.load_statistics(stats_path).datasets[0]
+      self.assertEqual(100, data_set.num_examples)
+      self.assertFalse(data_set.name)
+    self.assertEqual({
+        'train': 100,
+        'eval': 100
+    },
+                     json_utils.loads(
+                         stats.get_string_custom_property(
+                             executor.EFFECTIVE_SAMPLE_SIZES_PROPERTY)))
+
+  def testDoWithSampleSizeAndStatsOptionsSampleRate(self):
+    source_data_dir = os.path.join(
+        os.path.dirname(os.path.dirname(__file__)), 'testdata')
+    output_data_dir = os.path.join(
+        os.environ.get('TEST_UNDECLARED_OUTPUTS_DIR', self.get_temp_dir()),
+        self._testMethodName)
+    fileio.makedirs(output_data_dir)
+
+    examples = standard_artifacts.Examples()
+    examples.uri = os.path.join(source_data_dir, 'csv_example_gen')
+    examples.split_names = artifact_utils.encode_split_names(['train', 'eval'])
+    input_dict = {
+        executor.EXAMPLES_KEY: [examples],
+    }
+    # The sample size takes precedence over the sample rate of the
+    # StatsOptions, which must not sample the examples a second time.
+    exec_properties = {
+        executor.STATS_OPTIONS_JSON_KEY:
+            tfdv.StatsOptions(sample_rate=0.01).to_json(),
+        executor.EXCLUDE_SPLITS_KEY: json_utils.dumps([]),
+        executor.SAMPLE_SIZE_KEY: 100,
+    }
+    stats = standard_artifacts.ExampleStatistics()
+    stats.uri = output_data_dir
+    output_dict = {
+        executor.STATISTICS_KEY: [stats],
+    }
+
+    executor.Executor().Do(input_dict, output_dict, exec_properties)
+
+    for split in ('train', 'eval'):
+      stats_path = os.path.join(stats.uri, split, 'stats_tfrecord')
+      self._validate_stats_output(stats_path)
+      self.assertEqual(
+          100, tfdv.load_statistics(stats_path).datasets[0].num_examples)
+
+  def testDoWithBothSampleRateAndSize(self):
+    examples = standard_artifacts.Examples()
+    examples.split_names = artifact_utils.encode_split_names(['train'])
+    stats = standard_artifacts.ExampleStatistics()
+    stats.uri = self.get_temp_dir()
+    exec_properties = {
+        executor.SAMPLE_RATE_KEY: 0.5,
+        executor.SAMPLE_SIZE_KEY: 100,
+    }
+    with self.assertRaises(ValueError):
+      executor.Executor().Do({executor.EXAMPLES_KEY: [examples]},
+                             {executor.STATISTICS_KEY: [stats]},
+                             exec_properties)
+
+  def testDoIncremental(self):
+    source_data_dir = os.path.join(
+        os.path.dirname(os.path.dirname(__file__)), 'testdata')
+    output_data_dir = os.path.join(
+        os.environ.get('TEST_UNDECLARED_OUTPUTS_DIR', self.get_temp_dir()),
+        self._testMethodName)
+
+    def _MakeExamples(span):
+      examples = standard_artifacts.Examples()
+      examples.uri = os.path.join(source_data_dir, 'csv_example_gen')
+      examples.split_names = artifact_utils.encode_split_names(
+          ['train', 'eval'])
+      examples.span = span
+      return examples
+
+    def _Run(run_name, spans, statistics_cache=None):
+      stats = standard_artifacts.ExampleStatistics()
+      stats.uri = os.path.join(output_data_dir, run_name, 'statistics')
+      updated_cache = standard_artifacts.ExampleStatisticsCache()
+      updated_cache.uri = os.path.join(output_data_dir, run_name, 'cache')
+      input_dict = {
+          executor.EXAMPLES_KEY: [_MakeExamples(span) for span in spans],
+      }
+      if statistics_cache:
+        input_dict[executor.STATISTICS_CACHE_KEY] = [statistics_cache]
+      output_dict = {
+          executor.STATISTICS_KEY: [stats],
+          executor.UPDATED_STATISTICS_CACHE_KEY: [updated_cache],
+      }
+      executor.Executor().Do(input_dict, output_dict, {
+          executor.EXCLUDE_SPLITS_KEY: json_utils.dumps(['eval']),
+      })
+      return stats, updated_cache
+
+    stats1, cache1 = _Run('run1', [1, 2])
+    self.assertLen(fileio.listdir(cache1.uri), 2)
+    # Span 1 drops out of the window, span 2 is read from the cache.
+    stats2, cache2 = _Run('run2', [2, 3], statistics_cache=cache1)
+    cache1_files = fileio.listdir(cache1.uri)
+    cache2_files = fileio.listdir(cache2.uri)
+    self.assertLen(cache2_files, 2)
+    self.assertIn([f for f in cache1_files if f.startswith('span-2-')][0],
+                  cache2_files)
+    self.assertTrue(any(f.startswith('span-3-') for f in cache2_files))
+
+    stats_path1 = os.path.join(stats1.uri, 'train', 'stats_tfrecord')
+    stats_path2 = os.path.join(stats2.uri, 'train', 'stats_tfrecord')
+    self._validate_stats_output(stats_path1)
+    self.assertEqual(
+        tfdv.load_statistics(stats_path1), tfdv.load_statistics(stats_path2))
+
+  def testDoIncrementalWithLiftStatistics(self):
+    source_data_dir = os.path.join(
+        os.path.dirname(os.path.dirname(__file__)), 'testdata')
+    output_data_dir = os.path.join(
+        os.environ.get('TEST_UNDECLARED_OUTPUTS_DIR', self.get_temp_dir()),
+        self._testMethodName)
+
+    examples_list = []
+    for span in (1, 2):
+      examples = standard_artifacts.Examples()
+      examples.uri = os.path.join(source_data_dir, 'csv_example_gen')
+      examples.split_names = artifact_utils.encode_split_names(
+          ['train', 'eval'])
+      examples.span = span
+      examples_list.append(examples)
+    schema = standard_artifacts.Schema()
+    schema.uri = os.path.join(source_data_dir, 'schema_gen')
+    stats = standard_artifacts.ExampleStatistics()
+    stats.uri = os.path.join(output_data_dir, 'statistics')
+    updated_cache = standard_artifacts.ExampleStatisticsCache()
+    updated_cache.uri = os.path.join(output_data_dir, 'cache')
+
+    # Lift statistics cannot be merged from partials, so the statistics of
+    # all spans are computed without cache.
+    executor.Executor().Do(
+        {
+            executor.EXAMPLES_KEY: examples_list,
+            executor.SCHEMA_KEY: [schema],
+        }, {
+            executor.STATISTICS_KEY: [stats],
+            executor.UPDATED_STATISTICS_CACHE_KEY: [updated_cache],
+        }, {
+            executor.STATS_OPTIONS_JSON_KEY:
+                tfdv.StatsOptions(label_feature='company').to_json(),
+            executor.EXCLUDE_SPLITS_KEY: json_utils.dumps(['eval']),
+        })
+
+    self._validate_stats_output(
+        os.path.join(stats.uri, 'train', 'stats_tfrecord'))
+    self.assertEmpty(fileio.listdir(updated_cache.uri))
+
   def testDoWithTwoSchemas(self):
     source_data_dir = os.path.join(
         os.path.dirname(os.path.dirname(__file__)), 'testdata')
@@ -0,0 +1,223 @@
+# Lint as: python3
+# Copyright 2020 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Incremental statistics computation from mergeable per-span partials.
+
+The statistics of a split over a window of spans are computed by merging one
+partial statistics accumulator per (span, split). The accumulators are those
+of the TFDV combiner statistics generators, so merging the accumulators of all
+spans and extracting the output gives the same statistics as combining all
+examples at once. Accumulators are persisted in a statistics cache directory,
+one file per cache key, so that the next run over a shifted window only needs
+to compute the accumulators of its new spans:
+
+  <cache dir>/<cache key>.partial
+
+A cache key identifies the input data (the URI of the span's Examples artifact
+and the split), the stats options the accumulators were computed with and the
+TFDV version, since the accumulators are pickled TFDV objects.
+
+Statistics of generators without mergeable accumulators, i.e. the lift
+statistics and custom generators which are not `CombinerStatsGenerator`s,
+cannot be computed incrementally; see `is_mergeable`.
+"""
+
+import hashlib
+import os
+import pickle
+from typing import Any, Iterable, List, Optional, Text
+
+import apache_beam as beam
+import pyarrow as pa
+import tensorflow_data_validation as tfdv
+from tensorflow_data_validation.statistics import stats_impl
+from tensorflow_data_validation.statistics import stats_options as options
+from tensorflow_data_validation.statistics.generators import stats_generator
+from tfx import types
+from tfx.dsl.io import fileio
+
+from tensorflow_metadata.proto.v0 import statistics_pb2
+
+# Suffix of the files holding partial statistics in a statistics cache.
+PARTIAL_FILE_SUFFIX = '.partial'
+
+
+def is_mergeable(stats_options: options.StatsOptions) -> bool:
+  """Returns whether the statistics of `stats_options` can be merged.
+
+  The generators of the incremental computation are those of the in memory
+  computation, which lacks the LiftStatsGenerator (added when there is a
+  schema and a label feature) and only accepts custom generators which are
+  `CombinerStatsGenerator`s.
+
+  Args:
+    stats_options: The options of the statistics computation.
+
+  Returns:
+    Whether the incremental computation gives the same statistics as the full
+    computation.
+  """
+  if stats_options.schema is not None and stats_options.label_feature:
+    return False
+  return all(
+      isinstance(g, stats_generator.CombinerStatsGenerator)
+      for g in stats_options.generators or [])
+
+
+def get_cache_key(examples: types.Artifact, split: Text,
+                  stats_options: options.StatsOptions) -> Text:
+  """Returns the statistics cache key of a split of a span."""
+  fingerprint = hashlib.sha256()
+  fingerprint.update(os.path.join(examples.uri, split).encode('utf-8'))
+  fingerprint.update(stats_options.to_json().encode('utf-8'))
+  fingerprint.update(tfdv.__version__.encode('utf-8'))
+  return 'span-%d-%s-%s' % (examples.span, split, fingerprint.hexdigest()[:16])
+
+
+def get_partial_path(cache_dir: Text, cache_key: Text) -> Text:
+  return os.path.join(cache_dir, cache_key + PARTIAL_FILE_SUFFIX)
+
+
+def copy_partials(input_cache_dir: Optional[Text], output_cache_dir: Text,
+                  cache_keys: Iterable[Text]) -> List[Text]:
+  """Copies the cached partials of `cache_keys` and returns the copied keys.
+
+  Partials of keys which are not in `cache_keys` (i.e. spans which are no
+  longer in the window) are not carried over to the output cache.
+
+  Args:
+    input_cache_dir: The input statistics cache directory, if any.
+    output_cache_dir: The output statistics cache directory.
+    cache_keys: The cache keys of the current window.
+
+  Returns:
+    The keys of `cache_keys` whose partials were found in the input cache.
+  """
+  fileio.makedirs(output_cache_dir)
+  if not input_cache_dir:
+    return []
+  copied = []
+  for key in cache_keys:
+    src = get_partial_path(input_cache_dir, key)
+    if fileio.exists(src):
+      fileio.copy(src, get_partial_path(output_cache_dir, key), overwrite=True)
+      copied.append(key)
+  return copied
+
+
+class _GeneratorsCombineFnBase(beam.CombineFn):
+  """Base class of CombineFns over the accumulators of stats generators."""
+
+  def __init__(self, stats_options: options.StatsOptions):
+    self._stats_options = stats_options
+    self._generators = None
+
+  def setup(self):
+    self._ensure_generators()
+
+  def _ensure_generators(self):
+    if self._generators is None:
+      # Only combiner generators have mergeable accumulators, which are
+      # exactly the generators of the in memory statistics computation.
+      self._generators = stats_impl.get_generators(
+          self._stats_options, in_memory=True)
+
+  def create_accumulator(self) -> List[Any]:
+    self._ensure_generators()
+    return [g.create_accumulator() for g in self._generators]
+
+  def merge_accumulators(self, accumulators: Iterable[List[Any]]) -> List[Any]:
+    self._ensure_generators()
+    accumulators = list(accumulators)
+    return [
+        g.merge_accumulators([a[i] for a in accumulators])
+        for i, g in enumerate(self._generators)
+    ]
+
+
+class _ComputePartialCombineFn(_GeneratorsCombineFnBase):
+  """Combines RecordBatches into the accumulators of the stats generators."""
+
+  def add_input(self, accumulator: List[Any],
+                record_batch: pa.RecordBatch) -> List[Any]:
+    if self._stats_options.feature_whitelist:
+      # Whitelisted features absent from the batch are skipped.
+      record_batch = stats_impl._filter_features(  # pylint: disable=protected-access
+          record_batch, self._stats_options.feature_whitelist)
+    return [
+        g.add_input(a, record_batch)
+        for g, a in zip(self._generators, accumulator)
+    ]
+
+  def extract_output(self, accumulator: List[Any]) -> List[Any]:
+    return accumulator
+
+
+class _MergePartialsCombineFn(_GeneratorsCombineFnBase):
+  """Merges partial accumulators and extracts the statistics."""
+
+  def add_input(self, accumulator: List[Any], partial: List[Any]) -> List[Any]:
+    return self.merge_accumulators([accumulator, partial])
+
+  def extract_output(
+      self,
+      accumulator: List[Any]) -> statistics_pb2.DatasetFeatureStatisticsList:
+    # Also drops the internal example count feature and fills in the number
+    # of examples and missing counts, exactly like the non-incremental path.
+    return stats_impl.extract_statistics_output(accumulator, self._generators)
+
+
+@beam.ptransform_fn
+@beam.typehints.with_input_types(pa.RecordBatch)
+def ComputePartialStatistics(  # pylint: disable=invalid-name
+    record_batches: beam.pvalue.PCollection,
+    stats_options: options.StatsOptions) -> beam.pvalue.PCollection:
+  """Computes the mergeable partial statistics of a span of a split."""
+  return (record_batches
+          | 'CombinePartial' >> beam.CombineGlobally(
+              _ComputePartialCombineFn(stats_options)))
+
+
+@beam.ptransform_fn
+def WritePartialStatistics(  # pylint: disable=invalid-name
+    partials: beam.pvalue.PCollection, cache_dir: Text,
+    cache_key: Text) -> beam.pvalue.PDone:
+  """Writes the single partial of `partials` to the statistics cache."""
+  return (partials
+          | 'SerializePartial' >> beam.Map(pickle.dumps)
+          | 'WritePartial' >> beam.io.WriteToTFRecord(
+              get_partial_path(cache_dir, cache_key),
+              shard_name_template='',
+              num_shards=1))
+
+
+@beam.ptransform_fn
+def ReadPartialStatistics(  # pylint: disable=invalid-name
+    pipeline: beam.Pipeline, cache_dir: Text,
+    cache_key: Text) -> beam.pvalue.PCollection:
+  """Reads the partial of `cache_key` from the statistics cache."""
+  return (pipeline
+          | 'ReadPartial' >> beam.io.ReadFromTFRecord(
+              get_partial_path(cache_dir, cache_key))
+          | 'DeserializePartial' >> beam.Map(pickle.loads))
+
+
+@beam.ptransform_fn
+def MergePartialStatistics(  # pylint: disable=invalid-name
+    partials: beam.pvalue.PCollection,
+    stats_options: options.StatsOptions) -> beam.pvalue.PCollection:
+  """Merges partial statistics into a DatasetFeatureStatisticsList."""
+  return (partials
+          | 'MergePartials' >> beam.CombineGlobally(
+              _MergePartialsCombineFn(stats_options)))
@@ -0,0 +1,78 @@
+# Lint as: python3
+# Copyright 2020 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for tfx.components.statistics_gen.incremental."""
+
+import pyarrow as pa
+import tensorflow as tf
+import tensorflow_data_validation as tfdv
+from tensorflow_data_validation.statistics.generators import stats_generator
+from tfx.components.statistics_gen import incremental
+from tfx.types import standard_artifacts
+
+from tensorflow_metadata.proto.v0 import schema_pb2
+
+
+class _TransformGenerator(stats_generator.TransformStatsGenerator):
+
+  def __init__(self):
+    super(_TransformGenerator, self).__init__(
+        name='TransformGenerator', ptransform=None)
+
+
+class IncrementalTest(tf.test.TestCase):
+
+  def testIsMergeable(self):
+    schema = schema_pb2.Schema()
+    self.assertTrue(incremental.is_mergeable(tfdv.StatsOptions()))
+    self.assertFalse(
+        incremental.is_mergeable(
+            tfdv.StatsOptions(schema=schema, label_feature='label')))
+    self.assertTrue(
+        incremental.is_mergeable(tfdv.StatsOptions(label_feature='label')))
+    self.assertFalse(
+        incremental.is_mergeable(
+            tfdv.StatsOptions(generators=[_TransformGenerator()])))
+
+  def testGetCacheKey(self):
+    examples = standard_artifacts.Examples()
+    examples.uri = '/examples'
+    examples.span = 3
+    key = incremental.get_cache_key(examples, 'train', tfdv.StatsOptions())
+    self.assertStartsWith(key, 'span-3-train-')
+    self.assertNotEqual(
+        key,
+        incremental.get_cache_key(examples, 'train',
+                                  tfdv.StatsOptions(num_top_values=3)))
+
+  def testComputePartialSkipsMissingWhitelistedFeatures(self):
+    combine_fn = incremental._ComputePartialCombineFn(
+        tfdv.StatsOptions(feature_whitelist=['a', 'missing']))
+    accumulator = combine_fn.add_input(
+        combine_fn.create_accumulator(),
+        pa.RecordBatch.from_arrays([
+            pa.array([[1], [2]]),
+            pa.array([[b'x'], [b'y']]),
+        ], ['a', 'b']))
+    merge_fn = incremental._MergePartialsCombineFn(
+        tfdv.StatsOptions(feature_whitelist=['a', 'missing']))
+    statistics = merge_fn.extract_output(
+        merge_fn.add_input(merge_fn.create_accumulator(), accumulator))
+    dataset = statistics.datasets[0]
+    self.assertEqual(2, dataset.num_examples)
+    self.assertEqual(['a'], [f.path.step[0] for f in dataset.features])
+
+
+if __name__ == '__main__':
+  tf.test.main()
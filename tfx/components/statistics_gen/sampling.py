@@ -0,0 +1,186 @@
+# Lint as: python3
+# Copyright 2020 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Per-split sampling of record batches for StatisticsGen.
+
+Both sampling modes operate on PCollections of (split name, RecordBatch) so
+that all splits can be sampled within a single fused pass:
+
+  * Sampling by rate keeps every example independently with the given
+    probability.
+  * Sampling by reservoir size keeps a uniform random sample of at most
+    `sample_size` examples per split. Every example is assigned a random
+    priority and the examples with the smallest priorities are kept (bottom-k
+    sampling), which is mergeable and therefore runs as a combiner.
+"""
+
+from typing import List, Optional, Text, Tuple
+
+import apache_beam as beam
+import numpy as np
+import pyarrow as pa
+
+_KeyedRecordBatch = Tuple[Text, pa.RecordBatch]
+# Random priorities of the rows of a record batch, and the record batch.
+_PrioritizedRecordBatch = Tuple[np.ndarray, pa.RecordBatch]
+
+
+def _take(record_batch: pa.RecordBatch,
+          indices: np.ndarray) -> Optional[pa.RecordBatch]:
+  """Returns the rows of `record_batch` at `indices`, or None if empty."""
+  if indices.size == 0:
+    return None
+  if indices.size == record_batch.num_rows:
+    return record_batch
+  return record_batch.take(pa.array(indices))
+
+
+class _SampleAtRateDoFn(beam.DoFn):
+  """Keeps each row of the input record batches with probability `rate`."""
+
+  def __init__(self, sample_rate: float, seed: Optional[int]):
+    self._sample_rate = sample_rate
+    self._seed = seed
+    self._random_state = None
+
+  def setup(self):
+    self._random_state = np.random.RandomState(self._seed)
+
+  def process(self, element: _KeyedRecordBatch):
+    key, record_batch = element
+    mask = self._random_state.random_sample(
+        record_batch.num_rows) < self._sample_rate
+    sampled = _take(record_batch, np.flatnonzero(mask))
+    if sampled is not None:
+      yield key, sampled
+
+
+class _AssignPrioritiesDoFn(beam.DoFn):
+  """Assigns random priorities to rows, keeping the `sample_size` smallest."""
+
+  def __init__(self, sample_size: int, seed: Optional[int]):
+    self._sample_size = sample_size
+    self._seed = seed
+    self._random_state = None
+
+  def setup(self):
+    self._random_state = np.random.RandomState(self._seed)
+
+  def process(self, element: _KeyedRecordBatch):
+    key, record_batch = element
+    if record_batch.num_rows == 0:
+      return
+    priorities = self._random_state.random_sample(record_batch.num_rows)
+    if record_batch.num_rows > self._sample_size:
+      # Rows which are not among the smallest priorities of their own batch
+      # can never make it into the sample.
+      indices = np.sort(
+          np.argpartition(priorities, self._sample_size - 1)
+          [:self._sample_size])
+      priorities = priorities[indices]
+      record_batch = _take(record_batch, indices)
+    yield key, (priorities, record_batch)
+
+
+class _BottomKCombineFn(beam.CombineFn):
+  """Keeps the rows with the `sample_size` smallest priorities."""
+
+  def __init__(self, sample_size: int):
+    self._sample_size = sample_size
+
+  def _compact(self, accumulator: List[_PrioritizedRecordBatch],
+               max_rows: int) -> List[_PrioritizedRecordBatch]:
+    if sum(p.size for p, _ in accumulator) <= max_rows:
+      return accumulator
+    all_priorities = np.concatenate([p for p, _ in accumulator])
+    threshold = np.partition(all_priorities,
+                             self._sample_size - 1)[self._sample_size - 1]
+    result = []
+    budget = self._sample_size
+    for priorities, record_batch in accumulator:
+      # Ties with the threshold are practically impossible but would otherwise
+      # let the sample grow beyond its size.
+      indices = np.flatnonzero(priorities <= threshold)[:budget]
+      budget -= indices.size
+      sampled = _take(record_batch, indices)
+      if sampled is not None:
+        result.append((priorities[indices], sampled))
+    return result
+
+  def create_accumulator(self) -> List[_PrioritizedRecordBatch]:
+    return []
+
+  def add_input(
+      self, accumulator: List[_PrioritizedRecordBatch],
+      element: _PrioritizedRecordBatch) -> List[_PrioritizedRecordBatch]:
+    accumulator.append(element)
+    # Compacting lazily amortizes the cost of finding the threshold.
+    return self._compact(accumulator, 2 * self._sample_size)
+
+  def merge_accumulators(
+      self, accumulators: List[List[_PrioritizedRecordBatch]]
+  ) -> List[_PrioritizedRecordBatch]:
+    return self._compact([e for a in accumulators for e in a],
+                         2 * self._sample_size)
+
+  def extract_output(
+      self,
+      accumulator: List[_PrioritizedRecordBatch]) -> List[pa.RecordBatch]:
+    return [
+        record_batch for _, record_batch in self._compact(
+            accumulator, self._sample_size)
+    ]
+
+
+@beam.ptransform_fn
+@beam.typehints.with_input_types(_KeyedRecordBatch)
+@beam.typehints.with_output_types(_KeyedRecordBatch)
+def SampleRecordBatches(  # pylint: disable=invalid-name
+    keyed_record_batches: beam.pvalue.PCollection,
+    sample_rate: Optional[float] = None,
+    sample_size: Optional[int] = None,
+    seed: Optional[int] = None) -> beam.pvalue.PCollection:
+  """Samples the rows of (split name, RecordBatch) pairs of each split.
+
+  Args:
+    keyed_record_batches: A PCollection of (split name, RecordBatch) pairs.
+    sample_rate: If set, the probability with which each row is kept.
+    sample_size: If set, the maximum number of rows kept per split.
+    seed: Optional seed of the random number generators, for tests.
+
+  Returns:
+    A PCollection of (split name, RecordBatch) pairs containing the sample.
+
+  Raises:
+    ValueError: If both or none of `sample_rate` and `sample_size` are set, or
+      if they are out of range.
+  """
+  if (sample_rate is None) == (sample_size is None):
+    raise ValueError('Exactly one of sample_rate and sample_size must be set.')
+  if sample_rate is not None:
+    if not 0 < sample_rate <= 1:
+      raise ValueError('sample_rate must be in (0, 1], got %s.' % sample_rate)
+    return (keyed_record_batches
+            | 'SampleAtRate' >> beam.ParDo(
+                _SampleAtRateDoFn(sample_rate, seed)))
+
+  if sample_size <= 0:
+    raise ValueError('sample_size must be positive, got %s.' % sample_size)
+  return (keyed_record_batches
+          | 'AssignPriorities' >> beam.ParDo(
+              _AssignPrioritiesDoFn(sample_size, seed))
+          | 'KeepSmallestPriorities' >> beam.CombinePerKey(
+              _BottomKCombineFn(sample_size))
+          | 'FlattenSample' >> beam.FlatMap(
+              lambda kv: [(kv[0], rb) for rb in kv[1]]))
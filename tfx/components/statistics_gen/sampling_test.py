@@ -0,0 +1,82 @@
+# Lint as: python3
+# Copyright 2020 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for tfx.components.statistics_gen.sampling."""
+
+import apache_beam as beam
+from apache_beam.testing import util as beam_test_util
+import pyarrow as pa
+import tensorflow as tf
+from tfx.components.statistics_gen import sampling
+
+
+def _MakeRecordBatches(split, num_batches, batch_size):
+  return [(split,
+           pa.RecordBatch.from_arrays(
+               [pa.array([[i * batch_size + j] for j in range(batch_size)])],
+               ['x'])) for i in range(num_batches)]
+
+
+def _RowsPerSplit(keyed_record_batches):
+  result = {}
+  for split, record_batch in keyed_record_batches:
+    result.setdefault(split, []).extend(
+        v[0] for v in record_batch.column(0).to_pylist())
+  return result
+
+
+class SamplingTest(tf.test.TestCase):
+
+  def _Run(self, check_rows_fn, **kwargs):
+    inputs = (
+        _MakeRecordBatches('train', 20, 50) +
+        _MakeRecordBatches('eval', 2, 10))
+    with beam.Pipeline() as p:
+      result = (
+          p
+          | beam.Create(inputs, reshuffle=False)
+          | sampling.SampleRecordBatches(seed=0, **kwargs))
+      beam_test_util.assert_that(
+          result, lambda actual: check_rows_fn(_RowsPerSplit(actual)))
+
+  def testSampleSize(self):
+
+    def _CheckRows(rows):
+      self.assertLen(rows['train'], 100)
+      self.assertLen(set(rows['train']), 100)
+      self.assertTrue(set(rows['train']).issubset(range(1000)))
+      # Splits smaller than the sample size are kept as a whole.
+      self.assertCountEqual(range(20), rows['eval'])
+
+    self._Run(_CheckRows, sample_size=100)
+
+  def testSampleRate(self):
+
+    def _CheckRows(rows):
+      self.assertBetween(len(rows['train']), 50, 150)
+      self.assertTrue(set(rows['train']).issubset(range(1000)))
+
+    self._Run(_CheckRows, sample_rate=0.1)
+
+  def testInvalidArguments(self):
+    with self.assertRaises(ValueError):
+      self._Run(lambda _: None)
+    with self.assertRaises(ValueError):
+      self._Run(lambda _: None, sample_rate=0.5, sample_size=10)
+    with self.assertRaises(ValueError):
+      self._Run(lambda _: None, sample_rate=1.5)
+
+
+if __name__ == '__main__':
+  tf.test.main()
@@ -119,6 +119,7 @@ class Trainer(base_component.BaseComponent):
       train_args: Union[trainer_pb2.TrainArgs, Dict[Text, Any]] = None,
       eval_args: Union[trainer_pb2.EvalArgs, Dict[Text, Any]] = None,
       custom_config: Optional[Dict[Text, Any]] = None,
+      dataset_cache_config: Optional[trainer_pb2.DatasetCacheConfig] = None,
       custom_executor_spec: Optional[executor_spec.ExecutorSpec] = None,
       output: Optional[types.Channel] = None,
       model_run: Optional[types.Channel] = None,
@@ -184,6 +185,10 @@ class Trainer(base_component.BaseComponent):
         behavior (when splits is empty) is evaluate on `eval` split.
       custom_config: A dict which contains addtional training job parameters
         that will be passed into user module.
+      dataset_cache_config: An optional trainer_pb2.DatasetCacheConfig
+        instance. If enabled, the train and eval data read through
+        `FnArgs.data_accessor` is decoded once and cached in memory, or spilled
+        to a local directory, for later reads.
       custom_executor_spec: Optional custom executor spec.
       output: Optional `Model` channel for result of exported models.
       model_run: Optional `ModelRun` channel, as the working dir of models,
@@ -235,6 +240,7 @@ class Trainer(base_component.BaseComponent):
         run_fn=run_fn,
         trainer_fn=trainer_fn,
         custom_config=json_utils.dumps(custom_config),
+        dataset_cache_config=dataset_cache_config,
         model=output,
         model_run=model_run)
     super(Trainer, self).__init__(
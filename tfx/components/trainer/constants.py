@@ -35,6 +35,8 @@ TRAIN_ARGS_KEY = 'train_args'
 EVAL_ARGS_KEY = 'eval_args'
 # Key for custom config in executor exec_properties.
 CUSTOM_CONFIG_KEY = 'custom_config'
+# Key for dataset cache config in executor exec_properties.
+DATASET_CACHE_CONFIG_KEY = 'dataset_cache_config'
 
 # Key for output model in executor output_dict.
 MODEL_KEY = 'model'
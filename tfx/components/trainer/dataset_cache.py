@@ -0,0 +1,456 @@
+# Lint as: python3
+# Copyright 2020 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Cache of decoded train and eval data for DataAccessor factories.
+
+Trainer and Tuner user code reads its data through the factories of
+`fn_args_utils.DataAccessor`, which decode the example files on every pass.
+Tuner runs many trials over the same examples in the same process, so the
+same files are decoded over and over. `DatasetCache` wraps the factories so
+that the first call decodes the data once and later calls (and later epochs)
+read the decoded data instead.
+
+An entry of the cache holds the decoded data of one (Examples artifacts, file
+patterns, schema) key, in a single unshuffled epoch. When serving an entry,
+its examples are shuffled as by the wrapped factory, then batched with the
+requested batch size, and repeated, so that every epoch gets new batches.
+Entries are kept:
+
+  * In memory, as long as the decoded tensors or RecordBatches fit in
+    `max_memory_bytes`, least recently used entries being evicted first.
+    tf.data entries are decoded into the memory cache when the factory is
+    called, so that their size is known before they are served.
+  * Otherwise on local disk under `cache_dir`, if set, as tf.data cache files
+    for tf.data entries and memory-mapped Arrow files for RecordBatch entries.
+    The least recently used entries are deleted to keep the directory under
+    `max_disk_bytes`.
+
+Entries which fit in neither are not cached.
+"""
+
+import collections
+import hashlib
+import json
+import os
+import shutil
+import threading
+from typing import Any, Callable, Iterator, List, Optional, Text
+import uuid
+
+from absl import logging
+import numpy as np
+import pyarrow as pa
+import tensorflow as tf
+from tfx import types
+from tfx.dsl.io import fileio
+from tfx_bsl.tfxio import dataset_options
+
+from tensorflow_metadata.proto.v0 import schema_pb2
+
+TFDatasetFactory = Callable[[
+    List[Text], dataset_options.TensorFlowDatasetOptions,
+    Optional[schema_pb2.Schema]
+], tf.data.Dataset]
+RecordBatchFactory = Callable[[
+    List[Text], dataset_options.RecordBatchesOptions,
+    Optional[schema_pb2.Schema]
+], Iterator[pa.RecordBatch]]
+
+# Prefix of the tf.data cache files of an entry.
+_TF_DATA_CACHE_PREFIX = 'data'
+_ARROW_FILE_NAME = 'batches.arrow'
+# Touched whenever an entry on disk is used.
+_LAST_USED_FILE_NAME = 'last_used'
+
+
+def _directory_size(path: Text) -> int:
+  total = 0
+  for root, _, files in os.walk(path):
+    for f in files:
+      try:
+        total += os.path.getsize(os.path.join(root, f))
+      except OSError:
+        pass
+  return total
+
+
+def _tensor_size(tensor: tf.Tensor) -> int:
+  """Returns the number of bytes of the values of a tensor."""
+  if tensor.dtype == tf.string:
+    # Scalar strings are returned by numpy() as bytes rather than arrays.
+    return sum(len(v) for v in np.asarray(tensor.numpy(), dtype=object).flat)
+  return tensor.numpy().nbytes
+
+
+def _element_size(element: Any) -> int:
+  return sum(
+      _tensor_size(t) for t in tf.nest.flatten(element, expand_composites=True))
+
+
+def fingerprint_directory(path: Text) -> Text:
+  """Returns a fingerprint of the relative paths and contents of the files."""
+  path = path.rstrip('/')
+  files = []
+  for dir_name, _, leaf_files in fileio.walk(path):
+    for leaf_file in leaf_files:
+      file_path = os.path.join(dir_name, leaf_file)
+      files.append((file_path.replace(path, '', 1).lstrip('/'), file_path))
+  fingerprint = hashlib.sha256()
+  for relative_path, file_path in sorted(files):
+    fingerprint.update(relative_path.encode('utf-8') + b'\0')
+    with fileio.open(file_path, 'rb') as f:
+      fingerprint.update(hashlib.sha256(f.read()).digest())
+  return fingerprint.hexdigest()
+
+
+def _touch(path: Text) -> None:
+  with open(path, 'a'):
+    os.utime(path, None)
+
+
+class DatasetCache(object):
+  """Thread-safe cache of decoded data with memory and local disk levels."""
+
+  def __init__(self,
+               cache_dir: Optional[Text] = None,
+               max_memory_bytes: int = 0,
+               max_disk_bytes: int = 0):
+    """Initializes the cache.
+
+    Args:
+      cache_dir: Optional local directory where entries which do not fit in
+        memory are spilled.
+      max_memory_bytes: Maximum size of the entries kept in memory. No limit
+        if 0.
+      max_disk_bytes: Maximum size of `cache_dir`. No limit if 0. The limit is
+        enforced whenever a factory is called, so it can be exceeded by the
+        entries being written.
+    """
+    self.cache_dir = cache_dir
+    self.max_memory_bytes = max_memory_bytes
+    self.max_disk_bytes = max_disk_bytes
+    self._lock = threading.Lock()
+    # Maps keys to (entry, size), least recently used first.
+    self._memory = collections.OrderedDict()
+    self._memory_bytes = 0
+    self.memory_hits = 0
+    self.disk_hits = 0
+    self.misses = 0
+
+  def _get_key(self, kind: Text, examples: List[types.Artifact],
+               file_pattern: List[Text], schema: Optional[schema_pb2.Schema],
+               options: List[Any], extra_key: Optional[Text]) -> Text:
+    fingerprint = hashlib.sha256()
+    fingerprint.update(
+        json.dumps([
+            kind,
+            sorted([a.id, a.uri] for a in examples),
+            sorted(file_pattern),
+            options,
+            extra_key,
+        ]).encode('utf-8'))
+    if schema is not None:
+      fingerprint.update(schema.SerializeToString(deterministic=True))
+    return fingerprint.hexdigest()
+
+  def _get_from_memory(self, key: Text) -> Any:
+    with self._lock:
+      if key not in self._memory:
+        return None
+      self._memory.move_to_end(key)
+      self.memory_hits += 1
+      return self._memory[key][0]
+
+  def _fits_in_memory(self, size: int) -> bool:
+    return not self.max_memory_bytes or size <= self.max_memory_bytes
+
+  def _cache_in_memory(self, dataset: tf.data.Dataset) -> Optional[int]:
+    """Decodes `dataset` into its memory cache and returns its size, or None.
+
+    Decoding stops as soon as the decoded tensors do not fit in memory, in
+    which case the partially filled cache is discarded.
+
+    Args:
+      dataset: A dataset ending with an in-memory `cache()`.
+    """
+    size = 0
+    for element in dataset:
+      size += _element_size(element)
+      if not self._fits_in_memory(size):
+        return None
+    return size
+
+  def _put_in_memory(self, key: Text, entry: Any, size: int) -> None:
+    with self._lock:
+      self._memory[key] = (entry, size)
+      self._memory_bytes += size
+      while (self.max_memory_bytes and
+             self._memory_bytes > self.max_memory_bytes):
+        _, (_, evicted_size) = self._memory.popitem(last=False)
+        self._memory_bytes -= evicted_size
+
+  def _entry_dir(self, key: Text) -> Text:
+    return os.path.join(self.cache_dir, key)
+
+  def _find_on_disk(self, key: Text, file_name: Text) -> Optional[Text]:
+    """Returns the path of `file_name` of a complete entry of `key`."""
+    entry_dir = self._entry_dir(key)
+    if not os.path.isdir(entry_dir):
+      return None
+    # Every writer writes in its own sub directory, so that concurrent and
+    # interrupted writers never leave a partially written entry behind.
+    for writer_id in sorted(os.listdir(entry_dir)):
+      path = os.path.join(entry_dir, writer_id, file_name)
+      if os.path.exists(path):
+        _touch(os.path.join(entry_dir, _LAST_USED_FILE_NAME))
+        with self._lock:
+          self.disk_hits += 1
+        return path
+    return None
+
+  def _new_writer_dir(self, key: Text) -> Text:
+    self._enforce_disk_limit()
+    entry_dir = self._entry_dir(key)
+    writer_dir = os.path.join(entry_dir, uuid.uuid4().hex)
+    os.makedirs(writer_dir)
+    _touch(os.path.join(entry_dir, _LAST_USED_FILE_NAME))
+    return writer_dir
+
+  def _enforce_disk_limit(self) -> None:
+    """Deletes least recently used entries until the limit is met."""
+    if not self.max_disk_bytes or not os.path.isdir(self.cache_dir):
+      return
+    entries = []
+    for key in os.listdir(self.cache_dir):
+      entry_dir = self._entry_dir(key)
+      last_used = os.path.join(entry_dir, _LAST_USED_FILE_NAME)
+      mtime = os.path.getmtime(last_used) if os.path.exists(last_used) else 0
+      entries.append((mtime, entry_dir, _directory_size(entry_dir)))
+    total = sum(size for _, _, size in entries)
+    for _, entry_dir, size in sorted(entries):
+      if total <= self.max_disk_bytes:
+        break
+      logging.info('Evicting dataset cache entry %s (%d bytes).', entry_dir,
+                   size)
+      shutil.rmtree(entry_dir, ignore_errors=True)
+      total -= size
+
+  def wrap_tf_dataset_factory(
+      self,
+      examples: List[types.Artifact],
+      factory: TFDatasetFactory,
+      extra_key: Optional[Text] = None) -> TFDatasetFactory:
+    """Returns a tf.data.Dataset factory serving decoded data from the cache.
+
+    Args:
+      examples: The Examples artifacts read by `factory`.
+      factory: The factory to wrap.
+      extra_key: Optional additional cache key, e.g. the transform graph used
+        by the data.
+
+    Returns:
+      A factory with the same signature as `factory`.
+    """
+
+    def dataset_factory(file_pattern: List[Text],
+                        options: dataset_options.TensorFlowDatasetOptions,
+                        schema: Optional[schema_pb2.Schema]) -> tf.data.Dataset:
+      key = self._get_key('tf.data', examples, file_pattern, schema,
+                          [options.label_key], extra_key)
+      one_epoch_options = options._replace(
+          num_epochs=1, shuffle=False, drop_final_batch=False)
+      # Datasets of graph mode callers belong to their graph and can't be
+      # reused across calls.
+      in_memory = tf.executing_eagerly()
+      dataset = self._get_from_memory(key) if in_memory else None
+      if dataset is None:
+        dataset = factory(file_pattern, one_epoch_options, schema)
+        cache_prefix_path = None
+        if self.cache_dir:
+          cache_prefix_path = self._find_on_disk(
+              key, _TF_DATA_CACHE_PREFIX + '.index')
+        size = None
+        if in_memory and cache_prefix_path is None:
+          cached_dataset = dataset.cache()
+          size = self._cache_in_memory(cached_dataset)
+        if size is not None:
+          dataset = cached_dataset
+          self._put_in_memory(key, dataset, size)
+          with self._lock:
+            self.misses += 1
+        elif self.cache_dir:
+          if cache_prefix_path is None:
+            cache_prefix = os.path.join(
+                self._new_writer_dir(key), _TF_DATA_CACHE_PREFIX)
+            with self._lock:
+              self.misses += 1
+          else:
+            cache_prefix = cache_prefix_path[:-len('.index')]
+          dataset = dataset.cache(cache_prefix)
+        else:
+          logging.info('Decoded data of %s does not fit in the dataset cache.',
+                       file_pattern)
+          return factory(file_pattern, options, schema)
+      # The entry may be batched differently, and shuffling must mix examples
+      # rather than whole batches.
+      dataset = dataset.unbatch()
+      if options.shuffle:
+        dataset = dataset.shuffle(
+            options.shuffle_buffer_size, seed=options.shuffle_seed)
+      dataset = dataset.batch(
+          options.batch_size, drop_remainder=options.drop_final_batch)
+      return dataset.repeat(options.num_epochs).prefetch(
+          tf.data.experimental.AUTOTUNE)
+
+    return dataset_factory
+
+  def _read_arrow_file(self, path: Text) -> List[pa.RecordBatch]:
+    reader = pa.ipc.open_file(pa.memory_map(path))
+    return [reader.get_batch(i) for i in range(reader.num_record_batches)]
+
+  def _cache_record_batches(
+      self, key: Text, file_pattern: List[Text],
+      options: dataset_options.RecordBatchesOptions,
+      schema: Optional[schema_pb2.Schema],
+      factory: RecordBatchFactory) -> Optional[List[pa.RecordBatch]]:
+    """Decodes one epoch into the cache and returns it, or None."""
+    if self.cache_dir:
+      path = self._find_on_disk(key, _ARROW_FILE_NAME)
+      if path is not None:
+        return self._read_arrow_file(path)
+    with self._lock:
+      self.misses += 1
+    record_batches = []
+    size = 0
+    writer = None
+    path = None
+    one_epoch_options = options._replace(
+        num_epochs=1, shuffle=False, drop_final_batch=False)
+    for record_batch in factory(file_pattern, one_epoch_options, schema):
+      # Examples of the entry are shuffled and batched across RecordBatches.
+      if record_batches and not record_batch.schema.equals(
+          record_batches[0].schema):
+        logging.info('RecordBatches of %s have different schemas and are not '
+                     'cached.', file_pattern)
+        if writer is not None:
+          writer.close()
+          os.remove(path + '.tmp')
+        return None
+      if writer is None:
+        record_batches.append(record_batch)
+        size += record_batch.nbytes
+        if self._fits_in_memory(size):
+          continue
+        if not self.cache_dir:
+          logging.info('Decoded data of %s does not fit in the dataset cache.',
+                       file_pattern)
+          return None
+        # Spill to disk, keeping the first RecordBatch to check schemas.
+        path = os.path.join(self._new_writer_dir(key), _ARROW_FILE_NAME)
+        writer = pa.ipc.new_file(path + '.tmp', record_batches[0].schema)
+        for rb in record_batches:
+          writer.write_batch(rb)
+        record_batches = record_batches[:1]
+      else:
+        writer.write_batch(record_batch)
+    if writer is None:
+      self._put_in_memory(key, record_batches, size)
+      return record_batches
+    writer.close()
+    os.rename(path + '.tmp', path)
+    return self._read_arrow_file(path)
+
+  def wrap_record_batch_factory(
+      self,
+      examples: List[types.Artifact],
+      factory: RecordBatchFactory,
+      extra_key: Optional[Text] = None) -> RecordBatchFactory:
+    """Returns a RecordBatch factory serving decoded data from the cache.
+
+    Args:
+      examples: The Examples artifacts read by `factory`.
+      factory: The factory to wrap.
+      extra_key: Optional additional cache key.
+
+    Returns:
+      A factory with the same signature as `factory`.
+    """
+
+    def record_batch_factory(
+        file_pattern: List[Text], options: dataset_options.RecordBatchesOptions,
+        schema: Optional[schema_pb2.Schema]) -> Iterator[pa.RecordBatch]:
+      key = self._get_key('RecordBatch', examples, file_pattern, schema, [],
+                          extra_key)
+      record_batches = self._get_from_memory(key)
+      if record_batches is None:
+        record_batches = self._cache_record_batches(key, file_pattern, options,
+                                                    schema, factory)
+      if record_batches is None:
+        for record_batch in factory(file_pattern, options, schema):
+          yield record_batch
+        return
+      if not record_batches:
+        return
+      table = pa.Table.from_batches(record_batches)
+      random_state = np.random.RandomState(options.shuffle_seed)
+      epoch = 0
+      while options.num_epochs is None or epoch < options.num_epochs:
+        indices = None
+        if options.shuffle:
+          indices = random_state.permutation(table.num_rows)
+        for start in range(0, table.num_rows, options.batch_size):
+          end = min(start + options.batch_size, table.num_rows)
+          if options.drop_final_batch and end - start < options.batch_size:
+            break
+          if indices is None:
+            batch = table.slice(start, end - start)
+          else:
+            batch = table.take(pa.array(indices[start:end]))
+          yield batch.combine_chunks().to_batches()[0]
+        epoch += 1
+
+    return record_batch_factory
+
+  def get_stats(self) -> Any:
+    with self._lock:
+      return {
+          'memory_hits': self.memory_hits,
+          'disk_hits': self.disk_hits,
+          'misses': self.misses,
+          'memory_entries': len(self._memory),
+          'memory_bytes': self._memory_bytes,
+      }
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(cache_dir: Optional[Text], max_memory_bytes: int,
+              max_disk_bytes: int) -> DatasetCache:
+  """Returns the cache of the process with the given configuration.
+
+  Caches are shared by all calls with the same configuration, so that e.g. the
+  trials of a Tuner reuse the data decoded by the first trial.
+
+  Args:
+    cache_dir: Optional local directory where entries are spilled.
+    max_memory_bytes: Maximum size of the entries kept in memory.
+    max_disk_bytes: Maximum size of `cache_dir`.
+  """
+  config = (cache_dir, max_memory_bytes, max_disk_bytes)
+  with _caches_lock:
+    if config not in _caches:
+      _caches[config] = DatasetCache(*config)
+    return _caches[config]
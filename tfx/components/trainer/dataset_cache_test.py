@@ -0,0 +1,249 @@
+# Lint as: python3
+# Copyright 2020 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for tfx.components.trainer.dataset_cache."""
+
+import os
+
+import pyarrow as pa
+import tensorflow as tf
+from tfx.components.trainer import dataset_cache
+from tfx.types import standard_artifacts
+from tfx_bsl.tfxio import dataset_options
+
+
+class _CountingFactories(object):
+  """Factories over 10 rows which count how often they are called."""
+
+  def __init__(self):
+    self.calls = 0
+
+  def record_batches(self, file_pattern, options, schema):
+    del file_pattern, schema
+    self.calls += 1
+    for start in range(0, 10, options.batch_size):
+      yield pa.RecordBatch.from_arrays(
+          [pa.array(range(start, min(start + options.batch_size, 10)))], ['x'])
+
+  def tf_dataset(self, file_pattern, options, schema):
+    del file_pattern, schema
+    self.calls += 1
+    dataset = tf.data.Dataset.range(10).batch(options.batch_size)
+    if options.shuffle:
+      dataset = dataset.shuffle(10)
+    return dataset.repeat(options.num_epochs)
+
+
+def _Rows(record_batches):
+  return [x for rb in record_batches for x in rb.column(0).to_pylist()]
+
+
+def _EpochBatches(batches, num_batches_per_epoch):
+  """Returns the sets of the batches of each epoch."""
+  batches = [frozenset(b) for b in batches]
+  return [
+      set(batches[i:i + num_batches_per_epoch])
+      for i in range(0, len(batches), num_batches_per_epoch)
+  ]
+
+
+class DatasetCacheTest(tf.test.TestCase):
+
+  def setUp(self):
+    super(DatasetCacheTest, self).setUp()
+    self._tmp_dir = self.create_tempdir().full_path
+    self._data_file = os.path.join(self._tmp_dir, 'data.gz')
+    with open(self._data_file, 'wb') as f:
+      f.write(b'x' * 100)
+    self._examples = standard_artifacts.Examples()
+    self._examples.uri = self._tmp_dir
+    self._factories = _CountingFactories()
+
+  def testRecordBatchesInMemory(self):
+    cache = dataset_cache.DatasetCache()
+    factory = cache.wrap_record_batch_factory(
+        [self._examples], self._factories.record_batches)
+    options = dataset_options.RecordBatchesOptions(
+        batch_size=4, num_epochs=2, shuffle=False)
+    self.assertEqual(
+        list(range(10)) * 2, _Rows(factory([self._data_file], options, None)))
+    shuffled = _Rows(
+        factory([self._data_file], options._replace(shuffle=True), None))
+    self.assertCountEqual(list(range(10)) * 2, shuffled)
+    self.assertEqual(1, self._factories.calls)
+    self.assertEqual(1, cache.get_stats()['memory_hits'])
+
+  def testRecordBatchesReshuffledEveryEpoch(self):
+    cache = dataset_cache.DatasetCache()
+    factory = cache.wrap_record_batch_factory(
+        [self._examples], self._factories.record_batches)
+    options = dataset_options.RecordBatchesOptions(
+        batch_size=2, num_epochs=2, shuffle=True, shuffle_seed=1)
+    batches = [
+        rb.column(0).to_pylist()
+        for rb in factory([self._data_file], options, None)
+    ]
+    self.assertTrue(all(len(batch) == 2 for batch in batches))
+    first_epoch, second_epoch = _EpochBatches(batches, 5)
+    self.assertNotEqual(first_epoch, second_epoch)
+
+  def testRecordBatchesRebatched(self):
+    cache = dataset_cache.DatasetCache()
+    factory = cache.wrap_record_batch_factory(
+        [self._examples], self._factories.record_batches)
+    options = dataset_options.RecordBatchesOptions(
+        batch_size=4, num_epochs=1, shuffle=False)
+    list(factory([self._data_file], options, None))
+    options = options._replace(batch_size=3, drop_final_batch=True)
+    self.assertEqual(
+        [[0, 1, 2], [3, 4, 5], [6, 7, 8]],
+        [rb.column(0).to_pylist()
+         for rb in factory([self._data_file], options, None)])
+    self.assertEqual(1, self._factories.calls)
+
+  def testRecordBatchesSpilledToDisk(self):
+    cache_dir = os.path.join(self._tmp_dir, 'cache')
+    cache = dataset_cache.DatasetCache(cache_dir=cache_dir, max_memory_bytes=1)
+    factory = cache.wrap_record_batch_factory(
+        [self._examples], self._factories.record_batches)
+    options = dataset_options.RecordBatchesOptions(
+        batch_size=4, num_epochs=1, shuffle=False)
+    self.assertEqual(
+        list(range(10)), _Rows(factory([self._data_file], options, None)))
+    self.assertEqual(0, cache.get_stats()['memory_entries'])
+
+    # A new cache over the same directory reads the spilled data.
+    cache = dataset_cache.DatasetCache(cache_dir=cache_dir, max_memory_bytes=1)
+    factory = cache.wrap_record_batch_factory(
+        [self._examples], self._factories.record_batches)
+    self.assertEqual(
+        list(range(10)), _Rows(factory([self._data_file], options, None)))
+    self.assertEqual(1, self._factories.calls)
+    self.assertEqual(1, cache.get_stats()['disk_hits'])
+
+  def testRecordBatchesNotFitting(self):
+    cache = dataset_cache.DatasetCache(max_memory_bytes=1)
+    factory = cache.wrap_record_batch_factory(
+        [self._examples], self._factories.record_batches)
+    options = dataset_options.RecordBatchesOptions(
+        batch_size=4, num_epochs=1, shuffle=False)
+    for _ in range(2):
+      self.assertEqual(
+          list(range(10)), _Rows(factory([self._data_file], options, None)))
+    self.assertEqual(0, cache.get_stats()['memory_entries'])
+
+  def testTFDatasetInMemory(self):
+    cache = dataset_cache.DatasetCache()
+    factory = cache.wrap_tf_dataset_factory(
+        [self._examples], self._factories.tf_dataset)
+    options = dataset_options.TensorFlowDatasetOptions(
+        batch_size=3, num_epochs=2)
+    for _ in range(2):
+      rows = [
+          x for batch in factory([self._data_file], options, None)
+          for x in batch.numpy().tolist()
+      ]
+      self.assertCountEqual(list(range(10)) * 2, rows)
+    self.assertEqual(1, self._factories.calls)
+    self.assertEqual(1, cache.get_stats()['memory_hits'])
+    # The size of the decoded int64 tensors.
+    self.assertEqual(80, cache.get_stats()['memory_bytes'])
+
+  def testTFDatasetReshuffledEveryEpoch(self):
+    cache = dataset_cache.DatasetCache()
+    factory = cache.wrap_tf_dataset_factory(
+        [self._examples], self._factories.tf_dataset)
+    options = dataset_options.TensorFlowDatasetOptions(
+        batch_size=2, num_epochs=2, shuffle=True, shuffle_seed=1)
+    batches = [
+        batch.numpy().tolist()
+        for batch in factory([self._data_file], options, None)
+    ]
+    self.assertCountEqual(list(range(10)) * 2, sum(batches, []))
+    first_epoch, second_epoch = _EpochBatches(batches, 5)
+    self.assertNotEqual(first_epoch, second_epoch)
+
+  def testElementSizeOfStrings(self):
+    element = {
+        'scalar': tf.constant(b'abc'),
+        'vector': tf.constant([b'a', b'bc']),
+    }
+    self.assertEqual(6, dataset_cache._element_size(element))  # pylint: disable=protected-access
+
+  def testTFDatasetNotFitting(self):
+    cache = dataset_cache.DatasetCache(max_memory_bytes=79)
+    factory = cache.wrap_tf_dataset_factory(
+        [self._examples], self._factories.tf_dataset)
+    options = dataset_options.TensorFlowDatasetOptions(
+        batch_size=3, num_epochs=1, shuffle=False)
+    rows = [
+        x for batch in factory([self._data_file], options, None)
+        for x in batch.numpy().tolist()
+    ]
+    self.assertEqual(list(range(10)), rows)
+    self.assertEqual(0, cache.get_stats()['memory_entries'])
+
+  def testTFDatasetSpilledToDisk(self):
+    cache_dir = os.path.join(self._tmp_dir, 'cache')
+    options = dataset_options.TensorFlowDatasetOptions(
+        batch_size=3, num_epochs=1, shuffle=False)
+    for _ in range(2):
+      cache = dataset_cache.DatasetCache(
+          cache_dir=cache_dir, max_memory_bytes=1)
+      factory = cache.wrap_tf_dataset_factory(
+          [self._examples], self._factories.tf_dataset)
+      rows = [
+          x for batch in factory([self._data_file], options, None)
+          for x in batch.numpy().tolist()
+      ]
+      self.assertEqual(list(range(10)), rows)
+    self.assertEqual(1, cache.get_stats()['disk_hits'])
+
+  def testDiskLimit(self):
+    cache_dir = os.path.join(self._tmp_dir, 'cache')
+    cache = dataset_cache.DatasetCache(
+        cache_dir=cache_dir, max_memory_bytes=1, max_disk_bytes=1)
+    factory = cache.wrap_record_batch_factory(
+        [self._examples], self._factories.record_batches)
+    options = dataset_options.RecordBatchesOptions(
+        batch_size=4, num_epochs=1, shuffle=False)
+    for i in range(3):
+      list(factory([self._data_file + str(i)], options, None))
+    # Older entries are evicted whenever a new one is written.
+    self.assertLen(os.listdir(cache_dir), 1)
+
+  def testFingerprintDirectory(self):
+    graph_dir = os.path.join(self._tmp_dir, 'graph')
+    os.makedirs(os.path.join(graph_dir, 'assets'))
+    with open(os.path.join(graph_dir, 'assets', 'vocab'), 'w') as f:
+      f.write('a')
+    fingerprint = dataset_cache.fingerprint_directory(graph_dir)
+    self.assertEqual(fingerprint,
+                     dataset_cache.fingerprint_directory(graph_dir + '/'))
+    with open(os.path.join(graph_dir, 'assets', 'vocab'), 'w') as f:
+      f.write('b')
+    self.assertNotEqual(fingerprint,
+                        dataset_cache.fingerprint_directory(graph_dir))
+
+  def testGetCache(self):
+    self.assertIs(
+        dataset_cache.get_cache(None, 10, 0),
+        dataset_cache.get_cache(None, 10, 0))
+    self.assertIsNot(
+        dataset_cache.get_cache(None, 10, 0),
+        dataset_cache.get_cache(None, 20, 0))
+
+
+if __name__ == '__main__':
+  tf.test.main()
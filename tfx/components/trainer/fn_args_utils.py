@@ -26,6 +26,7 @@ import pyarrow as pa
 import tensorflow as tf
 from tfx import types
 from tfx.components.trainer import constants
+from tfx.components.trainer import dataset_cache
 from tfx.components.util import tfxio_utils
 from tfx.proto import trainer_pb2
 from tfx.types import artifact_utils
@@ -147,11 +148,36 @@ def get_common_fn_args(input_dict: Dict[Text, List[types.Artifact]],
             input_dict[constants.EXAMPLES_KEY], eval_split)
     ])
 
+  examples = input_dict[constants.EXAMPLES_KEY]
+  tf_dataset_factory = tfxio_utils.get_tf_dataset_factory_from_artifact(
+      examples, _TELEMETRY_DESCRIPTORS)
+  record_batch_factory = tfxio_utils.get_record_batch_factory_from_artifact(
+      examples, _TELEMETRY_DESCRIPTORS)
+  dataset_cache_config = trainer_pb2.DatasetCacheConfig()
+  if exec_properties.get(constants.DATASET_CACHE_CONFIG_KEY):
+    proto_utils.json_to_proto(
+        exec_properties[constants.DATASET_CACHE_CONFIG_KEY],
+        dataset_cache_config)
+  if dataset_cache_config.enabled:
+    cache = dataset_cache.get_cache(
+        cache_dir=dataset_cache_config.cache_dir or None,
+        max_memory_bytes=dataset_cache_config.max_memory_bytes,
+        max_disk_bytes=dataset_cache_config.max_disk_bytes)
+    absl.logging.info('Caching decoded data, cache stats: %s',
+                      cache.get_stats())
+    # Keyed by the contents of the transform graph rather than its path, so
+    # that entries on disk are never served for another graph at that path.
+    transform_graph_key = None
+    if transform_graph_path:
+      transform_graph_key = dataset_cache.fingerprint_directory(
+          transform_graph_path)
+    tf_dataset_factory = cache.wrap_tf_dataset_factory(
+        examples, tf_dataset_factory, extra_key=transform_graph_key)
+    record_batch_factory = cache.wrap_record_batch_factory(
+        examples, record_batch_factory, extra_key=transform_graph_key)
   data_accessor = DataAccessor(
-      tf_dataset_factory=tfxio_utils.get_tf_dataset_factory_from_artifact(
-          input_dict[constants.EXAMPLES_KEY], _TELEMETRY_DESCRIPTORS),
-      record_batch_factory=tfxio_utils.get_record_batch_factory_from_artifact(
-          input_dict[constants.EXAMPLES_KEY], _TELEMETRY_DESCRIPTORS))
+      tf_dataset_factory=tf_dataset_factory,
+      record_batch_factory=record_batch_factory)
 
   # https://github.com/tensorflow/tfx/issues/45: Replace num_steps=0 with
   # num_steps=None.  Conversion of the proto to python will set the default
@@ -18,14 +18,28 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import collections
+import hashlib
+import json
+import multiprocessing
 import os
+import tempfile
 import time
 
-from typing import Text
+from typing import Optional, Sequence, Text
 
+from absl import logging
 import tensorflow as tf
 from tfx.components.trainer.rewriting import rewriter
+from tfx.components.trainer.rewriting import tflite_rewriter
 from tfx.dsl.io import fileio
+from tfx.utils import io_utils
+
+_FINGERPRINT_CHUNK_SIZE = 1 << 20
+
+# A rewrite of a SavedModel by `rewrite_saved_model_concurrently`.
+Rewrite = collections.namedtuple(
+    'Rewrite', ['rewriter_inst', 'dst', 'dst_model_type'])
 
 
 def _invoke_rewriter(src: Text, dst: Text, rewriter_inst: rewriter.BaseRewriter,
@@ -135,3 +149,139 @@ def rewrite_saved_model(
   """
   _invoke_rewriter(src, dst, rewriter_inst, rewriter.ModelType.SAVED_MODEL,
                    dst_model_type)
+
+
+def _fingerprint_saved_model(path: Text) -> Text:
+  """Returns a digest of the names and contents of the files of a model."""
+  path = path.rstrip('/')
+  digest = hashlib.sha256()
+  for dir_name, sub_dirs, leaf_files in fileio.walk(path):
+    sub_dirs.sort()
+    for leaf_file in sorted(leaf_files):
+      file_path = os.path.join(dir_name, leaf_file)
+      digest.update(file_path.replace(path, '', 1).encode('utf-8') + b'\0')
+      size = 0
+      with fileio.open(file_path, 'rb') as f:
+        while True:
+          chunk = f.read(_FINGERPRINT_CHUNK_SIZE)
+          if not chunk:
+            break
+          size += len(chunk)
+          digest.update(chunk)
+      digest.update(b'\0%d\0' % size)
+  return digest.hexdigest()
+
+
+def _get_cache_key(fingerprint: Text, rewrite: Rewrite) -> Optional[Text]:
+  """Returns the key of the cached output of a rewrite, if it is cacheable."""
+  rewriter_key = rewrite.rewriter_inst.cache_key()
+  if rewriter_key is None:
+    return None
+  rewriter_class = type(rewrite.rewriter_inst)
+  return hashlib.sha256(
+      json.dumps([
+          fingerprint,
+          tf.__version__,
+          rewriter_class.__module__ + '.' + rewriter_class.__name__,
+          rewriter_key,
+          rewrite.dst_model_type.name,
+      ]).encode('utf-8')).hexdigest()
+
+
+def _perform_rewrite(src: Text, rewrite: Rewrite,
+                     staged_path: Optional[Text]):
+  """Performs a rewrite, in this process or in a worker process."""
+  rewriter_inst = rewrite.rewriter_inst
+  if staged_path is not None and isinstance(rewriter_inst,
+                                            tflite_rewriter.TFLiteRewriter):
+    rewriter_inst = rewriter_inst.with_staged_saved_model(src, staged_path)
+  fileio.makedirs(rewrite.dst)
+  _invoke_rewriter(src, rewrite.dst, rewriter_inst,
+                   rewriter.ModelType.SAVED_MODEL, rewrite.dst_model_type)
+
+
+def rewrite_saved_model_concurrently(src: Text,
+                                     rewrites: Sequence[Rewrite],
+                                     cache_dir: Optional[Text] = None,
+                                     num_workers: Optional[int] = None):
+  """Rewrites the provided SavedModel with several rewriters concurrently.
+
+  The rewrites run in worker processes. TFLite rewrites convert one shared,
+  asset-stripped staging of the SavedModel instead of staging their own.
+
+  If `cache_dir` is given, the output of every rewrite whose rewriter returns a
+  `cache_key` is cached by the fingerprint of the contents of `src`, the
+  rewriter class and its key, and rewrites whose output is already cached are
+  skipped and copy the cached output to their destination.
+
+  Args:
+    src: location of the saved_model to rewrite.
+    rewrites: the `Rewrite`s to perform, each made of a rewriter instance, the
+      location of the rewritten model and its `rewriter.ModelType`. Rewriter
+      instances must be picklable if more than one rewrite runs.
+    cache_dir: optional directory in which rewritten models are cached.
+    num_workers: number of worker processes. Defaults to the number of rewrites
+      to perform, bounded by the number of CPUs. With 1 worker, the rewrites
+      run one after the other in this process.
+
+  Raises:
+    ValueError: if a destination path is the same as the source path, or if
+      a rewrite fails.
+  """
+  pending = []
+  cache_paths = {}
+  if cache_dir:
+    fingerprint = _fingerprint_saved_model(src)
+    for rewrite in rewrites:
+      cache_key = _get_cache_key(fingerprint, rewrite)
+      if cache_key is None:
+        pending.append(rewrite)
+        continue
+      cache_path = os.path.join(cache_dir, cache_key)
+      if fileio.exists(cache_path):
+        logging.info('Rewriter %s uses cached output %s.',
+                     rewrite.rewriter_inst.name, cache_path)
+        io_utils.copy_dir(cache_path, rewrite.dst)
+      else:
+        cache_paths[rewrite.dst] = cache_path
+        pending.append(rewrite)
+  else:
+    pending = list(rewrites)
+  if not pending:
+    return
+
+  staging_dir = None
+  staged_path = None
+  if any(
+      isinstance(rewrite.rewriter_inst, tflite_rewriter.TFLiteRewriter)
+      for rewrite in pending):
+    staging_dir = tempfile.mkdtemp(prefix='tfx-rewrite-staging-')
+    staged_path = tflite_rewriter.stage_saved_model(src, staging_dir)
+
+  if num_workers is None:
+    num_workers = min(len(pending), multiprocessing.cpu_count())
+  try:
+    args = [(src, rewrite, staged_path) for rewrite in pending]
+    if num_workers <= 1 or len(pending) == 1:
+      for arg in args:
+        _perform_rewrite(*arg)
+    else:
+      # Workers are spawned rather than forked, as forking a process in which
+      # TensorFlow runs is unsafe.
+      with multiprocessing.get_context('spawn').Pool(num_workers) as pool:
+        pool.starmap(_perform_rewrite, args)
+  finally:
+    if staging_dir is not None:
+      fileio.rmtree(staging_dir)
+
+  for rewrite in pending:
+    cache_path = cache_paths.get(rewrite.dst)
+    if cache_path is None:
+      continue
+    tmp_cache_path = '{}.tmp-{}'.format(cache_path, os.getpid())
+    io_utils.copy_dir(rewrite.dst, tmp_cache_path)
+    try:
+      fileio.rename(tmp_cache_path, cache_path)
+    except Exception:  # pylint: disable=broad-except
+      # Another export cached the same output concurrently.
+      fileio.rmtree(tmp_cache_path)
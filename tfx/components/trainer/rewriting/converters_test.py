@@ -20,6 +20,7 @@ from __future__ import print_function
 
 import os
 import tempfile
+import uuid
 
 from absl.testing.absltest import mock
 
@@ -52,6 +53,30 @@ def _export_fn(estimator, export_path, checkpoint_path, eval_result,
   return path
 
 
+class _RecordingRewriter(rewriter.BaseRewriter):
+  """Writes the id of the rewrite and of the rewriting process."""
+
+  def __init__(self, key):
+    self._key = key
+
+  @property
+  def name(self):
+    return 'recording_rewriter'
+
+  def cache_key(self):
+    return self._key
+
+  def _pre_rewrite_validate(self, original_model):
+    pass
+
+  def _rewrite(self, original_model, rewritten_model):
+    with fileio.open(os.path.join(rewritten_model.path, 'rewrite'), 'w') as f:
+      f.write('{} {}'.format(uuid.uuid4().hex, os.getpid()))
+
+  def _post_rewrite_validate(self, rewritten_model):
+    pass
+
+
 class RewritingExporterTest(tf.test.TestCase):
 
   class _TestRewriter(rewriter.BaseRewriter):
@@ -178,5 +203,50 @@ class RewriteSavedModelTest(tf.test.TestCase):
                                                  rewriter.ModelType.SAVED_MODEL)
 
 
+class RewriteSavedModelConcurrentlyTest(tf.test.TestCase):
+
+  def setUp(self):
+    super(RewriteSavedModelConcurrentlyTest, self).setUp()
+    self._src = os.path.join(self.get_temp_dir(), 'src')
+    _export_fn(None, self._src, None, None, None)
+    self._src = os.path.join(self._src, BASE_EXPORT_SUBDIR)
+    self._cache_dir = os.path.join(self.get_temp_dir(), 'cache')
+
+  def _rewrite(self, keys, num_workers=1):
+    rewrites = [
+        converters.Rewrite(
+            _RecordingRewriter(key),
+            os.path.join(self.get_temp_dir(), 'dst-{}'.format(i)),
+            rewriter.ModelType.ANY_MODEL) for i, key in enumerate(keys)
+    ]
+    converters.rewrite_saved_model_concurrently(
+        self._src, rewrites, cache_dir=self._cache_dir, num_workers=num_workers)
+    result = []
+    for rewrite in rewrites:
+      with fileio.open(os.path.join(rewrite.dst, 'rewrite')) as f:
+        result.append(f.read().split())
+    return result
+
+  def testRewritesInWorkerProcesses(self):
+    outputs = self._rewrite(['a', 'b'], num_workers=2)
+    self.assertNotEqual(outputs[0][0], outputs[1][0])
+    for _, pid in outputs:
+      self.assertNotEqual(str(os.getpid()), pid)
+
+  def testSkipsCachedRewrites(self):
+    first = self._rewrite(['a', 'b', None])
+    second = self._rewrite(['a', 'c', None])
+    # Cached output of the same rewriter config.
+    self.assertEqual(first[0], second[0])
+    # Rewriters with another config or without a cache key rewrite the model.
+    self.assertNotEqual(first[1], second[1])
+    self.assertNotEqual(first[2], second[2])
+
+    with fileio.open(os.path.join(self._src, ORIGINAL_SAVED_MODEL), 'w') as f:
+      f.write('changed')
+    third = self._rewrite(['a'])
+    self.assertNotEqual(first[0], third[0])
+
+
 if __name__ == '__main__':
   tf.test.main()
@@ -22,7 +22,7 @@ import abc
 import collections
 import enum
 
-from typing import Text
+from typing import Optional, Text
 
 import six
 
@@ -49,6 +49,14 @@ class BaseRewriter(six.with_metaclass(abc.ABCMeta, object)):
     """
     pass
 
+  def cache_key(self) -> Optional[Text]:
+    """Identifies the rewrite made by this rewriter, for caching its outputs.
+
+    Two rewriters of the same class returning the same key must rewrite a model
+    in the same way. The outputs of rewriters returning `None` are not cached.
+    """
+    return None
+
   @abc.abstractmethod
   def _pre_rewrite_validate(self, original_model: ModelDescription):
     """Perform pre-rewrite validation to check the model has expected structure.
@@ -18,10 +18,11 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
-from typing import Text
+from typing import Optional, Text
 
 import six
 
+import tensorflowjs
 from tensorflowjs.converters import converter
 
 from tfx.components.trainer.rewriting import rewriter
@@ -55,6 +56,14 @@ class TFJSRewriter(rewriter.BaseRewriter):
     """The user-specified name of the rewriter."""
     return self._name
 
+  def cache_key(self) -> Optional[Text]:
+    """Identifies the conversion made by this rewriter."""
+    # The output of the converter changes between its versions.
+    return ' '.join([
+        tensorflowjs.__version__, CONVERTER_SAVED_MODEL_INPUT_FLAG,
+        CONVERTER_SERVING_TAG_FLAG, CONVERTER_DEFAULT_SIGNATURE_FLAG
+    ])
+
   def _pre_rewrite_validate(self, original_model: rewriter.ModelDescription):
     """Performs pre-rewrite checks to see if the model can be rewritten.
 
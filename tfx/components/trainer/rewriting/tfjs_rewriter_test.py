@@ -44,6 +44,14 @@ class TFJSRewriterTest(tf.test.TestCase):
 
     converter.assert_called_once_with(src_model_path, dst_model_path)
 
+  def testCacheKeyIncludesConverterVersion(self):
+    tfrw = tfjs_rewriter.TFJSRewriter(name='myrw')
+
+    with mock.patch.object(tfjs_rewriter.tensorflowjs, '__version__', '1.0.0'):
+      key = tfrw.cache_key()
+    with mock.patch.object(tfjs_rewriter.tensorflowjs, '__version__', '2.0.0'):
+      self.assertNotEqual(key, tfrw.cache_key())
+
 
 if __name__ == '__main__':
   tf.test.main()
@@ -18,6 +18,9 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import copy
+import hashlib
+import json
 import os
 import time
 
@@ -84,14 +87,62 @@ def _create_tflite_converter(
   return converter
 
 
+_ASSETS_DIRECTORIES = (tf.saved_model.ASSETS_DIRECTORY, EXTRA_ASSETS_DIRECTORY)
+
+
 def _create_tflite_compatible_saved_model(src: Text, dst: Text):
-  io_utils.copy_dir(src, dst)
-  assets_path = os.path.join(dst, tf.saved_model.ASSETS_DIRECTORY)
-  if fileio.exists(assets_path):
-    fileio.rmtree(assets_path)
-  assets_extra_path = os.path.join(dst, EXTRA_ASSETS_DIRECTORY)
-  if fileio.exists(assets_extra_path):
-    fileio.rmtree(assets_extra_path)
+  """Creates a SavedModel without the assets directories of `src` at `dst`.
+
+  On local filesystems the files of `src` are symlinked rather than copied.
+  Directories are always created, so that deleting `dst` never deletes files of
+  `src`.
+  """
+  src = src.rstrip('/')
+  dst = dst.rstrip('/')
+  link_files = '://' not in src and '://' not in dst
+  fileio.makedirs(dst)
+  for dir_name, sub_dirs, leaf_files in fileio.walk(src):
+    if dir_name == src:
+      sub_dirs[:] = [d for d in sub_dirs if d not in _ASSETS_DIRECTORIES]
+    dst_dir = dir_name.replace(src, dst, 1)
+    for sub_dir in sub_dirs:
+      fileio.makedirs(os.path.join(dst_dir, sub_dir))
+    for leaf_file in leaf_files:
+      src_path = os.path.join(dir_name, leaf_file)
+      dst_path = os.path.join(dst_dir, leaf_file)
+      if link_files:
+        try:
+          os.symlink(os.path.abspath(src_path), dst_path)
+          continue
+        except OSError:
+          link_files = False
+      fileio.copy(src_path, dst_path)
+
+
+def stage_saved_model(src: Text, staging_dir: Text) -> Text:
+  """Stages an asset-stripped SavedModel shared by TFLite rewrites.
+
+  TFLite rewriters returned by `TFLiteRewriter.with_staged_saved_model` convert
+  the staged SavedModel instead of creating their own. Staging again in the
+  same `staging_dir` reuses the existing staged SavedModel.
+
+  Args:
+    src: Path of the SavedModel to stage.
+    staging_dir: Directory in which the staged SavedModel is kept. The caller
+      is responsible for deleting it after the rewrites.
+
+  Returns:
+    The path of the staged SavedModel.
+  """
+  src = six.ensure_text(src)
+  staged_path = os.path.join(
+      staging_dir,
+      'tflite-compatible-' + hashlib.sha256(src.encode('utf-8')).hexdigest())
+  if not fileio.exists(staged_path):
+    tmp_path = staged_path + '.tmp-' + str(int(time.time()))
+    _create_tflite_compatible_saved_model(src, tmp_path)
+    fileio.rename(tmp_path, staged_path)
+  return staged_path
 
 
 class TFLiteRewriter(rewriter.BaseRewriter):
@@ -138,6 +189,8 @@ class TFLiteRewriter(rewriter.BaseRewriter):
       quantization_supported_types = []
     self._quantization_optimizations = quantization_optimizations
     self._quantization_supported_types = quantization_supported_types
+    # The path of an original SavedModel and of its staged copy.
+    self._staged_saved_model = None
     self._input_data = None
     if quantization_enable_full_integer:
       # TODO(b/175699054): Enable once data API is landed.
@@ -151,6 +204,35 @@ class TFLiteRewriter(rewriter.BaseRewriter):
     """The user-specified name of the rewriter."""
     return self._name
 
+  def with_staged_saved_model(self, src: Text,
+                              staged_path: Text) -> 'TFLiteRewriter':
+    """Returns a copy of this rewriter converting a staged copy of `src`.
+
+    Args:
+      src: Path of the original SavedModel.
+      staged_path: Path of the copy of `src` staged by `stage_saved_model`.
+
+    Returns:
+      A copy of this rewriter which converts `staged_path` when rewriting
+      `src`, and stages its own copy for other models.
+    """
+    result = copy.copy(self)
+    result._staged_saved_model = (six.ensure_text(src), staged_path)
+    return result
+
+  def cache_key(self) -> Optional[Text]:
+    """Identifies the conversion made by this rewriter."""
+    return json.dumps({
+        'filename': self._filename,
+        'copy_assets': self._copy_assets,
+        'copy_assets_extra': self._copy_assets_extra,
+        'quantization_optimizations': sorted(
+            str(o) for o in self._quantization_optimizations),
+        'quantization_supported_types': sorted(
+            tf.as_dtype(t).name for t in self._quantization_supported_types),
+        'full_integer': self._input_data is not None,
+    }, sort_keys=True)
+
   def _pre_rewrite_validate(self, original_model: rewriter.ModelDescription):
     """Performs pre-rewrite checks to see if the model can be rewritten.
 
@@ -182,22 +264,29 @@ class TFLiteRewriter(rewriter.BaseRewriter):
     ]:
       raise ValueError('TFLiteConverter can only convert to the TFLite format.')
 
-    # TODO(dzats): We create a temporary directory with a SavedModel that does
-    # not contain an assets or assets.extra directory. Remove this when the
-    # TFLite converter can convert models having these directories.
-    tmp_model_dir = os.path.join(
-        six.ensure_text(rewritten_model.path),
-        'tmp-rewrite-' + str(int(time.time())))
-    if fileio.exists(tmp_model_dir):
-      raise ValueError('TFLiteConverter is unable to create a unique path '
-                       'for the temp rewriting directory.')
-
-    fileio.makedirs(tmp_model_dir)
-    _create_tflite_compatible_saved_model(
-        six.ensure_text(original_model.path), tmp_model_dir)
+    # TODO(dzats): We convert a SavedModel that does not contain an assets or
+    # assets.extra directory. Remove this when the TFLite converter can convert
+    # models having these directories.
+    tmp_model_dir = None
+    saved_model_path = None
+    if self._staged_saved_model is not None:
+      src, staged_path = self._staged_saved_model
+      if src == six.ensure_text(original_model.path) and fileio.exists(
+          staged_path):
+        saved_model_path = staged_path
+    if saved_model_path is None:
+      tmp_model_dir = os.path.join(
+          six.ensure_text(rewritten_model.path),
+          'tmp-rewrite-' + str(int(time.time())))
+      if fileio.exists(tmp_model_dir):
+        raise ValueError('TFLiteConverter is unable to create a unique path '
+                         'for the temp rewriting directory.')
+      _create_tflite_compatible_saved_model(
+          six.ensure_text(original_model.path), tmp_model_dir)
+      saved_model_path = tmp_model_dir
 
     converter = _create_tflite_converter(
-        saved_model_path=tmp_model_dir,
+        saved_model_path=saved_model_path,
         quantization_optimizations=self._quantization_optimizations,
         quantization_supported_types=self._quantization_supported_types,
         # TODO(b/175699054): Enable once data API is landed.
@@ -208,7 +297,8 @@ class TFLiteRewriter(rewriter.BaseRewriter):
         six.ensure_text(rewritten_model.path), self._filename)
     with fileio.open(six.ensure_text(output_path), 'wb') as f:
       f.write(six.ensure_binary(tflite_model))
-    fileio.rmtree(tmp_model_dir)
+    if tmp_model_dir is not None:
+      fileio.rmtree(tmp_model_dir)
 
     copy_pairs = []
     if self._copy_assets:
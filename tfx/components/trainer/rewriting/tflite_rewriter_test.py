@@ -193,6 +193,64 @@ class TFLiteRewriterTest(tf.test.TestCase):
     self.assertRaises(NotImplementedError,
                       tfrw.perform_rewrite(src_model, dst_model))
 
+  @mock.patch('tfx.components.trainer.rewriting.'
+              'tflite_rewriter._create_tflite_converter')
+  def testInvokeTFLiteRewriterUsesStagedSavedModel(self, converter):
+    m = self.ConverterMock()
+    converter.return_value = m
+
+    src_model, dst_model, src_model_path, dst_model_path = (
+        self.create_temp_model_template())
+    assets_dir = os.path.join(src_model_path, tf.saved_model.ASSETS_DIRECTORY)
+    fileio.mkdir(assets_dir)
+    with fileio.open(os.path.join(assets_dir, 'assets_file'), 'wb') as f:
+      f.write(six.ensure_binary('assets_file'))
+
+    staging_dir = tempfile.mkdtemp()
+    staged_path = tflite_rewriter.stage_saved_model(src_model_path,
+                                                    staging_dir)
+    self.assertEqual(
+        staged_path,
+        tflite_rewriter.stage_saved_model(src_model_path, staging_dir))
+    self.assertTrue(
+        fileio.exists(
+            os.path.join(staged_path,
+                         tf.saved_model.SAVED_MODEL_FILENAME_PBTXT)))
+    self.assertFalse(
+        fileio.exists(
+            os.path.join(staged_path, tf.saved_model.ASSETS_DIRECTORY)))
+
+    tfrw = tflite_rewriter.TFLiteRewriter(name='myrw', filename='fname')
+    tfrw.with_staged_saved_model(src_model_path,
+                                 staged_path).perform_rewrite(
+                                     src_model, dst_model)
+
+    converter.assert_called_once_with(
+        saved_model_path=staged_path,
+        quantization_optimizations=[],
+        quantization_supported_types=[],
+        input_data=None)
+    self.assertEqual(['assets', 'fname'],
+                     sorted(fileio.listdir(dst_model_path)))
+
+    # Deleting the staged SavedModel keeps the files of the original one.
+    fileio.rmtree(staging_dir)
+    self.assertTrue(
+        fileio.exists(
+            os.path.join(src_model_path,
+                         tf.saved_model.SAVED_MODEL_FILENAME_PBTXT)))
+
+  def testCacheKey(self):
+    self.assertEqual(
+        tflite_rewriter.TFLiteRewriter(name='a').cache_key(),
+        tflite_rewriter.TFLiteRewriter(name='b').cache_key())
+    self.assertNotEqual(
+        tflite_rewriter.TFLiteRewriter(name='a').cache_key(),
+        tflite_rewriter.TFLiteRewriter(
+            name='a',
+            quantization_optimizations=[tf.lite.Optimize.DEFAULT],
+            quantization_supported_types=[tf.float16]).cache_key())
+
 
 if __name__ == '__main__':
   tf.test.main()
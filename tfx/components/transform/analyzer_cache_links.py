@@ -0,0 +1,171 @@
+# Lint as: python3
+# Copyright 2020 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Copy-free carry-over of tf.Transform analyzer cache between runs.
+
+A tf.Transform analyzer cache directory holds one sub-directory per dataset
+key (i.e. per analyzed span), each with its own `MANIFEST`. Instead of copying
+the sub-directories of still relevant spans from the input cache artifact into
+the output cache artifact, a links file is written into the output cache
+directory which references the cache base directories already containing the
+entries of each dataset key:
+
+  {
+    "links": {
+      "<dataset key>": [{"base_dir": "<dir>", "size_bytes": <int>}, ...]
+    },
+    "bytes_not_copied": <int>
+  }
+
+Links always point at physical directories, so following them never requires
+more than one hop. Dataset keys that fall out of the analyzed window are not
+carried over, which garbage-collects them from the new cache. Links whose
+target no longer exists (e.g. because an old cache artifact was deleted) are
+ignored when reading, which only results in a cache miss.
+"""
+
+import json
+import os
+from typing import Dict, Iterable, List, Text, Tuple
+
+import absl
+
+from tfx.dsl.io import fileio
+
+# Name of the links file in an analyzer cache directory.
+LINKS_FILENAME = 'CACHE_LINKS.json'
+
+# Name of the manifest file tf.Transform writes for each dataset key.
+_MANIFEST_FILENAME = 'MANIFEST'
+
+_LINKS_KEY = 'links'
+_BASE_DIR_KEY = 'base_dir'
+_SIZE_BYTES_KEY = 'size_bytes'
+_BYTES_NOT_COPIED_KEY = 'bytes_not_copied'
+
+
+def _has_manifest(base_dir: Text, dataset_key: Text) -> bool:
+  return fileio.exists(
+      os.path.join(base_dir, dataset_key, _MANIFEST_FILENAME))
+
+
+def _dir_size_bytes(path: Text) -> int:
+  size = 0
+  for dir_name, _, file_names in fileio.walk(path):
+    for file_name in file_names:
+      size += fileio.stat(os.path.join(dir_name, file_name)).length
+  return size
+
+
+def _read_links_file(cache_dir: Text) -> Dict[Text, List[Dict[Text, object]]]:
+  if not has_links(cache_dir):
+    return {}
+  with fileio.open(os.path.join(cache_dir, LINKS_FILENAME), 'r') as f:
+    return json.loads(f.read()).get(_LINKS_KEY, {})
+
+
+def has_links(cache_dir: Text) -> bool:
+  """Returns whether `cache_dir` references cache entries of other dirs."""
+  return fileio.exists(os.path.join(cache_dir, LINKS_FILENAME))
+
+
+def get_cache_base_dirs(cache_dir: Text,
+                        dataset_keys: Iterable[Text]) -> Dict[Text, List[Text]]:
+  """Returns the cache base directories holding entries of each dataset key.
+
+  Args:
+    cache_dir: An analyzer cache directory, possibly containing a links file.
+    dataset_keys: Keys (i.e. `DatasetKey.key`) of the analyzed datasets.
+
+  Returns:
+    A dict from dataset key to the base directories containing a readable
+    cache for it, ordered from the oldest to the most recent one so that
+    entries read from later directories take precedence. Dataset keys without
+    any cache are omitted.
+  """
+  links = _read_links_file(cache_dir)
+  result = {}
+  for key in dataset_keys:
+    base_dirs = [
+        link[_BASE_DIR_KEY]
+        for link in links.get(key, [])
+        if _has_manifest(link[_BASE_DIR_KEY], key)
+    ]
+    if _has_manifest(cache_dir, key):
+      base_dirs.append(cache_dir)
+    if base_dirs:
+      result[key] = base_dirs
+  return result
+
+
+def link_cache(input_cache_dir: Text,
+               output_cache_dir: Text,
+               dataset_keys: Iterable[Text],
+               link_input_dirs: bool = True) -> Tuple[int, int]:
+  """Carries over the input cache of `dataset_keys` without copying it.
+
+  Args:
+    input_cache_dir: The input analyzer cache directory.
+    output_cache_dir: The output analyzer cache directory. Cache entries
+      computed by the current run are written here separately.
+    dataset_keys: Keys (i.e. `DatasetKey.key`) of the datasets in the current
+      analysis window.
+    link_input_dirs: Whether to link the dataset key directories physically
+      present in `input_cache_dir`. If False, only the links of the input cache
+      are carried over and the caller is responsible for copying those
+      directories.
+
+  Returns:
+    A tuple of the number of bytes which were linked instead of copied, and
+    the number of dataset keys of the input cache which were dropped because
+    they are no longer in the analysis window.
+  """
+  dataset_keys = list(dataset_keys)
+  input_links = _read_links_file(input_cache_dir)
+  output_links = {}
+  bytes_not_copied = 0
+  for key in dataset_keys:
+    key_links = []
+    for link in input_links.get(key, []):
+      if _has_manifest(link[_BASE_DIR_KEY], key):
+        key_links.append(link)
+    if link_input_dirs and _has_manifest(input_cache_dir, key):
+      key_links.append({
+          _BASE_DIR_KEY: input_cache_dir,
+          _SIZE_BYTES_KEY: _dir_size_bytes(os.path.join(input_cache_dir, key)),
+      })
+    if key_links:
+      output_links[key] = key_links
+      bytes_not_copied += sum(link[_SIZE_BYTES_KEY] for link in key_links)
+
+  input_keys = set(input_links)
+  if fileio.isdir(input_cache_dir):
+    input_keys.update(
+        k.rstrip('/') for k in fileio.listdir(input_cache_dir)
+        if fileio.isdir(os.path.join(input_cache_dir, k)))
+  num_dropped = len(input_keys - set(dataset_keys))
+  if not output_links and not link_input_dirs:
+    return bytes_not_copied, num_dropped
+
+  fileio.makedirs(output_cache_dir)
+  with fileio.open(os.path.join(output_cache_dir, LINKS_FILENAME), 'w') as f:
+    f.write(json.dumps({
+        _LINKS_KEY: output_links,
+        _BYTES_NOT_COPIED_KEY: bytes_not_copied,
+    }, indent=2, sort_keys=True))
+  absl.logging.info(
+      'Linked analyzer cache of %d dataset keys instead of copying %d bytes; '
+      'dropped %d dataset keys outside of the analysis window.',
+      len(output_links), bytes_not_copied, num_dropped)
+  return bytes_not_copied, num_dropped
@@ -0,0 +1,111 @@
+# Lint as: python3
+# Copyright 2020 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for tfx.components.transform.analyzer_cache_links."""
+
+import json
+import os
+
+import tensorflow as tf
+
+from tfx.components.transform import analyzer_cache_links
+from tfx.dsl.io import fileio
+from tfx.utils import io_utils
+
+
+class AnalyzerCacheLinksTest(tf.test.TestCase):
+
+  def setUp(self):
+    super(AnalyzerCacheLinksTest, self).setUp()
+    self._base_dir = os.path.join(
+        os.environ.get('TEST_UNDECLARED_OUTPUTS_DIR', self.get_temp_dir()),
+        self._testMethodName)
+
+  def _WriteSpanCache(self, cache_dir, key, size):
+    io_utils.write_string_file(
+        os.path.join(cache_dir, key, 'MANIFEST'), 'm')
+    io_utils.write_string_file(
+        os.path.join(cache_dir, key, '0-00000-of-00001.gz'), 'x' * (size - 1))
+
+  def _ReadLinksFile(self, cache_dir):
+    return json.loads(
+        io_utils.read_string_file(
+            os.path.join(cache_dir, analyzer_cache_links.LINKS_FILENAME)))
+
+  def testLinkCache(self):
+    run1 = os.path.join(self._base_dir, 'run1')
+    run2 = os.path.join(self._base_dir, 'run2')
+    run3 = os.path.join(self._base_dir, 'run3')
+    for key in ('span1', 'span2', 'span3'):
+      self._WriteSpanCache(run1, key, 10)
+
+    # The second run analyzes spans 2 to 4, span1 falls out of the window.
+    bytes_not_copied, num_dropped = analyzer_cache_links.link_cache(
+        run1, run2, ['span2', 'span3', 'span4'])
+    self.assertEqual(20, bytes_not_copied)
+    self.assertEqual(1, num_dropped)
+    self.assertFalse(fileio.exists(os.path.join(run2, 'span2')))
+    self.assertEqual(20, self._ReadLinksFile(run2)['bytes_not_copied'])
+    self._WriteSpanCache(run2, 'span4', 5)
+    self.assertEqual(
+        {
+            'span2': [run1],
+            'span3': [run1],
+            'span4': [run2],
+        },
+        analyzer_cache_links.get_cache_base_dirs(
+            run2, ['span1', 'span2', 'span3', 'span4']))
+
+    # Links are carried over transitively and always point at physical dirs.
+    bytes_not_copied, num_dropped = analyzer_cache_links.link_cache(
+        run2, run3, ['span3', 'span4'])
+    self.assertEqual(15, bytes_not_copied)
+    self.assertEqual(1, num_dropped)
+    self.assertEqual({
+        'span3': [run1],
+        'span4': [run2],
+    }, analyzer_cache_links.get_cache_base_dirs(run3, ['span3', 'span4']))
+
+  def testPartialCacheIsMerged(self):
+    run1 = os.path.join(self._base_dir, 'run1')
+    run2 = os.path.join(self._base_dir, 'run2')
+    self._WriteSpanCache(run1, 'span1', 10)
+    analyzer_cache_links.link_cache(run1, run2, ['span1'])
+    # Entries of new analyzers are written to the output cache of the run.
+    self._WriteSpanCache(run2, 'span1', 3)
+    self.assertEqual({'span1': [run1, run2]},
+                     analyzer_cache_links.get_cache_base_dirs(run2, ['span1']))
+
+  def testDanglingLinksAreIgnored(self):
+    run1 = os.path.join(self._base_dir, 'run1')
+    run2 = os.path.join(self._base_dir, 'run2')
+    self._WriteSpanCache(run1, 'span1', 10)
+    analyzer_cache_links.link_cache(run1, run2, ['span1'])
+    fileio.rmtree(run1)
+    self.assertTrue(analyzer_cache_links.has_links(run2))
+    self.assertEqual({},
+                     analyzer_cache_links.get_cache_base_dirs(run2, ['span1']))
+
+  def testCopyModeOnlyCarriesLinks(self):
+    run1 = os.path.join(self._base_dir, 'run1')
+    run2 = os.path.join(self._base_dir, 'run2')
+    self._WriteSpanCache(run1, 'span1', 10)
+    bytes_not_copied, _ = analyzer_cache_links.link_cache(
+        run1, run2, ['span1'], link_input_dirs=False)
+    self.assertEqual(0, bytes_not_copied)
+    self.assertFalse(analyzer_cache_links.has_links(run2))
+
+
+if __name__ == '__main__':
+  tf.test.main()
@@ -80,7 +80,9 @@ class Transform(base_component.BaseComponent):
       materialize: bool = True,
       disable_analyzer_cache: bool = False,
       force_tf_compat_v1: bool = True,
-      custom_config: Optional[Dict[Text, Any]] = None):
+      custom_config: Optional[Dict[Text, Any]] = None,
+      link_analyzer_cache: bool = False,
+      fuse_dataset_reads: bool = False):
     """Construct a Transform component.
 
     Args:
@@ -143,6 +145,15 @@ class Transform(base_component.BaseComponent):
         future release.
       custom_config: A dict which contains additional parameters that will be
         passed to preprocessing_fn.
+      link_analyzer_cache: If True, the parts of `analyzer_cache` which are
+        still relevant are referenced from `updated_analyzer_cache` instead of
+        being copied into it. This makes the cache carry-over of rolling
+        windows cheap, but requires the artifacts of earlier analyzer caches
+        to be retained for as long as their spans are analyzed.
+      fuse_dataset_reads: If True, splits which are both analyzed and
+        transformed are read and decoded only once, and the decoded data is
+        shared by analysis, statistics and materialization. Depending on the
+        Beam runner this may cause the decoded data to be materialized.
 
     Raises:
       ValueError: When both or neither of 'module_file' and 'preprocessing_fn'
@@ -190,5 +201,7 @@ class Transform(base_component.BaseComponent):
         transformed_examples=transformed_examples,
         analyzer_cache=analyzer_cache,
         updated_analyzer_cache=updated_analyzer_cache,
-        custom_config=json_utils.dumps(custom_config))
+        custom_config=json_utils.dumps(custom_config),
+        link_analyzer_cache=int(link_analyzer_cache),
+        fuse_dataset_reads=int(fuse_dataset_reads))
     super(Transform, self).__init__(spec=spec, instance_name=instance_name)
@@ -18,6 +18,7 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import collections
 import functools
 import hashlib
 import os
@@ -39,8 +40,11 @@ from tensorflow_transform.tf_metadata import dataset_schema
 from tensorflow_transform.tf_metadata import metadata_io
 from tensorflow_transform.tf_metadata import schema_utils
 from tfx import types
+from tfx.components.transform import analyzer_cache_links
 from tfx.components.transform import labels
 from tfx.components.transform import stats_options_util
+from tfx.components.util import examples_utils
+from tfx.components.util import parquet_io
 from tfx.components.util import tfxio_utils
 from tfx.components.util import value_utils
 from tfx.dsl.components.base import base_executor
@@ -275,6 +279,24 @@ def _GetSchemaProto(
   return getattr(schema, '_schema_proto', schema)
 
 
+def _ProjectRecordBatch(record_batch: pa.RecordBatch,
+                        arrow_schema: pa.Schema) -> pa.RecordBatch:
+  """Selects the columns of `arrow_schema` from `record_batch` without copy."""
+  return pa.RecordBatch.from_arrays([
+      record_batch.column(record_batch.schema.get_field_index(field.name))
+      for field in arrow_schema
+  ], schema=arrow_schema)
+
+
+def _ProjectSharedRecordBatch(record_batch: pa.RecordBatch,
+                              arrow_schema: pa.Schema) -> pa.RecordBatch:
+  """Projects a record batch read for analysis onto the transform inputs."""
+  beam.metrics.Metrics.counter(
+      tft_beam_common.METRICS_NAMESPACE,
+      'fused_read_instances').inc(record_batch.num_rows)
+  return _ProjectRecordBatch(record_batch, arrow_schema)
+
+
 class Executor(base_executor.BaseExecutor):
   """Transform executor."""
 
@@ -319,6 +341,10 @@ class Executor(base_executor.BaseExecutor):
           all splits. If splits_config is set, analyze cannot be empty.
         - force_tf_compat_v1: Whether to use TF in compat.v1 mode
           irrespective of installed/enabled TF behaviors.
+        - link_analyzer_cache: Whether to link the still relevant analyzer
+          cache into updated_analyzer_cache instead of copying it.
+        - fuse_dataset_reads: Whether to decode datasets which are both
+          analyzed and transformed only once.
 
     Returns:
       None
@@ -354,6 +380,11 @@ class Executor(base_executor.BaseExecutor):
     payload_format, data_view_uri = (
         tfxio_utils.resolve_payload_format_and_data_view_uri(
             input_dict[EXAMPLES_KEY]))
+    # Columnar inputs are materialized in the same columnar format.
+    if payload_format == example_gen_pb2.PayloadFormat.FORMAT_PARQUET:
+      file_format = labels.FORMAT_PARQUET
+    else:
+      file_format = labels.FORMAT_TFRECORD
     schema_file = io_utils.get_only_uri_in_dir(
         artifact_utils.get_single_uri(input_dict[SCHEMA_KEY]))
     transform_output = artifact_utils.get_single_uri(
@@ -374,6 +405,9 @@ class Executor(base_executor.BaseExecutor):
       for transformed_example_artifact in output_dict[TRANSFORMED_EXAMPLES_KEY]:
         transformed_example_artifact.split_names = (
             artifact_utils.encode_split_names(list(splits_config.transform)))
+        if file_format == labels.FORMAT_PARQUET:
+          examples_utils.set_payload_format(transformed_example_artifact,
+                                            payload_format)
 
       for split in splits_config.transform:
         data_uris = artifact_utils.get_split_uris(input_dict[EXAMPLES_KEY],
@@ -414,11 +448,11 @@ class Executor(base_executor.BaseExecutor):
             data_view_uri,
         labels.ANALYZE_DATA_PATHS_LABEL:
             analyze_data_paths,
-        labels.ANALYZE_PATHS_FILE_FORMATS_LABEL: [labels.FORMAT_TFRECORD] *
+        labels.ANALYZE_PATHS_FILE_FORMATS_LABEL: [file_format] *
                                                  len(analyze_data_paths),
         labels.TRANSFORM_DATA_PATHS_LABEL:
             transform_data_paths,
-        labels.TRANSFORM_PATHS_FILE_FORMATS_LABEL: [labels.FORMAT_TFRECORD] *
+        labels.TRANSFORM_PATHS_FILE_FORMATS_LABEL: [file_format] *
                                                    len(transform_data_paths),
         labels.MODULE_FILE:
             exec_properties.get('module_file', None),
@@ -428,6 +462,10 @@ class Executor(base_executor.BaseExecutor):
             exec_properties.get('custom_config', None),
         labels.FORCE_TF_COMPAT_V1_LABEL:
             force_tf_compat_v1,
+        labels.LINK_ANALYZER_CACHE_LABEL:
+            bool(exec_properties.get('link_analyzer_cache', 0)),
+        labels.FUSE_DATASET_READS_LABEL:
+            bool(exec_properties.get('fuse_dataset_reads', 0)),
     }
     cache_input = _GetCachePath(ANALYZER_CACHE_KEY, input_dict)
     if cache_input is not None:
@@ -485,18 +523,31 @@ class Executor(base_executor.BaseExecutor):
   @beam.ptransform_fn
   @beam.typehints.with_input_types(Tuple[Optional[bytes], bytes])
   @beam.typehints.with_output_types(beam.pvalue.PDone)
-  def _WriteExamples(pcoll: beam.pvalue.PCollection, file_format: Text,
-                     transformed_example_path: Text) -> beam.pvalue.PDone:
-    """Writes transformed examples compressed in gzip format.
+  def _WriteExamples(
+      pcoll: beam.pvalue.PCollection,
+      file_format: Text,
+      transformed_example_path: Text,
+      schema: Optional[schema_pb2.Schema] = None) -> beam.pvalue.PDone:
+    """Writes transformed examples compressed in gzip format or as Parquet.
 
     Args:
       pcoll: PCollection of serialized transformed examples.
       file_format: The output file format.
       transformed_example_path: path to write to.
+      schema: The schema of the transformed examples. Used to derive the
+        columns of Parquet files.
 
     Returns:
       beam.pvalue.PDone.
     """
+    if file_format == labels.FORMAT_PARQUET:
+      return (
+          pcoll
+          | 'Values' >> beam.Values()
+          # pylint: disable=no-value-for-parameter
+          | 'Write' >> parquet_io.WriteExamplesToParquet(
+              transformed_example_path, schema=schema))
+
     assert file_format == labels.FORMAT_TFRECORD, file_format
 
     # TODO(b/139538871): Implement telemetry, on top of pa.Table once available.
@@ -741,13 +792,17 @@ class Executor(base_executor.BaseExecutor):
       if self._input_cache_dir is not None:
         absl.logging.info('Reading the following analysis cache entry keys: %s',
                           cache_entry_keys)
-        input_cache = (
-            pipeline
-            | 'ReadCache' >> analyzer_cache.ReadAnalysisCacheFromFS(
-                self._input_cache_dir,
-                dataset_keys_list,
-                source=self._cache_source,
-                cache_entry_keys=cache_entry_keys))
+        if analyzer_cache_links.has_links(self._input_cache_dir):
+          input_cache = self._ReadLinkedCache(pipeline, dataset_keys_list,
+                                              cache_entry_keys)
+        else:
+          input_cache = (
+              pipeline
+              | 'ReadCache' >> analyzer_cache.ReadAnalysisCacheFromFS(
+                  self._input_cache_dir,
+                  dataset_keys_list,
+                  source=self._cache_source,
+                  cache_entry_keys=cache_entry_keys))
       elif self._output_cache_dir is not None:
         input_cache = {}
       else:
@@ -774,6 +829,38 @@ class Executor(base_executor.BaseExecutor):
 
       return (new_analyze_data_dict, input_cache)
 
+    def _ReadLinkedCache(
+        self, pipeline: beam.Pipeline, dataset_keys_list: List[Any],
+        cache_entry_keys: Iterable[Text]
+    ) -> Dict[Any, Dict[Text, beam.pvalue.PCollection]]:
+      """Reads the input cache and the cache it links to."""
+      base_dirs_by_key = analyzer_cache_links.get_cache_base_dirs(
+          self._input_cache_dir, [key.key for key in dataset_keys_list])
+      dataset_keys_by_base_dir = collections.OrderedDict()
+      for dataset_key in dataset_keys_list:
+        for base_dir in base_dirs_by_key.get(dataset_key.key, []):
+          dataset_keys_by_base_dir.setdefault(base_dir, []).append(dataset_key)
+
+      cache_by_base_dir = {}
+      for index, (base_dir, dataset_keys) in enumerate(
+          dataset_keys_by_base_dir.items()):
+        cache_by_base_dir[base_dir] = (
+            pipeline
+            | 'ReadCache[{}]'.format(index) >>
+            analyzer_cache.ReadAnalysisCacheFromFS(
+                base_dir,
+                dataset_keys,
+                source=self._cache_source,
+                cache_entry_keys=cache_entry_keys))
+
+      # Entries of more recent caches take precedence.
+      input_cache = {}
+      for dataset_key in dataset_keys_list:
+        for base_dir in base_dirs_by_key.get(dataset_key.key, []):
+          input_cache.setdefault(dataset_key, {}).update(
+              cache_by_base_dir[base_dir].get(dataset_key, {}))
+      return input_cache
+
   def _MaybeBindCustomConfig(self, inputs: Mapping[Text, Any],
                              fn: Any) -> Callable[..., Any]:
     # For compatibility, only bind custom config if it's in the signature.
@@ -892,6 +979,10 @@ class Executor(base_executor.BaseExecutor):
           optional
         - labels.FORCE_TF_COMPAT_V1_LABEL: Whether to use TF in compat.v1 mode
           irrespective of installed/enabled TF behaviors.
+        - labels.LINK_ANALYZER_CACHE_LABEL: Whether to link the relevant input
+          analysis cache into the output cache instead of copying it, optional.
+        - labels.FUSE_DATASET_READS_LABEL: Whether to decode datasets which are
+          both analyzed and transformed only once, optional.
       outputs: A dictionary of labelled output values, including:
         - labels.PER_SET_STATS_OUTPUT_PATHS_LABEL: Paths to statistics output,
           optional.
@@ -943,6 +1034,12 @@ class Executor(base_executor.BaseExecutor):
         inputs, labels.DATA_VIEW_LABEL, strict=False)
     force_tf_compat_v1 = value_utils.GetSoleValue(
         inputs, labels.FORCE_TF_COMPAT_V1_LABEL)
+    link_analyzer_cache = bool(
+        value_utils.GetSoleValue(
+            inputs, labels.LINK_ANALYZER_CACHE_LABEL, strict=False))
+    fuse_dataset_reads = bool(
+        value_utils.GetSoleValue(
+            inputs, labels.FUSE_DATASET_READS_LABEL, strict=False))
 
     absl.logging.debug('Force tf.compat.v1: %s', force_tf_compat_v1)
     absl.logging.debug('Analyze data patterns: %s',
@@ -1023,7 +1120,8 @@ class Executor(base_executor.BaseExecutor):
                       raw_examples_data_format, temp_path, input_cache_dir,
                       output_cache_dir, compute_statistics,
                       per_set_stats_output_paths, materialization_format,
-                      len(analyze_data_paths))
+                      len(analyze_data_paths), link_analyzer_cache,
+                      fuse_dataset_reads)
   # TODO(b/122478841): Writes status to status file.
 
   def _RunBeamImpl(self, analyze_data_list: List[_Dataset],
@@ -1037,7 +1135,9 @@ class Executor(base_executor.BaseExecutor):
                    output_cache_dir: Optional[Text], compute_statistics: bool,
                    per_set_stats_output_paths: Sequence[Text],
                    materialization_format: Optional[Text],
-                   analyze_paths_count: int) -> _Status:
+                   analyze_paths_count: int,
+                   link_analyzer_cache: bool = False,
+                   fuse_dataset_reads: bool = False) -> _Status:
     """Perform data preprocessing with TFT.
 
     Args:
@@ -1062,6 +1162,11 @@ class Executor(base_executor.BaseExecutor):
         data or None if materialization is not enabled.
       analyze_paths_count: An integer, the number of paths that should be used
         for analysis.
+      link_analyzer_cache: Whether to link the relevant input cache into
+        `output_cache_dir` instead of copying it.
+      fuse_dataset_reads: Whether to decode datasets which are both analyzed
+        and transformed only once, sharing the decoded record batches between
+        analysis, statistics and materialization.
 
     Returns:
       Status of the execution.
@@ -1081,8 +1186,9 @@ class Executor(base_executor.BaseExecutor):
         force_tf_compat_v1=force_tf_compat_v1)
     # Use the same dataset (same columns) for AnalyzeDataset and computing
     # pre-transform stats so that the data will only be read once for these
-    # two operations.
-    if compute_statistics:
+    # two operations. When reads are fused, the same dataset is also used to
+    # transform the analyzed datasets.
+    if compute_statistics or fuse_dataset_reads:
       analyze_input_columns = list(
           set(list(analyze_input_columns) + list(transform_input_columns)))
 
@@ -1177,16 +1283,23 @@ class Executor(base_executor.BaseExecutor):
           fileio.makedirs(output_cache_dir)
           absl.logging.debug('Using existing cache in: %s', input_cache_dir)
           if input_cache_dir is not None:
-            # Only copy cache that is relevant to this iteration. This is
+            # Only carry over cache that is relevant to this iteration. This is
             # assuming that this pipeline operates on rolling ranges, so those
-            # cache entries may also be relevant for future iterations.
-            for span_cache_dir in input_analysis_data:
-              full_span_cache_dir = os.path.join(input_cache_dir,
-                                                 span_cache_dir.key)
-              if fileio.isdir(full_span_cache_dir):
-                self._CopyCache(
-                    full_span_cache_dir,
-                    os.path.join(output_cache_dir, span_cache_dir.key))
+            # cache entries may also be relevant for future iterations. Cache
+            # of datasets outside of the current range is dropped.
+            analyzer_cache_links.link_cache(
+                input_cache_dir,
+                output_cache_dir,
+                [dataset_key.key for dataset_key in input_analysis_data],
+                link_input_dirs=link_analyzer_cache)
+            if not link_analyzer_cache:
+              for span_cache_dir in input_analysis_data:
+                full_span_cache_dir = os.path.join(input_cache_dir,
+                                                   span_cache_dir.key)
+                if fileio.isdir(full_span_cache_dir):
+                  self._CopyCache(
+                      full_span_cache_dir,
+                      os.path.join(output_cache_dir, span_cache_dir.key))
 
           # TODO(b/157479287, b/171165988): Remove this condition when beam 2.26
           # is used.
@@ -1251,14 +1364,29 @@ class Executor(base_executor.BaseExecutor):
                  pre_transform_feature_stats_path,
                  stats_options=pre_transform_stats_options))
 
-          # transform_data_list is a superset of analyze_data_list, we pay the
-          # cost to read the same dataset (analyze_data_list) again here to
-          # prevent certain beam runner from doing large temp materialization.
+          # transform_data_list is a superset of analyze_data_list, unless
+          # reads are fused we pay the cost to read the same dataset
+          # (analyze_data_list) again here to prevent certain beam runner from
+          # doing large temp materialization.
+          analyzed_datasets = {}
+          if fuse_dataset_reads:
+            analyzed_datasets = {
+                dataset.file_pattern: dataset for dataset in analyze_data_list
+            }
           for dataset in transform_data_list:
             infix = 'TransformIndex{}'.format(dataset.index)
-            dataset.standardized = (
-                pipeline | 'TFXIOReadAndDecode[{}]'.format(infix) >>
-                dataset.tfxio.BeamSource(desired_batch_size))
+            analyzed_dataset = analyzed_datasets.get(dataset.file_pattern)
+            if (analyzed_dataset is not None and self._CanShareRecordBatches(
+                analyzed_dataset.tfxio, dataset.tfxio)):
+              dataset.standardized = (
+                  analyzed_dataset.standardized
+                  | 'ProjectAnalyzedRecordBatches[{}]'.format(infix) >>
+                  beam.Map(_ProjectSharedRecordBatch,
+                           dataset.tfxio.ArrowSchema()))
+            else:
+              dataset.standardized = (
+                  pipeline | 'TFXIOReadAndDecode[{}]'.format(infix) >>
+                  dataset.tfxio.BeamSource(desired_batch_size))
             (dataset.transformed, metadata) = (
                 ((dataset.standardized, dataset.tfxio.TensorAdapterConfig()),
                  transform_fn)
@@ -1322,12 +1450,14 @@ class Executor(base_executor.BaseExecutor):
                      stats_options=post_transform_stats_options))
 
           if materialization_format is not None:
+            _, metadata = transform_fn
             for dataset in transform_data_list:
               infix = 'TransformIndex{}'.format(dataset.index)
               (dataset.transformed_and_serialized
                | 'Materialize[{}]'.format(infix) >> self._WriteExamples(
                    materialization_format,
-                   dataset.materialize_output_path))
+                   dataset.materialize_output_path,
+                   _GetSchemaProto(metadata)))
 
     return _Status.OK()
 
@@ -1375,6 +1505,17 @@ class Executor(base_executor.BaseExecutor):
     """
     return self._make_beam_pipeline()
 
+  @staticmethod
+  def _CanShareRecordBatches(analyzed_tfxio: tfxio_module.TFXIO,
+                             transform_tfxio: tfxio_module.TFXIO) -> bool:
+    """Whether record batches read for analysis can be transformed."""
+    analyzed_schema = analyzed_tfxio.ArrowSchema()
+    for field in transform_tfxio.ArrowSchema():
+      index = analyzed_schema.get_field_index(field.name)
+      if index < 0 or not analyzed_schema.field(index).equals(field):
+        return False
+    return True
+
   # TODO(b/114444977): Remove the unused can_process_jointly argument.
   def _MakeDatasetList(
       self,
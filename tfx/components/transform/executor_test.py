@@ -28,6 +28,7 @@ import tensorflow_transform as tft
 from tensorflow_transform.beam import tft_unit
 from tfx import types
 from tfx.components.testdata.module_file import transform_module
+from tfx.components.transform import analyzer_cache_links
 from tfx.components.transform import executor
 from tfx.dsl.io import fileio
 from tfx.proto import transform_pb2
@@ -376,6 +377,19 @@ class ExecutorTest(tft_unit.TransformTestCase):
     # specifies.
     self.assertMetricsCounterEqual(metrics, 'analyze_paths_count', 1)
 
+  def test_counters_with_fused_dataset_reads(self):
+    self._exec_properties['preprocessing_fn'] = self._preprocessing_fn
+    self._exec_properties['fuse_dataset_reads'] = 1
+    metrics = self._run_pipeline_get_metrics()
+
+    # TFT counts the instances of the analysis dataset (train) both in analysis
+    # and in transform, so num_instances is the same as without fused reads.
+    self.assertMetricsCounterEqual(metrics, 'num_instances', 24909)
+    # The 9909 instances of the train dataset are decoded once and shared by
+    # analysis and transform.
+    self.assertMetricsCounterEqual(metrics, 'fused_read_instances', 9909)
+    self._verify_transform_outputs()
+
   def test_do_with_cache(self):
     # First run that creates cache.
     self._exec_properties['module_file'] = self._module_file
@@ -406,6 +420,42 @@ class ExecutorTest(tft_unit.TransformTestCase):
     self.assertMetricsCounterEqual(metrics, 'num_instances', 15000)
     self._verify_transform_outputs(store_cache=True)
 
+  def test_do_with_linked_cache(self):
+    # First run that creates cache.
+    self._exec_properties['module_file'] = self._module_file
+    self._exec_properties['link_analyzer_cache'] = 1
+    self._run_pipeline_get_metrics()
+    first_cache_uri = self._updated_analyzer_cache_artifact.uri
+
+    # Second run links the cache of the first run instead of copying it.
+    self._output_data_dir = self._get_output_data_dir('2nd_run')
+    analyzer_cache_artifact = standard_artifacts.TransformCache()
+    analyzer_cache_artifact.uri = first_cache_uri
+    self._make_base_do_params(self._SOURCE_DATA_DIR, self._output_data_dir)
+    self._input_dict[executor.ANALYZER_CACHE_KEY] = [analyzer_cache_artifact]
+    self._exec_properties['module_file'] = self._module_file
+    self._exec_properties['link_analyzer_cache'] = 1
+    metrics = self._run_pipeline_get_metrics()
+
+    self.assertMetricsCounterEqual(metrics, 'num_instances', 15000)
+    self._verify_transform_outputs(store_cache=True)
+    second_cache_uri = self._updated_analyzer_cache_artifact.uri
+    self.assertTrue(analyzer_cache_links.has_links(second_cache_uri))
+    self.assertEqual([analyzer_cache_links.LINKS_FILENAME],
+                     fileio.listdir(second_cache_uri))
+
+    # Third run follows the links carried over by the second run.
+    self._output_data_dir = self._get_output_data_dir('3rd_run')
+    analyzer_cache_artifact = standard_artifacts.TransformCache()
+    analyzer_cache_artifact.uri = second_cache_uri
+    self._make_base_do_params(self._SOURCE_DATA_DIR, self._output_data_dir)
+    self._input_dict[executor.ANALYZER_CACHE_KEY] = [analyzer_cache_artifact]
+    self._exec_properties['module_file'] = self._module_file
+    metrics = self._run_pipeline_get_metrics()
+
+    self.assertMetricsCounterEqual(metrics, 'num_instances', 15000)
+    self._verify_transform_outputs(store_cache=True)
+
   @tft_unit.mock.patch.object(executor, '_MAX_ESTIMATED_STAGES_COUNT', 21)
   def test_do_with_cache_disabled_too_many_stages(self):
     self._exec_properties['module_file'] = self._module_file
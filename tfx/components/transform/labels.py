@@ -33,6 +33,12 @@ CACHE_INPUT_PATH_LABEL = 'cache_input_path'
 # This label is used to determine whether Transform should execute in
 # `tf.compat.v1` mode or not.
 FORCE_TF_COMPAT_V1_LABEL = 'force_tf_compat_v1'
+# This label is used to determine whether the still relevant input analyzer
+# cache is linked into the output analyzer cache instead of being copied.
+LINK_ANALYZER_CACHE_LABEL = 'link_analyzer_cache'
+# This label is used to determine whether datasets which are both analyzed and
+# transformed are decoded once for analysis, statistics and materialization.
+FUSE_DATASET_READS_LABEL = 'fuse_dataset_reads'
 
 # Output labels.
 # TODO(b/72214804): Ideally per-set stats and materialization output paths
@@ -47,3 +53,4 @@ TEMP_OUTPUT_LABEL = 'temp_path'
 
 # Examples File Format
 FORMAT_TFRECORD = 'FORMAT_TFRECORD'
+FORMAT_PARQUET = 'FORMAT_PARQUET'
@@ -62,6 +62,8 @@ class Tuner(base_component.BaseComponent):
                eval_args: trainer_pb2.EvalArgs = None,
                tune_args: Optional[tuner_pb2.TuneArgs] = None,
                custom_config: Optional[Dict[Text, Any]] = None,
+               dataset_cache_config: Optional[
+                   trainer_pb2.DatasetCacheConfig] = None,
                best_hyperparameters: Optional[types.Channel] = None,
                instance_name: Optional[Text] = None):
     """Construct a Tuner component.
@@ -90,9 +92,15 @@ class Tuner(base_component.BaseComponent):
         Currently only splits and num_steps are available. Default behavior
         (when splits is empty) is evaluate on `eval` split.
       tune_args: A tuner_pb2.TuneArgs instance, containing args used for tuning.
-        Currently only num_parallel_trials is available.
+        Trials are run in num_parallel_trials local processes, and poor trials
+        are stopped early if early_stopping is enabled.
       custom_config: A dict which contains addtional training job parameters
         that will be passed into user module.
+      dataset_cache_config: An optional trainer_pb2.DatasetCacheConfig
+        instance. If enabled, the data read through `FnArgs.data_accessor` is
+        decoded by the first trial of each process running trials only and
+        cached in memory, or spilled to a local directory, for the later
+        trials.
       best_hyperparameters: Optional Channel of type
         `standard_artifacts.HyperParameters` for result of the best hparams.
       instance_name: Optional unique instance name. Necessary if multiple Tuner
@@ -115,5 +123,6 @@ class Tuner(base_component.BaseComponent):
         tune_args=tune_args,
         best_hyperparameters=best_hyperparameters,
         custom_config=json_utils.dumps(custom_config),
+        dataset_cache_config=dataset_cache_config,
     )
     super(Tuner, self).__init__(spec=spec, instance_name=instance_name)
@@ -18,14 +18,25 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+from concurrent import futures
+import copy
 import json
+import multiprocessing
+from multiprocessing import connection
 import os
 from typing import Any, Callable, Dict, List, Optional, Text
 
 from absl import logging
+import grpc
+from kerastuner.distribute import oracle_chief
 from kerastuner.engine import base_tuner
+from kerastuner.engine import trial as trial_module
+from kerastuner.protos import service_pb2
+from kerastuner.protos import service_pb2_grpc
 from tfx import types
+from tfx.components.trainer import constants
 from tfx.components.trainer import fn_args_utils
+from tfx.components.tuner import trial_scheduler
 from tfx.components.util import udf_utils
 from tfx.dsl.components.base import base_executor
 from tfx.proto import tuner_pb2
@@ -40,6 +51,15 @@ _BEST_HYPERPARAMETERS_KEY = 'best_hyperparameters'
 _TUNE_ARGS_KEY = 'tune_args'
 # Default file name for generated best hyperparameters file.
 _DEFAULT_FILE_NAME = 'best_hyperparameters.txt'
+# File name of the trial statistics, next to the best hyperparameters.
+_TUNING_STATS_FILE_NAME = 'tuning_stats.json'
+# Address of the chief oracle of parallel local trials.
+_LOCALHOST = '127.0.0.1'
+# Interval of checking that the chief oracle is alive while workers run.
+_POLLING_INTERVAL_SECS = 10
+# Processes are spawned rather than forked, as the executor process may have
+# already imported and run TensorFlow, whose state does not survive a fork.
+_MULTIPROCESSING_CONTEXT = 'spawn'
 
 
 # TODO(b/160253334): Establish a separation of practice between this 'default'
@@ -66,7 +86,13 @@ def write_best_hyperparameters(
     tuner: base_tuner.BaseTuner,
     output_dict: Dict[Text, List[types.Artifact]]) -> None:
   """Write out best hyperpeameters known to the given Tuner instance."""
-  best_hparams_config = tuner.get_best_hyperparameters()[0].get_config()
+  _write_best_hyperparameters_config(
+      tuner.get_best_hyperparameters()[0].get_config(), output_dict)
+
+
+def _write_best_hyperparameters_config(
+    best_hparams_config: Dict[Text, Any],
+    output_dict: Dict[Text, List[types.Artifact]]) -> None:
   logging.info('Best HyperParameters: %s', best_hparams_config)
   best_hparams_path = os.path.join(
       artifact_utils.get_single_uri(output_dict[_BEST_HYPERPARAMETERS_KEY]),
@@ -75,26 +101,173 @@ def write_best_hyperparameters(
   logging.info('Best Hyperparameters are written to %s.', best_hparams_path)
 
 
-def search(input_dict: Dict[Text, List[types.Artifact]],
-           exec_properties: Dict[Text, Any],
-           working_dir: Text) -> base_tuner.BaseTuner:
-  """Conduct a single hyperparameter search loop, and return the Tuner."""
+def _write_tuning_stats(stats: Dict[Text, Any],
+                        output_dict: Dict[Text, List[types.Artifact]]) -> None:
+  logging.info('Tuned %d trials in %.1f seconds, worker utilization %.2f.',
+               stats['num_trials'], stats['elapsed_seconds'],
+               stats['worker_utilization'])
+  stats_path = os.path.join(
+      artifact_utils.get_single_uri(output_dict[_BEST_HYPERPARAMETERS_KEY]),
+      _TUNING_STATS_FILE_NAME)
+  io_utils.write_string_file(stats_path, json.dumps(stats, sort_keys=True))
+
+
+def _create_tuner(input_dict: Dict[Text, List[types.Artifact]],
+                  exec_properties: Dict[Text, Any],
+                  working_dir: Text) -> Any:
+  """Calls tuner_fn and returns its TunerFnResult."""
   tuner_fn = _get_tuner_fn(exec_properties)
 
   fn_args = fn_args_utils.get_common_fn_args(input_dict, exec_properties,
                                              working_dir)
 
-  tuner_fn_result = tuner_fn(fn_args)
-  result = tuner_fn_result.tuner
+  return tuner_fn(fn_args)
+
 
+def _run_search(tuner_fn_result: Any) -> None:
+  tuner = tuner_fn_result.tuner
   # TODO(b/156966497): set logger for printing.
-  result.search_space_summary()
-  logging.info('Start tuning... Tuner ID: %s', result.tuner_id)
-  result.search(**tuner_fn_result.fit_kwargs)
-  logging.info('Finished tuning... Tuner ID: %s', result.tuner_id)
-  result.results_summary()
+  tuner.search_space_summary()
+  logging.info('Start tuning... Tuner ID: %s', tuner.tuner_id)
+  tuner.search(**tuner_fn_result.fit_kwargs)
+  logging.info('Finished tuning... Tuner ID: %s', tuner.tuner_id)
+  tuner.results_summary()
 
-  return result
+
+def search(input_dict: Dict[Text, List[types.Artifact]],
+           exec_properties: Dict[Text, Any],
+           working_dir: Text) -> base_tuner.BaseTuner:
+  """Conduct a single hyperparameter search loop, and return the Tuner."""
+  tuner_fn_result = _create_tuner(input_dict, exec_properties, working_dir)
+  _run_search(tuner_fn_result)
+  return tuner_fn_result.tuner
+
+
+def _run_chief_oracle(input_dict: Dict[Text, List[types.Artifact]],
+                      exec_properties: Dict[Text, Any], working_dir: Text,
+                      port_sender: connection.Connection) -> None:
+  """Serves the oracle of the Tuner to the workers. Blocks forever.
+
+  The oracle is only defined by the Tuner returned by the user's tuner_fn, so
+  tuner_fn is called in this process too, and everything but the oracle of its
+  result is unused. The dataset cache is disabled here, so that the datasets
+  it may create are not decoded.
+
+  The server listens on a port picked by the OS, which is sent through
+  `port_sender`, so that no other process can take the port before the server
+  binds it.
+
+  Args:
+    input_dict: Input dict of the executor.
+    exec_properties: Execution properties of the executor.
+    working_dir: Working directory of the process.
+    port_sender: Connection over which the port of the server is sent.
+  """
+  exec_properties = copy.copy(exec_properties)
+  exec_properties.pop(constants.DATASET_CACHE_CONFIG_KEY, None)
+  # KERASTUNER_ORACLE_IP and KERASTUNER_ORACLE_PORT are not set in this
+  # process, so that the Tuner owns the oracle instead of becoming a client.
+  tuner = _create_tuner(input_dict, exec_properties, working_dir).tuner
+  server = grpc.server(futures.ThreadPoolExecutor(max_workers=1))
+  service_pb2_grpc.add_OracleServicer_to_server(
+      oracle_chief.OracleServicer(tuner.oracle), server)
+  port = server.add_insecure_port('{}:0'.format(_LOCALHOST))
+  server.start()
+  logging.info('Chief oracle listening on %s:%d', _LOCALHOST, port)
+  port_sender.send(port)
+  port_sender.close()
+  server.wait_for_termination()
+
+
+def _run_worker(input_dict: Dict[Text, List[types.Artifact]],
+                exec_properties: Dict[Text, Any], working_dir: Text, port: int,
+                tuner_id: Text,
+                scheduler: trial_scheduler.TrialScheduler) -> None:
+  """Conducts a search loop with trials created by the chief oracle."""
+  os.environ['KERASTUNER_ORACLE_IP'] = _LOCALHOST
+  os.environ['KERASTUNER_ORACLE_PORT'] = str(port)
+  os.environ['KERASTUNER_TUNER_ID'] = tuner_id
+  tuner_fn_result = _create_tuner(input_dict, exec_properties, working_dir)
+  scheduler.attach(tuner_fn_result.tuner, tuner_id)
+  _run_search(tuner_fn_result)
+
+
+def _get_best_hyperparameters_config(port: int) -> Dict[Text, Any]:
+  """Returns the best hyperparameters known to the chief oracle."""
+  with grpc.insecure_channel('{}:{}'.format(_LOCALHOST, port)) as channel:
+    response = service_pb2_grpc.OracleStub(channel).GetBestTrials(
+        service_pb2.GetBestTrialsRequest(num_trials=1), wait_for_ready=True)
+  if not response.trials:
+    raise RuntimeError('No trial was completed.')
+  return trial_module.Trial.from_proto(
+      response.trials[0]).hyperparameters.get_config()
+
+
+def _search_in_parallel(input_dict: Dict[Text, List[types.Artifact]],
+                        exec_properties: Dict[Text, Any], working_dir: Text,
+                        num_workers: int,
+                        scheduler: trial_scheduler.TrialScheduler
+                       ) -> Dict[Text, Any]:
+  """Runs trials in worker processes, and returns the best hyperparameters.
+
+  The workers get their trials from a chief oracle in another process, like
+  the distributed search loops of KerasTuner. Every worker decodes its own
+  data, and caches it if the dataset cache is enabled.
+
+  Args:
+    input_dict: Input dict of the executor.
+    exec_properties: Execution properties of the executor.
+    working_dir: Directory under which every process gets its working dir.
+    num_workers: Number of worker processes.
+    scheduler: Scheduler of the trials, with a state shared by processes.
+
+  Returns:
+    The config of the best hyperparameters.
+
+  Raises:
+    RuntimeError: If the chief oracle or a worker process failed.
+  """
+  context = multiprocessing.get_context(_MULTIPROCESSING_CONTEXT)
+  port_receiver, port_sender = context.Pipe(duplex=False)
+  chief = context.Process(
+      target=_run_chief_oracle,
+      args=(input_dict, exec_properties, os.path.join(working_dir, 'chief'),
+            port_sender))
+  workers = []
+  try:
+    chief.start()
+    logging.info('Chief oracle started at PID: %s', chief.pid)
+    while not port_receiver.poll(_POLLING_INTERVAL_SECS):
+      if not chief.is_alive():
+        raise RuntimeError(
+            'Chief oracle exited with exit code {}.'.format(chief.exitcode))
+    port = port_receiver.recv()
+    workers = [
+        context.Process(
+            target=_run_worker,
+            args=(input_dict, exec_properties,
+                  os.path.join(working_dir, 'worker-%d' % i), port,
+                  'tfx-tuner-worker-%d' % i, scheduler))
+        for i in range(num_workers)
+    ]
+    for worker in workers:
+      worker.start()
+    for worker in workers:
+      while worker.is_alive():
+        worker.join(_POLLING_INTERVAL_SECS)
+        if not chief.is_alive():
+          raise RuntimeError(
+              'Chief oracle exited with exit code {}.'.format(chief.exitcode))
+      if worker.exitcode != 0:
+        raise RuntimeError('Tuner worker {} failed with exit code {}.'.format(
+            worker.name, worker.exitcode))
+    return _get_best_hyperparameters_config(port)
+  finally:
+    # The chief oracle serves forever.
+    for process in workers + [chief]:
+      if process.is_alive():
+        process.terminate()
+        process.join()
 
 
 class Executor(base_executor.BaseExecutor):
@@ -103,9 +276,38 @@ class Executor(base_executor.BaseExecutor):
   def Do(self, input_dict: Dict[Text, List[types.Artifact]],
          output_dict: Dict[Text, List[types.Artifact]],
          exec_properties: Dict[Text, Any]) -> None:
-    if get_tune_args(exec_properties):
-      raise ValueError("TuneArgs is not supported by this Tuner's Executor.")
+    """Runs the search loop and writes out the best hyperparameters.
+
+    If TuneArgs.num_parallel_trials > 1, the trials are run by as many worker
+    processes. Statistics of the trials are written to `tuning_stats.json`
+    next to the best hyperparameters.
+
+    Args:
+      input_dict: Input dict from input key to a list of artifacts.
+      output_dict: Output dict from output key to a list of artifacts.
+      exec_properties: A dict of execution properties.
+    """
+    tune_args = get_tune_args(exec_properties) or tuner_pb2.TuneArgs()
+    num_workers = max(tune_args.num_parallel_trials, 1)
+    working_dir = self._get_tmp_dir()
 
-    tuner = search(input_dict, exec_properties, self._get_tmp_dir())
+    if num_workers == 1:
+      scheduler = trial_scheduler.TrialScheduler(tune_args.early_stopping)
+      tuner_fn_result = _create_tuner(input_dict, exec_properties, working_dir)
+      scheduler.attach(tuner_fn_result.tuner, tuner_fn_result.tuner.tuner_id)
+      _run_search(tuner_fn_result)
+      write_best_hyperparameters(tuner_fn_result.tuner, output_dict)
+      _write_tuning_stats(scheduler.get_stats(), output_dict)
+      return
 
-    write_best_hyperparameters(tuner, output_dict)
+    manager = multiprocessing.get_context(_MULTIPROCESSING_CONTEXT).Manager()
+    try:
+      scheduler = trial_scheduler.TrialScheduler(
+          tune_args.early_stopping, num_workers=num_workers, manager=manager)
+      best_hparams_config = _search_in_parallel(
+          input_dict, exec_properties, working_dir, num_workers, scheduler)
+      stats = scheduler.get_stats()
+    finally:
+      manager.shutdown()
+    _write_best_hyperparameters_config(best_hparams_config, output_dict)
+    _write_tuning_stats(stats, output_dict)
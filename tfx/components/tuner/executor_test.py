@@ -22,10 +22,12 @@ import copy
 import json
 import os
 from kerastuner import HyperParameters
+import mock
 import tensorflow as tf
 
 from tfx.components.testdata.module_file import tuner_module
 from tfx.components.tuner import executor
+from tfx.components.tuner import trial_scheduler
 from tfx.dsl.io import fileio
 from tfx.proto import trainer_pb2
 from tfx.proto import tuner_pb2
@@ -93,6 +95,16 @@ class ExecutorTest(tf.test.TestCase):
     best_hparams = HyperParameters.from_config(best_hparams_config)
     self.assertIn(best_hparams.get('learning_rate'), (1e-1, 1e-3))
     self.assertBetween(best_hparams.get('num_layers'), 1, 5)
+    # Test tuning stats.
+    stats = self._read_tuning_stats()
+    self.assertEqual(stats['num_trials'], len(stats['trials']))
+    self.assertGreater(stats['num_trials'], 0)
+    self.assertBetween(stats['worker_utilization'], 0.0, 1.0)
+
+  def _read_tuning_stats(self):
+    return json.loads(
+        file_io.read_file_to_string(
+            os.path.join(self._best_hparams.uri, 'tuning_stats.json')))
 
   def testDoWithModuleFile(self):
     self._exec_properties['module_file'] = os.path.join(self._testdata_dir,
@@ -119,17 +131,52 @@ class ExecutorTest(tf.test.TestCase):
 
     self._verify_output()
 
-  def testTuneArgs(self):
-    with self.assertRaises(ValueError):
-      self._exec_properties['tune_args'] = proto_utils.proto_to_json(
-          tuner_pb2.TuneArgs(num_parallel_trials=3))
+  def testDoWithParallelTrials(self):
+    self._exec_properties['module_file'] = os.path.join(self._testdata_dir,
+                                                        'module_file',
+                                                        'tuner_module.py')
+    self._exec_properties['tune_args'] = proto_utils.proto_to_json(
+        tuner_pb2.TuneArgs(num_parallel_trials=2))
+
+    tuner = executor.Executor(self._context)
+    tuner.Do(
+        input_dict=self._input_dict,
+        output_dict=self._output_dict,
+        exec_properties=self._exec_properties)
 
-      tuner = executor.Executor(self._context)
+    self._verify_output()
+    stats = self._read_tuning_stats()
+    self.assertEqual(2, stats['num_workers'])
+    self.assertLen(
+        {trial['worker'] for trial in stats['trials'].values()}, 2)
+
+  def testDoWithEarlyStopping(self):
+    self._exec_properties['module_file'] = os.path.join(self._testdata_dir,
+                                                        'module_file',
+                                                        'tuner_module.py')
+    self._exec_properties['tune_args'] = proto_utils.proto_to_json(
+        tuner_pb2.TuneArgs(
+            early_stopping=tuner_pb2.EarlyStopping(
+                enabled=True, min_finished_trials=1)))
+
+    tuner = executor.Executor(self._context)
+    # Every trial is worse than the median of the finished trials, so that
+    # all trials but the first one are stopped.
+    with mock.patch.object(
+        trial_scheduler.TrialScheduler, '_is_better', return_value=True):
       tuner.Do(
           input_dict=self._input_dict,
           output_dict=self._output_dict,
           exec_properties=self._exec_properties)
 
+    self._verify_output()
+    stats = self._read_tuning_stats()
+    self.assertGreater(stats['num_trials'], 1)
+    self.assertEqual(stats['num_trials'] - 1, stats['num_stopped_trials'])
+    self.assertEqual(
+        stats['num_stopped_trials'],
+        sum(1 for trial in stats['trials'].values() if trial['stopped']))
+
   def testDoWithCustomSplits(self):
     # Update input dict.
     io_utils.copy_dir(
@@ -0,0 +1,194 @@
+# Lint as: python3
+# Copyright 2020 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Early stopping and accounting of the trials of local Tuner processes.
+
+A `TrialScheduler` is attached to the Tuner of every process conducting a
+search loop. It records the objective of each trial at the end of every epoch
+and the time spent in each trial, and stops trials early with the median
+stopping rule: a trial is stopped at the end of an epoch if its best objective
+so far is worse than the median of the best objectives of the finished trials
+at the same epoch.
+
+When trials run in several processes, the state of the scheduler is kept in a
+`multiprocessing.Manager`, so that all processes stop trials against the same
+finished trials.
+"""
+
+from multiprocessing import managers
+import statistics
+import time
+from typing import Any, Dict, List, Optional, Text
+
+from absl import logging
+from kerastuner.engine import base_tuner
+import tensorflow as tf
+from tfx.proto import tuner_pb2
+
+_DEFAULT_MIN_EPOCHS = 1
+_DEFAULT_MIN_FINISHED_TRIALS = 3
+
+
+class _EarlyStoppingCallback(tf.keras.callbacks.Callback):
+  """Reports the objective of a trial and stops it if the scheduler says so."""
+
+  def __init__(self, scheduler: 'TrialScheduler', trial_id: Text,
+               objective_name: Text, direction: Text):
+    super(_EarlyStoppingCallback, self).__init__()
+    self._scheduler = scheduler
+    self._trial_id = trial_id
+    self._objective_name = objective_name
+    self._direction = direction
+
+  def on_epoch_end(self, epoch, logs=None):
+    value = (logs or {}).get(self._objective_name)
+    if value is None:
+      return
+    if self._scheduler.report(self._trial_id, epoch, float(value),
+                              self._direction):
+      logging.info('Stopping trial %s at epoch %d.', self._trial_id, epoch)
+      self.model.stop_training = True
+
+
+class TrialScheduler(object):
+  """Stops poor trials early and accounts for the time spent in trials."""
+
+  def __init__(self,
+               early_stopping: tuner_pb2.EarlyStopping,
+               num_workers: int = 1,
+               manager: Optional[managers.SyncManager] = None):
+    """Initializes the scheduler.
+
+    Args:
+      early_stopping: Configuration of early stopping.
+      num_workers: Number of processes conducting a search loop.
+      manager: Optional started manager keeping the state shared by the
+        processes. If not given, the state is local to the process.
+    """
+    self._early_stopping = early_stopping
+    self._num_workers = num_workers
+    # Every trial is run by a single process, which is the only writer of the
+    # entries of the trial.
+    if manager is not None:
+      # Maps trial ids to the objective value of each epoch.
+      self._histories = manager.dict()
+      # Maps trial ids to the accounting of finished trials.
+      self._trials = manager.dict()
+    else:
+      self._histories = {}
+      self._trials = {}
+    # Trials stopped by this process.
+    self._stopped_trial_ids = set()
+    self._start_time = time.time()
+
+  def __deepcopy__(self, memo):
+    # KerasTuner deep copies the callbacks of every trial. The copies should
+    # keep reporting to this scheduler.
+    return self
+
+  def _is_better(self, value: float, other: float, direction: Text) -> bool:
+    return value > other if direction == 'max' else value < other
+
+  def _best(self, values: List[float], direction: Text) -> float:
+    return max(values) if direction == 'max' else min(values)
+
+  def report(self, trial_id: Text, epoch: int, value: float,
+             direction: Text) -> bool:
+    """Records the objective of a trial at the end of an epoch.
+
+    Args:
+      trial_id: Id of the trial.
+      epoch: Zero-based index of the epoch.
+      value: Objective value of the trial at the end of the epoch.
+      direction: 'min' or 'max', the direction of the objective.
+
+    Returns:
+      Whether the trial should be stopped.
+    """
+    history = list(self._histories.get(trial_id, []))
+    del history[epoch:]
+    history.append(value)
+    self._histories[trial_id] = history
+
+    if not self._early_stopping.enabled:
+      return False
+    min_epochs = self._early_stopping.min_epochs or _DEFAULT_MIN_EPOCHS
+    min_finished_trials = (
+        self._early_stopping.min_finished_trials or
+        _DEFAULT_MIN_FINISHED_TRIALS)
+    if epoch + 1 < min_epochs:
+      return False
+    finished_trial_ids = [t for t in self._trials.keys() if t != trial_id]
+    best_values = []
+    for finished_trial_id in finished_trial_ids:
+      finished_history = self._histories.get(finished_trial_id, [])
+      if len(finished_history) > epoch:
+        best_values.append(
+            self._best(finished_history[:epoch + 1], direction))
+    if len(best_values) < min_finished_trials:
+      return False
+    median = statistics.median(best_values)
+    if self._is_better(median, self._best(history, direction), direction):
+      self._stopped_trial_ids.add(trial_id)
+      return True
+    return False
+
+  def attach(self, tuner: base_tuner.BaseTuner, worker_id: Text) -> None:
+    """Schedules the trials run by `tuner`.
+
+    Args:
+      tuner: The Tuner conducting a search loop in this process.
+      worker_id: Id of the process, recorded with its trials.
+    """
+    run_trial = tuner.run_trial
+    objective = tuner.oracle.objective
+    objective_name = getattr(objective, 'name', None)
+    direction = getattr(objective, 'direction', 'min')
+
+    def scheduled_run_trial(trial, *fit_args, **fit_kwargs):
+      if objective_name is not None:
+        fit_kwargs = dict(fit_kwargs)
+        fit_kwargs['callbacks'] = list(fit_kwargs.get('callbacks') or []) + [
+            _EarlyStoppingCallback(self, trial.trial_id, objective_name,
+                                   direction)
+        ]
+      start = time.time()
+      try:
+        return run_trial(trial, *fit_args, **fit_kwargs)
+      finally:
+        self._trials[trial.trial_id] = {
+            'worker': worker_id,
+            'seconds': time.time() - start,
+            'epochs': len(self._histories.get(trial.trial_id, [])),
+            'stopped': trial.trial_id in self._stopped_trial_ids,
+        }
+
+    tuner.run_trial = scheduled_run_trial
+
+  def get_stats(self) -> Dict[Text, Any]:
+    """Returns the trial throughput, worker utilization and trial times."""
+    elapsed = time.time() - self._start_time
+    trials = dict(self._trials)
+    busy_seconds = sum(trial['seconds'] for trial in trials.values())
+    return {
+        'num_workers': self._num_workers,
+        'num_trials': len(trials),
+        'num_stopped_trials': sum(
+            1 for trial in trials.values() if trial['stopped']),
+        'elapsed_seconds': elapsed,
+        'trials_per_hour': len(trials) * 3600.0 / elapsed if elapsed else 0.0,
+        'worker_utilization': (
+            busy_seconds / (self._num_workers * elapsed) if elapsed else 0.0),
+        'trials': trials,
+    }
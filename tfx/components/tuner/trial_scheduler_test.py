@@ -0,0 +1,138 @@
+# Lint as: python3
+# Copyright 2020 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for tfx.components.tuner.trial_scheduler."""
+
+import copy
+import multiprocessing
+
+import mock
+import tensorflow as tf
+from tfx.components.tuner import trial_scheduler
+from tfx.proto import tuner_pb2
+
+
+class _FakeTuner(object):
+  """Tuner running trials whose objective is given per epoch."""
+
+  def __init__(self, direction='max'):
+    self.oracle = mock.Mock()
+    self.oracle.objective.name = 'val_accuracy'
+    self.oracle.objective.direction = direction
+    self.fit_callbacks = []
+
+  def run_trial(self, trial, values, callbacks=None):
+    # KerasTuner copies the callbacks of every trial.
+    callbacks = copy.deepcopy(callbacks)
+    self.fit_callbacks.append(callbacks)
+    model = mock.Mock(stop_training=False)
+    for callback in callbacks:
+      callback.set_model(model)
+    for epoch, value in enumerate(values):
+      for callback in callbacks:
+        callback.on_epoch_end(epoch, {'val_accuracy': value})
+      if model.stop_training:
+        break
+
+
+def _trial(trial_id):
+  return mock.Mock(trial_id=trial_id)
+
+
+class TrialSchedulerTest(tf.test.TestCase):
+
+  def testRecordsTrials(self):
+    scheduler = trial_scheduler.TrialScheduler(tuner_pb2.EarlyStopping())
+    tuner = _FakeTuner()
+    scheduler.attach(tuner, 'worker-0')
+
+    tuner.run_trial(_trial('a'), [0.1, 0.2, 0.3], callbacks=[])
+    tuner.run_trial(_trial('b'), [0.9, 0.1])
+
+    stats = scheduler.get_stats()
+    self.assertEqual(1, stats['num_workers'])
+    self.assertEqual(2, stats['num_trials'])
+    self.assertEqual(0, stats['num_stopped_trials'])
+    self.assertEqual({'a', 'b'}, set(stats['trials'].keys()))
+    self.assertEqual(3, stats['trials']['a']['epochs'])
+    self.assertEqual('worker-0', stats['trials']['b']['worker'])
+    self.assertFalse(stats['trials']['b']['stopped'])
+    self.assertGreaterEqual(stats['trials']['a']['seconds'], 0.0)
+    self.assertBetween(stats['worker_utilization'], 0.0, 1.0)
+
+  def testMedianStopping(self):
+    scheduler = trial_scheduler.TrialScheduler(
+        tuner_pb2.EarlyStopping(
+            enabled=True, min_epochs=2, min_finished_trials=2))
+    tuner = _FakeTuner()
+    scheduler.attach(tuner, 'worker-0')
+
+    tuner.run_trial(_trial('a'), [0.5, 0.6, 0.7])
+    # Not stopped while fewer than 2 trials finished.
+    tuner.run_trial(_trial('b'), [0.1, 0.2, 0.3])
+    # Median of the best values at the second epoch is 0.4. Not stopped at the
+    # first epoch.
+    tuner.run_trial(_trial('c'), [0.1, 0.3, 0.9])
+    tuner.run_trial(_trial('d'), [0.1, 0.5, 0.9])
+
+    stats = scheduler.get_stats()
+    self.assertEqual(1, stats['num_stopped_trials'])
+    self.assertEqual(3, stats['trials']['b']['epochs'])
+    self.assertTrue(stats['trials']['c']['stopped'])
+    self.assertEqual(2, stats['trials']['c']['epochs'])
+    self.assertFalse(stats['trials']['d']['stopped'])
+    self.assertEqual(3, stats['trials']['d']['epochs'])
+
+  def testMedianStopping_MinimizedObjective(self):
+    scheduler = trial_scheduler.TrialScheduler(
+        tuner_pb2.EarlyStopping(enabled=True, min_finished_trials=1))
+    tuner = _FakeTuner(direction='min')
+    scheduler.attach(tuner, 'worker-0')
+
+    tuner.run_trial(_trial('a'), [0.5, 0.4])
+    tuner.run_trial(_trial('b'), [0.6, 0.1])
+    tuner.run_trial(_trial('c'), [0.4, 0.1])
+
+    stats = scheduler.get_stats()
+    self.assertTrue(stats['trials']['b']['stopped'])
+    self.assertFalse(stats['trials']['c']['stopped'])
+
+  def testSharedState(self):
+    manager = multiprocessing.Manager()
+    self.addCleanup(manager.shutdown)
+    scheduler = trial_scheduler.TrialScheduler(
+        tuner_pb2.EarlyStopping(enabled=True, min_finished_trials=1),
+        num_workers=2,
+        manager=manager)
+
+    def run_worker():
+      tuner = _FakeTuner()
+      scheduler.attach(tuner, 'worker-1')
+      tuner.run_trial(_trial('a'), [0.5])
+
+    worker = multiprocessing.Process(target=run_worker)
+    worker.start()
+    worker.join()
+    tuner = _FakeTuner()
+    scheduler.attach(tuner, 'worker-0')
+    tuner.run_trial(_trial('b'), [0.1, 0.9])
+
+    stats = scheduler.get_stats()
+    self.assertEqual(2, stats['num_workers'])
+    self.assertEqual('worker-1', stats['trials']['a']['worker'])
+    self.assertTrue(stats['trials']['b']['stopped'])
+
+
+if __name__ == '__main__':
+  tf.test.main()
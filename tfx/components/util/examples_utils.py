@@ -19,7 +19,8 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
-from typing import Text
+import json
+from typing import Dict, Text
 
 from absl import logging
 from tfx import types
@@ -28,6 +29,9 @@ from tfx.proto import example_gen_pb2
 from tfx.types import standard_artifacts
 
 _DEFAULT_PAYLOAD_FORMAT = example_gen_pb2.PayloadFormat.FORMAT_TF_EXAMPLE
+_DEFAULT_COMPRESSION = example_gen_pb2.WriteConfig.GZIP
+_COLUMNAR_PAYLOAD_FORMATS = frozenset(
+    [example_gen_pb2.PayloadFormat.FORMAT_PARQUET])
 
 
 def get_payload_format(examples: types.Artifact) -> int:
@@ -75,3 +79,81 @@ def set_payload_format(examples: types.Artifact, payload_format: int):
   examples.set_string_custom_property(
       example_gen_utils.PAYLOAD_FORMAT_PROPERTY_NAME,
       example_gen_pb2.PayloadFormat.Name(payload_format))
+
+
+def is_columnar_payload_format(payload_format: int) -> bool:
+  """Returns whether `payload_format` stores features column by column.
+
+  Examples of a columnar payload format are not stored as serialized records
+  and can't be read as raw records, but reading a subset of the features only
+  reads the bytes of those features.
+
+  Args:
+    payload_format: One of the enums in example_gen_pb2.PayloadFormat.
+  """
+  return payload_format in _COLUMNAR_PAYLOAD_FORMATS
+
+
+def get_compression(examples: types.Artifact) -> int:
+  """Returns the compression of the files of Examples artifact.
+
+  Examples artifacts without the "compression" custom property are gzipped.
+
+  Args:
+    examples: A standard_artifacts.Examples artifact.
+
+  Returns:
+    compression: One of the enums in example_gen_pb2.WriteConfig.Compression.
+  """
+  assert examples.type_name == standard_artifacts.Examples.TYPE_NAME, (
+      'examples must be of type standard_artifacts.Examples')
+  if examples.has_custom_property(
+      example_gen_utils.COMPRESSION_PROPERTY_NAME):
+    return example_gen_pb2.WriteConfig.Compression.Value(
+        examples.get_string_custom_property(
+            example_gen_utils.COMPRESSION_PROPERTY_NAME))
+  return _DEFAULT_COMPRESSION
+
+
+def get_num_shards(examples: types.Artifact) -> Dict[Text, int]:
+  """Returns the number of files of each split of Examples artifact.
+
+  Args:
+    examples: A standard_artifacts.Examples artifact.
+
+  Returns:
+    A dict from split name to number of files. Empty if the layout was not
+    recorded.
+  """
+  assert examples.type_name == standard_artifacts.Examples.TYPE_NAME, (
+      'examples must be of type standard_artifacts.Examples')
+  if not examples.has_custom_property(
+      example_gen_utils.NUM_SHARDS_PROPERTY_NAME):
+    return {}
+  return json.loads(
+      examples.get_string_custom_property(
+          example_gen_utils.NUM_SHARDS_PROPERTY_NAME))
+
+
+def set_write_layout(examples: types.Artifact, compression: int,
+                     shuffled: bool, num_shards: Dict[Text, int]):
+  """Records how the files of `examples` were written.
+
+  Downstream readers can use the layout to plan parallel reads.
+
+  Args:
+    examples: A standard_artifacts.Examples artifact.
+    compression: One of the enums in example_gen_pb2.WriteConfig.Compression.
+    shuffled: Whether the records were shuffled before being written.
+    num_shards: A dict from split name to number of files.
+  """
+  assert examples.type_name == standard_artifacts.Examples.TYPE_NAME, (
+      'examples must be of type standard_artifacts.Examples')
+  examples.set_string_custom_property(
+      example_gen_utils.COMPRESSION_PROPERTY_NAME,
+      example_gen_pb2.WriteConfig.Compression.Name(compression))
+  examples.set_int_custom_property(example_gen_utils.SHUFFLED_PROPERTY_NAME,
+                                   int(shuffled))
+  examples.set_string_custom_property(
+      example_gen_utils.NUM_SHARDS_PROPERTY_NAME,
+      json.dumps(num_shards, sort_keys=True))
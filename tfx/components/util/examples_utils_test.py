@@ -61,6 +61,36 @@ class ExamplesUtilsTest(tf.test.TestCase):
       examples_utils.set_payload_format(
           artifact, example_gen_pb2.PayloadFormat.FORMAT_PROTO)
 
+  def test_is_columnar_payload_format(self):
+    self.assertTrue(
+        examples_utils.is_columnar_payload_format(
+            example_gen_pb2.PayloadFormat.FORMAT_PARQUET))
+    self.assertFalse(
+        examples_utils.is_columnar_payload_format(
+            example_gen_pb2.PayloadFormat.FORMAT_TF_EXAMPLE))
+
+  def test_get_compression(self):
+    examples = standard_artifacts.Examples()
+    self.assertEqual(examples_utils.get_compression(examples),
+                     example_gen_pb2.WriteConfig.GZIP)
+    examples.set_string_custom_property(utils.COMPRESSION_PROPERTY_NAME,
+                                        'NONE')
+    self.assertEqual(examples_utils.get_compression(examples),
+                     example_gen_pb2.WriteConfig.NONE)
+
+  def test_set_write_layout(self):
+    examples = standard_artifacts.Examples()
+    self.assertEqual(examples_utils.get_num_shards(examples), {})
+    examples_utils.set_write_layout(
+        examples, compression=example_gen_pb2.WriteConfig.ZLIB,
+        shuffled=False, num_shards={'train': 4, 'eval': 1})
+    self.assertEqual(examples_utils.get_compression(examples),
+                     example_gen_pb2.WriteConfig.ZLIB)
+    self.assertEqual(
+        examples.get_int_custom_property(utils.SHUFFLED_PROPERTY_NAME), 0)
+    self.assertEqual(examples_utils.get_num_shards(examples),
+                     {'train': 4, 'eval': 1})
+
 
 if __name__ == '__main__':
   tf.test.main()
@@ -0,0 +1,687 @@
+# Lint as: python3
+# Copyright 2020 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Reading and writing Examples with the FORMAT_PARQUET payload format.
+
+Examples of the FORMAT_PARQUET payload format are stored as Parquet files with
+one column per feature. The columns have the Arrow types produced by decoding
+tf.Examples with tfx_bsl (e.g. `large_list<int64>`), so that the record
+batches read from Parquet are interchangeable with the ones produced by the
+tf.Example TFXIO. Since the data is columnar, reading a projection of the
+features only reads the bytes of the projected columns, and local files are
+memory-mapped.
+"""
+
+import collections
+import hashlib
+import math
+import os
+import random
+from typing import Any, Iterator, List, Optional, Text, Tuple, Union
+import uuid
+
+import apache_beam as beam
+import pyarrow as pa
+from pyarrow import parquet as pq
+import tensorflow as tf
+from tfx.dsl.io import fileio
+from tfx_bsl.coders import example_coder
+from tfx_bsl.tfxio import dataset_options
+from tfx_bsl.tfxio import record_based_tfxio
+from tfx_bsl.tfxio import tensor_adapter
+from tfx_bsl.tfxio import tensor_representation_util
+from tfx_bsl.tfxio import tfxio
+
+from tensorflow_metadata.proto.v0 import schema_pb2
+
+# File name suffix of Parquet files.
+FILE_NAME_SUFFIX = '.parquet'
+
+# Parquet compression codecs supported when writing.
+COMPRESSION_GZIP = 'gzip'
+COMPRESSION_NONE = 'none'
+COMPRESSION_SNAPPY = 'snappy'
+
+# Size of a shard if neither the number of shards nor a shard size is given.
+_DEFAULT_SHARD_SIZE_BYTES = 128 << 20
+
+# Number of rows converted to tf.Examples at a time by ReadSerializedExamples.
+_DEFAULT_ROWS_PER_BATCH = 1024
+
+OneOrMorePatterns = Union[Text, List[Text]]
+
+
+def _GetFiles(file_pattern: OneOrMorePatterns) -> List[Text]:
+  patterns = [file_pattern] if isinstance(file_pattern, str) else file_pattern
+  files = []
+  for pattern in patterns:
+    files.extend(sorted(fileio.glob(pattern)))
+  return files
+
+
+def _OpenParquetFile(path: Text) -> pq.ParquetFile:
+  if '://' not in path:
+    # Local files are memory-mapped so that reading a column does not copy it.
+    return pq.ParquetFile(pa.memory_map(path, 'r'))
+  return pq.ParquetFile(fileio.open(path, 'rb'))
+
+
+def _GetTmpDir(file_path_prefix: Text) -> Text:
+  """Returns the directory of partially written files.
+
+  It is a sibling of the directory of the written files, so that readers of
+  that directory never match partially written files.
+  """
+  output_dir = os.path.dirname(file_path_prefix.rstrip('/'))
+  return os.path.join(
+      os.path.dirname(output_dir), '.tmp-' + os.path.basename(output_dir))
+
+
+def _RemoveDir(unused_num_files: int, path: Text) -> None:
+  if fileio.exists(path):
+    fileio.rmtree(path)
+
+
+def _ToRecordBatch(table: pa.Table) -> pa.RecordBatch:
+  """Converts a non-empty table to a single record batch."""
+  return table.combine_chunks().to_batches()[0]
+
+
+def _AlignToSchema(record_batch: pa.RecordBatch,
+                   arrow_schema: pa.Schema) -> pa.RecordBatch:
+  """Selects the columns of `arrow_schema`, filling missing ones with nulls."""
+  columns = []
+  for field in arrow_schema:
+    index = record_batch.schema.get_field_index(field.name)
+    if index < 0:
+      columns.append(
+          pa.array([None] * record_batch.num_rows, type=field.type))
+    else:
+      columns.append(record_batch.column(index))
+  return pa.RecordBatch.from_arrays(columns, schema=arrow_schema)
+
+
+def _MergeArrowSchemas(schemas: List[pa.Schema]) -> pa.Schema:
+  """Merges the schemas of record batches decoded without a TFMD schema.
+
+  A feature absent from all examples of a batch is decoded with the null type;
+  the type of the same feature in other batches takes precedence.
+
+  Args:
+    schemas: Arrow schemas to merge.
+
+  Returns:
+    A schema with the union of the fields of `schemas`, sorted by name.
+
+  Raises:
+    ValueError: if a feature has different non-null types.
+  """
+  types = {}
+  for schema in schemas:
+    for field in schema:
+      existing = types.get(field.name)
+      if existing is None or pa.types.is_null(existing):
+        types[field.name] = field.type
+      elif not pa.types.is_null(field.type) and existing != field.type:
+        raise ValueError('Feature {} has conflicting types {} and {}.'.format(
+            field.name, existing, field.type))
+  return pa.schema([pa.field(name, types[name]) for name in sorted(types)])
+
+
+class _MergeArrowSchemasFn(beam.CombineFn):
+  """Merges Arrow schemas into a single schema."""
+
+  def create_accumulator(self):
+    return pa.schema([])
+
+  def add_input(self, accumulator, schema):
+    return _MergeArrowSchemas([accumulator, schema])
+
+  def merge_accumulators(self, accumulators):
+    return _MergeArrowSchemas(list(accumulators))
+
+  def extract_output(self, accumulator):
+    return accumulator
+
+
+def _Fingerprint(example: bytes) -> int:
+  return int.from_bytes(hashlib.sha256(example).digest()[:8], 'big')
+
+
+def _AssignShards(
+    element: Tuple[List[int], pa.RecordBatch],
+    num_shards: int) -> Iterator[Tuple[int, pa.RecordBatch]]:
+  """Splits a record batch by the shards of its rows.
+
+  Rows are assigned to shards deterministically by the fingerprint of their
+  serialized example, as the TFRecord shards of ExampleGen.
+
+  Args:
+    element: The fingerprints of the rows of a record batch, and the batch.
+    num_shards: Number of shards.
+
+  Yields:
+    Tuples of a shard index and the rows of the batch assigned to it.
+  """
+  fingerprints, record_batch = element
+  rows_by_shard = collections.defaultdict(list)
+  for row, fingerprint in enumerate(fingerprints):
+    rows_by_shard[fingerprint % num_shards].append(row)
+  for shard_index, rows in rows_by_shard.items():
+    if len(rows) == record_batch.num_rows:
+      yield shard_index, record_batch
+    else:
+      yield shard_index, record_batch.take(pa.array(rows))
+
+
+class _DecodeExamplesFn(beam.DoFn):
+  """Decodes batches of serialized tf.Examples to Arrow RecordBatches.
+
+  The fingerprint of every serialized example is output with the batch.
+  """
+
+  def __init__(self, schema: Optional[schema_pb2.Schema]):
+    self._serialized_schema = schema.SerializeToString() if schema else None
+
+  def setup(self):
+    args = ([] if self._serialized_schema is None
+            else [self._serialized_schema])
+    self._decoder = example_coder.ExamplesToRecordBatchDecoder(*args)
+
+  def process(
+      self,
+      examples: List[bytes]) -> Iterator[Tuple[List[int], pa.RecordBatch]]:
+    yield ([_Fingerprint(example) for example in examples],
+           self._decoder.DecodeBatch(examples))
+
+
+class _WriteParquetShardFn(beam.DoFn):
+  """Writes a group of record batches as a single Parquet file."""
+
+  def __init__(self, file_path_prefix: Text, compression: Text,
+               tmp_dir: Text):
+    self._file_path_prefix = file_path_prefix
+    self._compression = compression
+    self._tmp_dir = tmp_dir
+
+  def process(self, element, arrow_schema, shard_indices):
+    shard_index, record_batches = element
+    # Shards to which no row was assigned are not written, so the written
+    # shards are numbered densely.
+    shard_indices = sorted(shard_indices)
+    path = '{}-{:05d}-of-{:05d}{}'.format(self._file_path_prefix,
+                                          shard_indices.index(shard_index),
+                                          len(shard_indices), FILE_NAME_SUFFIX)
+    # Write to a temporary file first so that a retried bundle never leaves a
+    # partially written shard behind.
+    fileio.makedirs(self._tmp_dir)
+    tmp_path = os.path.join(
+        self._tmp_dir, '{}.tmp-{}'.format(os.path.basename(path),
+                                          uuid.uuid4().hex))
+    with fileio.open(tmp_path, 'wb') as f:
+      writer = pq.ParquetWriter(
+          f, arrow_schema, compression=self._compression)
+      for record_batch in record_batches:
+        # Each record batch becomes a row group.
+        writer.write_table(
+            pa.Table.from_batches([_AlignToSchema(record_batch,
+                                                  arrow_schema)]))
+      writer.close()
+    fileio.rename(tmp_path, path, overwrite=True)
+    yield path
+
+
+@beam.ptransform_fn
+@beam.typehints.with_input_types(bytes)
+@beam.typehints.with_output_types(Text)
+def WriteExamplesToParquet(
+    examples: beam.pvalue.PCollection,
+    file_path_prefix: Text,
+    schema: Optional[schema_pb2.Schema] = None,
+    num_shards: int = 0,
+    target_shard_size_bytes: int = 0,
+    compression: Text = COMPRESSION_SNAPPY) -> beam.pvalue.PCollection:
+  """Writes serialized tf.Examples as Parquet files.
+
+  Examples are assigned to files by their fingerprint, so that the same
+  examples are always written to the same files. Files to which no example is
+  assigned are not written.
+
+  Args:
+    examples: PCollection of serialized tf.Examples.
+    file_path_prefix: Prefix of the written files, which are named
+      `<prefix>-<shard index>-of-<num shards>.parquet`.
+    schema: Optional TFMD schema of the examples. If not given, the columns and
+      their types are inferred from the examples.
+    num_shards: Number of files to write. If 0, the number of files is
+      derived from `target_shard_size_bytes`.
+    target_shard_size_bytes: Approximate uncompressed size of a file. Defaults
+      to 128MiB if neither this nor `num_shards` is set.
+    compression: Parquet compression codec.
+
+  Returns:
+    PCollection of the paths of the written files.
+  """
+  decoded = (
+      examples
+      | 'Batch' >> beam.BatchElements()
+      | 'Decode' >> beam.ParDo(_DecodeExamplesFn(schema)))
+  record_batches = decoded | 'RecordBatches' >> beam.Values()
+  if schema is not None:
+    arrow_schema = beam.pvalue.AsSingleton(
+        examples.pipeline
+        | 'CreateArrowSchema' >> beam.Create([
+            example_coder.ExamplesToRecordBatchDecoder(
+                schema.SerializeToString()).ArrowSchema()
+        ]))
+  else:
+    arrow_schema = beam.pvalue.AsSingleton(
+        record_batches
+        | 'GetArrowSchema' >> beam.Map(lambda rb: rb.schema)
+        | 'MergeArrowSchemas' >> beam.CombineGlobally(_MergeArrowSchemasFn()))
+
+  if num_shards:
+    shard_count = beam.pvalue.AsSingleton(
+        examples.pipeline | 'CreateNumShards' >> beam.Create([num_shards]))
+  else:
+    shard_size = target_shard_size_bytes or _DEFAULT_SHARD_SIZE_BYTES
+    shard_count = beam.pvalue.AsSingleton(
+        record_batches
+        | 'RecordBatchSize' >> beam.Map(lambda rb: rb.nbytes)
+        | 'TotalSize' >> beam.CombineGlobally(sum)
+        | 'NumShards' >> beam.Map(
+            lambda size: max(1, int(math.ceil(size / shard_size)))))
+
+  tmp_dir = _GetTmpDir(file_path_prefix)
+  shards = (
+      decoded
+      | 'AssignShard' >> beam.FlatMap(_AssignShards, num_shards=shard_count)
+      | 'GroupByShard' >> beam.GroupByKey())
+  paths = (
+      shards
+      | 'Write' >> beam.ParDo(
+          _WriteParquetShardFn(file_path_prefix, compression, tmp_dir),
+          arrow_schema=arrow_schema,
+          shard_indices=beam.pvalue.AsList(
+              shards | 'ShardIndex' >> beam.Keys())))
+  _ = (paths
+       | 'CountFiles' >> beam.combiners.Count.Globally()
+       | 'RemoveTmpDir' >> beam.Map(_RemoveDir, path=tmp_dir))
+  return paths
+
+
+def _SetFeature(example: tf.train.Example, name: Text,
+                value_type: pa.DataType, values: Optional[List[Any]]):
+  """Sets the values of a tf.Example feature from a list column value.
+
+  Null values, i.e. features absent from the example, are not set, as even
+  accessing a feature adds it to the example.
+  """
+  if values is None:
+    return
+  feature = example.features.feature[name]
+  if pa.types.is_integer(value_type):
+    feature.int64_list.value.extend(values)
+  elif pa.types.is_floating(value_type):
+    feature.float_list.value.extend(values)
+  else:
+    feature.bytes_list.value.extend(values)
+
+
+def _ToSerializedExamples(record_batch: pa.RecordBatch) -> List[bytes]:
+  """Encodes the rows of a record batch as serialized tf.Examples.
+
+  List columns hold the values of the features, and scalar columns (e.g. of
+  Parquet files not written by TFX) hold single-valued features.
+  """
+  columns = []
+  for field, column in zip(record_batch.schema, record_batch.columns):
+    # Features absent from all examples have the null type.
+    if pa.types.is_null(field.type):
+      continue
+    values = column.to_pylist()
+    if pa.types.is_list(field.type) or pa.types.is_large_list(field.type):
+      value_type = field.type.value_type
+    else:
+      value_type = field.type
+      values = [None if v is None else [v] for v in values]
+    columns.append((field.name, value_type, values))
+  result = []
+  for row in range(record_batch.num_rows):
+    example = tf.train.Example()
+    for name, value_type, values in columns:
+      _SetFeature(example, name, value_type, values[row])
+    result.append(example.SerializeToString())
+  return result
+
+
+def ReadSerializedExamples(
+    file_pattern: OneOrMorePatterns,
+    batch_size: int = _DEFAULT_ROWS_PER_BATCH) -> Iterator[bytes]:
+  """Reads the rows of Parquet files as serialized tf.Examples.
+
+  Rows are encoded one at a time, so this is meant for reading a few examples
+  (e.g. to build model server requests) rather than for bulk reads.
+
+  Args:
+    file_pattern: One or a list of glob patterns of the Parquet files.
+    batch_size: Number of rows converted to Python values at a time.
+
+  Yields:
+    Serialized tf.Examples, in file order.
+  """
+  for path in _GetFiles(file_pattern):
+    parquet_file = _OpenParquetFile(path)
+    for row_group in range(parquet_file.num_row_groups):
+      table = parquet_file.read_row_group(row_group)
+      for record_batch in table.to_batches(max_chunksize=batch_size):
+        for example in _ToSerializedExamples(record_batch):
+          yield example
+
+
+def _InferTensorRepresentations(
+    arrow_schema: pa.Schema) -> tensor_adapter.TensorRepresentations:
+  """Represents each list column as a VarLenSparseTensor."""
+  result = {}
+  for field in arrow_schema:
+    if pa.types.is_list(field.type) or pa.types.is_large_list(field.type):
+      result[field.name] = schema_pb2.TensorRepresentation(
+          varlen_sparse_tensor=schema_pb2.TensorRepresentation
+          .VarLenSparseTensor(column_name=field.name))
+  return result
+
+
+def _AppendRawRecordColumn(record_batch: pa.RecordBatch,
+                           raw_record_column_name: Text) -> pa.RecordBatch:
+  raw_record_column = record_based_tfxio.CreateRawRecordColumn(
+      _ToSerializedExamples(record_batch))
+  return pa.RecordBatch.from_arrays(
+      list(record_batch.columns) + [raw_record_column],
+      list(record_batch.schema.names) + [raw_record_column_name])
+
+
+def _Rebatch(record_batches: Iterator[pa.RecordBatch], batch_size: int,
+             drop_final_batch: bool) -> Iterator[pa.RecordBatch]:
+  """Regroups record batches into batches of exactly `batch_size` rows.
+
+  Rows are carried over across the input batches, so only the final batch may
+  have fewer rows.
+
+  Args:
+    record_batches: Record batches of the same schema.
+    batch_size: Number of rows of a batch.
+    drop_final_batch: Whether to drop the final batch if it has fewer rows.
+
+  Yields:
+    Record batches of `batch_size` rows.
+  """
+  pending = []
+  num_pending_rows = 0
+  for record_batch in record_batches:
+    pending.append(record_batch)
+    num_pending_rows += record_batch.num_rows
+    if num_pending_rows < batch_size:
+      continue
+    table = pa.Table.from_batches(pending)
+    offset = 0
+    while num_pending_rows - offset >= batch_size:
+      yield _ToRecordBatch(table.slice(offset, batch_size))
+      offset += batch_size
+    pending = table.slice(offset).to_batches()
+    num_pending_rows -= offset
+  if num_pending_rows and not drop_final_batch:
+    yield _ToRecordBatch(pa.Table.from_batches(pending))
+
+
+def _ShuffleRows(record_batches: Iterator[pa.RecordBatch], buffer_size: int,
+                 rng: random.Random) -> Iterator[pa.RecordBatch]:
+  """Shuffles the rows within consecutive blocks of `buffer_size` rows."""
+  buffered = []
+  num_buffered_rows = 0
+  for record_batch in record_batches:
+    buffered.append(record_batch)
+    num_buffered_rows += record_batch.num_rows
+    if num_buffered_rows < buffer_size:
+      continue
+    yield _ShuffledRecordBatch(buffered, rng)
+    buffered = []
+    num_buffered_rows = 0
+  if num_buffered_rows:
+    yield _ShuffledRecordBatch(buffered, rng)
+
+
+def _ShuffledRecordBatch(record_batches: List[pa.RecordBatch],
+                         rng: random.Random) -> pa.RecordBatch:
+  record_batch = _ToRecordBatch(pa.Table.from_batches(record_batches))
+  indices = list(range(record_batch.num_rows))
+  rng.shuffle(indices)
+  return record_batch.take(pa.array(indices))
+
+
+def _TensorComponents(value: Any) -> List[Any]:
+  """Flattens a non-eager tensor value into its components like tf.nest."""
+  if isinstance(value, tf.compat.v1.SparseTensorValue):
+    return [value.indices, value.values, value.dense_shape]
+  if isinstance(value, tf.compat.v1.ragged.RaggedTensorValue):
+    return [value.flat_values] + list(value.nested_row_splits)
+  return [value]
+
+
+class ParquetTFXIO(tfxio.TFXIO):
+  """TFXIO reading Examples stored as Parquet files."""
+
+  def __init__(self,
+               file_pattern: OneOrMorePatterns,
+               schema: Optional[schema_pb2.Schema] = None,
+               telemetry_descriptors: Optional[List[Text]] = None,
+               column_names: Optional[List[Text]] = None,
+               tensor_representations: Optional[
+                   tensor_adapter.TensorRepresentations] = None,
+               raw_record_column_name: Optional[Text] = None):
+    """Initializes a ParquetTFXIO.
+
+    Args:
+      file_pattern: One or a list of glob patterns of the Parquet files.
+      schema: Optional TFMD schema of the examples. If not given, the Arrow
+        schema is read from the first file.
+      telemetry_descriptors: Descriptors identifying the component reading the
+        data.
+      column_names: Names of the columns to read. All columns if not given.
+      tensor_representations: Tensor representations of the columns. Derived
+        from `schema` (or the Arrow schema) if not given.
+      raw_record_column_name: If not None, the record batches contain a column
+        of this name with the rows encoded as serialized tf.Examples.
+    """
+    self._file_pattern = file_pattern
+    self._schema = schema
+    self._telemetry_descriptors = telemetry_descriptors
+    self._column_names = column_names
+    self._tensor_representations = tensor_representations
+    self._raw_record_column_name = raw_record_column_name
+    self._arrow_schema = None
+
+  @property
+  def telemetry_descriptors(self) -> Optional[List[Text]]:
+    return self._telemetry_descriptors
+
+  @property
+  def raw_record_column_name(self) -> Optional[Text]:
+    return self._raw_record_column_name
+
+  def _FullArrowSchema(self) -> pa.Schema:
+    if self._schema is not None:
+      return example_coder.ExamplesToRecordBatchDecoder(
+          self._schema.SerializeToString()).ArrowSchema()
+    files = _GetFiles(self._file_pattern)
+    if not files:
+      raise ValueError('No Parquet files match {}.'.format(self._file_pattern))
+    return _OpenParquetFile(files[0]).schema.to_arrow_schema()
+
+  def ArrowSchema(self) -> pa.Schema:
+    if self._arrow_schema is None:
+      arrow_schema = self._FullArrowSchema()
+      if self._column_names is not None:
+        arrow_schema = pa.schema([
+            arrow_schema.field(arrow_schema.get_field_index(name))
+            for name in self._column_names
+        ])
+      if self._raw_record_column_name is not None:
+        if arrow_schema.get_field_index(self._raw_record_column_name) >= 0:
+          raise ValueError(
+              'Raw record column name {} collided with a column in the schema.'
+              .format(self._raw_record_column_name))
+        arrow_schema = arrow_schema.append(
+            pa.field(self._raw_record_column_name,
+                     pa.large_list(pa.large_binary())))
+      self._arrow_schema = arrow_schema
+    return self._arrow_schema
+
+  def TensorRepresentations(self) -> tensor_adapter.TensorRepresentations:
+    if self._tensor_representations is None:
+      if self._schema is not None:
+        result = tensor_representation_util.GetTensorRepresentationsFromSchema(
+            self._schema)
+        if result is None:
+          result = (
+              tensor_representation_util.InferTensorRepresentationsFromSchema(
+                  self._schema))
+      else:
+        result = _InferTensorRepresentations(self._FullArrowSchema())
+      self._tensor_representations = result
+    return self._tensor_representations
+
+  def _ProjectImpl(self, tensor_names: List[Text]) -> tfxio.TFXIO:
+    tensor_representations = {
+        name: representation
+        for name, representation in self.TensorRepresentations().items()
+        if name in tensor_names
+    }
+    column_names = set()
+    for representation in tensor_representations.values():
+      for column_path in (
+          tensor_representation_util.GetSourceColumnsFromTensorRepresentation(
+              representation)):
+        column_names.add(column_path.steps()[0])
+    return ParquetTFXIO(
+        self._file_pattern,
+        schema=self._schema,
+        telemetry_descriptors=self._telemetry_descriptors,
+        column_names=[
+            field.name for field in self.ArrowSchema()
+            if field.name in column_names
+        ],
+        tensor_representations=tensor_representations,
+        raw_record_column_name=self._raw_record_column_name)
+
+  def _ReadRecordBatches(self, files: List[Text],
+                         batch_size: Optional[int]) -> Iterator[pa.RecordBatch]:
+    arrow_schema = self.ArrowSchema()
+    columns = [field.name for field in arrow_schema]
+    for path in files:
+      parquet_file = _OpenParquetFile(path)
+      if self._raw_record_column_name is not None:
+        # The raw records are encoded from all the columns.
+        file_columns = None
+      else:
+        file_columns = [
+            name for name in columns
+            if parquet_file.schema.to_arrow_schema().get_field_index(name) >= 0
+        ]
+      for row_group in range(parquet_file.num_row_groups):
+        table = parquet_file.read_row_group(row_group, columns=file_columns)
+        for record_batch in table.to_batches(max_chunksize=batch_size):
+          if self._raw_record_column_name is not None:
+            record_batch = _AppendRawRecordColumn(
+                record_batch, self._raw_record_column_name)
+          yield _AlignToSchema(record_batch, arrow_schema)
+
+  def BeamSource(self, batch_size: Optional[int] = None) -> beam.PTransform:
+
+    @beam.typehints.with_input_types(beam.Pipeline)
+    @beam.typehints.with_output_types(pa.RecordBatch)
+    def _PTransformFn(pipeline: beam.pvalue.PBegin):
+      return (pipeline
+              | 'CreateFilePatterns' >> beam.Create(
+                  [self._file_pattern] if isinstance(self._file_pattern, str)
+                  else self._file_pattern)
+              | 'MatchFiles' >> beam.FlatMap(_GetFiles)
+              | 'Reshuffle' >> beam.Reshuffle()
+              | 'ReadRecordBatches' >> beam.FlatMap(
+                  lambda path: self._ReadRecordBatches([path], batch_size)))
+
+    return beam.ptransform_fn(_PTransformFn)()
+
+  def RecordBatches(
+      self, options: dataset_options.RecordBatchesOptions
+  ) -> Iterator[pa.RecordBatch]:
+    files = _GetFiles(self._file_pattern)
+    # A single generator makes the order differ between epochs.
+    rng = random.Random(options.shuffle_seed)
+
+    def _ReadEpochs():
+      epoch = 0
+      while options.num_epochs is None or epoch < options.num_epochs:
+        if options.shuffle:
+          rng.shuffle(files)
+        record_batches = self._ReadRecordBatches(files, options.batch_size)
+        if options.shuffle:
+          record_batches = _ShuffleRows(record_batches,
+                                        options.shuffle_buffer_size, rng)
+        for record_batch in record_batches:
+          yield record_batch
+        epoch += 1
+
+    # Batches span row groups, files and epochs, like the batches of a
+    # tf.data.Dataset that is repeated before being batched.
+    return _Rebatch(_ReadEpochs(), options.batch_size,
+                    options.drop_final_batch)
+
+  def TensorFlowDataset(
+      self,
+      options: dataset_options.TensorFlowDatasetOptions) -> tf.data.Dataset:
+    adapter = self.TensorAdapter()
+    type_specs = adapter.TypeSpecs()
+    # Before TF 2.4, generators can only produce dense tensors, so they
+    # produce the components of the tensors, which are packed afterwards.
+    component_specs = tf.nest.flatten(type_specs, expand_composites=True)
+
+    def _Generator():
+      for record_batch in self._ReadRecordBatches(
+          _GetFiles(self._file_pattern), options.batch_size):
+        tensors = adapter.ToBatchTensors(
+            record_batch, produce_eager_tensors=False)
+        # tf.nest orders the values of a dict by key.
+        yield tuple(component for name in sorted(tensors)
+                    for component in _TensorComponents(tensors[name]))
+
+    def _Pack(*components):
+      return tf.nest.pack_sequence_as(
+          type_specs, list(components), expand_composites=True)
+
+    dataset = tf.data.Dataset.from_generator(
+        _Generator,
+        output_types=tuple(spec.dtype for spec in component_specs),
+        output_shapes=tuple(spec.shape for spec in component_specs))
+    dataset = dataset.map(_Pack).unbatch()
+    if options.shuffle:
+      dataset = dataset.shuffle(
+          options.shuffle_buffer_size, seed=options.shuffle_seed)
+    dataset = dataset.repeat(options.num_epochs).batch(
+        options.batch_size, drop_remainder=options.drop_final_batch)
+    if options.label_key is not None:
+      label_key = options.label_key
+      dataset = dataset.map(lambda features: (  # pylint: disable=g-long-lambda
+          {k: v for k, v in features.items() if k != label_key},
+          features[label_key]))
+    return dataset.prefetch(tf.data.experimental.AUTOTUNE)
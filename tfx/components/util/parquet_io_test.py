@@ -0,0 +1,212 @@
+# Lint as: python3
+# Copyright 2020 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for tfx.components.util.parquet_io."""
+
+import os
+
+import apache_beam as beam
+import pyarrow as pa
+from pyarrow import parquet as pq
+import tensorflow as tf
+from tfx.components.util import parquet_io
+from tfx.dsl.io import fileio
+from tfx_bsl.tfxio import dataset_options
+
+from google.protobuf import text_format
+from tensorflow_metadata.proto.v0 import schema_pb2
+
+_SCHEMA = text_format.Parse(
+    """
+feature {
+  name: "i"
+  type: INT
+}
+feature {
+  name: "f"
+  type: FLOAT
+}
+feature {
+  name: "s"
+  type: BYTES
+}
+""", schema_pb2.Schema())
+
+
+def _MakeExample(index):
+  example = tf.train.Example()
+  example.features.feature['i'].int64_list.value.append(index)
+  example.features.feature['f'].float_list.value.append(index / 2.0)
+  if index % 2:
+    example.features.feature['s'].bytes_list.value.append(b'odd')
+  return example.SerializeToString()
+
+
+class ParquetIoTest(tf.test.TestCase):
+
+  def setUp(self):
+    super(ParquetIoTest, self).setUp()
+    self._output_dir = os.path.join(
+        os.environ.get('TEST_UNDECLARED_OUTPUTS_DIR', self.get_temp_dir()),
+        self._testMethodName)
+    self._examples = [_MakeExample(i) for i in range(10)]
+
+  def _Write(self, schema=None, num_shards=2):
+    with beam.Pipeline() as p:
+      _ = (
+          p
+          | beam.Create(self._examples)
+          | parquet_io.WriteExamplesToParquet(
+              os.path.join(self._output_dir, 'data'),
+              schema=schema,
+              num_shards=num_shards))
+    return os.path.join(self._output_dir, 'data-*')
+
+  def _ReadAll(self, tfxio, **kwargs):
+    kwargs.setdefault('batch_size', 100)
+    record_batches = list(
+        tfxio.RecordBatches(
+            dataset_options.RecordBatchesOptions(num_epochs=1, **kwargs)))
+    return [
+        row for rb in record_batches for row in zip(
+            *[rb.column(i).to_pylist() for i in range(rb.num_columns)])
+    ]
+
+  def testWriteAndRead(self):
+    file_pattern = self._Write(schema=_SCHEMA)
+    self.assertCountEqual(['data-00000-of-00002.parquet',
+                           'data-00001-of-00002.parquet'],
+                          fileio.listdir(self._output_dir))
+    self.assertFalse(
+        fileio.exists(os.path.join(os.path.dirname(self._output_dir),
+                                   '.tmp-' + self._testMethodName)))
+    tfxio = parquet_io.ParquetTFXIO(file_pattern, schema=_SCHEMA)
+    self.assertEqual(['f', 'i', 's'], sorted(tfxio.ArrowSchema().names))
+    rows = self._ReadAll(tfxio.Project(['i']))
+    self.assertCountEqual([([i],) for i in range(10)], rows)
+
+  def testWriteDenseDeterministicShards(self):
+
+    def Write():
+      self._Write(schema=_SCHEMA, num_shards=20)
+      files = sorted(fileio.listdir(self._output_dir))
+      contents = [
+          sorted(pq.read_table(os.path.join(self._output_dir, f)).column(
+              'i').to_pylist()) for f in files
+      ]
+      fileio.rmtree(self._output_dir)
+      return files, contents
+
+    files, contents = Write()
+    # Shards without examples are skipped when numbering.
+    self.assertLess(len(files), 20)
+    self.assertEqual([
+        'data-{:05d}-of-{:05d}.parquet'.format(i, len(files))
+        for i in range(len(files))
+    ], files)
+    self.assertCountEqual([[i] for i in range(10)], sum(contents, []))
+    self.assertEqual((files, contents), Write())
+
+  def testWriteAndReadWithoutSchema(self):
+    file_pattern = self._Write(num_shards=1)
+    tfxio = parquet_io.ParquetTFXIO(file_pattern)
+    self.assertEqual(['f', 'i', 's'], tfxio.ArrowSchema().names)
+    self.assertEqual(['f', 'i', 's'],
+                     sorted(tfxio.TensorRepresentations().keys()))
+    projected = tfxio.Project(['s'])
+    self.assertEqual(['s'], projected.ArrowSchema().names)
+    rows = self._ReadAll(projected)
+    self.assertCountEqual([([b'odd'],) if i % 2 else (None,)
+                           for i in range(10)], rows)
+
+  def testTensorFlowDataset(self):
+    file_pattern = self._Write(schema=_SCHEMA, num_shards=1)
+    tfxio = parquet_io.ParquetTFXIO(file_pattern, schema=_SCHEMA)
+    dataset = tfxio.Project(['i', 'f']).TensorFlowDataset(
+        dataset_options.TensorFlowDatasetOptions(
+            batch_size=4, num_epochs=1, label_key='i'))
+    labels = []
+    for features, label in dataset:
+      self.assertEqual(['f'], list(features.keys()))
+      labels.extend(tf.sparse.to_dense(label).numpy().flatten().tolist())
+    self.assertCountEqual(list(range(10)), labels)
+
+  def testRecordBatchesDropsOnlyFinalBatch(self):
+    # Batches span the row groups and files of both epochs.
+    tfxio = parquet_io.ParquetTFXIO(self._Write(schema=_SCHEMA), schema=_SCHEMA)
+    record_batches = list(
+        tfxio.RecordBatches(
+            dataset_options.RecordBatchesOptions(
+                batch_size=3, drop_final_batch=True, num_epochs=2)))
+    self.assertEqual([3] * 6, [rb.num_rows for rb in record_batches])
+
+    record_batches = list(
+        tfxio.RecordBatches(
+            dataset_options.RecordBatchesOptions(batch_size=3, num_epochs=2)))
+    self.assertEqual([3] * 6 + [2], [rb.num_rows for rb in record_batches])
+
+  def testRecordBatchesShuffle(self):
+    tfxio = parquet_io.ParquetTFXIO(
+        self._Write(schema=_SCHEMA, num_shards=1), schema=_SCHEMA)
+    record_batches = list(
+        tfxio.Project(['i']).RecordBatches(
+            dataset_options.RecordBatchesOptions(
+                batch_size=10, shuffle=True, shuffle_seed=1, num_epochs=2)))
+    epochs = [rb.column(0).flatten().to_pylist() for rb in record_batches]
+    self.assertLen(epochs, 2)
+    self.assertCountEqual(list(range(10)), epochs[0])
+    self.assertCountEqual(list(range(10)), epochs[1])
+    # Rows within a file are shuffled, differently in each epoch.
+    self.assertNotEqual(sorted(epochs[0]), epochs[0])
+    self.assertNotEqual(epochs[0], epochs[1])
+
+  def testRawRecords(self):
+    file_pattern = self._Write(num_shards=1)
+    tfxio = parquet_io.ParquetTFXIO(
+        file_pattern, column_names=[], raw_record_column_name='raw')
+    self.assertEqual(['raw'], tfxio.ArrowSchema().names)
+    rows = self._ReadAll(tfxio)
+    self.assertCountEqual(
+        [tf.train.Example.FromString(e) for e in self._examples],
+        [tf.train.Example.FromString(row[0][0]) for row in rows])
+
+  def testReadSerializedExamples(self):
+    file_pattern = self._Write(num_shards=1)
+    examples = list(
+        parquet_io.ReadSerializedExamples(file_pattern, batch_size=3))
+    self.assertCountEqual(
+        [tf.train.Example.FromString(e) for e in self._examples],
+        [tf.train.Example.FromString(e) for e in examples])
+
+  def testReadSerializedExamplesWithScalarColumns(self):
+    fileio.makedirs(self._output_dir)
+    path = os.path.join(self._output_dir, 'scalars.parquet')
+    pq.write_table(
+        pa.Table.from_arrays(
+            [pa.array([1, None]), pa.array([b'a', b'b'])], ['i', 's']), path)
+    expected = []
+    for i, s in ((1, b'a'), (None, b'b')):
+      example = tf.train.Example()
+      if i is not None:
+        example.features.feature['i'].int64_list.value.append(i)
+      example.features.feature['s'].bytes_list.value.append(s)
+      expected.append(example)
+    self.assertEqual(
+        expected,
+        [tf.train.Example.FromString(e)
+         for e in parquet_io.ReadSerializedExamples(path)])
+
+
+if __name__ == '__main__':
+  tf.test.main()
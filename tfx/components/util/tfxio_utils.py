@@ -23,8 +23,10 @@ from typing import Callable, List, Iterator, Optional, Text, Tuple, Union
 
 import pyarrow as pa
 import tensorflow as tf
+from tfx.components.example_gen import utils as example_gen_utils
 from tfx.components.experimental.data_view import constants
 from tfx.components.util import examples_utils
+from tfx.components.util import parquet_io
 from tfx.proto import example_gen_pb2
 from tfx.types import artifact
 from tfx.types import standard_artifacts
@@ -116,7 +118,8 @@ def get_tfxio_factory_from_artifact(
     schema: TFMD schema. Note that without a schema, some TFXIO interfaces
       in certain TFXIO implementations might not be available.
     read_as_raw_records: If True, ignore the payload type of `examples`. Always
-      use RawTfRecord TFXIO.
+      use RawTfRecord TFXIO, except for FORMAT_PARQUET, whose rows are read as
+      serialized tf.Examples.
     raw_record_column_name: If provided, the arrow RecordBatch produced by
       the TFXIO will contain a string column of the given name, and the contents
       of that column will be the raw records. Note that not all TFXIO supports
@@ -197,9 +200,14 @@ def get_record_batch_factory_from_artifact(
       to contain metrics for profiling and are therefore expected to be
       identifiers of the component itself and not individual instances of source
       use.
+
+  Raises:
+    ValueError: if the recorded compression of the artifacts cannot be read
+      into a tf.data.Dataset.
   """
   payload_format, data_view_uri = resolve_payload_format_and_data_view_uri(
       examples)
+  _check_compression_readable_by_tf_data(examples, payload_format)
 
   def record_batch_factory(
       file_pattern: List[Text], options: dataset_options.RecordBatchesOptions,
@@ -238,7 +246,8 @@ def make_tfxio(file_pattern: OneOrMorePatterns,
       schema in order for all TFXIO interfaces (e.g. TensorAdapter()) to work.
       Unless you know what you are doing, always supply a schema.
     read_as_raw_records: If True, ignore the payload type of `examples`. Always
-      use RawTfRecord TFXIO.
+      use RawTfRecord TFXIO, except for FORMAT_PARQUET, whose rows are read as
+      serialized tf.Examples.
     raw_record_column_name: If provided, the arrow RecordBatch produced by
       the TFXIO will contain a string column of the given name, and the contents
       of that column will be the raw records. Note that not all TFXIO supports
@@ -255,6 +264,13 @@ def make_tfxio(file_pattern: OneOrMorePatterns,
     assert raw_record_column_name is not None, (
         'read_as_raw_records is specified - '
         'must provide raw_record_column_name')
+    if payload_format == example_gen_pb2.PayloadFormat.FORMAT_PARQUET:
+      # The raw records of Parquet files are the rows encoded as tf.Examples.
+      return parquet_io.ParquetTFXIO(
+          file_pattern=file_pattern,
+          telemetry_descriptors=telemetry_descriptors,
+          column_names=[],
+          raw_record_column_name=raw_record_column_name)
     return raw_tf_record.RawTfRecordTFXIO(
         file_pattern=file_pattern,
         raw_record_column_name=raw_record_column_name,
@@ -284,6 +300,13 @@ def make_tfxio(file_pattern: OneOrMorePatterns,
         telemetry_descriptors=telemetry_descriptors,
         raw_record_column_name=raw_record_column_name)
 
+  if payload_format == example_gen_pb2.PayloadFormat.FORMAT_PARQUET:
+    return parquet_io.ParquetTFXIO(
+        file_pattern=file_pattern,
+        schema=schema,
+        telemetry_descriptors=telemetry_descriptors,
+        raw_record_column_name=raw_record_column_name)
+
   raise NotImplementedError(
       'Unsupport payload format: {}'.format(payload_format))
 
@@ -297,6 +320,38 @@ def _get_payload_format(examples: List[artifact.Artifact]) -> int:
   return payload_formats.pop()
 
 
+def _check_compression_readable_by_tf_data(examples: List[artifact.Artifact],
+                                           payload_format: int) -> None:
+  """Checks the compression recorded on Examples written by ExampleGen.
+
+  TFRecord datasets detect the compression of the files from their suffix,
+  which only works for gzipped and uncompressed files of a single compression.
+
+  Args:
+    examples: The Examples artifacts to read.
+    payload_format: The payload format of the artifacts.
+
+  Raises:
+    ValueError: if the artifacts record ZLIB or different compressions.
+  """
+  if examples_utils.is_columnar_payload_format(payload_format):
+    return
+  compressions = set(
+      examples_utils.get_compression(e)
+      for e in examples
+      if e.has_custom_property(example_gen_utils.COMPRESSION_PROPERTY_NAME))
+  if example_gen_pb2.WriteConfig.ZLIB in compressions:
+    raise ValueError(
+        'ZLIB compressed Examples cannot be read into a tf.data.Dataset. '
+        'Write them with GZIP or NONE compression.')
+  if len(compressions) > 1:
+    raise ValueError(
+        'Unable to read Examples artifacts of different compressions into a '
+        'tf.data.Dataset: {}'.format(sorted(
+            example_gen_pb2.WriteConfig.Compression.Name(c)
+            for c in compressions)))
+
+
 def _get_data_view_info(
     examples: artifact.Artifact) -> Optional[Tuple[Text, int]]:
   """Returns the payload format and data view URI and ID from examples."""
@@ -28,6 +28,7 @@ import tensorflow as tf
 
 from tfx.components.experimental.data_view import constants
 from tfx.components.util import examples_utils
+from tfx.components.util import parquet_io
 from tfx.components.util import tfxio_utils
 from tfx.proto import example_gen_pb2
 from tfx.types import standard_artifacts
@@ -276,6 +277,30 @@ class TfxioUtilsTest(tf.test.TestCase, parameterized.TestCase):
     self.assertEqual(Iterator[pa.RecordBatch],
                      inspect.signature(record_batch_factory).return_annotation)
 
+  def test_raise_if_compression_not_readable_by_tf_data(self):
+    zlib_examples = standard_artifacts.Examples()
+    examples_utils.set_payload_format(
+        zlib_examples, example_gen_pb2.PayloadFormat.FORMAT_TF_EXAMPLE)
+    examples_utils.set_write_layout(
+        zlib_examples, example_gen_pb2.WriteConfig.ZLIB, True, {})
+    with self.assertRaisesRegex(ValueError, 'ZLIB'):
+      tfxio_utils.get_tf_dataset_factory_from_artifact(
+          [zlib_examples], _TELEMETRY_DESCRIPTORS)
+
+    gzip_examples = standard_artifacts.Examples()
+    examples_utils.set_payload_format(
+        gzip_examples, example_gen_pb2.PayloadFormat.FORMAT_TF_EXAMPLE)
+    examples_utils.set_write_layout(
+        gzip_examples, example_gen_pb2.WriteConfig.GZIP, True, {})
+    uncompressed_examples = standard_artifacts.Examples()
+    examples_utils.set_payload_format(
+        uncompressed_examples, example_gen_pb2.PayloadFormat.FORMAT_TF_EXAMPLE)
+    examples_utils.set_write_layout(
+        uncompressed_examples, example_gen_pb2.WriteConfig.NONE, True, {})
+    with self.assertRaisesRegex(ValueError, 'different compressions'):
+      tfxio_utils.get_record_batch_factory_from_artifact(
+          [gzip_examples, uncompressed_examples], _TELEMETRY_DESCRIPTORS)
+
   def test_raise_if_data_view_uri_not_available(self):
     examples = standard_artifacts.Examples()
     examples_utils.set_payload_format(
@@ -284,6 +309,30 @@ class TfxioUtilsTest(tf.test.TestCase, parameterized.TestCase):
       tfxio_utils.get_tfxio_factory_from_artifact(
           [examples], _TELEMETRY_DESCRIPTORS)(_FAKE_FILE_PATTERN)
 
+  def test_make_tfxio_parquet(self):
+    tfxio = tfxio_utils.make_tfxio(
+        _FAKE_FILE_PATTERN, _TELEMETRY_DESCRIPTORS,
+        example_gen_pb2.PayloadFormat.FORMAT_PARQUET, schema=_SCHEMA)
+    self.assertIsInstance(tfxio, parquet_io.ParquetTFXIO)
+    self.assertEqual(tfxio.telemetry_descriptors, _TELEMETRY_DESCRIPTORS)
+    # Since we provide a schema, ArrowSchema() should not raise.
+    _ = tfxio.ArrowSchema()
+
+    tfxio = tfxio_utils.make_tfxio(
+        _FAKE_FILE_PATTERN, _TELEMETRY_DESCRIPTORS,
+        example_gen_pb2.PayloadFormat.FORMAT_PARQUET, schema=_SCHEMA,
+        raw_record_column_name=_RAW_RECORD_COLUMN_NAME)
+    self.assertEqual(_RAW_RECORD_COLUMN_NAME, tfxio.raw_record_column_name)
+    self.assertIn(_RAW_RECORD_COLUMN_NAME, tfxio.ArrowSchema().names)
+
+    tfxio = tfxio_utils.make_tfxio(
+        _FAKE_FILE_PATTERN, _TELEMETRY_DESCRIPTORS,
+        example_gen_pb2.PayloadFormat.FORMAT_PARQUET,
+        read_as_raw_records=True,
+        raw_record_column_name=_RAW_RECORD_COLUMN_NAME)
+    self.assertIsInstance(tfxio, parquet_io.ParquetTFXIO)
+    self.assertEqual(_RAW_RECORD_COLUMN_NAME, tfxio.raw_record_column_name)
+
   def test_raise_if_read_as_raw_but_raw_column_name_not_provided(self):
     examples = standard_artifacts.Examples()
     with self.assertRaisesRegex(AssertionError,
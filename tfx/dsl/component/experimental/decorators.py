@@ -177,12 +177,15 @@ def component(func: types.FunctionType) -> Callable[..., Any]:
     be passed for this argument. This value is tracked as an `Integer`, `Float`
     `String` or `Bytes` artifact (see `tfx.types.standard_artifacts`) whose
     value is read and passed into the given Python component function. Can be
-    an optional argument.
+    an optional argument. Values too large to be loaded into memory should be
+    taken as an `InputArtifact` of their artifact type instead.
   * `InputArtifact[ArtifactType]`: indicates that an input artifact object of
     type `ArtifactType` (deriving from `tfx.types.Artifact`) will be passed for
     this argument. This artifact is intended to be consumed as an input by this
     component (possibly reading from the path specified by its `.uri`). Can be
-    an optional argument by specifying a default value of `None`.
+    an optional argument by specifying a default value of `None`. The value of
+    a `ValueArtifact` input is not read until it is accessed, so it can instead
+    be streamed with `open_value()` or memory-mapped with `map_value()`.
   * `OutputArtifact[ArtifactType]`: indicates that an output artifact object of
     type `ArtifactType` (deriving from `tfx.types.Artifact`) will be passed for
     this argument. This artifact is intended to be emitted as an output by this
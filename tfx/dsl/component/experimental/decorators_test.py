@@ -86,6 +86,15 @@ if not six.PY2:
   def _verify(e: float, f: float):
     assert (e, f) == (32.0, 220.0), (e, f)
 
+  @component
+  def _streaming_component(
+      d: InputArtifact[standard_artifacts.Bytes]) -> OutputDict(e=Text):
+    # The value is not read before the artifact is passed.
+    assert not d._has_value  # pylint: disable=protected-access
+    with d.open_value() as f:
+      assert f.read() == b'bytes'
+    return {'e': 'passed'}
+
   @component
   def _injector_2(
       examples: OutputArtifact[standard_artifacts.Examples]
@@ -195,6 +204,21 @@ class ComponentDecoratorTest(tf.test.TestCase):
 
     beam_dag_runner.BeamDagRunner().run(test_pipeline)
 
+  def testBeamExecutionStreamingValueArtifact(self):
+    """Test execution with a value artifact streamed by the component."""
+    instance_1 = _injector_1(foo=9, bar='secret')
+    instance_2 = _streaming_component(d=instance_1.outputs['d'])
+
+    metadata_config = metadata.sqlite_metadata_connection_config(
+        self._metadata_path)
+    test_pipeline = pipeline.Pipeline(
+        pipeline_name='test_pipeline_1',
+        pipeline_root=self._test_dir,
+        metadata_connection_config=metadata_config,
+        components=[instance_1, instance_2])
+
+    beam_dag_runner.BeamDagRunner().run(test_pipeline)
+
   def testBeamExecutionFailure(self):
     """Test execution with return values; failure case."""
     instance_1 = _injector_1(foo=9, bar='secret')
@@ -165,11 +165,8 @@ class BaseDriver(object):
             artifact_name=input_channel.output_key,
             pipeline_info=pipeline_info,
             producer_component_id=input_channel.producer_component_id)
-        # TODO(ccy): add this code path to interactive resolution.
-        for artifact in result[name]:
-          if isinstance(artifact, types.ValueArtifact):
-            # Resolve the content of file into value field for value artifacts.
-            _ = artifact.read()
+        # The content of value artifacts is read on first access of their
+        # `value`.
     return result
 
   def resolve_exec_properties(
@@ -0,0 +1,362 @@
+# Lint as: python3
+# Copyright 2020 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Opt-in metadata caching decorator for filesystem plugins.
+
+Within a single component run the same paths are frequently probed with
+`exists`, `isdir`, `listdir`, `glob` and `stat`. For remote filesystems each
+of those is a network round trip. The caching filesystem wraps the filesystem
+plugin registered for a scheme and memoizes the results of these metadata
+calls for a bounded amount of time. Every mutating call (`open` for writing,
+`copy`, `makedirs`, `mkdir`, `remove`, `rename`, `rmtree`) is forwarded to the
+wrapped filesystem and invalidates the affected cache entries.
+
+Caching is disabled by default and is toggled per scheme:
+
+  from tfx.dsl.io import caching_filesystem
+  caching_filesystem.enable(schemes=['gs://'], ttl_seconds=30)
+  ...
+  logging.info('%s', caching_filesystem.get_stats())
+"""
+
+import threading
+import time
+from typing import (Any, Callable, Dict, Iterable, List, Optional, Text, Tuple,
+                    Type)
+
+from tfx.dsl.io import filesystem
+from tfx.dsl.io import filesystem_registry
+from tfx.dsl.io.filesystem import PathType
+
+# Default time-to-live of a cached metadata entry.
+DEFAULT_TTL_SECONDS = 60.0
+
+# Names of the cached metadata operations.
+_EXISTS = 'exists'
+_GLOB = 'glob'
+_ISDIR = 'isdir'
+_LISTDIR = 'listdir'
+_STAT = 'stat'
+
+_WRITE_MODES = ('w', 'a', 'x', '+')
+
+
+def _normalize(path: PathType) -> Text:
+  if isinstance(path, bytes):
+    path = path.decode('utf-8')
+  if len(path) > 1 and path.endswith('/') and not path.endswith('://'):
+    path = path.rstrip('/')
+  return path
+
+
+def _is_related(cached_path: Text, mutated_path: Text) -> bool:
+  """Returns whether a mutation of `mutated_path` may affect `cached_path`.
+
+  This is the case if one path is equal to, an ancestor of, or a descendant of
+  the other: e.g. `makedirs` creates ancestors, `rmtree` removes descendants
+  and any change alters the listing of the parent directory.
+
+  Args:
+    cached_path: Normalized path of a cache entry.
+    mutated_path: Normalized path passed to a mutating call.
+  """
+  if cached_path == mutated_path:
+    return True
+  shorter, longer = sorted((cached_path, mutated_path), key=len)
+  return longer.startswith(shorter if shorter.endswith('/') else shorter + '/')
+
+
+class MetadataCache(object):
+  """Thread-safe TTL cache of filesystem metadata results with counters."""
+
+  def __init__(self, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+               clock: Callable[[], float] = time.time):
+    self.ttl_seconds = ttl_seconds
+    self._clock = clock
+    self._lock = threading.Lock()
+    # Maps (operation, normalized path) to (expiry time, value).
+    self._entries = {}  # type: Dict[Tuple[Text, Text], Tuple[float, Any]]
+    # Incremented by every invalidation. Invalidated paths are logged with
+    # their generation while results are being computed, so that a result
+    # made stale during its computation is not stored.
+    self._generation = 0
+    self._num_computing = 0
+    self._invalidated = []  # type: List[Tuple[int, Text]]
+    self.hits = 0
+    self.misses = 0
+    self.invalidations = 0
+
+  def get_or_compute(self, operation: Text, path: PathType,
+                     compute_fn: Callable[[], Any]) -> Any:
+    """Returns the cached result for `operation` or computes and stores it."""
+    key = (operation, _normalize(path))
+    now = self._clock()
+    with self._lock:
+      entry = self._entries.get(key)
+      if entry is not None and entry[0] > now:
+        self.hits += 1
+        return entry[1]
+      self.misses += 1
+      generation = self._generation
+      self._num_computing += 1
+    # Compute outside of the lock so that slow remote calls on different
+    # paths do not serialize each other.
+    try:
+      value = compute_fn()
+      with self._lock:
+        if not self._is_invalidated_since(key, generation):
+          self._entries[key] = (self._clock() + self.ttl_seconds, value)
+    finally:
+      with self._lock:
+        self._num_computing -= 1
+        if not self._num_computing:
+          del self._invalidated[:]
+    return value
+
+  def _is_invalidated_since(self, key: Tuple[Text, Text],
+                            generation: int) -> bool:
+    """Returns whether `key` was invalidated after `generation`."""
+    return any(
+        invalidated_generation > generation and
+        (key[0] == _GLOB or mutated_path is None or
+         _is_related(key[1], mutated_path))
+        for invalidated_generation, mutated_path in self._invalidated)
+
+  def _log_invalidation(self, mutated_path: Optional[Text]) -> None:
+    self._generation += 1
+    if self._num_computing:
+      self._invalidated.append((self._generation, mutated_path))
+
+  def invalidate(self, path: PathType) -> None:
+    """Drops every entry which may be affected by a mutation of `path`."""
+    mutated_path = _normalize(path)
+    with self._lock:
+      stale_keys = [
+          key for key in self._entries
+          if key[0] == _GLOB or _is_related(key[1], mutated_path)
+      ]
+      for key in stale_keys:
+        del self._entries[key]
+      self.invalidations += len(stale_keys)
+      self._log_invalidation(mutated_path)
+
+  def clear(self) -> None:
+    """Drops all entries and resets the counters."""
+    with self._lock:
+      self._entries.clear()
+      self._log_invalidation(None)
+      self.hits = 0
+      self.misses = 0
+      self.invalidations = 0
+
+  def get_stats(self) -> Dict[Text, int]:
+    with self._lock:
+      return {
+          'hits': self.hits,
+          'misses': self.misses,
+          'invalidations': self.invalidations,
+          'entries': len(self._entries),
+      }
+
+
+def make_caching_filesystem(
+    base_filesystem: Type[filesystem.Filesystem],
+    scheme: Text,
+    cache: Optional[MetadataCache] = None) -> Type[filesystem.Filesystem]:
+  """Creates a filesystem class caching metadata calls of `base_filesystem`.
+
+  Args:
+    base_filesystem: Filesystem class to which all calls are delegated.
+    scheme: The single scheme served by the returned class.
+    cache: Cache to use. A new `MetadataCache` is created if not given.
+
+  Returns:
+    A `Filesystem` subclass. Caching can be toggled at any time through its
+    `enabled` attribute; when disabled every call goes straight to
+    `base_filesystem`.
+  """
+  cache = cache or MetadataCache()
+
+  class CachingFilesystem(filesystem.Filesystem):
+    """Filesystem caching metadata calls of a wrapped filesystem."""
+
+    SUPPORTED_SCHEMES = [scheme]
+    BASE_FILESYSTEM = base_filesystem
+    CACHE = cache
+    enabled = True
+
+    @classmethod
+    def _cached(cls, operation: Text, path: PathType) -> Any:
+      compute_fn = lambda: getattr(cls.BASE_FILESYSTEM, operation)(path)
+      if not cls.enabled:
+        return compute_fn()
+      return cls.CACHE.get_or_compute(operation, path, compute_fn)
+
+    @classmethod
+    def _invalidate(cls, *paths: PathType) -> None:
+      # Invalidate even when disabled so that re-enabling never serves entries
+      # which were made stale in the meantime.
+      for path in paths:
+        cls.CACHE.invalidate(path)
+
+    @classmethod
+    def open(cls, name: PathType, mode: Text = 'r') -> Any:
+      if any(c in mode for c in _WRITE_MODES):
+        cls._invalidate(name)
+      return cls.BASE_FILESYSTEM.open(name, mode=mode)
+
+    @classmethod
+    def copy(cls, src: PathType, dst: PathType,
+             overwrite: bool = False) -> None:
+      try:
+        cls.BASE_FILESYSTEM.copy(src, dst, overwrite=overwrite)
+      finally:
+        cls._invalidate(dst)
+
+    @classmethod
+    def exists(cls, path: PathType) -> bool:
+      return cls._cached(_EXISTS, path)
+
+    @classmethod
+    def glob(cls, pattern: PathType) -> List[PathType]:
+      return list(cls._cached(_GLOB, pattern))
+
+    @classmethod
+    def isdir(cls, path: PathType) -> bool:
+      return cls._cached(_ISDIR, path)
+
+    @classmethod
+    def listdir(cls, path: PathType) -> List[PathType]:
+      return list(cls._cached(_LISTDIR, path))
+
+    @classmethod
+    def makedirs(cls, path: PathType) -> None:
+      try:
+        cls.BASE_FILESYSTEM.makedirs(path)
+      finally:
+        cls._invalidate(path)
+
+    @classmethod
+    def mkdir(cls, path: PathType) -> None:
+      try:
+        cls.BASE_FILESYSTEM.mkdir(path)
+      finally:
+        cls._invalidate(path)
+
+    @classmethod
+    def remove(cls, path: PathType) -> None:
+      try:
+        cls.BASE_FILESYSTEM.remove(path)
+      finally:
+        cls._invalidate(path)
+
+    @classmethod
+    def rename(cls, src: PathType, dst: PathType,
+               overwrite: bool = False) -> None:
+      try:
+        cls.BASE_FILESYSTEM.rename(src, dst, overwrite=overwrite)
+      finally:
+        cls._invalidate(src, dst)
+
+    @classmethod
+    def rmtree(cls, path: PathType) -> None:
+      try:
+        cls.BASE_FILESYSTEM.rmtree(path)
+      finally:
+        cls._invalidate(path)
+
+    @classmethod
+    def stat(cls, path: PathType) -> Any:
+      return cls._cached(_STAT, path)
+
+    @classmethod
+    def walk(
+        cls,
+        top: PathType,
+        topdown: bool = True,
+        onerror: Callable[..., None] = None
+    ) -> Iterable[Tuple[PathType, List[PathType], List[PathType]]]:
+      # Walking is not cached since callers may mutate the tree while
+      # iterating.
+      return cls.BASE_FILESYSTEM.walk(top, topdown=topdown, onerror=onerror)
+
+  CachingFilesystem.__name__ = 'Caching' + base_filesystem.__name__
+  return CachingFilesystem
+
+
+# Caching filesystems installed by `enable`, keyed by (registry id, scheme).
+_installed = {}  # type: Dict[Tuple[int, Text], Type[filesystem.Filesystem]]
+_installed_lock = threading.Lock()
+
+
+def enable(
+    schemes: Optional[List[Text]] = None,
+    ttl_seconds: float = DEFAULT_TTL_SECONDS,
+    registry: Optional[filesystem_registry.FilesystemRegistry] = None) -> None:
+  """Enables metadata caching for the given filesystem schemes.
+
+  On first use for a scheme, the filesystem currently preferred for it is
+  wrapped and the wrapper is registered with a higher priority. Subsequent
+  calls only flip the toggle and update the TTL.
+
+  Args:
+    schemes: Schemes (e.g. `'gs://'`, or `''` for local paths) to cache. All
+      schemes with a preferred filesystem in the registry if not given.
+    ttl_seconds: Time-to-live of cached entries in seconds.
+    registry: Filesystem registry to install into. Defaults to the global
+      registry used by `tfx.dsl.io.fileio`.
+  """
+  registry = registry or filesystem_registry.DEFAULT_FILESYSTEM_REGISTRY
+  if schemes is None:
+    schemes = registry.get_registered_schemes()
+  with _installed_lock:
+    for scheme in schemes:
+      key = (id(registry), scheme)
+      caching_fs = _installed.get(key)
+      if caching_fs is None:
+        base_fs = registry.get_filesystem_for_scheme(scheme)
+        caching_fs = make_caching_filesystem(
+            base_fs, scheme, MetadataCache(ttl_seconds))
+        priority = registry.get_priority(base_fs)
+        registry.register(
+            caching_fs, priority - 1 if priority is not None else 0)
+        _installed[key] = caching_fs
+      caching_fs.CACHE.ttl_seconds = ttl_seconds
+      caching_fs.enabled = True
+
+
+def disable(
+    schemes: Optional[List[Text]] = None,
+    registry: Optional[filesystem_registry.FilesystemRegistry] = None) -> None:
+  """Disables metadata caching for the given (or all) schemes."""
+  registry = registry or filesystem_registry.DEFAULT_FILESYSTEM_REGISTRY
+  with _installed_lock:
+    for (registry_id, scheme), caching_fs in _installed.items():
+      if registry_id == id(registry) and (schemes is None or
+                                          scheme in schemes):
+        caching_fs.enabled = False
+        caching_fs.CACHE.clear()
+
+
+def get_stats(
+    registry: Optional[filesystem_registry.FilesystemRegistry] = None
+) -> Dict[Text, Dict[Text, int]]:
+  """Returns hit/miss counters of every installed cache keyed by scheme."""
+  registry = registry or filesystem_registry.DEFAULT_FILESYSTEM_REGISTRY
+  with _installed_lock:
+    return {
+        scheme: dict(caching_fs.CACHE.get_stats(), enabled=caching_fs.enabled)
+        for (registry_id, scheme), caching_fs in _installed.items()
+        if registry_id == id(registry)
+    }
@@ -0,0 +1,192 @@
+# Lint as: python3
+# Copyright 2020 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for tfx.dsl.io.caching_filesystem."""
+
+import collections
+
+import tensorflow as tf
+
+from tfx.dsl.io import caching_filesystem
+from tfx.dsl.io import filesystem
+from tfx.dsl.io import filesystem_registry
+
+
+class _FakeFilesystem(filesystem.Filesystem):
+  """In-memory filesystem counting metadata calls."""
+
+  SUPPORTED_SCHEMES = ['fake://']
+  files = set()
+  calls = collections.Counter()
+
+  @classmethod
+  def reset(cls):
+    cls.files = set()
+    cls.calls = collections.Counter()
+
+  @classmethod
+  def exists(cls, path):
+    cls.calls['exists'] += 1
+    return any(f == path or f.startswith(path + '/') for f in cls.files)
+
+  @classmethod
+  def isdir(cls, path):
+    cls.calls['isdir'] += 1
+    return any(f.startswith(path + '/') for f in cls.files)
+
+  @classmethod
+  def listdir(cls, path):
+    cls.calls['listdir'] += 1
+    prefix = path + '/'
+    return sorted({
+        f[len(prefix):].split('/')[0] for f in cls.files if f.startswith(prefix)
+    })
+
+  @classmethod
+  def makedirs(cls, path):
+    cls.files.add(path + '/.keep')
+
+  @classmethod
+  def remove(cls, path):
+    cls.files.discard(path)
+
+  @classmethod
+  def rmtree(cls, path):
+    cls.files = {f for f in cls.files if not f.startswith(path + '/')}
+
+  @classmethod
+  def rename(cls, src, dst, overwrite=False):
+    cls.files.discard(src)
+    cls.files.add(dst)
+
+
+class _FakeClock(object):
+
+  def __init__(self):
+    self.now = 0.0
+
+  def __call__(self):
+    return self.now
+
+
+class CachingFilesystemTest(tf.test.TestCase):
+
+  def setUp(self):
+    super(CachingFilesystemTest, self).setUp()
+    _FakeFilesystem.reset()
+    self._clock = _FakeClock()
+    self._fs = caching_filesystem.make_caching_filesystem(
+        _FakeFilesystem, 'fake://',
+        caching_filesystem.MetadataCache(ttl_seconds=10, clock=self._clock))
+
+  def testMetadataCallsAreCached(self):
+    _FakeFilesystem.files.add('fake://bucket/a/file')
+    for _ in range(3):
+      self.assertTrue(self._fs.exists('fake://bucket/a'))
+      self.assertTrue(self._fs.isdir('fake://bucket/a'))
+      self.assertEqual(['file'], self._fs.listdir('fake://bucket/a'))
+    self.assertEqual(1, _FakeFilesystem.calls['exists'])
+    self.assertEqual(1, _FakeFilesystem.calls['isdir'])
+    self.assertEqual(1, _FakeFilesystem.calls['listdir'])
+    self.assertEqual(6, self._fs.CACHE.hits)
+    self.assertEqual(3, self._fs.CACHE.misses)
+
+  def testEntriesExpire(self):
+    self.assertFalse(self._fs.exists('fake://bucket/a'))
+    self._clock.now = 5
+    self.assertFalse(self._fs.exists('fake://bucket/a'))
+    self.assertEqual(1, _FakeFilesystem.calls['exists'])
+    self._clock.now = 11
+    self.assertFalse(self._fs.exists('fake://bucket/a'))
+    self.assertEqual(2, _FakeFilesystem.calls['exists'])
+
+  def testMutationsInvalidate(self):
+    self.assertFalse(self._fs.exists('fake://bucket/a/b'))
+    self.assertFalse(self._fs.exists('fake://bucket/a'))
+    self.assertEqual([], self._fs.listdir('fake://bucket'))
+    self.assertFalse(self._fs.exists('fake://bucket/other'))
+
+    self._fs.makedirs('fake://bucket/a/b')
+    self.assertTrue(self._fs.exists('fake://bucket/a/b'))
+    self.assertTrue(self._fs.exists('fake://bucket/a'))
+    self.assertEqual(['a'], self._fs.listdir('fake://bucket'))
+    # Unrelated entries are kept.
+    self.assertFalse(self._fs.exists('fake://bucket/other'))
+    self.assertEqual(5, _FakeFilesystem.calls['exists'])
+
+    self._fs.rmtree('fake://bucket/a')
+    self.assertFalse(self._fs.exists('fake://bucket/a/b'))
+    self.assertEqual([], self._fs.listdir('fake://bucket'))
+
+    self._fs.rename('fake://bucket/x', 'fake://bucket/y')
+    self.assertEqual(['y'], self._fs.listdir('fake://bucket'))
+
+  def testInvalidationDuringComputeIsNotLost(self):
+    cache = caching_filesystem.MetadataCache(ttl_seconds=10, clock=self._clock)
+
+    def compute_then_mutate():
+      # A mutation of the path races with the computation of its entry.
+      cache.invalidate('fake://bucket/a')
+      return 'stale'
+
+    self.assertEqual(
+        'stale', cache.get_or_compute('exists', 'fake://bucket/a',
+                                      compute_then_mutate))
+    self.assertEqual(
+        'fresh', cache.get_or_compute('exists', 'fake://bucket/a',
+                                      lambda: 'fresh'))
+
+    def compute_then_mutate_other():
+      cache.invalidate('fake://other')
+      return 'value'
+
+    cache.get_or_compute('exists', 'fake://bucket/b', compute_then_mutate_other)
+    self.assertEqual(
+        'value', cache.get_or_compute('exists', 'fake://bucket/b',
+                                      lambda: 'recomputed'))
+
+  def testDisabled(self):
+    self._fs.enabled = False
+    self._fs.exists('fake://bucket/a')
+    self._fs.exists('fake://bucket/a')
+    self.assertEqual(2, _FakeFilesystem.calls['exists'])
+    self.assertEqual(0, self._fs.CACHE.hits)
+
+  def testEnableAndDisable(self):
+    registry = filesystem_registry.FilesystemRegistry()
+    registry.register(_FakeFilesystem, 10)
+    caching_filesystem.enable(schemes=['fake://'], registry=registry)
+    caching_fs = registry.get_filesystem_for_path('fake://bucket/a')
+    self.assertIsNot(_FakeFilesystem, caching_fs)
+    self.assertIs(_FakeFilesystem, caching_fs.BASE_FILESYSTEM)
+    self.assertEqual(9, registry.get_priority(caching_fs))
+
+    caching_fs.exists('fake://bucket/a')
+    caching_fs.exists('fake://bucket/a')
+    stats = caching_filesystem.get_stats(registry=registry)
+    self.assertEqual(1, stats['fake://']['hits'])
+    self.assertEqual(1, stats['fake://']['misses'])
+    self.assertTrue(stats['fake://']['enabled'])
+
+    caching_filesystem.disable(registry=registry)
+    self.assertFalse(caching_filesystem.get_stats(
+        registry=registry)['fake://']['enabled'])
+    # Re-enabling reuses the installed wrapper.
+    caching_filesystem.enable(schemes=['fake://'], registry=registry)
+    self.assertIs(caching_fs, registry.get_filesystem_for_path('fake://b'))
+    self.assertTrue(caching_fs.enabled)
+
+
+if __name__ == '__main__':
+  tf.test.main()
@@ -20,7 +20,7 @@ from __future__ import print_function
 
 import re
 import threading
-from typing import Text, Type
+from typing import List, Optional, Text, Type
 
 from tfx.dsl.io import filesystem
 from tfx.dsl.io.filesystem import PathType
@@ -60,6 +60,15 @@ class FilesystemRegistry(object):
             priority < self._filesystem_priority[self._fallback_filesystem]):
           self._fallback_filesystem = filesystem_cls
 
+  def get_priority(
+      self, filesystem_cls: Type[filesystem.Filesystem]) -> Optional[int]:
+    """Get the registered priority of a filesystem class, if registered."""
+    return self._filesystem_priority.get(filesystem_cls)
+
+  def get_registered_schemes(self) -> List[Text]:
+    """Get the schemes with an explicitly registered filesystem plugin."""
+    return list(self._preferred_filesystem_by_scheme)
+
   def get_filesystem_for_scheme(
       self, scheme: PathType) -> Type[filesystem.Filesystem]:
     """Get filesystem plugin for given scheme string."""
@@ -19,6 +19,7 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import base64
 import datetime
 import json
 import sys
@@ -32,6 +33,7 @@ import tensorflow as tf
 
 from tfx import types
 from tfx import version
+from tfx.orchestration import data_types_utils
 from tfx.types import artifact_utils
 from tfx.utils import telemetry_utils
 
@@ -254,12 +256,10 @@ def start_aip_training(input_dict: Dict[Text, List[types.Artifact]],
   """
   training_inputs = training_inputs.copy()
 
-  json_inputs = artifact_utils.jsonify_artifact_dict(input_dict)
-  logging.info('json_inputs=\'%s\'.', json_inputs)
-  json_outputs = artifact_utils.jsonify_artifact_dict(output_dict)
-  logging.info('json_outputs=\'%s\'.', json_outputs)
-  json_exec_properties = json.dumps(exec_properties, sort_keys=True)
-  logging.info('json_exec_properties=\'%s\'.', json_exec_properties)
+  if not training_inputs.get('masterConfig'):
+    training_inputs['masterConfig'] = {
+        'imageUri': _TFX_IMAGE,
+    }
 
   # We use custom containers to launch training on AI Platform, which invokes
   # the specified image using the container's entrypoint. The default
@@ -269,18 +269,33 @@ def start_aip_training(input_dict: Dict[Text, List[types.Artifact]],
   container_command = _CONTAINER_COMMAND + [
       '--executor_class_path',
       executor_class_path,
-      '--inputs',
-      json_inputs,
-      '--outputs',
-      json_outputs,
-      '--exec-properties',
-      json_exec_properties,
   ]
-
-  if not training_inputs.get('masterConfig'):
-    training_inputs['masterConfig'] = {
-        'imageUri': _TFX_IMAGE,
-    }
+  # The binary format is only known to the run_executor of this TFX version,
+  # while user images may ship an older one.
+  executor_args = None
+  if training_inputs['masterConfig'].get('imageUri') == _TFX_IMAGE:
+    executor_args = data_types_utils.serialize_executor_args(
+        input_dict, output_dict, exec_properties)
+  if executor_args is not None:
+    container_command += [
+        '--executor-args-base64',
+        base64.b64encode(executor_args).decode('ascii'),
+    ]
+  else:
+    json_inputs = artifact_utils.jsonify_artifact_dict(input_dict)
+    logging.info('json_inputs=\'%s\'.', json_inputs)
+    json_outputs = artifact_utils.jsonify_artifact_dict(output_dict)
+    logging.info('json_outputs=\'%s\'.', json_outputs)
+    json_exec_properties = json.dumps(exec_properties, sort_keys=True)
+    logging.info('json_exec_properties=\'%s\'.', json_exec_properties)
+    container_command += [
+        '--inputs',
+        json_inputs,
+        '--outputs',
+        json_outputs,
+        '--exec-properties',
+        json_exec_properties,
+    ]
 
   # Always use our own entrypoint instead of relying on container default.
   if 'containerCommand' in training_inputs['masterConfig']:
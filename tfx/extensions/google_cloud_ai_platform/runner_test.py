@@ -18,6 +18,7 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import base64
 import copy
 import os
 import sys
@@ -31,6 +32,7 @@ import tensorflow as tf
 from tfx import version
 from tfx.extensions.google_cloud_ai_platform import runner
 from tfx.extensions.google_cloud_ai_platform.trainer import executor
+from tfx.orchestration import data_types_utils
 from tfx.utils import json_utils
 from tfx.utils import telemetry_utils
 
@@ -107,14 +109,18 @@ class RunnerTest(tf.test.TestCase):
                     default_image,
                 'containerCommand':
                     runner._CONTAINER_COMMAND + [
-                        '--executor_class_path', class_path, '--inputs', '{}',
-                        '--outputs', '{}', '--exec-properties',
-                        '{"custom_config": '
-                        '"{\\"ai_platform_training_args\\": {\\"project\\": \\"12345\\"'
-                        '}}"}'
+                        '--executor_class_path', class_path,
+                        '--executor-args-base64', mock.ANY
                     ],
             },
         }, body['trainingInput'])
+    # The default image gets the arguments in the binary format.
+    container_command = body['trainingInput']['masterConfig'][
+        'containerCommand']
+    self.assertEqual(
+        ({}, {}, self._serialize_custom_config_under_test()),
+        data_types_utils.deserialize_executor_args(
+            base64.b64decode(container_command[-1])))
     self.assertStartsWith(body['jobId'], 'tfx_')
     self._mock_get.execute.assert_called_with()
 
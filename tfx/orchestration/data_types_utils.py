@@ -12,9 +12,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Data types util shared for orchestration."""
-from typing import Dict, Iterable, List, Mapping
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
 
 from tfx import types
+from tfx.proto.orchestration import execution_invocation_pb2
 from tfx.types import artifact_utils
 
 from ml_metadata.proto import metadata_store_pb2
@@ -85,3 +86,89 @@ def build_exec_property_value_dict(
       raise RuntimeError('Unsupported type {} for key {}'.format(type(v), k))
     result[k] = value
   return result
+
+
+def serialize_executor_args(
+    input_dict: Mapping[str, Iterable[types.Artifact]],
+    output_dict: Mapping[str, Iterable[types.Artifact]],
+    exec_properties: Mapping[str, Any]) -> Optional[bytes]:
+  """Serializes the arguments of an executor in a binary format.
+
+  The arguments are stored in an ExecutionInvocation proto, with the MLMD
+  protos and the Python class paths of the artifacts, which is much cheaper to
+  serialize and parse than the JSON format of
+  `artifact_utils.jsonify_artifact_dict`.
+
+  Args:
+    input_dict: Input artifact dict of the executor.
+    output_dict: Output artifact dict of the executor.
+    exec_properties: Execution properties of the executor.
+
+  Returns:
+    The serialized arguments, or None if some execution properties are not
+    int, float or string values, in which case the arguments need to be
+    serialized as JSON.
+  """
+  for v in (exec_properties or {}).values():
+    # Booleans are ints but would not be restored as such.
+    if isinstance(v, bool) or not isinstance(v, (str, int, float)):
+      return None
+  invocation = execution_invocation_pb2.ExecutionInvocation()
+  for k, v in build_artifact_struct_dict(input_dict).items():
+    invocation.input_dict[k].CopyFrom(v)
+  for k, v in build_artifact_struct_dict(output_dict).items():
+    invocation.output_dict[k].CopyFrom(v)
+  for artifact_dict, class_paths in (
+      (input_dict, invocation.input_artifact_class_paths),
+      (output_dict, invocation.output_artifact_class_paths)):
+    for k, artifacts in (artifact_dict or {}).items():
+      class_paths[k].class_paths.extend(
+          '%s.%s' % (a.__class__.__module__, a.__class__.__name__)
+          for a in artifacts)
+  for k, v in build_exec_property_value_dict(exec_properties).items():
+    invocation.execution_properties[k].CopyFrom(v)
+  return invocation.SerializeToString()
+
+
+def deserialize_executor_args(
+    serialized: bytes
+) -> Tuple[Dict[str, List[types.Artifact]], Dict[str, List[types.Artifact]],
+           Dict[str, types.Property]]:
+  """Deserializes the output of `serialize_executor_args`.
+
+  Args:
+    serialized: Arguments of an executor serialized by
+      `serialize_executor_args`.
+
+  Returns:
+    A tuple of the input artifact dict, the output artifact dict and the
+    execution properties of the executor.
+  """
+  invocation = execution_invocation_pb2.ExecutionInvocation.FromString(
+      serialized)
+  input_dict = _build_artifact_dict_with_classes(
+      invocation.input_dict, invocation.input_artifact_class_paths)
+  output_dict = _build_artifact_dict_with_classes(
+      invocation.output_dict, invocation.output_artifact_class_paths)
+  return (input_dict, output_dict,
+          build_exec_property_dict(invocation.execution_properties))
+
+
+def _build_artifact_dict_with_classes(
+    proto_dict: Mapping[str, metadata_store_service_pb2.ArtifactStructList],
+    class_paths: Mapping[str, execution_invocation_pb2.ArtifactClassPaths]
+) -> Dict[str, List[types.Artifact]]:
+  """Converts an artifact dict, restoring the classes of the artifacts."""
+  result = build_artifact_dict(proto_dict)
+  for k, artifacts in result.items():
+    if k not in class_paths:
+      continue
+    for i, class_path in enumerate(class_paths[k].class_paths):
+      artifact = artifacts[i]
+      module_name, class_name = class_path.rsplit('.', 1)
+      if (artifact.__class__.__module__, artifact.__class__.__name__) != (
+          module_name, class_name):
+        artifacts[i] = types.Artifact.from_class_name(
+            module_name, class_name, artifact.artifact_type,
+            artifact.mlmd_artifact)
+  return result
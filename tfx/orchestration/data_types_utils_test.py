@@ -14,6 +14,7 @@
 """Tests for tfx.orchestration.data_types_utils."""
 
 import tensorflow as tf
+from tfx import types
 from tfx.orchestration import data_types_utils
 from tfx.types import artifact_utils
 
@@ -22,6 +23,14 @@ from ml_metadata.proto import metadata_store_pb2
 from ml_metadata.proto import metadata_store_service_pb2
 
 
+class _FirstArtifact(types.Artifact):
+  TYPE_NAME = 'DataTypesUtilsTestArtifact'
+
+
+class _SecondArtifact(types.Artifact):
+  TYPE_NAME = 'DataTypesUtilsTestArtifact'
+
+
 class DataTypesUtilsTest(tf.test.TestCase):
 
   def setUp(self):
@@ -102,6 +111,35 @@ class DataTypesUtilsTest(tf.test.TestCase):
     self.assertEqual(self.exec_property_value_dict,
                      actual_exec_property_value_dict)
 
+  def testSerializeExecutorArgs(self):
+    serialized = data_types_utils.serialize_executor_args(
+        self.artifact_dict, {'o1': self.artifact_dict['a1']},
+        self.exec_property_dict)
+    input_dict, output_dict, exec_properties = (
+        data_types_utils.deserialize_executor_args(serialized))
+    self.assertEqual(['a1', 'a2'], sorted(input_dict))
+    self.assertEqual(456, input_dict['a2'][0].id)
+    self.assertEqual('t2', input_dict['a2'][0].type_name)
+    self.assertEqual(['o1'], list(output_dict))
+    self.assertEqual(123, output_dict['o1'][0].id)
+    self.assertEqual(self.exec_property_dict, exec_properties)
+
+  def testSerializeExecutorArgsRestoresArtifactClasses(self):
+    artifact = _SecondArtifact()
+    artifact.uri = '/tmp/a'
+    serialized = data_types_utils.serialize_executor_args({'a': [artifact]},
+                                                          {}, {})
+    input_dict, _, _ = data_types_utils.deserialize_executor_args(serialized)
+    # Both classes have the same type, the class of the artifact is kept.
+    self.assertIsInstance(input_dict['a'][0], _SecondArtifact)
+    self.assertEqual('/tmp/a', input_dict['a'][0].uri)
+
+  def testSerializeExecutorArgsUnsupportedExecProperties(self):
+    for value in (True, None, [1]):
+      self.assertIsNone(
+          data_types_utils.serialize_executor_args(self.artifact_dict, {},
+                                                   {'p': value}))
+
 
 if __name__ == '__main__':
   tf.test.main()
@@ -39,7 +39,8 @@ TYPE_NAME_KEY = 'type_name'
 
 _SUPPORTED_STANDARD_ARTIFACT_TYPES = frozenset(
     (standard_artifacts.ExampleAnomalies, standard_artifacts.ExampleStatistics,
-     standard_artifacts.Examples, standard_artifacts.HyperParameters,
+     standard_artifacts.ExampleStatisticsCache, standard_artifacts.Examples,
+     standard_artifacts.HyperParameters,
      standard_artifacts.InferenceResult, standard_artifacts.InfraBlessing,
      standard_artifacts.Model, standard_artifacts.ModelBlessing,
      standard_artifacts.ModelEvaluation, standard_artifacts.ModelRun,
@@ -55,6 +56,8 @@ _SUPPORTED_STANDARD_ARTIFACT_TYPES = frozenset(
 TITLE_TO_CLASS_PATH = {
     'tfx.ExampleAnomalies': 'tfx.types.standard_artifacts.ExampleAnomalies',
     'tfx.ExampleStatistics': 'tfx.types.standard_artifacts.ExampleStatistics',
+    'tfx.ExampleStatisticsCache':
+        'tfx.types.standard_artifacts.ExampleStatisticsCache',
     'tfx.Examples': 'tfx.types.standard_artifacts.Examples',
     'tfx.HyperParameters': 'tfx.types.standard_artifacts.HyperParameters',
     'tfx.InferenceResult': 'tfx.types.standard_artifacts.InferenceResult',
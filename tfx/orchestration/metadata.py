@@ -33,6 +33,7 @@ import six
 from tfx.dsl.io import fileio
 from tfx.orchestration import data_types
 from tfx.types import artifact_utils
+from tfx.types import artifact_view
 from tfx.types.artifact import Artifact
 from tfx.types.artifact import ArtifactState
 
@@ -251,6 +252,45 @@ class Metadata(object):
     """Fetches artifacts given artifact type name."""
     return self.store.get_artifacts_by_type(type_name)
 
+  def get_artifact_views_by_type(
+      self, type_name: Text) -> List[artifact_view.ArtifactView]:
+    """Fetches read-only views of the artifacts of a type, given its name."""
+    try:
+      artifact_type = self.store.get_artifact_type(type_name)
+    except mlmd.errors.NotFoundError:
+      return []
+    if artifact_type is None:
+      return []
+    return artifact_view.create_views(
+        artifact_type, self.store.get_artifacts_by_type(type_name))
+
+  def get_artifact_views_by_id(
+      self, artifact_ids: List[int]) -> List[artifact_view.ArtifactView]:
+    """Fetches read-only views of artifacts given their ids.
+
+    Each artifact type is fetched once and shared by the views of its
+    artifacts.
+
+    Args:
+      artifact_ids: Ids of the artifacts to fetch.
+
+    Returns:
+      A list of ArtifactViews of the artifacts found, in the order of
+      `artifact_ids`.
+    """
+    artifacts = self.store.get_artifacts_by_id(artifact_ids)
+    artifact_types = self.store.get_artifact_types_by_id(
+        list(set(a.type_id for a in artifacts)))
+    artifacts_by_type_id = collections.defaultdict(list)
+    for a in artifacts:
+      artifacts_by_type_id[a.type_id].append(a)
+    views_by_id = {}
+    for artifact_type in artifact_types:
+      for view in artifact_view.create_views(
+          artifact_type, artifacts_by_type_id[artifact_type.id]):
+        views_by_id[view.id] = view
+    return [views_by_id[i] for i in artifact_ids if i in views_by_id]
+
   # TODO(b/145751019): Remove this once migrated to use MLMD built-in states.
   def _get_artifact_state(
       self, artifact: metadata_store_pb2.Artifact) -> Optional[Text]:
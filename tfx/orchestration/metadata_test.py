@@ -145,6 +145,27 @@ class MetadataTest(tf.test.TestCase):
       m.update_artifact_state(artifact, ArtifactState.DELETED)
       self._check_artifact_state(m, artifact, ArtifactState.DELETED)
 
+  def testGetArtifactViews(self):
+    with metadata.Metadata(connection_config=self._connection_config) as m:
+      self.assertListEqual(
+          [], m.get_artifact_views_by_type(standard_artifacts.Model.TYPE_NAME))
+      examples = standard_artifacts.Examples()
+      examples.uri = 'examples_uri'
+      model = standard_artifacts.Model()
+      model.uri = 'model_uri'
+      m.publish_artifacts([examples, model])
+
+      [view] = m.get_artifact_views_by_type(
+          standard_artifacts.Examples.TYPE_NAME)
+      self.assertEqual(examples.id, view.id)
+      self.assertEqual('examples_uri', view.uri)
+      self.assertEqual(ArtifactState.PUBLISHED, view.state)
+
+      views = m.get_artifact_views_by_id([model.id, examples.id, 100])
+      self.assertEqual([model.id, examples.id], [v.id for v in views])
+      self.assertEqual([standard_artifacts.Model, standard_artifacts.Examples],
+                       [v.type for v in views])
+
   def testArtifactTypeRegistrationForwardCompatible(self):
     with metadata.Metadata(connection_config=self._connection_config) as m:
       self.assertListEqual([], m.store.get_artifacts())
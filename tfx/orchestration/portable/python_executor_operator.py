@@ -23,7 +23,6 @@ from tfx.orchestration.portable import base_executor_operator
 from tfx.orchestration.portable import data_types
 from tfx.proto.orchestration import executable_spec_pb2
 from tfx.proto.orchestration import execution_result_pb2
-from tfx.types.value_artifact import ValueArtifact
 from tfx.utils import import_utils
 
 from google.protobuf import message
@@ -101,12 +100,8 @@ class PythonExecutorOperator(base_executor_operator.BaseExecutorOperator):
         stateful_working_dir=execution_info.stateful_working_dir)
     executor = self._executor_cls(context=context)
 
-    for _, artifact_list in execution_info.input_dict.items():
-      for artifact in artifact_list:
-        if isinstance(artifact, ValueArtifact):
-          # Read ValueArtifact into memory.
-          artifact.read()
-
+    # ValueArtifact inputs are read on first access of their `value`, so that
+    # the executor does not read the values it does not use.
     result = executor.Do(execution_info.input_dict, execution_info.output_dict,
                          execution_info.exec_properties)
     if not result:
@@ -24,6 +24,7 @@ import json
 
 import absl
 from tfx.dsl.components.base import base_executor
+from tfx.orchestration import data_types_utils
 from tfx.types import artifact_utils
 from tfx.utils import import_utils
 
@@ -69,6 +70,9 @@ def _run_executor(args, pipeline_args) -> None:
         serialized as JSON.
       - exec_properties: The execution properties to be used by this execution,
         serialized as JSON.
+      - executor_args_base64: The inputs, outputs and execution properties
+        serialized by data_types_utils.serialize_executor_args, which replace
+        the three above if set.
     pipeline_args: Optional parameter that maps to the optional_pipeline_args
     parameter in the pipeline, which provides additional configuration options
     for apache-beam and tensorflow.logging.
@@ -82,16 +86,19 @@ def _run_executor(args, pipeline_args) -> None:
 
   absl.logging.set_verbosity(absl.logging.INFO)
 
-  (inputs_str, outputs_str,
-   exec_properties_str) = (args.inputs or base64.b64decode(args.inputs_base64),
-                           args.outputs or
-                           base64.b64decode(args.outputs_base64),
-                           args.exec_properties or
-                           base64.b64decode(args.exec_properties_base64))
-
-  inputs = artifact_utils.parse_artifact_dict(inputs_str)
-  outputs = artifact_utils.parse_artifact_dict(outputs_str)
-  exec_properties = json.loads(exec_properties_str)
+  if args.executor_args_base64:
+    inputs, outputs, exec_properties = (
+        data_types_utils.deserialize_executor_args(
+            base64.b64decode(args.executor_args_base64)))
+  else:
+    (inputs_str, outputs_str, exec_properties_str) = (
+        args.inputs or base64.b64decode(args.inputs_base64), args.outputs or
+        base64.b64decode(args.outputs_base64), args.exec_properties or
+        base64.b64decode(args.exec_properties_base64))
+
+    inputs = artifact_utils.parse_artifact_dict(inputs_str)
+    outputs = artifact_utils.parse_artifact_dict(outputs_str)
+    exec_properties = json.loads(exec_properties_str)
   absl.logging.info(
       'Executor {} do: inputs: {}, outputs: {}, exec_properties: {}'.format(
           args.executor_class_path, inputs, outputs, exec_properties))
@@ -123,6 +130,7 @@ def main(argv):
       --outputs-base64: base64-encoded JSON serialized dict of output artifacts.  If the output is not base64-encoded, use --outputs instead.
       --exec_properties: JSON serialized dict of (non artifact) execution properties.  If the execution properties need to be base64-encoded, use --exec_properties-base64 instead.
       --exec_properties-base64: base64-encoded JSON serialized dict of (non artifact) execution properties.  If the execution properties are not base64-encoded, use --exec_properties instead.
+      --executor-args-base64: base64-encoded output of data_types_utils.serialize_executor_args(), replacing all the flags above.
       --write_outputs_stdout: Write outputs to last line of stdout, which will be pushed to xcom in Airflow. Please ignore by other users or orchestrators.
   # pylint: disable=line-too-long
 
@@ -143,7 +151,12 @@ def main(argv):
       '--temp_directory_path',
       type=str,
       help='common temp directory path for executors')
-  inputs_group = parser.add_mutually_exclusive_group(required=True)
+  parser.add_argument(
+      '--executor-args-base64',
+      type=str,
+      help='base64 encoded binary serialized input artifacts, output artifacts '
+      'and execution properties, which replaces the other flags for them.')
+  inputs_group = parser.add_mutually_exclusive_group()
   inputs_group.add_argument(
       '--inputs',
       type=str,
@@ -153,7 +166,7 @@ def main(argv):
       type=str,
       help='base64 encoded json serialized dict of input artifacts.')
 
-  outputs_group = parser.add_mutually_exclusive_group(required=True)
+  outputs_group = parser.add_mutually_exclusive_group()
   outputs_group.add_argument(
       '--outputs',
       type=str,
@@ -163,7 +176,7 @@ def main(argv):
       type=str,
       help='base64 encoded json serialized dict of output artifacts.')
 
-  execution_group = parser.add_mutually_exclusive_group(required=True)
+  execution_group = parser.add_mutually_exclusive_group()
   execution_group.add_argument(
       '--exec-properties',
       type=str,
@@ -182,6 +195,14 @@ def main(argv):
       'orchestrators.')
 
   args, beam_pipeline_args = parser.parse_known_args(argv)
+  for name, group in (('inputs', inputs_group), ('outputs', outputs_group),
+                      ('exec-properties', execution_group)):
+    given = any(getattr(args, a.dest) for a in group._group_actions)  # pylint: disable=protected-access
+    if args.executor_args_base64 and given:
+      parser.error('--%s and --%s-base64 can not be used with '
+                   '--executor-args-base64.' % (name, name))
+    if not args.executor_args_base64 and not given:
+      parser.error('--%s or --%s-base64 is required.' % (name, name))
   _run_executor(args, beam_pipeline_args)
 
 
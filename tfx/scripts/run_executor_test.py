@@ -18,6 +18,7 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import base64
 import json
 from typing import Any, Dict, List, Text
 
@@ -25,6 +26,7 @@ import tensorflow as tf
 
 from tfx import types
 from tfx.dsl.components.base import base_executor
+from tfx.orchestration import data_types_utils
 from tfx.scripts import run_executor
 from tfx.types import artifact_utils
 from tfx.types import standard_artifacts
@@ -82,6 +84,40 @@ class RunExecutorTest(tf.test.TestCase):
           set(args_capture.output_dict.keys()), set(outputs.keys()))
       self.assertDictEqual(args_capture.exec_properties, exec_properties)
 
+  def testMainExecutorArgs(self):
+    inputs = {'x': [standard_artifacts.ExternalArtifact()]}
+    inputs['x'][0].uri = '/tmp/x'
+    outputs = {'y': [standard_artifacts.Examples()]}
+    exec_properties = {'a': 'b', 'c': 1}
+    executor_args = data_types_utils.serialize_executor_args(
+        inputs, outputs, exec_properties)
+    args = [
+        '--executor_class_path=%s.%s' %
+        (FakeExecutor.__module__, FakeExecutor.__name__),
+        '--executor-args-base64=%s' %
+        base64.b64encode(executor_args).decode('ascii'),
+    ]
+    with ArgsCapture() as args_capture:
+      run_executor.main(args)
+      self.assertEqual(['x'], list(args_capture.input_dict))
+      self.assertEqual('/tmp/x', args_capture.input_dict['x'][0].uri)
+      self.assertIsInstance(args_capture.output_dict['y'][0],
+                            standard_artifacts.Examples)
+      self.assertDictEqual(args_capture.exec_properties, exec_properties)
+
+  def testMainExecutorArgsWithJsonFlags(self):
+    inputs = {'x': [standard_artifacts.ExternalArtifact()]}
+    executor_args = data_types_utils.serialize_executor_args(inputs, {}, {})
+    args = [
+        '--executor_class_path=%s.%s' %
+        (FakeExecutor.__module__, FakeExecutor.__name__),
+        '--executor-args-base64=%s' %
+        base64.b64encode(executor_args).decode('ascii'),
+        '--inputs=%s' % artifact_utils.jsonify_artifact_dict(inputs),
+    ]
+    with self.assertRaises(SystemExit):
+      run_executor.main(args)
+
 
 # TODO(zhitaoli): Add tests for:
 # - base64 decoding of flags;
@@ -22,7 +22,6 @@ import builtins
 import copy
 import enum
 import importlib
-import json
 from typing import Any, Dict, Optional, Text, Type
 
 from absl import logging
@@ -129,6 +128,14 @@ class Artifact(json_utils.Jsonable):
   # Initialization flag to support setattr / getattr behavior.
   _initialized = False
 
+  # Number of Artifact subclasses defined so far, used to invalidate indexes of
+  # the Artifact type ontology (see `artifact_utils.get_artifact_type_class`).
+  _subclass_generation = 0
+
+  def __init_subclass__(cls, **kwargs):
+    super(Artifact, cls).__init_subclass__(**kwargs)
+    Artifact._subclass_generation += 1
+
   def __init__(
       self,
       mlmd_artifact_type: Optional[metadata_store_pb2.ArtifactType] = None):
@@ -288,14 +295,11 @@ class Artifact(json_utils.Jsonable):
   def to_json_dict(self) -> Dict[Text, Any]:
     return {
         'artifact':
-            json.loads(
-                json_format.MessageToJson(
-                    message=self._artifact, preserving_proto_field_name=True)),
+            json_format.MessageToDict(
+                self._artifact, preserving_proto_field_name=True),
         'artifact_type':
-            json.loads(
-                json_format.MessageToJson(
-                    message=self._artifact_type,
-                    preserving_proto_field_name=True)),
+            json_format.MessageToDict(
+                self._artifact_type, preserving_proto_field_name=True),
         '__artifact_class_module__':
             self.__class__.__module__,
         '__artifact_class_name__':
@@ -304,13 +308,30 @@ class Artifact(json_utils.Jsonable):
 
   @classmethod
   def from_json_dict(cls, dict_data: Dict[Text, Any]) -> Any:
-    module_name = dict_data['__artifact_class_module__']
-    class_name = dict_data['__artifact_class_name__']
     artifact = metadata_store_pb2.Artifact()
     artifact_type = metadata_store_pb2.ArtifactType()
-    json_format.Parse(json.dumps(dict_data['artifact']), artifact)
-    json_format.Parse(json.dumps(dict_data['artifact_type']), artifact_type)
+    json_format.ParseDict(dict_data['artifact'], artifact)
+    json_format.ParseDict(dict_data['artifact_type'], artifact_type)
+    return cls.from_class_name(dict_data['__artifact_class_module__'],
+                               dict_data['__artifact_class_name__'],
+                               artifact_type, artifact)
+
+  @classmethod
+  def from_class_name(cls, module_name: Text, class_name: Text,
+                      artifact_type: metadata_store_pb2.ArtifactType,
+                      artifact: metadata_store_pb2.Artifact) -> Any:
+    """Builds an artifact of the named class from its MLMD protos.
 
+    Args:
+      module_name: Module of the class of the artifact.
+      class_name: Name of the class of the artifact.
+      artifact_type: The MLMD type of the artifact.
+      artifact: The MLMD artifact.
+
+    Returns:
+      An artifact of the named class, or a generic Artifact if the class can
+      not be imported.
+    """
     # First, try to resolve the specific class used for the artifact; if this
     # is not possible, use a generic artifact.Artifact object.
     result = None
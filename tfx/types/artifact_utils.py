@@ -23,7 +23,8 @@ import itertools
 import json
 import os
 import re
-from typing import Dict, List, Optional, Text, Type
+import threading
+from typing import Any, Dict, List, Optional, Text, Tuple, Type
 
 import absl
 from tfx.types.artifact import _ArtifactType
@@ -170,6 +171,96 @@ def _get_subclasses(cls: Type[Artifact]) -> List[Type[Artifact]]:
   return all_subclasses
 
 
+def _get_type_signature(
+    artifact_type: metadata_store_pb2.ArtifactType
+) -> Tuple[Text, Tuple[Tuple[Text, int], ...]]:
+  """Returns the (name, properties) signature identifying an artifact type.
+
+  The proto `.id` field is not part of the signature, because it is populated
+  when the type is read from MLMD.
+
+  Args:
+    artifact_type: A metadata_store_pb2.ArtifactType proto object.
+
+  Returns:
+    A hashable tuple of the type name and its sorted property types.
+  """
+  return (artifact_type.name,
+          tuple(sorted(artifact_type.properties.items())))
+
+
+class _ArtifactClassRegistry(object):
+  """Index of the Artifact type ontology by type signature.
+
+  The index is built lazily from the transitive subclasses of Artifact and
+  rebuilt whenever a new subclass has been defined since. Classes generated
+  for types without a matching class are kept by the registry, so that a
+  single class is generated per type.
+  """
+
+  def __init__(self):
+    self._lock = threading.Lock()
+    self._generation = None
+    self._index = {}  # type: Dict[Tuple[Any, ...], Type[Artifact]]
+    # Strong references to generated classes, which are otherwise only weakly
+    # referenced by `Artifact.__subclasses__()`.
+    self._generated_classes = {}  # type: Dict[Tuple[Any, ...], Type[Artifact]]
+
+  def _maybe_rebuild_index(self):
+    """Rebuilds the index if Artifact subclasses were defined since."""
+    generation = Artifact._subclass_generation  # pylint: disable=protected-access
+    if generation == self._generation:
+      return
+    # Enumerate the Artifact type ontology, separated into auto-generated and
+    # natively-defined classes.
+    native_artifact_classes = []
+    generated_artifact_classes = []
+    for cls in _get_subclasses(Artifact):
+      if not cls.TYPE_NAME:
+        # Skip abstract classes.
+        continue
+      if getattr(cls, '_AUTOGENERATED', False):
+        generated_artifact_classes.append(cls)
+      else:
+        native_artifact_classes.append(cls)
+    # Prefer to use a native artifact class, then the first class defined for
+    # a type.
+    index = {}
+    for cls in itertools.chain(native_artifact_classes,
+                               generated_artifact_classes):
+      signature = _get_type_signature(cls._get_artifact_type())  # pylint: disable=protected-access
+      index.setdefault(signature, cls)
+    self._index = index
+    self._generation = generation
+
+  def get(self, artifact_type: metadata_store_pb2.ArtifactType
+         ) -> Type[Artifact]:
+    """Returns the Artifact class of a type, generating it if needed."""
+    signature = _get_type_signature(artifact_type)
+    with self._lock:
+      self._maybe_rebuild_index()
+      cls = self._index.get(signature)
+      if cls is not None:
+        return cls
+
+      # Generate a class for the artifact type on the fly.
+      absl.logging.warning(
+          ('Could not find matching artifact class for type %r (proto: %r); '
+           'generating an ephemeral artifact class on-the-fly. If this is not '
+           'intended, please make sure that the artifact class for this type '
+           'can be imported within your container or environment where a '
+           'component is executed to consume this type.') %
+          (artifact_type.name, str(artifact_type)))
+      new_artifact_class = _ArtifactType(mlmd_artifact_type=artifact_type)
+      setattr(new_artifact_class, '_AUTOGENERATED', True)
+      self._generated_classes[signature] = new_artifact_class
+      self._index[signature] = new_artifact_class
+      return new_artifact_class
+
+
+_artifact_class_registry = _ArtifactClassRegistry()
+
+
 def get_artifact_type_class(
     artifact_type: metadata_store_pb2.ArtifactType) -> Type[Artifact]:
   """Get the artifact type class corresponding to an MLMD type proto."""
@@ -180,43 +271,7 @@ def get_artifact_type_class(
   # application or container.
   from tfx.types import standard_artifacts  # pylint: disable=g-import-not-at-top,import-outside-toplevel,unused-import,unused-variable
 
-  # Enumerate the Artifact type ontology, separated into auto-generated and
-  # natively-defined classes.
-  artifact_classes = _get_subclasses(Artifact)
-  native_artifact_classes = []
-  generated_artifact_classes = []
-  for cls in artifact_classes:
-    if not cls.TYPE_NAME:
-      # Skip abstract classes.
-      continue
-    if getattr(cls, '_AUTOGENERATED', False):
-      generated_artifact_classes.append(cls)
-    else:
-      native_artifact_classes.append(cls)
-
-  # Try to find an existing class for the artifact type, if it exists. Prefer
-  # to use a native artifact class.
-  for cls in itertools.chain(native_artifact_classes,
-                             generated_artifact_classes):
-    candidate_type = cls._get_artifact_type()  # pylint: disable=protected-access
-    # We need to compare `.name` and `.properties` (and not the entire proto
-    # directly), because the proto `.id` field will be populated when the type
-    # is read from MLMD.
-    if (artifact_type.name == candidate_type.name and
-        artifact_type.properties == candidate_type.properties):
-      return cls
-
-  # Generate a class for the artifact type on the fly.
-  absl.logging.warning(
-      ('Could not find matching artifact class for type %r (proto: %r); '
-       'generating an ephemeral artifact class on-the-fly. If this is not '
-       'intended, please make sure that the artifact class for this type can '
-       'be imported within your container or environment where a component '
-       'is executed to consume this type.') %
-      (artifact_type.name, str(artifact_type)))
-  new_artifact_class = _ArtifactType(mlmd_artifact_type=artifact_type)
-  setattr(new_artifact_class, '_AUTOGENERATED', True)
-  return new_artifact_class
+  return _artifact_class_registry.get(artifact_type)
 
 
 def deserialize_artifact(
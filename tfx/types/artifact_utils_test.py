@@ -113,6 +113,35 @@ class ArtifactUtilsTest(tf.test.TestCase):
     self.assertEqual(mlmd_artifact_type,
                      reconstructed_class._get_artifact_type())
 
+  @mock.patch('absl.logging.warning')
+  def testArtifactTypeClassGeneratedOnce(self, *unused_mocks):
+    mlmd_artifact_type = copy.deepcopy(
+        standard_artifacts.Examples._get_artifact_type())
+    mlmd_artifact_type.name = 'GeneratedOnceTypeName'
+
+    reconstructed_class = artifact_utils.get_artifact_type_class(
+        mlmd_artifact_type)
+    mlmd_artifact_type.id = 123
+    self.assertIs(reconstructed_class,
+                  artifact_utils.get_artifact_type_class(mlmd_artifact_type))
+    absl.logging.warning.assert_called_once()
+
+  @mock.patch('absl.logging.warning')
+  def testArtifactTypeClassDefinedAfterLookup(self, *unused_mocks):
+    mlmd_artifact_type = _MyArtifact._get_artifact_type()
+    mlmd_artifact_type.name = 'DefinedAfterLookupTypeName'
+    generated_class = artifact_utils.get_artifact_type_class(
+        mlmd_artifact_type)
+
+    class _DefinedAfterLookup(artifact.Artifact):
+      TYPE_NAME = 'DefinedAfterLookupTypeName'
+      PROPERTIES = _MyArtifact.PROPERTIES
+
+    # Generated classes are only used for types without a native class.
+    self.assertIsNot(generated_class, _DefinedAfterLookup)
+    self.assertIs(_DefinedAfterLookup,
+                  artifact_utils.get_artifact_type_class(mlmd_artifact_type))
+
 
 if __name__ == '__main__':
   tf.test.main()
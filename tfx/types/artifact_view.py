@@ -0,0 +1,199 @@
+# Lint as: python3
+# Copyright 2020 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Lightweight read-only views of MLMD artifacts.
+
+An `ArtifactView` wraps the MLMD artifact proto it is created from without
+copying it, and shares the ArtifactType proto of its type with all other views
+of that type. Artifact properties are exposed as attributes through accessors
+generated once per artifact type. Views are meant for code holding many
+artifacts, e.g. input resolution, and can be converted to a full `Artifact`
+when needed.
+
+Internal module, no backwards compatibility guarantees.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Text, Tuple, Type
+
+from tfx.types import artifact_utils
+from tfx.types.artifact import Artifact
+
+from ml_metadata.proto import metadata_store_pb2
+
+# Field of the MLMD Value proto and default value of each property type.
+_PROPERTY_FIELDS = {
+    metadata_store_pb2.STRING: ('string_value', ''),
+    metadata_store_pb2.INT: ('int_value', 0),
+    metadata_store_pb2.DOUBLE: ('double_value', 0.0),
+}
+
+
+class ArtifactView(object):
+  """Read-only view of an MLMD artifact of a given type.
+
+  Use `create_views` to create views, which returns instances of a subclass
+  specific to the artifact type with an attribute per artifact property.
+  """
+
+  __slots__ = ['_artifact', '_artifact_type']
+
+  def __init__(self, artifact_type: metadata_store_pb2.ArtifactType,
+               artifact: metadata_store_pb2.Artifact):
+    """Constructs a view, without copying `artifact_type` and `artifact`."""
+    self._artifact_type = artifact_type
+    self._artifact = artifact
+
+  def __repr__(self):
+    return 'ArtifactView(artifact: {}, artifact_type: {})'.format(
+        str(self._artifact), str(self._artifact_type))
+
+  @property
+  def type(self) -> Type[Artifact]:
+    return artifact_utils.get_artifact_type_class(self._artifact_type)
+
+  @property
+  def type_name(self) -> Text:
+    return self._artifact_type.name
+
+  @property
+  def artifact_type(self) -> metadata_store_pb2.ArtifactType:
+    return self._artifact_type
+
+  @property
+  def mlmd_artifact(self) -> metadata_store_pb2.Artifact:
+    return self._artifact
+
+  @property
+  def uri(self) -> Text:
+    return self._artifact.uri
+
+  @property
+  def id(self) -> int:
+    return self._artifact.id
+
+  @property
+  def type_id(self) -> int:
+    return self._artifact.type_id
+
+  def _get_system_property(self, key: Text) -> Text:
+    # See `Artifact._get_system_property`.
+    if (key in self._artifact_type.properties and
+        key in self._artifact.properties):
+      return self._artifact.properties[key].string_value
+    return self.get_string_custom_property(key)
+
+  @property
+  def name(self) -> Text:
+    return self._get_system_property('name')
+
+  @property
+  def state(self) -> Text:
+    return self._get_system_property('state')
+
+  @property
+  def pipeline_name(self) -> Text:
+    return self._get_system_property('pipeline_name')
+
+  @property
+  def producer_component(self) -> Text:
+    return self._get_system_property('producer_component')
+
+  def has_custom_property(self, key: Text) -> bool:
+    return key in self._artifact.custom_properties
+
+  def get_string_custom_property(self, key: Text) -> Text:
+    """Get a custom property of string type."""
+    if key not in self._artifact.custom_properties:
+      return ''
+    return self._artifact.custom_properties[key].string_value
+
+  def get_int_custom_property(self, key: Text) -> int:
+    """Get a custom property of int type."""
+    if key not in self._artifact.custom_properties:
+      return 0
+    return self._artifact.custom_properties[key].int_value
+
+  def to_artifact(self) -> Artifact:
+    """Returns a full Artifact with a copy of the contents of this view."""
+    artifact = metadata_store_pb2.Artifact()
+    artifact.CopyFrom(self._artifact)
+    return artifact_utils.deserialize_artifact(self._artifact_type, artifact)
+
+
+def _make_property_getter(name: Text, field: Text,
+                          default: Any) -> Callable[[ArtifactView], Any]:
+  """Returns a getter of the artifact property `name`."""
+
+  def getter(self):
+    properties = self._artifact.properties  # pylint: disable=protected-access
+    if name not in properties:
+      # Avoid populating empty property protobuf with the [] operator.
+      return default
+    return getattr(properties[name], field)
+
+  return getter
+
+
+# View classes by artifact type signature.
+_view_classes = {}  # type: Dict[Tuple[Any, ...], Type[ArtifactView]]
+_view_classes_lock = threading.Lock()
+
+
+def _get_view_class(
+    artifact_type: metadata_store_pb2.ArtifactType) -> Type[ArtifactView]:
+  """Returns the ArtifactView subclass of `artifact_type`."""
+  signature = artifact_utils._get_type_signature(artifact_type)  # pylint: disable=protected-access
+  with _view_classes_lock:
+    view_class = _view_classes.get(signature)
+    if view_class is None:
+      attributes = {'__slots__': []}
+      for name, property_type in artifact_type.properties.items():
+        if property_type not in _PROPERTY_FIELDS:
+          raise ValueError('Unknown MLMD type %r for property %r.' %
+                           (property_type, name))
+        # Like with Artifact, builtin attributes take precedence over
+        # properties of the same name.
+        if hasattr(ArtifactView, name):
+          continue
+        field, default = _PROPERTY_FIELDS[property_type]
+        attributes[name] = property(
+            _make_property_getter(name, field, default))
+      view_class = type('%sView' % artifact_type.name, (ArtifactView,),
+                        attributes)
+      _view_classes[signature] = view_class
+  return view_class
+
+
+def create_views(
+    artifact_type: metadata_store_pb2.ArtifactType,
+    artifacts: Iterable[metadata_store_pb2.Artifact]) -> List[ArtifactView]:
+  """Creates views of MLMD artifacts of the same type.
+
+  All views share `artifact_type`, and neither it nor `artifacts` are copied,
+  so they should not be modified while the views are in use.
+
+  Args:
+    artifact_type: A metadata_store_pb2.ArtifactType proto object describing the
+      type of the artifacts.
+    artifacts: metadata_store_pb2.Artifact proto objects of `artifact_type`.
+
+  Returns:
+    A list of ArtifactViews of `artifacts`, in order.
+
+  Raises:
+    ValueError: If `artifact_type` has a property of unknown type.
+  """
+  view_class = _get_view_class(artifact_type)
+  return [view_class(artifact_type, artifact) for artifact in artifacts]
@@ -0,0 +1,94 @@
+# Lint as: python3
+# Copyright 2020 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for tfx.types.artifact_view."""
+
+import tensorflow as tf
+from tfx.types import artifact
+from tfx.types import artifact_view
+
+
+class _MyArtifact(artifact.Artifact):
+  TYPE_NAME = 'ArtifactViewTypeName'
+  PROPERTIES = {
+      'int1': artifact.Property(artifact.PropertyType.INT),
+      'float1': artifact.Property(artifact.PropertyType.FLOAT),
+      'string1': artifact.Property(artifact.PropertyType.STRING),
+  }
+
+
+class ArtifactViewTest(tf.test.TestCase):
+
+  def _CreateArtifact(self):
+    my_artifact = _MyArtifact()
+    my_artifact.id = 1
+    my_artifact.uri = '/tmp/uri'
+    my_artifact.int1 = 111
+    my_artifact.string1 = 'aaa'
+    my_artifact.state = artifact.ArtifactState.PUBLISHED
+    my_artifact.set_int_custom_property('span', 5)
+    return my_artifact
+
+  def testCreateViews(self):
+    my_artifact = self._CreateArtifact()
+    artifact_type = my_artifact.artifact_type
+    [view1, view2] = artifact_view.create_views(
+        artifact_type, [my_artifact.mlmd_artifact, my_artifact.mlmd_artifact])
+
+    self.assertIs(artifact_type, view1.artifact_type)
+    self.assertIs(artifact_type, view2.artifact_type)
+    self.assertIs(my_artifact.mlmd_artifact, view1.mlmd_artifact)
+    self.assertIs(type(view1), type(view2))
+    self.assertIs(_MyArtifact, view1.type)
+    self.assertEqual('ArtifactViewTypeName', view1.type_name)
+    self.assertEqual(1, view1.id)
+    self.assertEqual('/tmp/uri', view1.uri)
+    self.assertEqual(111, view1.int1)
+    self.assertEqual(0.0, view1.float1)
+    self.assertEqual('aaa', view1.string1)
+    self.assertEqual(artifact.ArtifactState.PUBLISHED, view1.state)
+    self.assertEqual('', view1.producer_component)
+    self.assertTrue(view1.has_custom_property('span'))
+    self.assertEqual(5, view1.get_int_custom_property('span'))
+    self.assertEqual('', view1.get_string_custom_property('missing'))
+
+  def testViewsAreReadOnly(self):
+    my_artifact = self._CreateArtifact()
+    [view] = artifact_view.create_views(my_artifact.artifact_type,
+                                        [my_artifact.mlmd_artifact])
+    with self.assertRaises(AttributeError):
+      view.uri = '/tmp/other_uri'
+    with self.assertRaises(AttributeError):
+      view.int1 = 222
+    with self.assertRaises(AttributeError):
+      view.other = 1
+    with self.assertRaises(AttributeError):
+      _ = view.other
+
+  def testToArtifact(self):
+    my_artifact = self._CreateArtifact()
+    [view] = artifact_view.create_views(my_artifact.artifact_type,
+                                        [my_artifact.mlmd_artifact])
+    converted = view.to_artifact()
+
+    self.assertIsInstance(converted, _MyArtifact)
+    self.assertEqual(my_artifact.mlmd_artifact, converted.mlmd_artifact)
+    self.assertEqual(my_artifact.artifact_type, converted.artifact_type)
+    # The view is not affected by changes to the converted artifact.
+    converted.int1 = 222
+    self.assertEqual(111, view.int1)
+
+
+if __name__ == '__main__':
+  tf.test.main()
@@ -97,6 +97,10 @@ class ExampleStatistics(_TfxArtifact):
   }
 
 
+class ExampleStatisticsCache(_TfxArtifact):
+  TYPE_NAME = 'ExampleStatisticsCache'
+
+
 # TODO(b/158334890): deprecate ExternalArtifact.
 class ExternalArtifact(_TfxArtifact):
   TYPE_NAME = 'ExternalArtifact'
@@ -280,13 +280,22 @@ class StatisticsGenSpec(ComponentSpec):
   PARAMETERS = {
       'stats_options_json': ExecutionParameter(type=(str, Text), optional=True),
       'exclude_splits': ExecutionParameter(type=(str, Text), optional=True),
+      'fuse_splits': ExecutionParameter(type=int, optional=True),
+      'sample_rate': ExecutionParameter(type=float, optional=True),
+      'sample_size': ExecutionParameter(type=int, optional=True),
   }
   INPUTS = {
       'examples': ChannelParameter(type=standard_artifacts.Examples),
       'schema': ChannelParameter(type=standard_artifacts.Schema, optional=True),
+      'statistics_cache':
+          ChannelParameter(
+              type=standard_artifacts.ExampleStatisticsCache, optional=True),
   }
   OUTPUTS = {
       'statistics': ChannelParameter(type=standard_artifacts.ExampleStatistics),
+      'updated_statistics_cache':
+          ChannelParameter(
+              type=standard_artifacts.ExampleStatisticsCache, optional=True),
   }
   # TODO(b/139281215): these input / output names have recently been renamed.
   # These compatibility aliases are temporarily provided for backwards
@@ -309,6 +318,9 @@ class TrainerSpec(ComponentSpec):
       'run_fn': ExecutionParameter(type=(str, Text), optional=True),
       'trainer_fn': ExecutionParameter(type=(str, Text), optional=True),
       'custom_config': ExecutionParameter(type=(str, Text), optional=True),
+      'dataset_cache_config':
+          ExecutionParameter(
+              type=trainer_pb2.DatasetCacheConfig, optional=True),
   }
   INPUTS = {
       'examples':
@@ -349,6 +361,9 @@ class TunerSpec(ComponentSpec):
       'eval_args': ExecutionParameter(type=trainer_pb2.EvalArgs),
       'tune_args': ExecutionParameter(type=tuner_pb2.TuneArgs, optional=True),
       'custom_config': ExecutionParameter(type=(str, Text), optional=True),
+      'dataset_cache_config':
+          ExecutionParameter(
+              type=trainer_pb2.DatasetCacheConfig, optional=True),
   }
   INPUTS = {
       'examples':
@@ -379,6 +394,10 @@ class TransformSpec(ComponentSpec):
           ExecutionParameter(type=(str, Text), optional=True),
       'splits_config':
           ExecutionParameter(type=transform_pb2.SplitsConfig, optional=True),
+      'link_analyzer_cache':
+          ExecutionParameter(type=int, optional=True),
+      'fuse_dataset_reads':
+          ExecutionParameter(type=int, optional=True),
   }
   INPUTS = {
       'examples':
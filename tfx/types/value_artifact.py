@@ -19,14 +19,21 @@ from __future__ import division
 from __future__ import print_function
 
 import abc
-from typing import Any
+import mmap
+import os
+from typing import Any, BinaryIO
 
 from tfx.dsl.io import fileio
 from tfx.types.artifact import Artifact
 
 
 class ValueArtifact(Artifact):
-  """Artifacts of small scalar-values that can be easily loaded into memory."""
+  """Artifacts of small scalar-values that can be easily loaded into memory.
+
+  The value is read from storage on first access of `value`, so that executors
+  which do not use an input value do not read it. Large byte values can be
+  streamed with `open_value` or memory-mapped with `map_value` instead.
+  """
 
   def __init__(self, *args, **kwargs):
     self._has_value = False
@@ -34,33 +41,78 @@ class ValueArtifact(Artifact):
     self._value = None
     super(ValueArtifact, self).__init__(*args, **kwargs)
 
+  def _check_value_file(self):
+    # Assert there is a file exists.
+    if not fileio.exists(self.uri):
+      raise RuntimeError(
+          'Given path does not exist or is not a valid file: %s' % self.uri)
+
   def read(self):
     if not self._has_value:
-      file_path = self.uri
-      # Assert there is a file exists.
-      if not fileio.exists(file_path):
-        raise RuntimeError(
-            'Given path does not exist or is not a valid file: %s' % file_path)
-
-      serialized_value = fileio.open(file_path, 'rb').read()
+      self._check_value_file()
+      with fileio.open(self.uri, 'rb') as f:
+        serialized_value = f.read()
       self._has_value = True
       self._value = self.decode(serialized_value)
     return self._value
 
   def write(self, value):
     serialized_value = self.encode(value)
-    fileio.open(self.uri, 'wb').write(serialized_value)
+    with fileio.open(self.uri, 'wb') as f:
+      f.write(serialized_value)
+
+  def open_value(self) -> BinaryIO:
+    """Opens the serialized value for streaming reads.
+
+    Returns:
+      A binary file object, to be closed by the caller (e.g. used as a context
+      manager).
+
+    Raises:
+      RuntimeError: If the value file does not exist.
+    """
+    self._check_value_file()
+    return fileio.open(self.uri, 'rb')
+
+  def map_value(self) -> memoryview:
+    """Returns the serialized value without copying it in memory if possible.
+
+    Values in local files are memory-mapped, so that only the pages accessed
+    are read. Values in other filesystems are read into memory.
+
+    Returns:
+      A read-only memoryview of the serialized value.
+
+    Raises:
+      RuntimeError: If the value file does not exist.
+    """
+    self._check_value_file()
+    if '://' in self.uri:
+      with fileio.open(self.uri, 'rb') as f:
+        return memoryview(f.read())
+    with open(self.uri, 'rb') as f:
+      if not os.fstat(f.fileno()).st_size:
+        # Empty files cannot be memory-mapped.
+        return memoryview(b'')
+      # The mapping stays valid after the file is closed.
+      return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
 
   @property
   def value(self):
-    if not self._has_value:
-      raise ValueError('The artifact value has not yet been read from storage.')
-    return self._value
+    """The value of the artifact, read from storage on first access.
+
+    Raises:
+      ValueError: If the value was neither set nor written to storage.
+    """
+    if not self._has_value and not fileio.exists(self.uri):
+      raise ValueError('The artifact value has not been written to storage.')
+    return self.read()
 
   @value.setter
   def value(self, value):
     self._modified = True
     self._value = value
+    self._has_value = True
     self.write(value)
 
   # Note: behavior of decode() method should not be changed to provide
@@ -18,6 +18,7 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import os
 from typing import Text
 
 # Standard Imports
@@ -63,7 +64,8 @@ def fake_isdir(path: Text) -> bool:
 
 def fake_open(unused_path: Text, unused_mode: Text = 'r') -> bool:
   """Mock behavior of fileio.open."""
-  mock_open = mock.Mock()
+  mock_open = mock.MagicMock()
+  mock_open.__enter__.return_value = mock_open
   mock_open.read.side_effect = lambda: _BYTE_VALUE
   return mock_open
 
@@ -84,13 +86,31 @@ class ValueArtifactTest(tf.test.TestCase):
     instance.uri = _VALID_URI
     self.assertEqual(_VALID_URI, instance.uri)
 
-    with self.assertRaisesRegexp(
-        ValueError, 'The artifact value has not yet been read from storage.'):
-      instance.value  # pylint: disable=pointless-statement
-
     instance.read()
     self.assertEqual(_STRING_VALUE, instance.value)
 
+  @mock.patch.object(fileio, 'exists', fake_exist)
+  @mock.patch.object(fileio, 'isdir', fake_isdir)
+  def testValueArtifactLazyRead(self):
+    instance = _MyValueArtifact()
+    instance.uri = _VALID_URI
+
+    with mock.patch.object(fileio, 'open', side_effect=fake_open) as mock_open:
+      self.assertEqual(_STRING_VALUE, instance.value)
+      self.assertEqual(_STRING_VALUE, instance.value)
+      mock_open.assert_called_once()
+
+  def testValueArtifactStreamingReads(self):
+    instance = _MyValueArtifact()
+    instance.uri = os.path.join(self.get_temp_dir(), 'value')
+    instance.value = _STRING_VALUE
+
+    with instance.open_value() as f:
+      self.assertEqual(_BYTE_VALUE[:4], f.read(4))
+    self.assertEqual(_BYTE_VALUE, instance.map_value().tobytes())
+    instance.value = u''
+    self.assertEqual(b'', instance.map_value().tobytes())
+
   @mock.patch.object(fileio, 'exists', fake_exist)
   @mock.patch.object(fileio, 'isdir', fake_isdir)
   @mock.patch.object(fileio, 'open', fake_open)
@@ -102,6 +122,13 @@ class ValueArtifactTest(tf.test.TestCase):
         RuntimeError, 'Given path does not exist or is not a valid file'):
       instance.read()
 
+  def testValueArtifactNotWritten(self):
+    instance = _MyValueArtifact()
+    instance.uri = os.path.join(self.get_temp_dir(), 'missing_value')
+
+    with self.assertRaisesRegexp(ValueError, 'has not been written'):
+      _ = instance.value
+
 
 if __name__ == '__main__':
   tf.test.main()
@@ -0,0 +1,313 @@
+# Lint as: python3
+# Copyright 2020 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Cache of decoded statistics and schema protos.
+
+Statistics of datasets with many features can be hundreds of MB, and the same
+statistics and schema files are decoded by several components (SchemaGen,
+ExampleValidator, Transform, ...) running in the same worker. This module
+caches the decoded protos at two levels:
+
+  * An in-process LRU of decoded messages, keyed by the fingerprint of the
+    file contents and bounded by the serialized size of the messages. A second
+    index from (path, size, modification time) to the content fingerprint lets
+    repeated loads of an unchanged file skip reading it altogether. The bound
+    is set by the `TFX_DECODED_ARTIFACT_CACHE_MAX_BYTES` environment variable
+    and defaults to 512MiB, so that the statistics of wide datasets are
+    cached. Decoded messages take a few times their serialized size in memory,
+    so workers with little memory should lower it; 0 disables the in-process
+    level.
+  * Optionally, a directory on local disk holding the binary serialization of
+    decoded messages, keyed by the same content fingerprint. Parsing the binary
+    serialization is much cheaper than parsing the text format of a schema,
+    and the directory is shared by all processes of a worker. It is enabled by
+    setting the `TFX_DECODED_ARTIFACT_CACHE_DIR` environment variable.
+
+Loads return a private copy of the cached message by default, so callers are
+free to mutate the result. Callers which only read large messages can opt out
+of the copy.
+"""
+
+import collections
+import hashlib
+import os
+import struct
+import threading
+from typing import Any, Callable, Dict, Optional, Text, Type, TypeVar
+
+from absl import logging
+from tfx.dsl.io import fileio
+
+from google.protobuf import message
+from google.protobuf import text_format
+
+# Environment variable holding the local disk cache directory.
+DISK_CACHE_DIR_ENV = 'TFX_DECODED_ARTIFACT_CACHE_DIR'
+
+# Environment variable holding the maximum size of the in-process cache.
+MAX_BYTES_ENV = 'TFX_DECODED_ARTIFACT_CACHE_MAX_BYTES'
+
+# Default maximum total serialized size of the decoded messages kept in memory.
+DEFAULT_MAX_BYTES = 512 << 20
+
+_DISK_CACHE_FILE_SUFFIX = '.pb'
+
+# A TFRecord is framed by its length (uint64) and the CRC of the length
+# (uint32) before the data, and the CRC of the data (uint32) after it.
+_TFRECORD_HEADER_FORMAT = '<QI'
+_TFRECORD_HEADER_SIZE = struct.calcsize(_TFRECORD_HEADER_FORMAT)
+_TFRECORD_FOOTER_SIZE = 4
+
+_MessageT = TypeVar('_MessageT', bound=message.Message)
+# Decodes a message from the path of a file and its contents.
+DecodeFn = Callable[[Text, bytes], message.Message]
+
+
+def _stat_key(path: Text) -> Any:
+  """Returns the size and modification time of `path`."""
+  stat = fileio.stat(path)
+  # Filesystem plugins return either os.stat_result or tf.io.gfile's StatResult.
+  size = getattr(stat, 'length', getattr(stat, 'st_size', None))
+  mtime = getattr(stat, 'mtime_nsec', getattr(stat, 'st_mtime_ns', None))
+  return size, mtime
+
+
+class DecodedArtifactCache(object):
+  """Thread-safe two-level cache of decoded protos with hit counters."""
+
+  def __init__(self,
+               max_bytes: int = DEFAULT_MAX_BYTES,
+               disk_cache_dir: Optional[Text] = None):
+    self.max_bytes = max_bytes
+    self.disk_cache_dir = disk_cache_dir
+    self._lock = threading.Lock()
+    # Maps content fingerprints to decoded messages and their serialized
+    # sizes, least recent first.
+    self._messages = collections.OrderedDict()
+    self._num_bytes = 0
+    # Maps (message type, path) to the (size, mtime) of the file and its
+    # content fingerprint, as long as a level of the cache holds the message.
+    self._fingerprints = {}  # type: Dict[Any, Any]
+    self.memory_hits = 0
+    self.disk_hits = 0
+    self.misses = 0
+    self.evictions = 0
+
+  def _get_from_memory(self, fingerprint: Text) -> Optional[message.Message]:
+    with self._lock:
+      cached = self._messages.get(fingerprint)
+      if cached is None:
+        return None
+      self._messages.move_to_end(fingerprint)
+      self.memory_hits += 1
+      return cached[0]
+
+  def _put_in_memory(self, fingerprint: Text, msg: message.Message) -> None:
+    size = msg.ByteSize()
+    if size > self.max_bytes:
+      return
+    with self._lock:
+      if fingerprint in self._messages:
+        return
+      self._messages[fingerprint] = (msg, size)
+      self._num_bytes += size
+      while self._num_bytes > self.max_bytes:
+        evicted, (_, evicted_size) = self._messages.popitem(last=False)
+        self._num_bytes -= evicted_size
+        if not self.disk_cache_dir:
+          self._fingerprints = {
+              k: v for k, v in self._fingerprints.items() if v[1] != evicted
+          }
+        self.evictions += 1
+
+  def _get_from_disk(self, fingerprint: Text,
+                     message_class: Type[_MessageT]) -> Optional[_MessageT]:
+    if not self.disk_cache_dir:
+      return None
+    path = os.path.join(self.disk_cache_dir,
+                        fingerprint + _DISK_CACHE_FILE_SUFFIX)
+    if not fileio.exists(path):
+      return None
+    with fileio.open(path, 'rb') as f:
+      result = message_class.FromString(f.read())
+    with self._lock:
+      self.disk_hits += 1
+    return result
+
+  def _put_on_disk(self, fingerprint: Text, msg: message.Message) -> None:
+    if not self.disk_cache_dir:
+      return
+    path = os.path.join(self.disk_cache_dir,
+                        fingerprint + _DISK_CACHE_FILE_SUFFIX)
+    # Write to a temporary file first so that concurrent readers never see a
+    # partially written entry.
+    tmp_path = '%s.tmp-%d-%d' % (path, os.getpid(), threading.get_ident())
+    try:
+      fileio.makedirs(self.disk_cache_dir)
+      with fileio.open(tmp_path, 'wb') as f:
+        f.write(msg.SerializeToString())
+      fileio.rename(tmp_path, path, overwrite=True)
+    except Exception as e:  # pylint: disable=broad-except
+      # The disk cache is best effort only.
+      logging.warning('Failed to write decoded artifact cache entry %s: %s',
+                      path, e)
+
+  def load(self,
+           path: Text,
+           message_class: Type[_MessageT],
+           decode_fn: DecodeFn,
+           copy: bool = True) -> _MessageT:
+    """Returns the message decoded from the file at `path`.
+
+    Args:
+      path: Path of the file to decode.
+      message_class: Class of the decoded message.
+      decode_fn: Function decoding a `message_class` message from the path of
+        the file and its contents, called on cache misses.
+      copy: Whether to return a copy of the cached message. If False, the
+        returned message may be shared and must not be mutated.
+
+    Returns:
+      A `message_class` message.
+    """
+    type_name = message_class.DESCRIPTOR.full_name
+    path_key = (type_name, path)
+    stat = _stat_key(path)
+    with self._lock:
+      known = self._fingerprints.get(path_key)
+    cached = None
+    if known is not None and known[0] == stat:
+      # The file is unchanged, so its contents need not be read.
+      cached = self._get_from_memory(known[1])
+      if cached is None:
+        cached = self._get_from_disk(known[1], message_class)
+        if cached is not None:
+          self._put_in_memory(known[1], cached)
+    if cached is None:
+      with fileio.open(path, 'rb') as f:
+        contents = f.read()
+      fingerprint = hashlib.sha256(type_name.encode('utf-8') + b'\0' +
+                                   contents).hexdigest()
+      cached = self._get_from_memory(fingerprint)
+      if cached is None:
+        cached = self._get_from_disk(fingerprint, message_class)
+        if cached is None:
+          with self._lock:
+            self.misses += 1
+          cached = decode_fn(path, contents)
+          self._put_on_disk(fingerprint, cached)
+        self._put_in_memory(fingerprint, cached)
+      with self._lock:
+        if self.disk_cache_dir or fingerprint in self._messages:
+          self._fingerprints[path_key] = (stat, fingerprint)
+        else:
+          self._fingerprints.pop(path_key, None)
+    if not copy:
+      return cached
+    result = message_class()
+    result.CopyFrom(cached)
+    return result
+
+  def clear(self) -> None:
+    """Drops all in-memory entries and resets the counters."""
+    with self._lock:
+      self._messages.clear()
+      self._num_bytes = 0
+      self._fingerprints.clear()
+      self.memory_hits = 0
+      self.disk_hits = 0
+      self.misses = 0
+      self.evictions = 0
+
+  def get_stats(self) -> Dict[Text, int]:
+    with self._lock:
+      return {
+          'memory_hits': self.memory_hits,
+          'disk_hits': self.disk_hits,
+          'misses': self.misses,
+          'evictions': self.evictions,
+          'entries': len(self._messages),
+          'bytes': self._num_bytes,
+      }
+
+
+_default_cache = None  # type: Optional[DecodedArtifactCache]
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache() -> DecodedArtifactCache:
+  """Returns the cache shared by all components of the process."""
+  global _default_cache
+  with _default_cache_lock:
+    if _default_cache is None:
+      _default_cache = DecodedArtifactCache(
+          max_bytes=int(os.environ.get(MAX_BYTES_ENV, DEFAULT_MAX_BYTES)),
+          disk_cache_dir=os.environ.get(DISK_CACHE_DIR_ENV) or None)
+    return _default_cache
+
+
+def get_stats() -> Dict[Text, int]:
+  """Returns the hit and miss counters of the default cache."""
+  return get_default_cache().get_stats()
+
+
+def _decode_statistics(path: Text, contents: bytes) -> message.Message:
+  """Decodes statistics written by TFDV from the contents of their file.
+
+  Statistics are a single TFRecord, as written by StatisticsGen, or else a
+  binary or text format proto, as accepted by `tfdv.load_statistics`.
+
+  Args:
+    path: Path of the statistics file.
+    contents: Contents of the statistics file.
+
+  Returns:
+    A DatasetFeatureStatisticsList.
+
+  Raises:
+    ValueError: If the contents are not statistics.
+  """
+  from tensorflow_metadata.proto.v0 import statistics_pb2  # pylint: disable=g-import-not-at-top
+  message_class = statistics_pb2.DatasetFeatureStatisticsList
+  if len(contents) >= _TFRECORD_HEADER_SIZE + _TFRECORD_FOOTER_SIZE:
+    length, _ = struct.unpack_from(_TFRECORD_HEADER_FORMAT, contents)
+    if (_TFRECORD_HEADER_SIZE + length +
+        _TFRECORD_FOOTER_SIZE == len(contents)):
+      return message_class.FromString(
+          contents[_TFRECORD_HEADER_SIZE:_TFRECORD_HEADER_SIZE + length])
+  try:
+    return message_class.FromString(contents)
+  except message.DecodeError:
+    pass
+  try:
+    return text_format.Parse(contents, message_class())
+  except (text_format.ParseError, UnicodeDecodeError) as e:
+    raise ValueError('{} does not hold statistics: {}'.format(path, e))
+
+
+def load_statistics(path: Text, copy: bool = True) -> Any:
+  """Loads a DatasetFeatureStatisticsList through the default cache.
+
+  Args:
+    path: Path of the statistics file.
+    copy: Whether to return a copy of the cached statistics. If False, the
+      returned statistics may be shared and must not be mutated.
+
+  Returns:
+    The decoded statistics.
+  """
+  from tensorflow_metadata.proto.v0 import statistics_pb2  # pylint: disable=g-import-not-at-top
+  return get_default_cache().load(
+      path, statistics_pb2.DatasetFeatureStatisticsList, _decode_statistics,
+      copy=copy)
@@ -0,0 +1,151 @@
+# Lint as: python3
+# Copyright 2020 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for tfx.utils.decoded_artifact_cache."""
+
+import os
+
+import mock
+import tensorflow as tf
+from tfx.utils import decoded_artifact_cache
+from tfx.utils import io_utils
+
+from google.protobuf import text_format
+from tensorflow_metadata.proto.v0 import schema_pb2
+from tensorflow_metadata.proto.v0 import statistics_pb2
+
+
+class DecodedArtifactCacheTest(tf.test.TestCase):
+
+  def setUp(self):
+    super(DecodedArtifactCacheTest, self).setUp()
+    self._base_dir = os.path.join(
+        os.environ.get('TEST_UNDECLARED_OUTPUTS_DIR', self.get_temp_dir()),
+        self._testMethodName)
+    self._num_decodes = 0
+
+  def _WriteSchema(self, name, feature_name):
+    path = os.path.join(self._base_dir, name, 'schema.pbtxt')
+    schema = schema_pb2.Schema()
+    schema.feature.add(name=feature_name)
+    io_utils.write_pbtxt_file(path, schema)
+    return path
+
+  def _Decode(self, path, contents):
+    del path
+    self._num_decodes += 1
+    return text_format.Parse(contents, schema_pb2.Schema())
+
+  def testMemoryCache(self):
+    # Room for a single schema of a single feature with a one letter name.
+    cache = decoded_artifact_cache.DecodedArtifactCache(
+        max_bytes=schema_pb2.Schema(
+            feature=[schema_pb2.Feature(name='x')]).ByteSize())
+    path = self._WriteSchema('a', 'x')
+    first = cache.load(path, schema_pb2.Schema, self._Decode)
+    # Results are private copies.
+    first.feature[0].name = 'mutated'
+    second = cache.load(path, schema_pb2.Schema, self._Decode)
+    self.assertEqual('x', second.feature[0].name)
+    # The same content at a different path is a hit as well.
+    cache.load(self._WriteSchema('b', 'x'), schema_pb2.Schema, self._Decode)
+    self.assertEqual(1, self._num_decodes)
+
+    cache.load(self._WriteSchema('c', 'y'), schema_pb2.Schema, self._Decode)
+    cache.load(path, schema_pb2.Schema, self._Decode)
+    self.assertEqual(3, self._num_decodes)
+    self.assertEqual({
+        'memory_hits': 2,
+        'disk_hits': 0,
+        'misses': 3,
+        'evictions': 2,
+        'entries': 1,
+        'bytes': cache.max_bytes,
+    }, cache.get_stats())
+
+  def testMemoryCacheSkipsMessagesLargerThanMaxBytes(self):
+    cache = decoded_artifact_cache.DecodedArtifactCache(max_bytes=1)
+    path = self._WriteSchema('a', 'x')
+    cache.load(path, schema_pb2.Schema, self._Decode)
+    cache.load(path, schema_pb2.Schema, self._Decode)
+    self.assertEqual(2, self._num_decodes)
+    self.assertEqual(0, cache.get_stats()['entries'])
+    # Files of messages held by no level of the cache are not remembered.
+    self.assertEmpty(cache._fingerprints)  # pylint: disable=protected-access
+
+  def testDiskCacheSkipsReadingUnchangedFiles(self):
+    cache = decoded_artifact_cache.DecodedArtifactCache(
+        max_bytes=1, disk_cache_dir=os.path.join(self._base_dir, 'disk_cache'))
+    path = self._WriteSchema('a', 'x')
+    cache.load(path, schema_pb2.Schema, self._Decode)
+    with mock.patch.object(decoded_artifact_cache.fileio, 'open',
+                           wraps=decoded_artifact_cache.fileio.open) as m:
+      self.assertEqual(
+          'x',
+          cache.load(path, schema_pb2.Schema, self._Decode).feature[0].name)
+      m.assert_called_once()
+      self.assertNotEqual(path, m.call_args[0][0])
+    self.assertEqual(1, self._num_decodes)
+    self.assertEqual(1, cache.get_stats()['disk_hits'])
+
+  def testLoadWithoutCopy(self):
+    cache = decoded_artifact_cache.DecodedArtifactCache()
+    path = self._WriteSchema('a', 'x')
+    first = cache.load(path, schema_pb2.Schema, self._Decode, copy=False)
+    self.assertIs(first,
+                  cache.load(path, schema_pb2.Schema, self._Decode, copy=False))
+    self.assertIsNot(first, cache.load(path, schema_pb2.Schema, self._Decode))
+
+  def testDiskCache(self):
+    disk_cache_dir = os.path.join(self._base_dir, 'disk_cache')
+    path = self._WriteSchema('a', 'x')
+    decoded_artifact_cache.DecodedArtifactCache(
+        disk_cache_dir=disk_cache_dir).load(path, schema_pb2.Schema,
+                                            self._Decode)
+    # A new process (i.e. a new in-memory cache) reuses the disk entry.
+    cache = decoded_artifact_cache.DecodedArtifactCache(
+        disk_cache_dir=disk_cache_dir)
+    schema = cache.load(path, schema_pb2.Schema, self._Decode)
+    self.assertEqual('x', schema.feature[0].name)
+    self.assertEqual(1, self._num_decodes)
+    self.assertEqual(1, cache.get_stats()['disk_hits'])
+
+  def testDecodeStatistics(self):
+    stats = statistics_pb2.DatasetFeatureStatisticsList()
+    stats.datasets.add(name='train', num_examples=10)
+    tfrecord_path = os.path.join(self._base_dir, 'stats.tfrecord')
+    io_utils.write_tfrecord_file(tfrecord_path, stats)
+    binary_path = os.path.join(self._base_dir, 'stats.pb')
+    with open(binary_path, 'wb') as f:
+      f.write(stats.SerializeToString())
+    text_path = os.path.join(self._base_dir, 'stats.pbtxt')
+    io_utils.write_pbtxt_file(text_path, stats)
+    for path in (tfrecord_path, binary_path, text_path):
+      with open(path, 'rb') as f:
+        self.assertEqual(
+            stats,
+            decoded_artifact_cache._decode_statistics(path, f.read()))  # pylint: disable=protected-access
+
+  def testSchemaReaderUsesDefaultCache(self):
+    path = self._WriteSchema('a', 'x')
+    before = decoded_artifact_cache.get_stats()
+    self.assertEqual('x', io_utils.SchemaReader().read(path).feature[0].name)
+    self.assertEqual('x', io_utils.SchemaReader().read(path).feature[0].name)
+    after = decoded_artifact_cache.get_stats()
+    self.assertEqual(before['misses'] + 1, after['misses'])
+    self.assertEqual(before['memory_hits'] + 1, after['memory_hits'])
+
+
+if __name__ == '__main__':
+  tf.test.main()
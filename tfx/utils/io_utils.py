@@ -23,6 +23,7 @@ from typing import List, Text, TypeVar
 import six
 
 from tfx.dsl.io import fileio
+from tfx.utils import decoded_artifact_cache
 from google.protobuf import json_format
 from google.protobuf import text_format
 from google.protobuf.message import Message
@@ -188,6 +189,11 @@ class SchemaReader(object):
   def read(self, schema_path: Text) -> schema_pb2_Schema:  # pytype: disable=invalid-annotation
     """Gets a tf.metadata schema.
 
+    Decoded schemas are shared through
+    `decoded_artifact_cache.get_default_cache()`, which is bounded by the
+    serialized size of its messages, so reading the same schema file again
+    does not parse it again.
+
     Args:
       schema_path: Path to schema file.
 
@@ -200,7 +206,10 @@ class SchemaReader(object):
       raise Exception('The full "tfx" package must be installed to use this '
                       'functionality.') from e
 
-    result = schema_pb2.Schema()
-    contents = fileio.open(schema_path).read()
-    text_format.Parse(contents, result)
-    return result
+    def _parse(unused_path: Text, contents: bytes) -> schema_pb2.Schema:
+      result = schema_pb2.Schema()
+      text_format.Parse(contents, result)
+      return result
+
+    return decoded_artifact_cache.get_default_cache().load(
+        schema_path, schema_pb2.Schema, _parse)
@@ -22,7 +22,7 @@ import abc
 import importlib
 import inspect
 import json
-from typing import Any, Dict, List, Text, Type, Union
+from typing import Any, Dict, List, Text, Tuple, Type, Union
 
 from six import with_metaclass
 from tfx.utils import deprecation_utils
@@ -38,6 +38,9 @@ _MODULE_KEY = '__module__'
 _CLASS_KEY = '__class__'
 _PROTO_VALUE_KEY = '__proto_value__'
 
+# Classes loaded by the decoder, by (module name, class name).
+_CLASS_CACHE = {}  # type: Dict[Tuple[Text, Text], Any]
+
 RUNTIME_PARAMETER_PATTERN = (r'({\\*"__class__\\*": \\*"RuntimeParameter\\*", '
                              r'.*?})')
 
@@ -158,9 +161,13 @@ class _DefaultDecoder(json.JSONDecoder):
     object_type = dict_data.pop(_TFX_OBJECT_TYPE_KEY)
 
     def _extract_class(d):
-      module_name = d.pop(_MODULE_KEY)
-      class_name = d.pop(_CLASS_KEY)
-      return getattr(importlib.import_module(module_name), class_name)
+      class_path = (d.pop(_MODULE_KEY), d.pop(_CLASS_KEY))
+      cls = _CLASS_CACHE.get(class_path)
+      if cls is None:
+        module_name, class_name = class_path
+        cls = getattr(importlib.import_module(module_name), class_name)
+        _CLASS_CACHE[class_path] = cls
+      return cls
 
     if object_type == _ObjectType.JSONABLE:
       jsonable_class_type = _extract_class(dict_data)